@@ -27,6 +27,7 @@ from sentry_sdk.integrations.flask import FlaskIntegration  # noqa: I001
 from bcol_api import config
 from bcol_api.config import _Config
 from bcol_api.resources import API_BLUEPRINT, OPS_BLUEPRINT
+from bcol_api.schemas import utils as schema_utils
 from bcol_api.utils.auth import jwt
 from bcol_api.utils.logging import setup_logging
 from bcol_api.utils.run_version import get_run_version
@@ -46,6 +47,8 @@ def create_app(run_mode=os.getenv("FLASK_ENV", "production")):
 
     app.register_blueprint(API_BLUEPRINT)
     app.register_blueprint(OPS_BLUEPRINT)
+    # Load and check the request schemas before serving requests.
+    schema_utils.get_default_schema_store()
     app.after_request(convert_to_camel)
 
     setup_jwt_manager(app, jwt)
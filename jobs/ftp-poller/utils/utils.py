@@ -17,8 +17,7 @@ from typing import List
 
 from flask import current_app
 from paramiko import SFTPFile
-from pay_api.services import gcp_queue_publisher
-from pay_api.services.gcp_queue_publisher import QueueMessage
+from pay_api.services.gcp_queue_publisher import BatchPublisher, QueueMessage
 from pay_api.utils.enums import QueueSources
 from sbc_common_components.utils.enums import QueueMessageTypes
 
@@ -29,23 +28,28 @@ def publish_to_queue(
     payment_file_list: List[str], message_type=QueueMessageTypes.CAS_MESSAGE_TYPE.value, location: str = ""
 ):
     """Publish message to the Queue, saying file has been uploaded. Using the event spec."""
-    queue_data = {"fileSource": "MINIO", "location": location or current_app.config["MINIO_BUCKET_NAME"]}
-    for file_name in payment_file_list:
-        queue_data["fileName"] = file_name
-
-        try:
-            gcp_queue_publisher.publish_to_queue(
+    location = location or current_app.config["MINIO_BUCKET_NAME"]
+    publisher = BatchPublisher()
+    file_names = {}
+    try:
+        for file_name in payment_file_list:
+            future = publisher.publish(
                 QueueMessage(
                     source=QueueSources.FTP_POLLER.value,
                     message_type=message_type,
-                    payload=queue_data,
+                    payload={"fileSource": "MINIO", "location": location, "fileName": file_name},
                     topic=current_app.config.get("FTP_POLLER_TOPIC"),
                     ordering_key=str(time()),
                 )
             )
-        except Exception as e:  # NOQA # pylint: disable=broad-except
-            current_app.logger.warning(f"Notification to Queue failed for the file {file_name}", e)
-            raise
+            if future:
+                file_names[future] = file_name
+    finally:
+        failed = publisher.close()
+    if failed:
+        error_message = "Notification to Queue failed for the files " + ", ".join(file_names[f] for f in failed)
+        current_app.logger.warning(error_message)
+        raise ConnectionError(error_message) from failed[0].exception()
 
 
 def upload_to_minio(file, file_full_name, sftp_client, bucket_name):
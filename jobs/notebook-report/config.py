@@ -22,6 +22,8 @@ class Config(object):
     WEEKLY_REPORT_DATES = os.getenv('WEEKLY_REPORT_DATES', '[1]')
     MONTHLY_REPORT_DATES = os.getenv('MONTHLY_REPORT_DATES', '[1]')
     PARTNER_CODES = os.getenv('PARTNER_CODES', 'CSO,VS,RPT,ESRA')
+    # Number of worker processes running the partner and weekly notebooks.
+    NOTEBOOK_WORKERS = int(os.getenv('NOTEBOOK_WORKERS', '4'))
 
     # POSTGRESQL
     PAY_USER = os.getenv('PAY_USER', '')
@@ -6,7 +6,10 @@ import logging
 import os
 import smtplib
 import sys
+import time
 import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta
 from email import encoders
 from email.mime.base import MIMEBase
@@ -45,8 +48,40 @@ def findfiles(directory, pattern):
             yield os.path.join(directory, filename)
 
 
-def send_email(file_processing, emailtype, errormessage, partner_code=None):
-    """Send email for results."""
+@dataclass
+class Email:
+    """Email built by a notebook run, the emails of a batch are sent together by send_emails."""
+
+    subject: str
+    recipients: list
+    content: str
+
+
+@dataclass
+class NotebookRun:
+    """Timing of a notebook execution."""
+
+    notebook: str
+    partner_code: str
+    seconds: float
+    succeeded: bool
+
+
+@dataclass
+class NotebookResults:
+    """Emails to send and notebook timings, returned from the worker processes."""
+
+    emails: list = field(default_factory=list)
+    runs: list = field(default_factory=list)
+
+    def extend(self, other):
+        """Add the emails and timings of other."""
+        self.emails.extend(other.emails)
+        self.runs.extend(other.runs)
+
+
+def build_email(file_processing, emailtype, errormessage, partner_code=None) -> Email:
+    """Build the email for results."""
     message = MIMEMultipart()
     date_str = datetime.strftime(datetime.now() - timedelta(1), '%Y-%m-%d')
     ext = ''
@@ -82,12 +117,31 @@ def send_email(file_processing, emailtype, errormessage, partner_code=None):
     process_email_attachments(filenames, message)
 
     message['Subject'] = subject
+    return Email(subject=subject, recipients=recipients.strip('][').split(', '), content=message.as_string())
+
+
+def send_emails(emails: list):
+    """Send the emails over one SMTP session, reconnecting if the server drops it."""
+    if not emails:
+        return
     server = smtplib.SMTP(Config.EMAIL_SMTP)
-    email_list = recipients.strip('][').split(', ')
-    logging.info('Email recipients list is: %s', email_list)
-    server.sendmail(Config.SENDER_EMAIL, email_list, message.as_string())
-    logging.info("Email with subject \'%s\' has been sent successfully!", subject)
-    server.quit()
+    try:
+        for email in emails:
+            logging.info('Email recipients list is: %s', email.recipients)
+            try:
+                try:
+                    server.sendmail(Config.SENDER_EMAIL, email.recipients, email.content)
+                except smtplib.SMTPServerDisconnected:
+                    server = smtplib.SMTP(Config.EMAIL_SMTP)
+                    server.sendmail(Config.SENDER_EMAIL, email.recipients, email.content)
+                logging.info("Email with subject \'%s\' has been sent successfully!", email.subject)
+            except smtplib.SMTPException:
+                logging.exception("Error sending email with subject \'%s\'.", email.subject)
+    finally:
+        try:
+            server.quit()
+        except smtplib.SMTPServerDisconnected:
+            pass
 
 
 def process_email_attachments(filenames, message):
@@ -105,70 +159,121 @@ def process_email_attachments(filenames, message):
         message.attach(part)
 
 
-def process_partner_notebooks(notebookdirectory: str, data_dir: str, partner_code: str):
+def process_partner_notebooks(notebookdirectory: str, data_dir: str, partner_code: str) -> NotebookResults:
     """Process Partner Notebook."""
     logging.info('Start processing partner notebooks directory: %s', notebookdirectory)
+    results = NotebookResults()
 
     try:
         monthly_report_dates = ast.literal_eval(Config.MONTHLY_REPORT_DATES)
     except Exception:  # noqa: B902
         logging.exception('Error parsing monthly report dates for: %s', notebookdirectory)
-        send_email(notebookdirectory, 'ERROR', traceback.format_exc())
-        return
+        results.emails.append(build_email(notebookdirectory, 'ERROR', traceback.format_exc()))
+        return results
 
     today = date.today().day
     logging.info("Today\'s date: %s", today)
 
     if notebookdirectory == 'daily':
         logging.info('Processing daily notebooks for partner: %s', partner_code)
-        execute_notebook(notebookdirectory, data_dir, partner_code)
+        results.extend(execute_notebook(notebookdirectory, data_dir, partner_code))
 
     if notebookdirectory == 'monthly' and today in monthly_report_dates:
         logging.info('Processing monthly notebooks for partner: %s', partner_code)
-        execute_notebook(notebookdirectory, data_dir, partner_code, is_monthly=True)
+        results.extend(execute_notebook(notebookdirectory, data_dir, partner_code, is_monthly=True))
 
     # Ensure both daily and monthly run on the 1st of the month
     if today == 1:
         if notebookdirectory == 'daily':
             logging.info('Also processing daily notebooks on the 1st of the month for partner: %s', partner_code)
-            execute_notebook(notebookdirectory, data_dir, partner_code)
+            results.extend(execute_notebook(notebookdirectory, data_dir, partner_code))
         elif notebookdirectory == 'monthly':
             logging.info('Also processing monthly notebooks on the 1st of the month for partner: %s', partner_code)
-            execute_notebook(notebookdirectory, data_dir, partner_code, is_monthly=True)
+            results.extend(execute_notebook(notebookdirectory, data_dir, partner_code, is_monthly=True))
+    return results
 
 
-def process_notebooks(notebookdirectory: str, data_dir: str):
+def process_notebooks(notebookdirectory: str, data_dir: str) -> NotebookResults:
     """Process Notebook."""
     logging.info('Start processing directory: %s', notebookdirectory)
+    results = NotebookResults()
 
     try:
         weekly_report_dates = ast.literal_eval(Config.WEEKLY_REPORT_DATES)
     except Exception:  # noqa: B902
         logging.exception('Error: %s.', notebookdirectory)
-        send_email(notebookdirectory, 'ERROR', traceback.format_exc())
+        results.emails.append(build_email(notebookdirectory, 'ERROR', traceback.format_exc()))
+        return results
 
     # Monday is 1 and Sunday is 7
     if notebookdirectory == 'weekly' and date.today().isoweekday() in weekly_report_dates:
-        execute_notebook(notebookdirectory, data_dir)
+        results.extend(execute_notebook(notebookdirectory, data_dir))
+    return results
 
 
-def execute_notebook(notebookdirectory: str, data_dir: str, partner_code: str = None, is_monthly: bool = False):
-    """Execute notebook and send emails."""
+def execute_notebook(notebookdirectory: str, data_dir: str, partner_code: str = None,
+                     is_monthly: bool = False) -> NotebookResults:
+    """Execute notebook and build the emails."""
     parameters = {'partner_code': partner_code} if partner_code else None
     if is_monthly:
         pattern = 'reconciliation_summary.ipynb'
     else:
         pattern = f'{partner_code.lower()}_*.ipynb' if partner_code else '*.ipynb'
 
+    results = NotebookResults()
     for file in findfiles(notebookdirectory, pattern):
+        # Notebooks run concurrently, each run has its own output notebook.
+        output_file = data_dir + f'{partner_code or notebookdirectory}_{os.path.basename(file)}'
+        start_time = time.monotonic()
+        succeeded = False
         try:
-            pm.execute_notebook(file, data_dir + 'temp.ipynb', parameters=parameters)
-            # send email to receivers and remove files/directories which we don't want to keep
-            send_email(file, '', '', partner_code)
-            os.remove(data_dir + 'temp.ipynb')
+            pm.execute_notebook(file, output_file, parameters=parameters)
+            # email to receivers and remove files/directories which we don't want to keep
+            results.emails.append(build_email(file, '', '', partner_code))
+            os.remove(output_file)
+            succeeded = True
         except Exception:  # noqa: B902
             logging.exception('Error: %s.', file)
-            send_email(file, 'ERROR', traceback.format_exc())
+            results.emails.append(build_email(file, 'ERROR', traceback.format_exc()))
+        seconds = time.monotonic() - start_time
+        logging.info('Notebook %s for %s %s in %.1fs.', file, partner_code or '-',
+                     'completed' if succeeded else 'failed', seconds)
+        results.runs.append(NotebookRun(notebook=file, partner_code=partner_code, seconds=seconds,
+                                        succeeded=succeeded))
+    return results
+
+
+def process_partner(partner_code: str, data_dir: str) -> NotebookResults:
+    """Process the daily and monthly notebooks of a partner."""
+    results = NotebookResults()
+    for subdir in ['daily', 'monthly']:
+        results.extend(process_partner_notebooks(subdir, data_dir, partner_code))
+    return results
+
+
+def process_all_notebooks(partner_codes: list, data_dir: str) -> NotebookResults:
+    """Process the partner and weekly notebooks in a pool of NOTEBOOK_WORKERS processes.
+
+    The workers return the emails instead of sending them, they're sent over one SMTP session by the caller.
+    """
+    results = NotebookResults()
+    with ProcessPoolExecutor(max_workers=max(Config.NOTEBOOK_WORKERS, 1)) as executor:
+        futures = {executor.submit(process_partner, code, data_dir): code for code in partner_codes}
+        futures[executor.submit(process_notebooks, 'weekly', data_dir)] = 'weekly'
+        for future, name in futures.items():
+            try:
+                results.extend(future.result())
+            except Exception:  # noqa: B902
+                logging.exception('Error processing notebooks for: %s.', name)
+                results.emails.append(build_email(name, 'ERROR', traceback.format_exc()))
+    return results
+
+
+def log_notebook_timings(runs: list):
+    """Log the notebook timings, slowest first."""
+    for run in sorted(runs, key=lambda run: run.seconds, reverse=True):
+        logging.info('%7.1fs %-8s %s%s', run.seconds, run.partner_code or '-', run.notebook,
+                     '' if run.succeeded else ' (failed)')
 
 
 def get_partner_recipients(file_processing: str, partner_code: str) -> str:
@@ -193,15 +298,13 @@ if __name__ == '__main__':
     # Current partner codes to execute notebooks on
     partner_codes = Config.PARTNER_CODES.split(',')
 
-    # Process notebooks for each partner
+    # Process notebooks for each partner, and the weekly pay notebook
     # For each daily and monthly email, it is expected there is configuration per partner
     # e.g Config.VS_DAILY_RECONCILIATION_RECIPIENTS, Config.CSO_DAILY_RECONCILIATION_RECIPIENTS
-    for code in partner_codes:
-        for subdir in ['daily', 'monthly']:
-            process_partner_notebooks(subdir, temp_dir, code)
-
-    # process weekly pay notebook separate from partner notebooks
-    process_notebooks('weekly', temp_dir)
+    # The monthly totals are read from the revenue_rollups kept by the REVENUE_ROLLUP payment job.
+    notebook_results = process_all_notebooks(partner_codes, temp_dir)
+    send_emails(notebook_results.emails)
+    log_notebook_timings(notebook_results.runs)
 
     end_time = datetime.utcnow()
     logging.info('job - jupyter notebook report completed in: %s', end_time - start_time)
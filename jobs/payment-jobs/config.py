@@ -101,9 +101,12 @@ class _Config(object):  # pylint: disable=too-few-public-methods
     AUTH_API_VERSION = os.getenv("AUTH_API_VERSION", "")
     NOTIFY_API_URL = os.getenv("NOTIFY_API_URL", "")
     NOTIFY_API_VERSION = os.getenv("NOTIFY_API_VERSION", "")
+    REPORT_API_URL = os.getenv("REPORT_API_URL", "")
+    REPORT_API_VERSION = os.getenv("REPORT_API_VERSION", "")
 
     AUTH_API_ENDPOINT = f"{AUTH_API_URL + AUTH_API_VERSION}/"
     NOTIFY_API_ENDPOINT = f"{NOTIFY_API_URL + NOTIFY_API_VERSION}/"
+    REPORT_API_BASE_URL = f"{REPORT_API_URL + REPORT_API_VERSION}/reports"
 
     # Service account details
     KEYCLOAK_SERVICE_ACCOUNT_ID = os.getenv("SBC_AUTH_ADMIN_CLIENT_ID")
@@ -130,6 +133,18 @@ class _Config(object):  # pylint: disable=too-few-public-methods
     CFS_INVOICE_CUT_OFF_HOURS_UTC = int(os.getenv("CFS_INVOICE_CUT_OFF_HOURS_UTC", "2"))
     CFS_INVOICE_CUT_OFF_MINUTES_UTC = int(os.getenv("CFS_INVOICE_CUT_OFF_MINUTES_UTC", "0"))
 
+    # CFS invoice creation, calls for different accounts run on CFS_INVOICE_WORKERS threads. Results are committed every
+    # CFS_INVOICE_BATCH_SIZE invoices. CFS_MAX_REQUESTS_PER_SECOND of 0 disables the rate limit.
+    CFS_INVOICE_WORKERS = int(os.getenv("CFS_INVOICE_WORKERS", "4"))
+    CFS_INVOICE_BATCH_SIZE = int(os.getenv("CFS_INVOICE_BATCH_SIZE", "100"))
+    CFS_MAX_REQUESTS_PER_SECOND = float(os.getenv("CFS_MAX_REQUESTS_PER_SECOND", "10"))
+
+    # PayBC revenue updates, calls for different invoices run on PAYBC_REVENUE_WORKERS threads. Invoices are committed
+    # every PAYBC_REVENUE_BATCH_SIZE. PAYBC_MAX_REQUESTS_PER_SECOND of 0 disables the rate limit.
+    PAYBC_REVENUE_WORKERS = int(os.getenv("PAYBC_REVENUE_WORKERS", "4"))
+    PAYBC_REVENUE_BATCH_SIZE = int(os.getenv("PAYBC_REVENUE_BATCH_SIZE", "100"))
+    PAYBC_MAX_REQUESTS_PER_SECOND = float(os.getenv("PAYBC_MAX_REQUESTS_PER_SECOND", "10"))
+
     SENTRY_ENABLE = os.getenv("SENTRY_ENABLE", "False")
     SENTRY_DSN = os.getenv("SENTRY_DSN", None)
 
@@ -177,6 +192,21 @@ class _Config(object):  # pylint: disable=too-few-public-methods
     # CGI File specific configs
     CGI_TRIGGER_FILE_SUFFIX = os.getenv("CGI_TRIGGER_FILE_SUFFIX", "TRG")
 
+    # Statement generation, accounts are processed in batches. The partition settings split the accounts between
+    # parallel job tasks by payment account id, eg. STATEMENT_PARTITION_INDEX=$CLOUD_RUN_TASK_INDEX.
+    STATEMENT_ACCOUNT_BATCH_SIZE = int(os.getenv("STATEMENT_ACCOUNT_BATCH_SIZE", "1000"))
+    STATEMENT_PARTITION_COUNT = int(os.getenv("STATEMENT_PARTITION_COUNT", "1"))
+    STATEMENT_PARTITION_INDEX = int(os.getenv("STATEMENT_PARTITION_INDEX", "0"))
+    # Render the PDFs of the new statements into the report cache, so downloads don't wait on report-api.
+    STATEMENT_REPORT_PRERENDER = os.getenv("STATEMENT_REPORT_PRERENDER", "true").lower() == "true"
+    # Report jobs and cached reports older than this are removed by the statement job.
+    REPORT_JOB_RETENTION_DAYS = int(os.getenv("REPORT_JOB_RETENTION_DAYS", "90"))
+    # Report jobs still pending after this are marked as failed, the process rendering them has gone away.
+    REPORT_JOB_TIMEOUT_MINUTES = int(os.getenv("REPORT_JOB_TIMEOUT_MINUTES", "30"))
+
+    # Days of revenue rollups rebuilt nightly, covers the month read by the monthly reconciliation reports.
+    REVENUE_ROLLUP_DAYS = int(os.getenv("REVENUE_ROLLUP_DAYS", "40"))
+
     # disbursement delay
     DISBURSEMENT_DELAY_IN_DAYS = int(os.getenv("DISBURSEMENT_DELAY", 5))
 
@@ -234,6 +264,12 @@ class TestConfig(_Config):  # pylint: disable=too-few-public-methods
     CFS_BASE_URL = "http://localhost:8080/paybc-api"
     CFS_CLIENT_ID = "TEST"
     CFS_CLIENT_SECRET = "TEST"
+    # Tests share a single connection, keep the CFS calls on the main thread.
+    CFS_INVOICE_WORKERS = 1
+    CFS_MAX_REQUESTS_PER_SECOND = 0
+    PAYBC_REVENUE_WORKERS = 1
+    PAYBC_MAX_REQUESTS_PER_SECOND = 0
+    STATEMENT_REPORT_PRERENDER = False
     USE_DOCKER_MOCK = os.getenv("USE_DOCKER_MOCK", None)
 
     PAYBC_DIRECT_PAY_CLIENT_ID = "abc"
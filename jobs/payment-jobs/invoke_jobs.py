@@ -20,8 +20,9 @@ import sys
 
 import sentry_sdk
 from flask import Flask
-from pay_api.services import Flags
+from pay_api.services import Flags, gcp_queue_publisher
 from pay_api.services.gcp_queue import queue
+from pay_api.services.http_session_pool import http_session_pool
 from sentry_sdk.integrations.flask import FlaskIntegration
 
 import config
@@ -89,6 +90,7 @@ def run(job_name, argument=None):
     from tasks.distribution_task import DistributionTask
     from tasks.ejv_partner_distribution_task import EjvPartnerDistributionTask
     from tasks.ejv_payment_task import EjvPaymentTask
+    from tasks.revenue_rollup_task import RevenueRollupTask
     from tasks.stale_payment_task import StalePaymentTask
     from tasks.statement_notification_task import StatementNotificationTask
     from tasks.statement_task import StatementTask
@@ -100,7 +102,8 @@ def run(job_name, argument=None):
     application.app_context().push()
     match job_name:
         case "UPDATE_GL_CODE":
-            DistributionTask.update_failed_distributions()
+            last_invoice_id = int(argument[0]) if argument and len(argument) >= 1 else 0
+            DistributionTask.update_failed_distributions(last_invoice_id)
             application.logger.info("<<<< Completed Updating GL Codes >>>>")
         case "GENERATE_STATEMENTS":
             StatementTask.generate_statements(argument)
@@ -165,8 +168,17 @@ def run(job_name, argument=None):
         case "BCOL_REFUND_CONFIRMATION":
             BcolRefundConfirmationTask.update_bcol_refund_invoices()
             application.logger.info("<<<< Completed running BCOL Refund Confirmation Job >>>>")
+        case "QUEUE_OUTBOX":
+            published = gcp_queue_publisher.publish_outbox()
+            application.logger.info(f"<<<< Completed publishing {published} queue outbox messages >>>>")
+        case "REVENUE_ROLLUP":
+            days = int(argument[0]) if argument and len(argument) >= 1 else None
+            RevenueRollupTask.update_rollups(days)
+            application.logger.info("<<<< Completed updating revenue rollups >>>>")
         case _:
             application.logger.debug("No valid args passed. Exiting job without running any ***************")
+    if http_stats := http_session_pool.stats():
+        application.logger.info(f"Outbound HTTP per host: {http_stats}")
 
 
 if __name__ == "__main__":
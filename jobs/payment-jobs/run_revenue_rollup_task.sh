@@ -0,0 +1,3 @@
+#! /bin/sh
+echo 'run invoke_jobs.py REVENUE_ROLLUP'
+python3 invoke_jobs.py REVENUE_ROLLUP
@@ -13,9 +13,10 @@
 # limitations under the License.
 """Task to create CFS invoices offline."""
 import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import List
+from typing import Any, Callable, Dict, Hashable, List, Tuple
 
 from flask import current_app
 from pay_api.models import CfsAccount as CfsAccountModel
@@ -23,6 +24,7 @@ from pay_api.models import CorpType as CorpTypeModel
 from pay_api.models import Invoice as InvoiceModel
 from pay_api.models import InvoiceReference as InvoiceReferenceModel
 from pay_api.models import PaymentAccount as PaymentAccountModel
+from pay_api.models import PaymentLineItem as PaymentLineItemModel
 from pay_api.models import Receipt as ReceiptModel
 from pay_api.models import RoutingSlip as RoutingSlipModel
 from pay_api.models import db
@@ -45,10 +47,23 @@ from sentry_sdk import capture_message
 from sqlalchemy import select
 
 from utils import mailer
+from utils.executor import CallResult, RateLimiter, run_ordered_by_key
 
 from .routing_slip_task import RoutingSlipTask
 
 
+@dataclass
+class CfsInvoiceJob:
+    """CFS invoice to create, calls for jobs with the same key are made in order."""
+
+    key: Hashable
+    transaction_number: int
+    invoice_ids: List[int]
+    cfs_account_id: int
+    # Models needed to save the result, only used on the main thread.
+    context: Any = None
+
+
 class CreateInvoiceTask:  # pylint:disable=too-few-public-methods
     """Task to create invoices in CFS."""
 
@@ -138,7 +153,7 @@ class CreateInvoiceTask:  # pylint:disable=too-few-public-methods
             invoice.save()
 
     @classmethod
-    def _create_rs_invoices(cls):  # pylint: disable=too-many-locals
+    def _create_rs_invoices(cls):
         """Create RS invoices in to CFS system."""
         # Find all pending routing slips.
 
@@ -163,9 +178,8 @@ class CreateInvoiceTask:  # pylint:disable=too-few-public-methods
 
         current_app.logger.info(f"Found {len(invoices)} to be created in CFS.")
 
+        jobs = []
         for invoice in invoices:
-            # Create a CFS invoice
-            current_app.logger.debug(f"Creating cfs invoice for invoice {invoice.id}")
             routing_slip = RoutingSlipModel.find_by_number(invoice.routing_slip)
             # If routing slip is not found in Pay-DB, assume legacy RS and move on to next one.
             if not routing_slip:
@@ -179,40 +193,28 @@ class CreateInvoiceTask:  # pylint:disable=too-few-public-methods
             active_cfs_account = CfsAccountModel.find_effective_by_payment_method(
                 routing_slip_payment_account.id, PaymentMethod.INTERNAL.value
             )
-
-            try:
-                invoice_response = CFSService.create_account_invoice(
+            jobs.append(
+                CfsInvoiceJob(
+                    key=routing_slip.number,
                     transaction_number=invoice.id,
-                    line_items=invoice.payment_line_items,
-                    cfs_account=active_cfs_account,
+                    invoice_ids=[invoice.id],
+                    cfs_account_id=active_cfs_account.id,
+                    context=(invoice, routing_slip, routing_slip_payment_account, active_cfs_account),
                 )
-            except Exception as e:  # NOQA # pylint: disable=broad-except
-                # There is a chance that the error is a timeout from CAS side,
-                # so to make sure we are not missing any data, make a GET call for the invoice we tried to create
-                # and use it if it got created.
-                current_app.logger.info(e)  # INFO is intentional as sentry alerted only after the following try/catch
-                has_invoice_created: bool = False
-                try:
-                    # add a 10 seconds delay here as safe bet, as CFS takes time to create the invoice and
-                    # since this is a job, delay doesn't cause any performance issue
-                    time.sleep(10)
-                    invoice_number = generate_transaction_number(str(invoice.id))
-                    invoice_response = CFSService.get_invoice(cfs_account=active_cfs_account, inv_number=invoice_number)
-                    has_invoice_created = invoice_response.get("invoice_number", None) == invoice_number
-                except Exception as exc:  # NOQA # pylint: disable=broad-except,unused-variable
-                    # Ignore this error, as it is irrelevant and error on outer level is relevant.
-                    pass
-
-                # If no invoice is created raise an error for sentry
-                if not has_invoice_created:
-                    capture_message(
-                        f"Error on creating routing slip invoice: account id={invoice.payment_account.id}, "
-                        f"auth account : {invoice.payment_account.auth_account_id}, ERROR : {str(e)}",
-                        level="error",
-                    )
-                    current_app.logger.error(e)
-                    continue
+            )
+
+        def save_result(job: CfsInvoiceJob, result: CallResult) -> bool:
+            invoice, routing_slip, routing_slip_payment_account, active_cfs_account = job.context
+            if result.error:
+                capture_message(
+                    f"Error on creating routing slip invoice: account id={invoice.payment_account.id}, "
+                    f"auth account : {invoice.payment_account.auth_account_id}, ERROR : {str(result.error)}",
+                    level="error",
+                )
+                current_app.logger.error(result.error)
+                return False
 
+            invoice_response, _ = result.value
             invoice_number = invoice_response.get("invoice_number", None)
 
             current_app.logger.info(f"invoice_number  {invoice_number}  created in CFS.")
@@ -227,7 +229,7 @@ class CreateInvoiceTask:  # pylint:disable=too-few-public-methods
 
             if has_error_in_apply_receipt:
                 # move on to next invoice
-                continue
+                return False
 
             invoice_reference: InvoiceReference = InvoiceReference.create(
                 invoice.id, invoice_number, invoice_response.get("pbc_ref_number", None)
@@ -251,9 +253,12 @@ class CreateInvoiceTask:  # pylint:disable=too-few-public-methods
             invoice.payment_date = datetime.now(tz=timezone.utc)
             invoice.paid = invoice.total
             invoice.save()
+            return True
+
+        cls._run_cfs_invoice_jobs("Routing Slip", jobs, save_result)
 
     @classmethod
-    def _create_pad_invoices(cls):  # pylint: disable=too-many-locals
+    def _create_pad_invoices(cls):
         """Create PAD invoices in to CFS system."""
         inv_subquery = (
             db.session.query(InvoiceModel.payment_account_id)
@@ -273,6 +278,7 @@ class CreateInvoiceTask:  # pylint:disable=too-few-public-methods
 
         current_app.logger.info(f"Found {len(pad_accounts)} with PAD transactions.")
 
+        jobs = []
         for account in pad_accounts:
             account_invoices = (
                 db.session.query(InvoiceModel)
@@ -305,53 +311,37 @@ class CreateInvoiceTask:  # pylint:disable=too-few-public-methods
                 )
                 continue
 
-            lines = []
-            invoice_total = Decimal("0")
-            for invoice in account_invoices:
-                lines.extend(invoice.payment_line_items)
-                invoice_total += invoice.total
-            invoice_number = account_invoices[-1].id
-            try:
-                # Get the first invoice id as the trx number for CFS
-                invoice_response = CFSService.create_account_invoice(
-                    transaction_number=invoice_number,
-                    line_items=lines,
-                    cfs_account=cfs_account,
+            invoice_total = sum((invoice.total for invoice in account_invoices), Decimal("0"))
+            # Roll up all the account's invoices, the first invoice id is the trx number for CFS.
+            jobs.append(
+                CfsInvoiceJob(
+                    key=account.id,
+                    transaction_number=account_invoices[-1].id,
+                    invoice_ids=[invoice.id for invoice in account_invoices],
+                    cfs_account_id=cfs_account.id,
+                    context=(account_invoices, payment_account, cfs_account, invoice_total),
                 )
-            except Exception as e:  # NOQA # pylint: disable=broad-except
-                # There is a chance that the error is a timeout from CAS side,
-                # so to make sure we are not missing any data, make a GET call for the invoice we tried to create
-                # and use it if it got created.
-                current_app.logger.info(e)  # INFO is intentional as sentry alerted only after the following try/catch
-                has_invoice_created: bool = False
-                try:
-                    # add a 10 seconds delay here as safe bet, as CFS takes time to create the invoice
-                    time.sleep(10)
-                    invoice_number = generate_transaction_number(str(invoice_number))
-                    invoice_response = CFSService.get_invoice(cfs_account=cfs_account, inv_number=invoice_number)
-                    has_invoice_created = invoice_response.get("invoice_number", None) == invoice_number
-                    invoice_total_matches = Decimal(invoice_response.get("total", "0")) == invoice_total
-                except Exception as exc:  # NOQA # pylint: disable=broad-except,unused-variable
-                    # Ignore this error, as it is irrelevant and error on outer level is relevant.
-                    pass
-                # If no invoice is created raise an error for sentry
-                if not has_invoice_created:
-                    capture_message(
-                        f"Error on creating PAD invoice: account id={payment_account.id}, "
-                        f"auth account : {payment_account.auth_account_id}, ERROR : {str(e)}",
-                        level="error",
-                    )
-                    current_app.logger.error(e)
-                    continue
-                if not invoice_total_matches:
-                    capture_message(
-                        f"Error on creating PAD invoice: account id={payment_account.id}, "
-                        f"auth account : {payment_account.auth_account_id}, Invoice exists: "
-                        f' CAS total: {invoice_response.get("total", 0)}, PAY-BC total: {invoice_total}',
-                        level="error",
-                    )
-                    current_app.logger.error(e)
-                    continue
+            )
+
+        def save_result(job: CfsInvoiceJob, result: CallResult) -> bool:
+            account_invoices, payment_account, cfs_account, invoice_total = job.context
+            if result.error:
+                capture_message(
+                    f"Error on creating PAD invoice: account id={payment_account.id}, "
+                    f"auth account : {payment_account.auth_account_id}, ERROR : {str(result.error)}",
+                    level="error",
+                )
+                current_app.logger.error(result.error)
+                return False
+            invoice_response, recovered = result.value
+            if recovered and Decimal(invoice_response.get("total", "0")) != invoice_total:
+                capture_message(
+                    f"Error on creating PAD invoice: account id={payment_account.id}, "
+                    f"auth account : {payment_account.auth_account_id}, Invoice exists: "
+                    f' CAS total: {invoice_response.get("total", 0)}, PAY-BC total: {invoice_total}',
+                    level="error",
+                )
+                return False
 
             additional_params = {
                 "invoice_total": float(invoice_total),
@@ -372,7 +362,9 @@ class CreateInvoiceTask:  # pylint:disable=too-few-public-methods
                 )
                 db.session.add(invoice_reference)
                 invoice.cfs_account_id = cfs_account.id
-            db.session.commit()
+            return True
+
+        cls._run_cfs_invoice_jobs("PAD", jobs, save_result)
 
     @classmethod
     def _return_eft_accounts(cls):
@@ -409,6 +401,7 @@ class CreateInvoiceTask:  # pylint:disable=too-few-public-methods
         # Note we can't roll up for EFT, because doing refunds for invoices it's not possible to get the line
         # information back from the API. You need that information when creating an adjustment otherwise revenue
         # will flow to the wrong lines.
+        jobs = []
         for eft_account in cls._return_eft_accounts():
             invoices = (
                 db.session.query(InvoiceModel)
@@ -436,60 +429,49 @@ class CreateInvoiceTask:  # pylint:disable=too-few-public-methods
                 continue
 
             current_app.logger.info(f"Found {len(invoices)} EFT invoices for account {payment_account.auth_account_id}")
-            for invoice in invoices:
-                current_app.logger.debug(f"Creating cfs invoice for invoice {invoice.id}")
-                try:
-                    invoice_response = CFSService.create_account_invoice(
-                        transaction_number=invoice.id,
-                        line_items=invoice.payment_line_items,
-                        cfs_account=cfs_account,
-                    )
-                except Exception as e:  # NOQA # pylint: disable=broad-except
-                    # There is a chance that the error is a timeout from CAS side,
-                    # so to make sure we are not missing any data, make a GET call for the invoice we tried to create
-                    # and use it if it got created.
-                    current_app.logger.info(e)  # INFO intentional as sentry alerted only after the following try/catch
-                    has_invoice_created: bool = False
-                    try:
-                        # add a 10 seconds delay here as safe bet, as CFS takes time to create the invoice and
-                        # since this is a job, delay doesn't cause any performance issue
-                        time.sleep(10)
-                        invoice_number = generate_transaction_number(str(invoice.id))
-                        invoice_response = CFSService.get_invoice(cfs_account=cfs_account, inv_number=invoice_number)
-                        has_invoice_created = invoice_response.get("invoice_number", None) == invoice_number
-                        invoice_total_matches = Decimal(invoice_response.get("total", "0")) == invoice.total
-                    except Exception as exc:  # NOQA # pylint: disable=broad-except,unused-variable
-                        # Ignore this error, as it is irrelevant and error on outer level is relevant.
-                        pass
-
-                    if not has_invoice_created:
-                        capture_message(
-                            f"Error on creating EFT invoice: account id={invoice.payment_account.id}, "
-                            f"auth account : {invoice.payment_account.auth_account_id}, ERROR : {str(e)}",
-                            level="error",
-                        )
-                        current_app.logger.error(e)
-                        continue
-                    if not invoice_total_matches:
-                        capture_message(
-                            f"Error on creating EFT invoice: account id={payment_account.id}, "
-                            f"auth account : {payment_account.auth_account_id}, Invoice exists: "
-                            f' CAS total: {invoice_response.get("total", 0)}, '
-                            f"PAY-BC total: {invoice.total}",
-                            level="error",
-                        )
-                        current_app.logger.error(e)
-                        continue
+            jobs.extend(
+                CfsInvoiceJob(
+                    key=eft_account.id,
+                    transaction_number=invoice.id,
+                    invoice_ids=[invoice.id],
+                    cfs_account_id=cfs_account.id,
+                    context=(invoice, payment_account, cfs_account),
+                )
+                for invoice in invoices
+            )
 
-                invoice.cfs_account_id = cfs_account.id
-                # Create ACTIVE invoice reference
-                invoice_reference = EftService.create_invoice_reference(
-                    invoice=invoice,
-                    invoice_number=invoice_response.get("invoice_number"),
-                    reference_number=invoice_response.get("pbc_ref_number", None),
+        def save_result(job: CfsInvoiceJob, result: CallResult) -> bool:
+            invoice, payment_account, cfs_account = job.context
+            if result.error:
+                capture_message(
+                    f"Error on creating EFT invoice: account id={invoice.payment_account.id}, "
+                    f"auth account : {invoice.payment_account.auth_account_id}, ERROR : {str(result.error)}",
+                    level="error",
                 )
-                db.session.add(invoice_reference)
-                db.session.commit()
+                current_app.logger.error(result.error)
+                return False
+            invoice_response, recovered = result.value
+            if recovered and Decimal(invoice_response.get("total", "0")) != invoice.total:
+                capture_message(
+                    f"Error on creating EFT invoice: account id={payment_account.id}, "
+                    f"auth account : {payment_account.auth_account_id}, Invoice exists: "
+                    f' CAS total: {invoice_response.get("total", 0)}, '
+                    f"PAY-BC total: {invoice.total}",
+                    level="error",
+                )
+                return False
+
+            invoice.cfs_account_id = cfs_account.id
+            # Create ACTIVE invoice reference
+            invoice_reference = EftService.create_invoice_reference(
+                invoice=invoice,
+                invoice_number=invoice_response.get("invoice_number"),
+                reference_number=invoice_response.get("pbc_ref_number", None),
+            )
+            db.session.add(invoice_reference)
+            return True
+
+        cls._run_cfs_invoice_jobs("EFT", jobs, save_result)
 
     @classmethod
     def _create_online_banking_invoices(cls):
@@ -507,6 +489,7 @@ class CreateInvoiceTask:  # pylint:disable=too-few-public-methods
         )
 
         current_app.logger.info(f"Found {len(invoices)} to be created in CFS.")
+        jobs = []
         for invoice in invoices:
             payment_account: PaymentAccountService = PaymentAccountService.find_by_id(invoice.payment_account_id)
             # Adding this in for the future when we can switch between BCOL and ONLINE_BANKING.
@@ -519,22 +502,28 @@ class CreateInvoiceTask:  # pylint:disable=too-few-public-methods
                 if not corp_type.is_online_banking_allowed:
                     continue
 
-            current_app.logger.debug(f"Creating cfs invoice for invoice {invoice.id}")
-            try:
-                invoice_response = CFSService.create_account_invoice(
+            jobs.append(
+                CfsInvoiceJob(
+                    key=payment_account.id,
                     transaction_number=invoice.id,
-                    line_items=invoice.payment_line_items,
-                    cfs_account=cfs_account,
+                    invoice_ids=[invoice.id],
+                    cfs_account_id=cfs_account.id,
+                    context=(invoice, payment_account),
                 )
-            except Exception as e:  # NOQA # pylint: disable=broad-except
+            )
+
+        def save_result(job: CfsInvoiceJob, result: CallResult) -> bool:
+            invoice, payment_account = job.context
+            if result.error:
                 capture_message(
                     f"Error on creating Online Banking invoice: account id={payment_account.id}, "
-                    f"auth account : {payment_account.auth_account_id}, ERROR : {str(e)}",
+                    f"auth account : {payment_account.auth_account_id}, ERROR : {str(result.error)}",
                     level="error",
                 )
-                current_app.logger.error(e)
-                continue
+                current_app.logger.error(result.error)
+                return False
 
+            invoice_response, _ = result.value
             # Create invoice reference, payment record and a payment transaction
             InvoiceReference.create(
                 invoice_id=invoice.id,
@@ -545,3 +534,87 @@ class CreateInvoiceTask:  # pylint:disable=too-few-public-methods
             invoice.cfs_account_id = payment_account.cfs_account_id
             invoice.invoice_status_code = InvoiceStatus.SETTLEMENT_SCHEDULED.value
             invoice.save()
+            return True
+
+        cls._run_cfs_invoice_jobs("Online Banking", jobs, save_result)
+
+    @classmethod
+    def _run_cfs_invoice_jobs(
+        cls, phase: str, jobs: List[CfsInvoiceJob], save_result: Callable[[CfsInvoiceJob, CallResult], bool]
+    ):
+        """Create the CFS invoices for the jobs concurrently and save the results on this thread.
+
+        Jobs are run in batches of CFS_INVOICE_BATCH_SIZE and each batch is committed once saved, so a crashed run only
+        loses the last batch. Rerunning picks those invoices up again, the GET fallback in _create_cfs_invoice finds the
+        invoices CFS already has.
+        """
+        config = current_app.config
+        batch_size = max(config.get("CFS_INVOICE_BATCH_SIZE", 100), 1)
+        rate_limiter = RateLimiter(config.get("CFS_MAX_REQUESTS_PER_SECOND", 0))
+        created = failed = 0
+        cfs_seconds = save_seconds = 0.0
+        for start in range(0, len(jobs), batch_size):
+            started = time.monotonic()
+            results = run_ordered_by_key(
+                jobs[start : start + batch_size],
+                cls._create_cfs_invoice,
+                key=lambda job: job.key,
+                workers=config.get("CFS_INVOICE_WORKERS", 1),
+                rate_limiter=rate_limiter,
+            )
+            cfs_seconds += time.monotonic() - started
+
+            started = time.monotonic()
+            for result in results:
+                if save_result(result.item, result):
+                    created += 1
+                else:
+                    failed += 1
+            db.session.commit()
+            save_seconds += time.monotonic() - started
+
+        if jobs:
+            current_app.logger.info(
+                f"{phase}: {len(jobs)} CFS invoices, {created} created, {failed} failed. "
+                f"CFS calls took {cfs_seconds:.1f}s ({len(jobs) / max(cfs_seconds, 0.001):.1f}/s), "
+                f"saving took {save_seconds:.1f}s."
+            )
+
+    @classmethod
+    def _create_cfs_invoice(cls, job: CfsInvoiceJob) -> Tuple[Dict, bool]:
+        """Create the invoice in CFS, runs on the worker threads so only the job's ids are used.
+
+        Returns the invoice response and whether it was recovered through a GET after the create call failed.
+        """
+        cfs_account = CfsAccountModel.find_by_id(job.cfs_account_id)
+        invoice_order = {invoice_id: index for index, invoice_id in enumerate(job.invoice_ids)}
+        line_items = sorted(
+            PaymentLineItemModel.find_by_invoice_ids(job.invoice_ids),
+            key=lambda line_item: invoice_order[line_item.invoice_id],
+        )
+        current_app.logger.debug(f"Creating cfs invoice for invoice {job.transaction_number}")
+        try:
+            invoice_response = CFSService.create_account_invoice(
+                transaction_number=job.transaction_number,
+                line_items=line_items,
+                cfs_account=cfs_account,
+            )
+            return invoice_response, False
+        except Exception as e:  # NOQA # pylint: disable=broad-except
+            # There is a chance that the error is a timeout from CAS side,
+            # so to make sure we are not missing any data, make a GET call for the invoice we tried to create
+            # and use it if it got created.
+            current_app.logger.info(e)  # INFO is intentional as sentry alerted only after the following try/catch
+            invoice_response = {}
+            invoice_number = generate_transaction_number(str(job.transaction_number))
+            try:
+                # add a 10 seconds delay here as safe bet, as CFS takes time to create the invoice and
+                # since this is a job, delay doesn't cause any performance issue
+                time.sleep(10)
+                invoice_response = CFSService.get_invoice(cfs_account=cfs_account, inv_number=invoice_number)
+            except Exception:  # NOQA # pylint: disable=broad-except
+                # Ignore this error, as it is irrelevant and error on outer level is relevant.
+                pass
+            if invoice_response.get("invoice_number", None) != invoice_number:
+                raise e
+            return invoice_response, True
@@ -21,7 +21,7 @@ from flask import current_app
 from pay_api.models import DistributionCode as DistributionCodeModel
 from pay_api.utils.util import get_fiscal_year, get_nearest_business_day
 
-from utils.minio import put_object
+from utils.minio import put_file, put_object
 from utils.sftp import upload_to_ftp
 
 
@@ -131,6 +131,16 @@ class CgiEjv:
             file_size=os.stat(file_path_with_name).st_size,
         )
 
+    @classmethod
+    def upload_file(cls, file_name, file_path_with_name, trg_file_path):
+        """Upload a feeder file written to disk to ftp and to minio, the content isn't read into memory."""
+        upload_to_ftp(file_path_with_name, trg_file_path)
+        try:
+            put_file(file_path_with_name, file_name)
+        except Exception as e:  # NOQA # pylint: disable=broad-except
+            current_app.logger.error(e)
+            current_app.logger.error(f"upload to minio failed for the file: {file_name}")
+
     @classmethod
     def get_jv_header(cls, batch_type, journal_batch_name, journal_name, total):
         """Get JV Header string."""
@@ -180,3 +190,52 @@ class CgiEjv:
             trg_file.write("")
             trg_file.close()
         return file_path_with_name, trg_file_path, file_name
+
+
+class CgiFeederFile:
+    """Feeder file that is written to disk as records are added, instead of being built up as one string.
+
+    The batch header is written on open and the trailer on close, which also moves the file to its INBOX name and
+    creates the trigger file. Unless closed, the working file is removed when the context exits.
+    """
+
+    def __init__(self, cgi: type[CgiEjv], batch_header: str):
+        """Open a working file in the temp directory and write the batch header."""
+        self._cgi = cgi
+        file_descriptor, self._work_path = tempfile.mkstemp(prefix="cgi_feeder_", dir=tempfile.gettempdir())
+        self._file = os.fdopen(file_descriptor, "w", encoding="utf-8")
+        self._file.write(batch_header)
+        self.has_records = False
+
+    def __enter__(self):
+        """Return the feeder file."""
+        return self
+
+    def __exit__(self, *args):
+        """Remove the working file if the feeder file wasn't closed."""
+        if not self._file.closed:
+            self._file.close()
+        if os.path.exists(self._work_path):
+            os.remove(self._work_path)
+
+    def write(self, *records: str):
+        """Append the records to the file."""
+        self._file.writelines(records)
+        self.has_records = True
+
+    def close(self, batch_trailer: str):
+        """Write the trailer, move the file to its INBOX name and create the trigger file.
+
+        Returns the file path, the trigger file path and the file name.
+        """
+        self._file.write(batch_trailer)
+        self._file.close()
+        file_path: str = tempfile.gettempdir()
+        file_name = self._cgi.get_file_name()
+        file_path_with_name = f"{file_path}/{file_name}"
+        trg_file_path = f"{file_path_with_name}.{self._cgi.get_trg_suffix()}"
+        os.replace(self._work_path, file_path_with_name)
+        # TRG File
+        with open(trg_file_path, "a+", encoding="utf-8") as trg_file:
+            trg_file.write("")
+        return file_path_with_name, trg_file_path, file_name
@@ -12,9 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Service to manage PAYBC services."""
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from typing import Dict, List, Optional
 
 from flask import current_app
+from pay_api.models import db
 from pay_api.models.distribution_code import DistributionCode as DistributionCodeModel
 from pay_api.models.invoice import Invoice as InvoiceModel
 from pay_api.models.payment import Payment as PaymentModel
@@ -24,69 +28,183 @@ from pay_api.services.direct_pay_service import DirectPayService
 from pay_api.services.oauth_service import OAuthService
 from pay_api.utils.enums import AuthHeaderType, ContentType, InvoiceReferenceStatus, InvoiceStatus, PaymentMethod
 
+from utils.executor import CallResult, RateLimiter, run_ordered_by_key
+
 STATUS_PAID = "PAID"
 STATUS_NOT_PROCESSED = ("PAID", "RJCT")
 DECIMAL_PRECISION = ".2f"
 
 
+@dataclass
+class RevenueSyncJob:
+    """PayBC revenue sync for an invoice, only plain values are used on the worker threads."""
+
+    invoice_id: int
+    invoice_status_code: str
+    payment_url: str
+    post_revenue_payload: dict
+    # Updated once synced, only used on the main thread.
+    invoice: InvoiceModel = field(default=None, repr=False)
+    refund: RefundModel = field(default=None, repr=False)
+
+
 class DistributionTask:
     """Task to update distribution details on paybc transactions."""
 
     @classmethod
-    def update_failed_distributions(cls):  # pylint:disable=too-many-locals
+    def update_failed_distributions(cls, last_invoice_id: int = 0):  # pylint:disable=too-many-locals
         """Update failed distributions.
 
         Steps:
-        1. Get all invoices with status UPDATE_REVENUE_ACCOUNT or UPDATE_REVENUE_ACCOUNT_REFUND.
-        2. Find the completed invoice reference for the invoice.
-        3. Call the paybc GET service and check if there is any revenue not processed.
+        1. Get invoices with status UPDATE_REVENUE_ACCOUNT or UPDATE_REVENUE_ACCOUNT_REFUND, in batches by invoice id.
+        2. Load the payments, line items, distribution codes and refunds of the batch.
+        3. Call the paybc GET service concurrently and check if there is any revenue not processed.
         4. If yes, update the revenue details.
-        5. Update the invoice status as PAID or REFUNDED and save.
+        5. Update the invoice status as PAID or REFUNDED and commit the batch.
+
+        Each batch is committed, the job can be resumed after the last logged invoice id with last_invoice_id.
         """
+        config = current_app.config
+        batch_size = max(config.get("PAYBC_REVENUE_BATCH_SIZE", 100), 1)
+        rate_limiter = RateLimiter(config.get("PAYBC_MAX_REQUESTS_PER_SECOND", 0))
         invoice_statuses = [
             InvoiceStatus.UPDATE_REVENUE_ACCOUNT.value,
             InvoiceStatus.UPDATE_REVENUE_ACCOUNT_REFUND.value,
         ]
-        gl_update_invoices = InvoiceModel.query.filter(InvoiceModel.invoice_status_code.in_(invoice_statuses)).all()
-        current_app.logger.debug(f"Found {len(gl_update_invoices)} invoices to update revenue details.")
+        access_token = None
+        updated = failed = 0
+        paybc_seconds = 0.0
+        while True:
+            gl_update_invoices = (
+                InvoiceModel.query.filter(InvoiceModel.invoice_status_code.in_(invoice_statuses))
+                .filter(InvoiceModel.id > last_invoice_id)
+                .order_by(InvoiceModel.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not gl_update_invoices:
+                break
+            current_app.logger.debug(f"Found {len(gl_update_invoices)} invoices to update revenue details.")
+
+            jobs = cls._prepare_revenue_sync_jobs(gl_update_invoices)
+            if jobs and access_token is None:
+                access_token = DirectPayService().get_token().json().get("access_token")
 
-        if len(gl_update_invoices) == 0:
-            return
+            started = time.monotonic()
+            results = run_ordered_by_key(
+                jobs,
+                lambda job: cls._sync_revenue(job, access_token),
+                key=lambda job: job.invoice_id,
+                workers=config.get("PAYBC_REVENUE_WORKERS", 1),
+                rate_limiter=rate_limiter,
+            )
+            paybc_seconds += time.monotonic() - started
+
+            for result in results:
+                if cls._save_revenue_sync_result(result):
+                    updated += 1
+                else:
+                    failed += 1
+            db.session.commit()
+            last_invoice_id = gl_update_invoices[-1].id
+            current_app.logger.info(f"Revenue details processed up to invoice {last_invoice_id}.")
+
+        if updated or failed:
+            current_app.logger.info(
+                f"Revenue details: {updated} invoices updated, {failed} failed. PayBC calls took {paybc_seconds:.1f}s."
+            )
+
+    @classmethod
+    def _prepare_revenue_sync_jobs(  # pylint:disable=too-many-locals
+        cls, invoices: List[InvoiceModel]
+    ) -> List[RevenueSyncJob]:
+        """Load what the batch needs in bulk, invoices which don't need PayBC are updated here."""
+        invoice_ids = [invoice.id for invoice in invoices]
+        payments = PaymentModel.find_payments_for_invoices(invoice_ids)
+        line_items_by_invoice = {}
+        for line_item in PaymentLineItemModel.find_by_invoice_ids(invoice_ids):
+            line_items_by_invoice.setdefault(line_item.invoice_id, []).append(line_item)
+        distribution_ids = {
+            line_item.fee_distribution_id for line_items in line_items_by_invoice.values() for line_item in line_items
+        }
+        distribution_codes = {
+            distribution_code.distribution_code_id: distribution_code
+            for distribution_code in DistributionCodeModel.query.filter(
+                DistributionCodeModel.distribution_code_id.in_(distribution_ids)
+            ).all()
+        }
+        refunds = {
+            refund.invoice_id: refund
+            for refund in RefundModel.query.filter(RefundModel.invoice_id.in_(invoice_ids)).all()
+        }
 
-        access_token: str = DirectPayService().get_token().json().get("access_token")
         paybc_ref_number: str = current_app.config.get("PAYBC_DIRECT_PAY_REF_NUMBER")
         paybc_svc_base_url = current_app.config.get("PAYBC_DIRECT_PAY_BASE_URL")
-        for gl_update_invoice in gl_update_invoices:
-            payment: PaymentModel = PaymentModel.find_payment_for_invoice(gl_update_invoice.id)
+        jobs = []
+        for invoice in invoices:
+            payment: PaymentModel = payments.get(invoice.id)
             # For now handle only GL updates for Direct Pay, more to come in future
             if payment.payment_method_code != PaymentMethod.DIRECT_PAY.value:
-                cls.update_invoice_to_refunded_or_paid(gl_update_invoice)
+                cls.update_invoice_to_refunded_or_paid(invoice, refunds.get(invoice.id))
                 continue
 
             active_reference = list(
                 filter(
                     lambda reference: (reference.status_code == InvoiceReferenceStatus.COMPLETED.value),
-                    gl_update_invoice.references,
+                    invoice.references,
                 )
             )[0]
             payment_url: str = (
                 f"{paybc_svc_base_url}/paybc/payment/{paybc_ref_number}/{active_reference.invoice_number}"
             )
+            jobs.append(
+                RevenueSyncJob(
+                    invoice_id=invoice.id,
+                    invoice_status_code=invoice.invoice_status_code,
+                    payment_url=payment_url,
+                    post_revenue_payload=cls.generate_post_revenue_payload(
+                        invoice, line_items_by_invoice.get(invoice.id, []), distribution_codes
+                    ),
+                    invoice=invoice,
+                    refund=refunds.get(invoice.id),
+                )
+            )
+        return jobs
 
-            payment_details: dict = cls.get_payment_details(payment_url, access_token)
-            if not payment_details:
-                current_app.logger.error("No payment details found for invoice.")
-                continue
+    @classmethod
+    def _sync_revenue(cls, job: RevenueSyncJob, access_token: str) -> Optional[bool]:
+        """Check the revenue in PayBC and update it when not processed, runs on the worker threads.
+
+        Returns None without payment details, otherwise whether the invoice is done in PayBC.
+        """
+        payment_details: dict = cls.get_payment_details(job.payment_url, access_token)
+        if not payment_details:
+            return None
+
+        target_status, target_gl_status = cls.get_status_fields(job.invoice_status_code)
+        if target_status is None or payment_details.get(target_status) == STATUS_PAID:
+            has_gl_completed: bool = True
+            for revenue in payment_details.get("revenue"):
+                if revenue.get(target_gl_status) in STATUS_NOT_PROCESSED:
+                    has_gl_completed = False
+            if not has_gl_completed:
+                cls.update_revenue_lines(job.post_revenue_payload, job.payment_url, access_token)
+            return True
+        return False
 
-            target_status, target_gl_status = cls.get_status_fields(gl_update_invoice.invoice_status_code)
-            if target_status is None or payment_details.get(target_status) == STATUS_PAID:
-                has_gl_completed: bool = True
-                for revenue in payment_details.get("revenue"):
-                    if revenue.get(target_gl_status) in STATUS_NOT_PROCESSED:
-                        has_gl_completed = False
-                if not has_gl_completed:
-                    cls.update_revenue_lines(gl_update_invoice, payment_url, access_token)
-                cls.update_invoice_to_refunded_or_paid(gl_update_invoice)
+    @classmethod
+    def _save_revenue_sync_result(cls, result: CallResult) -> bool:
+        """Update the invoice status for the PayBC result, on the main thread."""
+        job: RevenueSyncJob = result.item
+        if result.error:
+            current_app.logger.error(f"Error updating revenue details for invoice {job.invoice_id}: {result.error}")
+            return False
+        if result.value is None:
+            current_app.logger.error("No payment details found for invoice.")
+            return False
+        if result.value:
+            cls.update_invoice_to_refunded_or_paid(job.invoice, job.refund)
+        return True
 
     @classmethod
     def get_status_fields(cls, invoice_status_code: str) -> tuple:
@@ -97,9 +215,8 @@ class DistributionTask:
         return "paymentstatus", "glstatus"
 
     @classmethod
-    def update_revenue_lines(cls, invoice: InvoiceModel, payment_url: str, access_token: str):
+    def update_revenue_lines(cls, post_revenue_payload: dict, payment_url: str, access_token: str):
         """Update revenue lines for the invoice."""
-        post_revenue_payload = cls.generate_post_revenue_payload(invoice)
         OAuthService.post(
             payment_url,
             access_token,
@@ -109,17 +226,27 @@ class DistributionTask:
         )
 
     @classmethod
-    def generate_post_revenue_payload(cls, invoice: InvoiceModel):
-        """Generate the payload for POSTing revenue to paybc."""
+    def generate_post_revenue_payload(
+        cls,
+        invoice: InvoiceModel,
+        payment_line_items: List[PaymentLineItemModel] = None,
+        distribution_codes: Dict[int, DistributionCodeModel] = None,
+    ):
+        """Generate the payload for POSTing revenue to paybc.
+
+        The line items and distribution codes are loaded when they aren't passed in.
+        """
         post_revenue_payload = {"revenue": []}
 
-        payment_line_items = PaymentLineItemModel.find_by_invoice_ids([invoice.id])
+        if payment_line_items is None:
+            payment_line_items = PaymentLineItemModel.find_by_invoice_ids([invoice.id])
+        distribution_codes = distribution_codes or {}
         index: int = 0
 
         for payment_line_item in payment_line_items:
-            fee_distribution_code: DistributionCodeModel = DistributionCodeModel.find_by_id(
+            fee_distribution_code: DistributionCodeModel = distribution_codes.get(
                 payment_line_item.fee_distribution_id
-            )
+            ) or DistributionCodeModel.find_by_id(payment_line_item.fee_distribution_id)
 
             if payment_line_item.total is not None and payment_line_item.total > 0:
                 index = index + 1
@@ -128,14 +255,11 @@ class DistributionTask:
                 )
 
             if payment_line_item.service_fees is not None and payment_line_item.service_fees > 0:
-                service_fee_distribution_code = DistributionCodeModel.find_by_id(
-                    fee_distribution_code.distribution_code_id
-                )
                 index = index + 1
                 post_revenue_payload["revenue"].append(
                     cls.get_revenue_details(
                         index,
-                        service_fee_distribution_code,
+                        fee_distribution_code,
                         payment_line_item.service_fees,
                     )
                 )
@@ -163,15 +287,14 @@ class DistributionTask:
         }
 
     @classmethod
-    def update_invoice_to_refunded_or_paid(cls, invoice: InvoiceModel):
-        """Update the invoice status."""
+    def update_invoice_to_refunded_or_paid(cls, invoice: InvoiceModel, refund: RefundModel = None):
+        """Update the invoice status, the caller commits."""
         if invoice.invoice_status_code == InvoiceStatus.UPDATE_REVENUE_ACCOUNT_REFUND.value:
             # No more work is needed to ensure it was posted to gl.
-            refund = RefundModel.find_by_invoice_id(invoice.id)
+            refund = refund or RefundModel.find_by_invoice_id(invoice.id)
             refund.gl_posted = datetime.now(tz=timezone.utc)
-            refund.save()
             invoice.invoice_status_code = InvoiceStatus.REFUNDED.value
         else:
             invoice.invoice_status_code = InvoiceStatus.PAID.value
-        invoice.save()
+        db.session.add(invoice)
         current_app.logger.info(f"Updated invoice : {invoice.id}")
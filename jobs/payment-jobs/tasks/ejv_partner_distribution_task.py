@@ -32,9 +32,10 @@ from pay_api.models import PaymentLineItem as PaymentLineItemModel
 from pay_api.models import Receipt as ReceiptModel
 from pay_api.models import db
 from pay_api.utils.enums import DisbursementStatus, EjvFileType, EJVLinkType, InvoiceStatus, PaymentMethod
-from sqlalchemy import Date, and_, cast
+from sqlalchemy import Date, and_, cast, insert
+from sqlalchemy.orm import joinedload
 
-from tasks.common.cgi_ejv import CgiEjv
+from tasks.common.cgi_ejv import CgiEjv, CgiFeederFile
 from tasks.common.dataclasses import Disbursement, DisbursementLineItem
 
 # Just a warning for this code, there aren't decent unit tests that test this. If you're changing this job, you'll need
@@ -85,6 +86,7 @@ class EjvPartnerDistributionTask(CgiEjv):
             .filter(InvoiceModel.corp_type_code == partner.code)
             .filter(PaymentLineItemModel.total > 0)
             .filter(DistributionCodeModel.stop_ejv.is_(False) | DistributionCodeModel.stop_ejv.is_(None))
+            .options(joinedload(DistributionCodeModel.disbursement_distribution_code))
             .order_by(DistributionCodeModel.distribution_code_id, PaymentLineItemModel.id)
         )
 
@@ -160,6 +162,7 @@ class EjvPartnerDistributionTask(CgiEjv):
             .filter(PartnerDisbursementsModel.partner_code == partner.code)
             .filter(DistributionCodeModel.stop_ejv.is_(False) | DistributionCodeModel.stop_ejv.is_(None))
             .filter(~InvoiceModel.receipts.any(cast(ReceiptModel.receipt_date, Date) >= disbursement_date.date()))
+            .options(joinedload(DistributionCodeModel.disbursement_distribution_code))
             .order_by(DistributionCodeModel.distribution_code_id, PaymentLineItemModel.id)
             .all()
         )
@@ -196,7 +199,7 @@ class EjvPartnerDistributionTask(CgiEjv):
     @classmethod
     def _create_ejv_file_for_partner(cls, batch_type: str):  # pylint:disable=too-many-locals, too-many-statements
         """Create EJV file for the partner and upload."""
-        ejv_content, batch_total, control_total = "", Decimal("0"), Decimal("0")
+        batch_total, control_total = Decimal("0"), Decimal("0")
         today = datetime.now(tz=timezone.utc)
         disbursement_desc = current_app.config.get("CGI_DISBURSEMENT_DESC").format(
             today.strftime("%B").upper(), f"{today.day:0>2}"
@@ -208,85 +211,89 @@ class EjvPartnerDistributionTask(CgiEjv):
             disbursement_status_code=DisbursementStatus.UPLOADED.value,
         ).flush()
         batch_number = cls.get_batch_number(ejv_file_model.id)
-        batch_header = cls.get_batch_header(batch_number, batch_type)
         effective_date = cls.get_effective_date()
-        # Each of the partner will go as a JV Header and transactions as JV Details.
-        for partner in cls._get_partners_by_batch_type(batch_type):
-            current_app.logger.info(partner)
-            disbursements, distribution_code_totals = cls.get_disbursement_by_distribution_for_partner(partner)
-            if not disbursements:
-                continue
+        ejv_links = []
+        with CgiFeederFile(cls, cls.get_batch_header(batch_number, batch_type)) as feeder_file:
+            # Each of the partner will go as a JV Header and transactions as JV Details.
+            for partner in cls._get_partners_by_batch_type(batch_type):
+                current_app.logger.info(partner)
+                disbursements, distribution_code_totals = cls.get_disbursement_by_distribution_for_partner(partner)
+                if not disbursements:
+                    continue
 
-            ejv_header_model = EjvHeaderModel(
-                partner_code=partner.code,
-                disbursement_status_code=DisbursementStatus.UPLOADED.value,
-                ejv_file_id=ejv_file_model.id,
-            ).flush()
-            journal_name = cls.get_journal_name(ejv_header_model.id)
-            sequence = 1
+                ejv_header_model = EjvHeaderModel(
+                    partner_code=partner.code,
+                    disbursement_status_code=DisbursementStatus.UPLOADED.value,
+                    ejv_file_id=ejv_file_model.id,
+                ).flush()
+                journal_name = cls.get_journal_name(ejv_header_model.id)
+                sequence = 1
 
-            last_distribution_code = None
-            line_number = 1
-            for disbursement in disbursements:
-                # debit_distribution and credit_distribution stays as is for invoices which are not PAID
-                if last_distribution_code != disbursement.bcreg_distribution_code.distribution_code_id:
-                    header_total = distribution_code_totals[disbursement.bcreg_distribution_code.distribution_code_id]
-                    ejv_content = "{}{}".format(
-                        ejv_content,  # pylint:disable=consider-using-f-string
-                        cls.get_jv_header(
+                last_distribution_code = None
+                line_number = 1
+                for disbursement in disbursements:
+                    # debit_distribution and credit_distribution stays as is for invoices which are not PAID
+                    if last_distribution_code != disbursement.bcreg_distribution_code.distribution_code_id:
+                        header_total = distribution_code_totals[
+                            disbursement.bcreg_distribution_code.distribution_code_id
+                        ]
+                        feeder_file.write(
+                            cls.get_jv_header(
+                                batch_type,
+                                cls.get_journal_batch_name(batch_number),
+                                journal_name,
+                                header_total,
+                            )
+                        )
+                        control_total += 1
+                        last_distribution_code = disbursement.bcreg_distribution_code.distribution_code_id
+                        line_number = 1
+
+                    batch_total += disbursement.line_item.amount
+                    dl = disbursement.line_item
+                    description = disbursement_desc[: -len(dl.description_identifier)] + dl.description_identifier
+                    description = f"{description[:100]:<100}"
+                    for credit_debit_row in range(1, 3):
+                        target_distribution = cls.get_distribution_string(
+                            disbursement.partner_distribution_code
+                            if credit_debit_row == 1
+                            else disbursement.bcreg_distribution_code
+                        )
+                        # For payment flow, credit the GL partner code, debit the BCREG GL code.
+                        # Reversal is the opposite debit the GL partner code, credit the BCREG GL Code.
+                        credit_debit = "C" if credit_debit_row == 1 else "D"
+                        if dl.is_reversal is True:
+                            credit_debit = "D" if credit_debit == "C" else "C"
+                        jv_line = cls.get_jv_line(
                             batch_type,
-                            cls.get_journal_batch_name(batch_number),
+                            target_distribution,
+                            description,
+                            effective_date,
+                            f"{dl.flow_through:<110}",
                             journal_name,
-                            header_total,
-                        ),
-                    )
-                    control_total += 1
-                    last_distribution_code = disbursement.bcreg_distribution_code.distribution_code_id
-                    line_number = 1
+                            dl.amount,
+                            line_number,
+                            credit_debit,
+                        )
+                        feeder_file.write(jv_line)
+                        line_number += 1
+                        control_total += 1
 
-                batch_total += disbursement.line_item.amount
-                dl = disbursement.line_item
-                description = disbursement_desc[: -len(dl.description_identifier)] + dl.description_identifier
-                description = f"{description[:100]:<100}"
-                for credit_debit_row in range(1, 3):
-                    target_distribution = cls.get_distribution_string(
-                        disbursement.partner_distribution_code
-                        if credit_debit_row == 1
-                        else disbursement.bcreg_distribution_code
-                    )
-                    # For payment flow, credit the GL partner code, debit the BCREG GL code.
-                    # Reversal is the opposite debit the GL partner code, credit the BCREG GL Code.
-                    credit_debit = "C" if credit_debit_row == 1 else "D"
-                    if dl.is_reversal is True:
-                        credit_debit = "D" if credit_debit == "C" else "C"
-                    jv_line = cls.get_jv_line(
-                        batch_type,
-                        target_distribution,
-                        description,
-                        effective_date,
-                        f"{dl.flow_through:<110}",
-                        journal_name,
-                        dl.amount,
-                        line_number,
-                        credit_debit,
+                    ejv_links.append(
+                        cls._update_disbursement_status_and_ejv_link(disbursement, ejv_header_model, sequence)
                     )
-                    ejv_content = "{}{}".format(ejv_content, jv_line)  # pylint:disable=consider-using-f-string
-                    line_number += 1
-                    control_total += 1
+                    sequence += 1
 
-                cls._update_disbursement_status_and_ejv_link(disbursement, ejv_header_model, sequence)
-                sequence += 1
+                db.session.flush()
 
-            db.session.flush()
+            if not feeder_file.has_records:
+                db.session.rollback()
+                return
 
-        if not ejv_content:
-            db.session.rollback()
-            return
-
-        jv_batch_trailer = cls.get_batch_trailer(batch_number, batch_total, batch_type, control_total)
-        ejv_content = f"{batch_header}{ejv_content}{jv_batch_trailer}"
-        file_path_with_name, trg_file_path, file_name = cls.create_inbox_and_trg_files(ejv_content)
-        cls.upload(ejv_content, file_name, file_path_with_name, trg_file_path)
+            db.session.execute(insert(EjvLinkModel), ejv_links)
+            jv_batch_trailer = cls.get_batch_trailer(batch_number, batch_total, batch_type, control_total)
+            file_path_with_name, trg_file_path, file_name = feeder_file.close(jv_batch_trailer)
+        cls.upload_file(file_name, file_path_with_name, trg_file_path)
 
         db.session.commit()
 
@@ -296,8 +303,8 @@ class EjvPartnerDistributionTask(CgiEjv):
     @classmethod
     def _update_disbursement_status_and_ejv_link(
         cls, disbursement: Disbursement, ejv_header_model: EjvHeaderModel, sequence: int
-    ):
-        """Update disbursement status and create EJV Link."""
+    ) -> dict:
+        """Update disbursement status and return the EJV Link row to be inserted."""
         if isinstance(disbursement.target, InvoiceModel):
             disbursement.target.disbursement_status_code = DisbursementStatus.UPLOADED.value
         elif isinstance(disbursement.target, PartnerDisbursementsModel):
@@ -310,15 +317,13 @@ class EjvPartnerDistributionTask(CgiEjv):
         else:
             raise NotImplementedError("Unknown disbursement type")
 
-        db.session.add(
-            EjvLinkModel(
-                link_id=disbursement.line_item.identifier,
-                link_type=disbursement.line_item.target_type,
-                ejv_header_id=ejv_header_model.id,
-                disbursement_status_code=DisbursementStatus.UPLOADED.value,
-                sequence=sequence,
-            )
-        )
+        return {
+            "link_id": disbursement.line_item.identifier,
+            "link_type": disbursement.line_item.target_type,
+            "ejv_header_id": ejv_header_model.id,
+            "disbursement_status_code": DisbursementStatus.UPLOADED.value,
+            "sequence": sequence,
+        }
 
     @classmethod
     def _get_partners_by_batch_type(cls, batch_type) -> List[CorpTypeModel]:
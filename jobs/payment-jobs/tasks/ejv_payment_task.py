@@ -14,7 +14,8 @@
 """Task to create Journal Voucher for gov account payments."""
 
 import time
-from typing import List
+from collections import defaultdict
+from typing import Dict, Iterable, List
 
 from flask import current_app
 from pay_api.models import DistributionCode as DistributionCodeModel
@@ -24,6 +25,7 @@ from pay_api.models import EjvLink as EjvLinkModel
 from pay_api.models import Invoice as InvoiceModel
 from pay_api.models import InvoiceReference as InvoiceReferenceModel
 from pay_api.models import PaymentAccount as PaymentAccountModel
+from pay_api.models import PaymentLineItem as PaymentLineItemModel
 from pay_api.models import db
 from pay_api.utils.enums import (
     DisbursementStatus,
@@ -34,8 +36,9 @@ from pay_api.utils.enums import (
     PaymentMethod,
 )
 from pay_api.utils.util import generate_transaction_number
+from sqlalchemy import insert
 
-from tasks.common.cgi_ejv import CgiEjv
+from tasks.common.cgi_ejv import CgiEjv, CgiFeederFile
 
 
 class EjvPaymentTask(CgiEjv):
@@ -59,7 +62,6 @@ class EjvPaymentTask(CgiEjv):
     @classmethod
     def _create_ejv_file_for_gov_account(cls, batch_type: str):  # pylint:disable=too-many-locals, too-many-statements
         """Create EJV file for the partner and upload."""
-        ejv_content: str = ""
         batch_total: float = 0
         control_total: int = 0
 
@@ -70,181 +72,196 @@ class EjvPaymentTask(CgiEjv):
         ).flush()
         batch_number = cls.get_batch_number(ejv_file_model.id)
 
-        account_ids = cls._get_account_ids_for_payment(batch_type)
+        # An account can have more than one distribution code, process it once.
+        account_ids = list(dict.fromkeys(cls._get_account_ids_for_payment(batch_type)))
 
-        batch_header: str = cls.get_batch_header(batch_number, batch_type)
+        # Everything needed for the batch is fetched up front in a few queries, instead of per account and line.
+        invoices_by_account = cls._get_invoices_for_payment(account_ids)
+        accounts = {
+            account.id: account
+            for account in db.session.query(PaymentAccountModel).filter(PaymentAccountModel.id.in_(account_ids)).all()
+        }
+        debit_distribution_codes = DistributionCodeModel.find_active_for_accounts(account_ids)
+        invoices = [inv for account_invoices in invoices_by_account.values() for inv in account_invoices]
+        line_items_by_invoice = cls._get_line_items_by_invoice([inv.id for inv in invoices])
+        distribution_codes = cls._get_distribution_codes(
+            line.fee_distribution_id for line_items in line_items_by_invoice.values() for line in line_items
+        )
+        completed_references = cls._get_completed_invoice_references(
+            [inv.id for inv in invoices if inv.invoice_status_code == InvoiceStatus.REFUND_REQUESTED.value]
+        )
 
-        current_app.logger.info("Processing accounts.")
-        for account_id in account_ids:
-            account_jv: str = ""
-            # Find all invoices for the gov account to pay.
-            invoices = cls._get_invoices_for_payment(account_id)
-            pay_account: PaymentAccountModel = PaymentAccountModel.find_by_id(account_id)
-            if not invoices or not pay_account.billable:
-                continue
+        ejv_links = []
+        invoice_references = []
+        with CgiFeederFile(cls, cls.get_batch_header(batch_number, batch_type)) as feeder_file:
+            current_app.logger.info("Processing accounts.")
+            for account_id in account_ids:
+                account_jv = []
+                # Find all invoices for the gov account to pay.
+                account_invoices = invoices_by_account.get(account_id)
+                pay_account: PaymentAccountModel = accounts.get(account_id)
+                if not account_invoices or not pay_account.billable:
+                    continue
 
-            disbursement_desc = f"{pay_account.name[:100]:<100}"
-            effective_date: str = cls.get_effective_date()
-            ejv_header_model: EjvFileModel = EjvHeaderModel(
-                payment_account_id=account_id,
-                disbursement_status_code=DisbursementStatus.UPLOADED.value,
-                ejv_file_id=ejv_file_model.id,
-            ).flush()
-            journal_name: str = cls.get_journal_name(ejv_header_model.id)
-            debit_distribution_code: DistributionCodeModel = DistributionCodeModel.find_by_active_for_account(
-                account_id
-            )
-            debit_distribution = cls.get_distribution_string(debit_distribution_code)  # Debit from GOV account GL
+                disbursement_desc = f"{pay_account.name[:100]:<100}"
+                effective_date: str = cls.get_effective_date()
+                ejv_header_model: EjvFileModel = EjvHeaderModel(
+                    payment_account_id=account_id,
+                    disbursement_status_code=DisbursementStatus.UPLOADED.value,
+                    ejv_file_id=ejv_file_model.id,
+                ).flush()
+                journal_name: str = cls.get_journal_name(ejv_header_model.id)
+                debit_distribution_code: DistributionCodeModel = debit_distribution_codes.get(account_id)
+                debit_distribution = cls.get_distribution_string(debit_distribution_code)  # Debit from GOV account GL
 
-            line_number: int = 0
-            total: float = 0
-            current_app.logger.info(f"Processing invoices for account_id: {account_id}.")
-            for inv in invoices:
-                # If it's a JV reversal credit and debit is reversed.
-                is_jv_reversal = inv.invoice_status_code == InvoiceStatus.REFUND_REQUESTED.value
+                line_number: int = 0
+                total: float = 0
+                current_app.logger.info(f"Processing invoices for account_id: {account_id}.")
+                for inv in account_invoices:
+                    # If it's a JV reversal credit and debit is reversed.
+                    is_jv_reversal = inv.invoice_status_code == InvoiceStatus.REFUND_REQUESTED.value
 
-                # If it's reversal, If there is no COMPLETED invoice reference, then no need to reverse it.
-                # Else mark it as CANCELLED, as new invoice reference will be created
-                if is_jv_reversal:
-                    if (
-                        inv_ref := InvoiceReferenceModel.find_by_invoice_id_and_status(
-                            inv.id, InvoiceReferenceStatus.COMPLETED.value
-                        )
-                    ) is None:
-                        continue
-                    inv_ref.status_code = InvoiceReferenceStatus.CANCELLED.value
+                    # If it's reversal, If there is no COMPLETED invoice reference, then no need to reverse it.
+                    # Else mark it as CANCELLED, as new invoice reference will be created
+                    if is_jv_reversal:
+                        if (inv_ref := completed_references.get(inv.id)) is None:
+                            continue
+                        inv_ref.status_code = InvoiceReferenceStatus.CANCELLED.value
 
-                line_items = inv.payment_line_items
-                invoice_number = f"#{inv.id}"
-                description = disbursement_desc[: -len(invoice_number)] + invoice_number
-                description = f"{description[:100]:<100}"
+                    invoice_number = f"#{inv.id}"
+                    description = disbursement_desc[: -len(invoice_number)] + invoice_number
+                    description = f"{description[:100]:<100}"
 
-                for line in line_items:
-                    # Line can have 2 distribution, 1 for the total and another one for service fees.
-                    line_distribution_code: DistributionCodeModel = DistributionCodeModel.find_by_id(
-                        line.fee_distribution_id
-                    )
-                    if line.total > 0:
-                        total += line.total
-                        line_distribution = cls.get_distribution_string(line_distribution_code)
+                    for line in line_items_by_invoice.get(inv.id, []):
+                        # Line can have 2 distribution, 1 for the total and another one for service fees.
+                        line_distribution_code: DistributionCodeModel = distribution_codes.get(line.fee_distribution_id)
                         flow_through = f"{line.invoice_id:<110}"
-                        # Credit to BCREG GL for a transaction (non-reversal)
-                        line_number += 1
-                        control_total += 1
-                        # If it's normal payment then the Line distribution goes as Credit,
-                        # else it goes as Debit as we need to debit the fund from BC registry GL.
-                        account_jv = account_jv + cls.get_jv_line(
-                            batch_type,
-                            line_distribution,
-                            description,
-                            effective_date,
-                            flow_through,
-                            journal_name,
-                            line.total,
-                            line_number,
-                            "C" if not is_jv_reversal else "D",
-                        )
+                        if line.total > 0:
+                            total += line.total
+                            line_distribution = cls.get_distribution_string(line_distribution_code)
+                            # Credit to BCREG GL for a transaction (non-reversal)
+                            line_number += 1
+                            control_total += 1
+                            # If it's normal payment then the Line distribution goes as Credit,
+                            # else it goes as Debit as we need to debit the fund from BC registry GL.
+                            account_jv.append(
+                                cls.get_jv_line(
+                                    batch_type,
+                                    line_distribution,
+                                    description,
+                                    effective_date,
+                                    flow_through,
+                                    journal_name,
+                                    line.total,
+                                    line_number,
+                                    "C" if not is_jv_reversal else "D",
+                                )
+                            )
 
-                        # Debit from GOV ACCOUNT GL for a transaction (non-reversal)
-                        line_number += 1
-                        control_total += 1
-                        # If it's normal payment then the Gov account GL goes as Debit,
-                        # else it goes as Credit as we need to credit the fund back to ministry.
-                        account_jv = account_jv + cls.get_jv_line(
-                            batch_type,
-                            debit_distribution,
-                            description,
-                            effective_date,
-                            flow_through,
-                            journal_name,
-                            line.total,
-                            line_number,
-                            "D" if not is_jv_reversal else "C",
-                        )
-                    if line.service_fees > 0:
-                        service_fee_distribution_code: DistributionCodeModel = DistributionCodeModel.find_by_id(
-                            line_distribution_code.service_fee_distribution_code_id
-                        )
-                        total += line.service_fees
-                        service_fee_distribution = cls.get_distribution_string(service_fee_distribution_code)
-                        flow_through = f"{line.invoice_id:<110}"
-                        # Credit to BCREG GL for a transaction (non-reversal)
-                        line_number += 1
-                        control_total += 1
-                        account_jv = account_jv + cls.get_jv_line(
-                            batch_type,
-                            service_fee_distribution,
-                            description,
-                            effective_date,
-                            flow_through,
-                            journal_name,
-                            line.service_fees,
-                            line_number,
-                            "C" if not is_jv_reversal else "D",
-                        )
+                            # Debit from GOV ACCOUNT GL for a transaction (non-reversal)
+                            line_number += 1
+                            control_total += 1
+                            # If it's normal payment then the Gov account GL goes as Debit,
+                            # else it goes as Credit as we need to credit the fund back to ministry.
+                            account_jv.append(
+                                cls.get_jv_line(
+                                    batch_type,
+                                    debit_distribution,
+                                    description,
+                                    effective_date,
+                                    flow_through,
+                                    journal_name,
+                                    line.total,
+                                    line_number,
+                                    "D" if not is_jv_reversal else "C",
+                                )
+                            )
+                        if line.service_fees > 0:
+                            service_fee_distribution_code: DistributionCodeModel = distribution_codes.get(
+                                line_distribution_code.service_fee_distribution_code_id
+                            )
+                            total += line.service_fees
+                            service_fee_distribution = cls.get_distribution_string(service_fee_distribution_code)
+                            # Credit to BCREG GL for a transaction (non-reversal)
+                            line_number += 1
+                            control_total += 1
+                            account_jv.append(
+                                cls.get_jv_line(
+                                    batch_type,
+                                    service_fee_distribution,
+                                    description,
+                                    effective_date,
+                                    flow_through,
+                                    journal_name,
+                                    line.service_fees,
+                                    line_number,
+                                    "C" if not is_jv_reversal else "D",
+                                )
+                            )
+
+                            # Debit from GOV ACCOUNT GL for a transaction (non-reversal)
+                            line_number += 1
+                            control_total += 1
+                            account_jv.append(
+                                cls.get_jv_line(
+                                    batch_type,
+                                    debit_distribution,
+                                    description,
+                                    effective_date,
+                                    flow_through,
+                                    journal_name,
+                                    line.service_fees,
+                                    line_number,
+                                    "D" if not is_jv_reversal else "C",
+                                )
+                            )
+                batch_total += total
 
-                        # Debit from GOV ACCOUNT GL for a transaction (non-reversal)
-                        line_number += 1
-                        control_total += 1
-                        account_jv = account_jv + cls.get_jv_line(
+                if total > 0:
+                    # A JV header for each account.
+                    control_total += 1
+                    feeder_file.write(
+                        cls.get_jv_header(
                             batch_type,
-                            debit_distribution,
-                            description,
-                            effective_date,
-                            flow_through,
+                            cls.get_journal_batch_name(batch_number),
                             journal_name,
-                            line.service_fees,
-                            line_number,
-                            "D" if not is_jv_reversal else "C",
-                        )
-            batch_total += total
+                            total,
+                        ),
+                        *account_jv,
+                    )
 
-            if total > 0:
-                # A JV header for each account.
-                control_total += 1
-                account_jv = (
-                    cls.get_jv_header(
-                        batch_type,
-                        cls.get_journal_batch_name(batch_number),
-                        journal_name,
-                        total,
+                for sequence, inv in enumerate(account_invoices, start=1):
+                    ejv_links.append(
+                        {
+                            "link_id": inv.id,
+                            "link_type": EJVLinkType.INVOICE.value,
+                            "ejv_header_id": ejv_header_model.id,
+                            "disbursement_status_code": DisbursementStatus.UPLOADED.value,
+                            "sequence": sequence,
+                        }
+                    )
+                    invoice_references.append(
+                        {
+                            "invoice_id": inv.id,
+                            "invoice_number": generate_transaction_number(inv.id),
+                            "reference_number": None,
+                            "status_code": InvoiceReferenceStatus.ACTIVE.value,
+                        }
                     )
-                    + account_jv
-                )
-                ejv_content = ejv_content + account_jv
 
-            current_app.logger.info("Creating ejv invoice link records and setting invoice status.")
-            sequence = 1
-            for inv in invoices:
-                current_app.logger.debug(f"Creating EJV Invoice Link for invoice id: {inv.id}")
-                ejv_invoice_link = EjvLinkModel(
-                    link_id=inv.id,
-                    link_type=EJVLinkType.INVOICE.value,
-                    ejv_header_id=ejv_header_model.id,
-                    disbursement_status_code=DisbursementStatus.UPLOADED.value,
-                    sequence=sequence,
-                )
-                db.session.add(ejv_invoice_link)
-                sequence += 1
-                current_app.logger.debug(f"Creating Invoice Reference for invoice id: {inv.id}")
-                inv_ref = InvoiceReferenceModel(
-                    invoice_id=inv.id,
-                    invoice_number=generate_transaction_number(inv.id),
-                    reference_number=None,
-                    status_code=InvoiceReferenceStatus.ACTIVE.value,
-                )
-                db.session.add(inv_ref)
-            db.session.flush()  # Instead of flushing every entity, flush all at once.
+            if not feeder_file.has_records:
+                db.session.rollback()
+                return
 
-        if not ejv_content:
-            db.session.rollback()
-            return
+            current_app.logger.info("Creating ejv invoice link records and invoice references.")
+            db.session.flush()
+            db.session.execute(insert(EjvLinkModel), ejv_links)
+            db.session.execute(insert(InvoiceReferenceModel), invoice_references)
 
-        batch_trailer: str = cls.get_batch_trailer(batch_number, batch_total, batch_type, control_total)
-        ejv_content = f"{batch_header}{ejv_content}{batch_trailer}"
-        file_path_with_name, trg_file_path, file_name = cls.create_inbox_and_trg_files(ejv_content)
+            batch_trailer: str = cls.get_batch_trailer(batch_number, batch_total, batch_type, control_total)
+            file_path_with_name, trg_file_path, file_name = feeder_file.close(batch_trailer)
         current_app.logger.info("Uploading to sftp.")
-        cls.upload(ejv_content, file_name, file_path_with_name, trg_file_path)
+        cls.upload_file(file_name, file_path_with_name, trg_file_path)
         db.session.commit()
 
         # Sleep to prevent collision on file name.
@@ -269,8 +286,8 @@ class EjvPaymentTask(CgiEjv):
         return [account_id_tuple[0] for account_id_tuple in account_ids]
 
     @classmethod
-    def _get_invoices_for_payment(cls, account_id: int) -> List[InvoiceModel]:
-        """Return invoices for payments."""
+    def _get_invoices_for_payment(cls, account_ids: List[int]) -> Dict[int, List[InvoiceModel]]:
+        """Return invoices for payments, grouped by account id."""
         valid_statuses = (
             InvoiceStatus.APPROVED.value,
             InvoiceStatus.REFUND_REQUESTED.value,
@@ -283,8 +300,53 @@ class EjvPaymentTask(CgiEjv):
             db.session.query(InvoiceModel)
             .filter(InvoiceModel.invoice_status_code.in_(valid_statuses))
             .filter(InvoiceModel.payment_method_code == PaymentMethod.EJV.value)
-            .filter(InvoiceModel.payment_account_id == account_id)
+            .filter(InvoiceModel.payment_account_id.in_(account_ids))
             .filter(InvoiceModel.id.notin_(invoice_ref_subquery))
+            .order_by(InvoiceModel.id)
+            .all()
+        )
+        invoices_by_account = defaultdict(list)
+        for invoice in invoices:
+            invoices_by_account[invoice.payment_account_id].append(invoice)
+        return invoices_by_account
+
+    @classmethod
+    def _get_line_items_by_invoice(cls, invoice_ids: List[int]) -> Dict[int, List[PaymentLineItemModel]]:
+        """Return the payment line items for the invoices, grouped by invoice id."""
+        line_items_by_invoice = defaultdict(list)
+        if invoice_ids:
+            for line_item in sorted(PaymentLineItemModel.find_by_invoice_ids(invoice_ids), key=lambda line: line.id):
+                line_items_by_invoice[line_item.invoice_id].append(line_item)
+        return line_items_by_invoice
+
+    @classmethod
+    def _get_distribution_codes(cls, distribution_code_ids: Iterable[int]) -> Dict[int, DistributionCodeModel]:
+        """Return the distribution codes and their service fee distribution codes, keyed by id."""
+        distribution_codes = {}
+        ids_to_fetch = set(distribution_code_ids) - {None}
+        while ids_to_fetch:
+            for distribution_code in (
+                db.session.query(DistributionCodeModel)
+                .filter(DistributionCodeModel.distribution_code_id.in_(ids_to_fetch))
+                .all()
+            ):
+                distribution_codes[distribution_code.distribution_code_id] = distribution_code
+            ids_to_fetch = (
+                {code.service_fee_distribution_code_id for code in distribution_codes.values()}
+                - set(distribution_codes)
+                - {None}
+            )
+        return distribution_codes
+
+    @classmethod
+    def _get_completed_invoice_references(cls, invoice_ids: List[int]) -> Dict[int, InvoiceReferenceModel]:
+        """Return the COMPLETED invoice references for the invoices, keyed by invoice id."""
+        if not invoice_ids:
+            return {}
+        invoice_references = (
+            db.session.query(InvoiceReferenceModel)
+            .filter(InvoiceReferenceModel.invoice_id.in_(invoice_ids))
+            .filter(InvoiceReferenceModel.status_code == InvoiceReferenceStatus.COMPLETED.value)
             .all()
         )
-        return invoices
+        return {invoice_reference.invoice_id: invoice_reference for invoice_reference in invoice_references}
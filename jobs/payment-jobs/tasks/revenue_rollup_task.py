@@ -0,0 +1,41 @@
+# Copyright © 2024 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Task to rebuild the daily revenue rollups used by the partner reconciliation reports."""
+from datetime import timedelta
+
+from flask import current_app
+from pay_api.models import RevenueRollup as RevenueRollupModel
+from pay_api.models import db
+from pay_api.utils.util import current_local_time
+
+
+class RevenueRollupTask:  # pylint: disable=too-few-public-methods
+    """Task to rebuild the daily revenue rollups."""
+
+    @classmethod
+    def update_rollups(cls, days: int = None):
+        """Rebuild the rollups for the last days (REVENUE_ROLLUP_DAYS) through today, one day per transaction.
+
+        Invoices still change after they're created (refunds, disbursements), the days rebuilt should cover the
+        period the reports read. Pass more days to backfill, e.g. `REVENUE_ROLLUP 400` on first deploy. Run it after
+        local midnight and before the notebook-report job, so the reports see the previous day.
+        """
+        days = current_app.config.get("REVENUE_ROLLUP_DAYS") if days is None else days
+        today = current_local_time().date()
+        rows = 0
+        for offset in range(days, -1, -1):
+            report_date = today - timedelta(days=offset)
+            rows += RevenueRollupModel.refresh(report_date, report_date)
+            db.session.commit()
+        current_app.logger.info(f"Rebuilt {rows} revenue rollups from {today - timedelta(days=days)} to {today}.")
@@ -13,17 +13,20 @@
 # limitations under the License.
 """Service to manage PAYBC services."""
 
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 
 from dateutil.parser import parse
 from flask import current_app
 from pay_api.models.base_model import db
 from pay_api.models.payment import Payment as PaymentModel
+from pay_api.models.report_job import ReportJob as ReportJobModel
 from pay_api.models.statement import Statement as StatementModel
 from pay_api.models.statement_invoices import StatementInvoices as StatementInvoicesModel
+from pay_api.services.oauth_service import OAuthService
 from pay_api.services.statement import Statement as StatementService
 from pay_api.services.statement_settings import StatementSettings as StatementSettingsService
-from pay_api.utils.enums import NotificationStatus, StatementFrequency
+from pay_api.utils.enums import AuthHeaderType, ContentType, NotificationStatus, StatementFrequency
 from pay_api.utils.util import (
     get_first_and_last_dates_of_month,
     get_local_time,
@@ -31,9 +34,11 @@ from pay_api.utils.util import (
     get_previous_month_and_year,
     get_week_start_and_end_date,
 )
-from sqlalchemy import cast, delete, func, select
+from sqlalchemy import cast, delete, func, insert, select
 from sqlalchemy.dialects.postgresql import ARRAY, INTEGER
 
+from utils.auth import get_token
+
 
 class StatementTask:  # pylint:disable=too-few-public-methods
     """Task to generate statements."""
@@ -42,6 +47,7 @@ class StatementTask:  # pylint:disable=too-few-public-methods
     has_account_override: bool = False
     statement_from: datetime = None
     statement_to: datetime = None
+    statements_to_render: list = []
 
     @classmethod
     def generate_statements(cls, arguments=None):
@@ -60,6 +66,7 @@ class StatementTask:  # pylint:disable=too-few-public-methods
         )
         cls.has_date_override = date_override is not None
         cls.has_account_override = auth_account_override is not None
+        cls.statements_to_render = []
         if date_override:
             current_app.logger.debug(f"Generating statements for: {date_override} using date override.")
         if auth_account_override:
@@ -81,6 +88,40 @@ class StatementTask:  # pylint:disable=too-few-public-methods
         # Commit transaction
         db.session.commit()
 
+        if current_app.config.get("STATEMENT_REPORT_PRERENDER"):
+            cls._prerender_statement_reports()
+
+    @classmethod
+    def _prerender_statement_reports(cls):
+        """Render the PDFs of the new statements, these are stored in the report cache once the statement is closed."""
+        retention_days = current_app.config.get("REPORT_JOB_RETENTION_DAYS")
+        deleted = ReportJobModel.delete_created_before(datetime.now(tz=timezone.utc) - timedelta(days=retention_days))
+        db.session.commit()
+        current_app.logger.info(f"Removed {deleted} report jobs older than {retention_days} days.")
+        timeout = timedelta(minutes=current_app.config.get("REPORT_JOB_TIMEOUT_MINUTES"))
+        failed = ReportJobModel.fail_pending_created_before(datetime.now(tz=timezone.utc) - timeout)
+        db.session.commit()
+        current_app.logger.info(f"Marked {failed} report jobs pending for more than {timeout} as failed.")
+        if not cls.statements_to_render:
+            return
+
+        token = get_token()
+        rendered = 0
+        for statement_id, auth_account_id in cls.statements_to_render:
+            try:
+                auth_url = current_app.config.get("AUTH_API_ENDPOINT") + f"orgs/{auth_account_id}/authorizations"
+                auth = OAuthService.get(
+                    f"{auth_url}?expanded=true", token, AuthHeaderType.BEARER, ContentType.JSON
+                ).json()
+                StatementService.get_statement_report(
+                    statement_id=statement_id, content_type=ContentType.PDF.value, auth=auth, token=token
+                )
+                rendered += 1
+            except Exception as e:  # NOQA # pylint: disable=broad-except
+                db.session.rollback()
+                current_app.logger.error(f"Error rendering statement {statement_id}: {e}", exc_info=True)
+        current_app.logger.info(f"Rendered {rendered} of {len(cls.statements_to_render)} statement reports.")
+
     @classmethod
     def _generate_gap_statements(cls, target_time, account_override):
         """Generate gap statements for weekly statements that wont run over Sunday."""
@@ -154,20 +195,17 @@ class StatementTask:  # pylint:disable=too-few-public-methods
         cls._create_statement_records(search_filter, statement_settings, account_override)
 
     @classmethod
-    def _upsert_statements(cls, statement_settings, invoice_detail_tuple, reuse_statements):
+    def _upsert_statements(cls, statement_settings, invoices_by_account, reuse_statements):
         """Upsert statements to reuse statement ids because they are referenced in the EFT Shortname History."""
+        reuse_by_key = {}
+        for statement in reuse_statements:
+            reuse_by_key.setdefault(
+                (statement.payment_account_id, statement.frequency, statement.from_date, statement.to_date), statement
+            )
         statements = []
         for setting, pay_account in statement_settings:
-            existing_statement = next(
-                (
-                    statement
-                    for statement in reuse_statements
-                    if statement.payment_account_id == pay_account.id
-                    and statement.frequency == setting.frequency
-                    and statement.from_date == cls.statement_from.date()
-                    and statement.to_date == cls.statement_to.date()
-                ),
-                None,
+            existing_statement = reuse_by_key.get(
+                (pay_account.id, setting.frequency, cls.statement_from.date(), cls.statement_to.date())
             )
             notification_status = (
                 NotificationStatus.PENDING.value
@@ -175,7 +213,7 @@ class StatementTask:  # pylint:disable=too-few-public-methods
                 else NotificationStatus.SKIP.value
             )
             payment_methods = StatementService.determine_payment_methods(
-                invoice_detail_tuple, pay_account, existing_statement
+                invoices_by_account.get(pay_account.auth_account_id, []), pay_account, existing_statement
             )
             created_on = get_local_time(datetime.now(tz=timezone.utc))
             if existing_statement:
@@ -219,34 +257,52 @@ class StatementTask:  # pylint:disable=too-few-public-methods
             )
             current_app.logger.debug(f"Statements for month: {cls.statement_from.date()} to {cls.statement_to.date()}")
         if cls.has_account_override:
-            auth_account_ids = [account_override]
             statement_settings = cls._filter_settings_by_override(statement_settings, account_override)
             current_app.logger.debug(f"Override Filtered to {len(statement_settings)} accounts to generate statements.")
-        else:
-            auth_account_ids = [pay_account.auth_account_id for _, pay_account in statement_settings]
-        search_filter["authAccountIds"] = auth_account_ids
-        # Force match on these methods where if the payment method is in matchPaymentMethods, the invoice payment method
-        # must match the account payment method. Used for EFT so the statements only show EFT invoices and interim
-        # statement logic when transitioning payment methods
-        search_filter["matchPaymentMethods"] = True
-        invoice_detail_tuple = PaymentModel.get_invoices_and_payment_accounts_for_statements(search_filter)
+        statement_settings = cls._filter_settings_by_partition(statement_settings)
+        batch_size = current_app.config.get("STATEMENT_ACCOUNT_BATCH_SIZE", 1000)
+        for start in range(0, len(statement_settings), batch_size):
+            batch = statement_settings[start : start + batch_size]
+            current_app.logger.debug(f"Generating statements for accounts {start + 1} to {start + len(batch)}.")
+            cls._create_statement_records_for_batch(search_filter, batch)
+
+    @classmethod
+    def _create_statement_records_for_batch(cls, search_filter, statement_settings):
+        """Create the statements and statement invoices for a batch of accounts."""
+        batch_filter = {
+            **search_filter,
+            "authAccountIds": [pay_account.auth_account_id for _, pay_account in statement_settings],
+            # Force match on these methods where if the payment method is in matchPaymentMethods, the invoice payment
+            # method must match the account payment method. Used for EFT so the statements only show EFT invoices and
+            # interim statement logic when transitioning payment methods
+            "matchPaymentMethods": True,
+        }
+        invoices_by_account = defaultdict(list)
+        for invoice_detail in PaymentModel.get_invoices_and_payment_accounts_for_statements(batch_filter):
+            invoices_by_account[invoice_detail.auth_account_id].append(invoice_detail)
         reuse_statements = []
         if cls.has_date_override and statement_settings:
             reuse_statements = cls._clean_up_old_statements(statement_settings)
         current_app.logger.debug("Upserting statements.")
-        statements = cls._upsert_statements(statement_settings, invoice_detail_tuple, reuse_statements)
+        statements = cls._upsert_statements(statement_settings, invoices_by_account, reuse_statements)
         # Return defaults which returns the id.
         db.session.bulk_save_objects(statements, return_defaults=True)
         db.session.flush()
 
         current_app.logger.debug("Inserting statement invoices.")
-        statement_invoices = []
-        for statement, auth_account_id in zip(statements, auth_account_ids):
-            invoices = [i for i in invoice_detail_tuple if i.auth_account_id == auth_account_id]
-            statement_invoices = statement_invoices + [
-                StatementInvoicesModel(statement_id=statement.id, invoice_id=invoice.id) for invoice in invoices
-            ]
-        db.session.bulk_save_objects(statement_invoices)
+        statement_invoices = [
+            {"statement_id": statement.id, "invoice_id": invoice.id}
+            for statement, (_, pay_account) in zip(statements, statement_settings)
+            for invoice in invoices_by_account.get(pay_account.auth_account_id, [])
+        ]
+        if statement_invoices:
+            # Executemany of a core insert is sent as multi row INSERT .. VALUES statements.
+            db.session.execute(insert(StatementInvoicesModel), statement_invoices)
+        cls.statements_to_render.extend(
+            (statement.id, pay_account.auth_account_id)
+            for statement, (_, pay_account) in zip(statements, statement_settings)
+            if invoices_by_account.get(pay_account.auth_account_id)
+        )
 
     @classmethod
     def _clean_up_old_statements(cls, statement_settings):
@@ -289,3 +345,17 @@ class StatementTask:  # pylint:disable=too-few-public-methods
         return [
             settings for settings in statement_settings if settings.PaymentAccount.auth_account_id == auth_account_id
         ]
+
+    @classmethod
+    def _filter_settings_by_partition(cls, statement_settings):
+        """Return the statement settings for this job's partition, so parallel job tasks split the accounts."""
+        partition_count = current_app.config.get("STATEMENT_PARTITION_COUNT", 1)
+        if partition_count <= 1:
+            return statement_settings
+        partition_index = current_app.config.get("STATEMENT_PARTITION_INDEX", 0)
+        current_app.logger.debug(f"Generating statements for partition {partition_index} of {partition_count}.")
+        return [
+            settings
+            for settings in statement_settings
+            if settings.PaymentAccount.id % partition_count == partition_index
+        ]
@@ -19,6 +19,7 @@ Test-Suite to ensure that the CreateInvoiceTask is working as expected.
 from datetime import datetime, timedelta, timezone
 from unittest.mock import patch
 
+from flask import current_app
 from pay_api.models import DistributionCode as DistributionCodeModel
 from pay_api.models import FeeSchedule as FeeScheduleModel
 from pay_api.models import Invoice as InvoiceModel
@@ -282,6 +283,44 @@ def test_create_pad_invoice_multiple_transactions(session):
     assert invoice2.invoice_status_code == invoice.invoice_status_code == InvoiceStatus.APPROVED.value
 
 
+def test_create_eft_invoices_in_batches(session, monkeypatch):
+    """Assert EFT invoices are created per account in order and a failed call doesn't stop the batch."""
+    monkeypatch.setitem(current_app.config, "CFS_INVOICE_BATCH_SIZE", 2)
+    previous_day = datetime.now(tz=timezone.utc) - timedelta(days=1)
+    fee_schedule = FeeScheduleModel.find_by_filing_type_and_corp_type("CP", "OTANN")
+    invoices = []
+    for auth_account_id in ("1", "2"):
+        account = factory_create_eft_account(auth_account_id=auth_account_id, status=CfsAccountStatus.ACTIVE.value)
+        for minutes in range(2):
+            invoice = factory_invoice(
+                payment_account=account,
+                created_on=previous_day + timedelta(minutes=minutes),
+                total=10,
+                status_code=InvoiceStatus.APPROVED.value,
+                payment_method_code=PaymentMethod.EFT.value,
+            )
+            factory_payment_line_item(invoice.id, fee_schedule_id=fee_schedule.fee_schedule_id).save()
+            invoices.append(invoice)
+    failing_invoice_id = invoices[1].id
+
+    def create_account_invoice(transaction_number, line_items, cfs_account):
+        assert [line_item.invoice_id for line_item in line_items] == [transaction_number]
+        if transaction_number == failing_invoice_id:
+            raise HTTPError()
+        return {"invoice_number": f"{transaction_number}", "pbc_ref_number": "10005"}
+
+    with patch.object(CFSService, "create_account_invoice", side_effect=create_account_invoice) as mock_cfs:
+        with patch.object(CFSService, "get_invoice", return_value={}), patch("time.sleep"):
+            CreateInvoiceTask.create_invoices()
+        called_ids = [call.kwargs["transaction_number"] for call in mock_cfs.call_args_list]
+
+    # Invoices are sent newest first for each account.
+    assert called_ids == [invoices[1].id, invoices[0].id, invoices[3].id, invoices[2].id]
+    for invoice in invoices:
+        inv_ref = InvoiceReferenceModel.find_by_invoice_id_and_status(invoice.id, InvoiceReferenceStatus.ACTIVE.value)
+        assert (inv_ref is None) == (invoice.id == failing_invoice_id)
+
+
 def test_create_pad_invoice_before_cutoff(session):
     """Assert PAD invoices are created."""
     # Create an account and an invoice for the account
@@ -16,6 +16,7 @@
 
 Test-Suite to ensure that the DistributionTask is working as expected.
 """
+from flask import current_app
 from pay_api.models import CorpType as CorpTypeModel
 from pay_api.models import FeeSchedule
 from pay_api.utils.enums import InvoiceReferenceStatus, InvoiceStatus
@@ -154,6 +155,25 @@ def test_non_direct_pay_invoices(session, monkeypatch):
     assert invoice.invoice_status_code == InvoiceStatus.REFUNDED.value
 
 
+def test_update_failed_distributions_in_batches(session, monkeypatch):
+    """Test invoices are processed in batches, starting after the last invoice id."""
+    monkeypatch.setitem(current_app.config, "PAYBC_REVENUE_BATCH_SIZE", 1)
+    invoices = []
+    for _ in range(3):
+        invoice = factory_invoice(
+            factory_create_ejv_account(),
+            status_code=InvoiceStatus.UPDATE_REVENUE_ACCOUNT.value,
+        )
+        factory_invoice_reference(invoice.id, invoice.id, InvoiceReferenceStatus.COMPLETED.value)
+        factory_payment("PAYBC", "EJV", invoice_number=invoice.id)
+        invoices.append(invoice)
+
+    DistributionTask.update_failed_distributions(last_invoice_id=invoices[0].id)
+    assert invoices[0].invoice_status_code == InvoiceStatus.UPDATE_REVENUE_ACCOUNT.value
+    assert invoices[1].invoice_status_code == InvoiceStatus.PAID.value
+    assert invoices[2].invoice_status_code == InvoiceStatus.PAID.value
+
+
 def test_no_response_pay_bc(session, monkeypatch):
     """Test no response from PayBC."""
     invoice = factory_invoice(factory_create_direct_pay_account(), status_code=InvoiceStatus.PAID.value)
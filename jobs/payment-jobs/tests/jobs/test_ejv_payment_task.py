@@ -16,9 +16,12 @@
 
 Test-Suite to ensure that the CgiEjvJob is working as expected.
 """
+import os
+
 from pay_api.models import DistributionCode, EjvFile, EjvHeader, EjvLink, FeeSchedule, Invoice, InvoiceReference, db
 from pay_api.utils.enums import DisbursementStatus, EjvFileType, InvoiceReferenceStatus, InvoiceStatus
 
+from tasks.common.cgi_ejv import CgiFeederFile
 from tasks.ejv_payment_task import EjvPaymentTask
 
 from .factory import factory_create_ejv_account, factory_distribution, factory_invoice, factory_payment_line_item
@@ -148,3 +151,13 @@ def test_payments_for_gov_accounts(session, monkeypatch):
         ejv_file: EjvFile = EjvFile.find_by_id(ejv_header.ejv_file_id)
         assert ejv_file
         assert ejv_file.file_type == EjvFileType.PAYMENT.value
+
+
+def test_feeder_file_is_removed_when_not_closed(session):
+    """Assert the working file of an unfinished feeder file doesn't stay behind."""
+    with CgiFeederFile(EjvPaymentTask, "BH") as feeder_file:
+        feeder_file.write("JH", "JD")
+        work_path = feeder_file._work_path  # pylint: disable=protected-access
+        assert os.path.exists(work_path)
+        assert feeder_file.has_records
+    assert not os.path.exists(work_path)
@@ -0,0 +1,71 @@
+# Copyright © 2024 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests to assure the RevenueRollupTask.
+
+Test-Suite to ensure that the RevenueRollupTask is working as expected.
+"""
+from datetime import timedelta, timezone
+
+from pay_api.models import RevenueRollup as RevenueRollupModel
+from pay_api.utils.enums import InvoiceStatus, PaymentMethod, RevenueRollupDateType
+from pay_api.utils.util import current_local_time
+
+from tasks.revenue_rollup_task import RevenueRollupTask
+
+from .factory import factory_create_ejv_account, factory_invoice
+
+
+def test_update_rollups(session):
+    """Assert the invoices are summed per day, the earlier days are left out."""
+    account = factory_create_ejv_account()
+    local_noon = current_local_time().replace(hour=12, minute=0, second=0, microsecond=0)
+    for total, days_ago in ((10, 0), (20, 0), (40, 3)):
+        factory_invoice(
+            account,
+            status_code=InvoiceStatus.PAID.value,
+            corp_type_code="VS",
+            total=total,
+            service_fees=1.5,
+            payment_method_code=PaymentMethod.EJV.value,
+            created_on=(local_noon - timedelta(days=days_ago)).astimezone(timezone.utc),
+        )
+
+    RevenueRollupTask.update_rollups(days=1)
+
+    rollups = RevenueRollupModel.query.filter_by(
+        corp_type_code="VS",
+        date_type=RevenueRollupDateType.CREATED.value,
+        invoice_status_code=InvoiceStatus.PAID.value,
+        payment_method_code=PaymentMethod.EJV.value,
+    ).all()
+    assert [rollup.report_date for rollup in rollups] == [local_noon.date()]
+    assert rollups[0].transaction_count == 2
+    assert rollups[0].total == 30
+    assert rollups[0].service_fees == 3
+
+    # Rebuilding replaces the rows for the days instead of adding to them.
+    RevenueRollupTask.update_rollups(days=1)
+    assert RevenueRollupModel.query.filter_by(id=rollups[0].id).count() == 0
+    assert (
+        RevenueRollupModel.query.filter_by(
+            corp_type_code="VS",
+            date_type=RevenueRollupDateType.CREATED.value,
+            report_date=local_noon.date(),
+            payment_method_code=PaymentMethod.EJV.value,
+        )
+        .one()
+        .transaction_count
+        == 2
+    )
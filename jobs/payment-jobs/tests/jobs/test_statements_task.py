@@ -20,6 +20,7 @@ from datetime import datetime, timedelta, timezone
 
 import pytest
 import pytz
+from flask import current_app
 from freezegun import freeze_time
 from pay_api.models import Invoice as InvoiceModel
 from pay_api.models import Statement, StatementInvoices, StatementSettings, db
@@ -121,6 +122,32 @@ def test_statements_for_empty_results(session):
     assert len(invoices) == 0
 
 
+@freeze_time("2023-01-02 12:00:00T08:00:00")
+def test_statements_in_batches_and_partitions(session, monkeypatch):
+    """Assert statements are generated per batch of accounts and only for the accounts in the job's partition."""
+    previous_day = localize_date(get_previous_day(datetime.utcnow()))
+    accounts = []
+    for auth_account_id in ("1001", "1002", "1003", "1004"):
+        account = factory_premium_payment_account(auth_account_id=auth_account_id)
+        factory_invoice(payment_account=account, created_on=previous_day)
+        factory_invoice(payment_account=account, created_on=previous_day)
+        factory_statement_settings(pay_account_id=account.id, from_date=previous_day, frequency="DAILY")
+        accounts.append(account)
+
+    monkeypatch.setitem(current_app.config, "STATEMENT_ACCOUNT_BATCH_SIZE", 1)
+    monkeypatch.setitem(current_app.config, "STATEMENT_PARTITION_COUNT", 2)
+    monkeypatch.setitem(current_app.config, "STATEMENT_PARTITION_INDEX", 1)
+    StatementTask.generate_statements()
+
+    for account in accounts:
+        statements = StatementService.get_account_statements(auth_account_id=account.auth_account_id, page=1, limit=100)
+        if account.id % 2 == 1:
+            invoices = StatementInvoices.find_all_invoices_for_statement(statements[0][0].id)
+            assert len(invoices) == 2
+        else:
+            assert statements[1] == 0
+
+
 def test_bcol_weekly_to_eft_statement(session):
     """Test transition to EFT statement with an existing weekly interim statement."""
     # Account set up
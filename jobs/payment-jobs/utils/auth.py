@@ -16,6 +16,7 @@ import base64
 
 from flask import current_app
 from pay_api.services.oauth_service import OAuthService
+from pay_api.services.oauth_token_cache import oauth_token_cache
 from pay_api.utils.enums import AuthHeaderType, ContentType
 
 
@@ -34,12 +35,15 @@ def get_token():
         )
     ).decode("utf-8")
     data = "grant_type=client_credentials"
-    token_response = OAuthService.post(
-        token_url,
-        basic_auth_encoded,
-        AuthHeaderType.BASIC,
-        ContentType.FORM_URL_ENCODED,
-        data,
+    token_response = oauth_token_cache.get(
+        f"KEYCLOAK:{current_app.config.get('KEYCLOAK_SERVICE_ACCOUNT_ID')}",
+        lambda: OAuthService.post(
+            token_url,
+            basic_auth_encoded,
+            AuthHeaderType.BASIC,
+            ContentType.FORM_URL_ENCODED,
+            data,
+        ),
     )
     token = token_response.json().get("access_token")
     return token
@@ -0,0 +1,103 @@
+# Copyright © 2024 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Bounded concurrent execution of outbound calls (CFS, PayBC) for the jobs.
+
+Calls are spread over a thread pool, each thread runs in its own app context and therefore its own database session.
+Functions passed in should take plain values (ids) and load what they need, the caller's ORM objects must not be shared
+with the threads.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Hashable, List, Optional, Sequence
+
+from flask import current_app
+
+
+@dataclass
+class CallResult:
+    """Outcome of calling the function for an item."""
+
+    item: Any
+    value: Any = None
+    error: Optional[Exception] = None
+    seconds: float = 0
+
+
+class RateLimiter:
+    """Spaces out call starts across threads so no more than max_per_second start each second, 0 disables it."""
+
+    def __init__(self, max_per_second: float = 0):
+        """Initialize the limiter."""
+        self._interval = 1 / max_per_second if max_per_second else 0
+        self._lock = Lock()
+        self._next_at = 0.0
+
+    def wait(self):
+        """Block until the next call is allowed to start."""
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            self._next_at = max(now, self._next_at) + self._interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def run_ordered_by_key(
+    items: Sequence,
+    func: Callable,
+    key: Callable[[Any], Hashable],
+    workers: int,
+    rate_limiter: RateLimiter = None,
+) -> List[CallResult]:
+    """Call func for every item using up to workers threads, the results are returned in the order of the items.
+
+    Items sharing a key are called one after the other in their original order (e.g. the invoices of one account),
+    items with different keys run concurrently. Exceptions are captured on the result instead of being raised.
+    """
+    rate_limiter = rate_limiter or RateLimiter()
+    results = [CallResult(item) for item in items]
+    chains = {}
+    for result in results:
+        chains.setdefault(key(result.item), []).append(result)
+
+    def run_chain(chain: List[CallResult]):
+        for result in chain:
+            rate_limiter.wait()
+            started = time.monotonic()
+            try:
+                result.value = func(result.item)
+            except Exception as e:  # NOQA # pylint: disable=broad-except
+                result.error = e
+            result.seconds = time.monotonic() - started
+
+    if workers <= 1 or len(chains) <= 1:
+        for chain in chains.values():
+            run_chain(chain)
+        return results
+
+    app = current_app._get_current_object()  # pylint: disable=protected-access
+
+    def run_chain_in_app_context(chain: List[CallResult]):
+        with app.app_context():
+            run_chain(chain)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_chain_in_app_context, chain) for chain in chains.values()]
+        for future in futures:
+            future.result()
+    return results
@@ -32,6 +32,12 @@ def put_object(value_as_bytes, file_name: str, file_size: int = 0):
     )
 
 
+def put_file(file_path: str, file_name: str):
+    """Upload the file at file_path, it's streamed from disk instead of being read into memory."""
+    current_app.logger.debug(f"Uploading {file_name}")
+    _get_client().fput_object(current_app.config.get("MINIO_BUCKET_NAME"), file_name, file_path)
+
+
 def _get_client() -> Minio:
     """Return a minio client."""
     minio_endpoint = current_app.config.get("MINIO_ENDPOINT")
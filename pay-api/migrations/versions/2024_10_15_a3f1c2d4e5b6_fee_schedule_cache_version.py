@@ -0,0 +1,57 @@
+"""Cache version stamps for fee schedules and fee codes.
+
+Revision ID: a3f1c2d4e5b6
+Revises: ed487561aeeb
+Create Date: 2024-10-15 09:12:44.187311
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+# Note you may see foreign keys with distribution_codes_history
+# For disbursement_distribution_code_id, service_fee_distribution_code_id
+# Please ignore those lines and don't include in migration.
+
+revision = 'a3f1c2d4e5b6'
+down_revision = 'ed487561aeeb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('create sequence cache_versions_seq')
+    op.create_table(
+        'cache_versions',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_on', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("insert into cache_versions (name, version, updated_on) values ('fee_schedules', nextval('cache_versions_seq'), now())")
+
+    # Sequences are not rolled back, so every change produces a unique stamp even if the transaction is aborted.
+    op.execute("""
+        create or replace function bump_cache_version() returns trigger as $$
+        begin
+            update cache_versions set version = nextval('cache_versions_seq'), updated_on = now()
+            where name = TG_ARGV[0];
+            return null;
+        end;
+        $$ language plpgsql;
+    """)
+    for table_name in ('fee_schedules', 'fee_codes'):
+        op.execute(f"""
+            create trigger {table_name}_cache_version
+            after insert or update or delete or truncate on {table_name}
+            for each statement execute procedure bump_cache_version('fee_schedules');
+        """)
+
+
+def downgrade():
+    for table_name in ('fee_schedules', 'fee_codes'):
+        op.execute(f'drop trigger if exists {table_name}_cache_version on {table_name}')
+    op.execute('drop function if exists bump_cache_version()')
+    op.drop_table('cache_versions')
+    op.execute('drop sequence if exists cache_versions_seq')
@@ -0,0 +1,37 @@
+"""Cache version stamp for the code tables.
+
+Revision ID: b4e2d3f5a6c7
+Revises: a3f1c2d4e5b6
+Create Date: 2024-10-16 10:21:37.512904
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+# Note you may see foreign keys with distribution_codes_history
+# For disbursement_distribution_code_id, service_fee_distribution_code_id
+# Please ignore those lines and don't include in migration.
+
+revision = 'b4e2d3f5a6c7'
+down_revision = 'a3f1c2d4e5b6'
+branch_labels = None
+depends_on = None
+
+CODE_TABLES = ('corp_types', 'error_codes', 'fee_codes', 'invoice_status_codes', 'routing_slip_status_codes')
+
+
+def upgrade():
+    op.execute("insert into cache_versions (name, version, updated_on) values ('codes', nextval('cache_versions_seq'), now())")
+    for table_name in CODE_TABLES:
+        op.execute(f"""
+            create trigger {table_name}_codes_cache_version
+            after insert or update or delete or truncate on {table_name}
+            for each statement execute procedure bump_cache_version('codes');
+        """)
+
+
+def downgrade():
+    for table_name in CODE_TABLES:
+        op.execute(f'drop trigger if exists {table_name}_codes_cache_version on {table_name}')
+    op.execute("delete from cache_versions where name = 'codes'")
@@ -0,0 +1,33 @@
+"""Indexes for the date range searches on invoices and routing slips.
+
+Revision ID: c5f3e4a6b7d8
+Revises: b4e2d3f5a6c7
+Create Date: 2024-10-17 14:05:12.840271
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+# Note you may see foreign keys with distribution_codes_history
+# For disbursement_distribution_code_id, service_fee_distribution_code_id
+# Please ignore those lines and don't include in migration.
+
+revision = 'c5f3e4a6b7d8'
+down_revision = 'b4e2d3f5a6c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Purchase history and statements filter an account's invoices by created_on.
+    op.create_index('ix_invoices_payment_account_id_created_on', 'invoices', ['payment_account_id', 'created_on'],
+                    unique=False)
+    op.create_index(op.f('ix_routing_slips_routing_slip_date'), 'routing_slips', ['routing_slip_date'], unique=False)
+    op.create_index('ix_routing_slips_created_on', 'routing_slips', ['created_on'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_routing_slips_created_on', table_name='routing_slips')
+    op.drop_index(op.f('ix_routing_slips_routing_slip_date'), table_name='routing_slips')
+    op.drop_index('ix_invoices_payment_account_id_created_on', table_name='invoices')
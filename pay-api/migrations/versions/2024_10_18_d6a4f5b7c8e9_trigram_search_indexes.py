@@ -0,0 +1,107 @@
+"""Trigram indexes for substring searches and the invoice details search text.
+
+Revision ID: d6a4f5b7c8e9
+Revises: c5f3e4a6b7d8
+Create Date: 2024-10-18 11:47:03.215968
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+# Note you may see foreign keys with distribution_codes_history
+# For disbursement_distribution_code_id, service_fee_distribution_code_id
+# Please ignore those lines and don't include in migration.
+
+revision = 'd6a4f5b7c8e9'
+down_revision = 'c5f3e4a6b7d8'
+branch_labels = None
+depends_on = None
+
+# (index name, table, indexed expression) used by ILIKE '%x%' searches.
+TRIGRAM_INDEXES = [
+    ('ix_invoices_business_identifier_trgm', 'invoices', 'business_identifier'),
+    ('ix_invoices_created_name_trgm', 'invoices', 'created_name'),
+    ('ix_invoices_details_text_trgm', 'invoices', 'details_text'),
+    ('ix_invoices_id_text_trgm', 'invoices', '(cast(id as varchar))'),
+    ('ix_invoice_references_invoice_number_trgm', 'invoice_references', 'invoice_number'),
+    ('ix_payment_line_items_description_trgm', 'payment_line_items', 'description'),
+    ('ix_payment_accounts_name_trgm', 'payment_accounts', 'name'),
+    ('ix_payment_accounts_branch_name_trgm', 'payment_accounts', 'branch_name'),
+    ('ix_routing_slips_number_trgm', 'routing_slips', 'number'),
+    ('ix_routing_slips_created_name_trgm', 'routing_slips', 'created_name'),
+    ('ix_eft_short_names_short_name_trgm', 'eft_short_names', 'short_name'),
+]
+
+# (index name, table, column) used by prefix searches on identifiers.
+PREFIX_INDEXES = [
+    ('ix_invoices_business_identifier_upper', 'invoices', 'business_identifier'),
+    ('ix_invoice_references_invoice_number_upper', 'invoice_references', 'invoice_number'),
+]
+
+# Invoices updated per transaction when filling in details_text.
+BACKFILL_BATCH_SIZE = 10000
+
+
+def upgrade():
+    op.execute('create extension if not exists pg_trgm')
+
+    op.add_column('invoices', sa.Column('details_text', sa.Text(), nullable=True))
+    # Separated by new lines, so a search can't match across a label and a value.
+    op.execute("""
+        create or replace function invoice_details_text(details jsonb) returns text as $$
+            select string_agg(concat_ws(E'\\n', detail ->> 'label', detail ->> 'value'), E'\\n')
+            from jsonb_array_elements(case when jsonb_typeof(details) = 'array' then details else '[]'::jsonb end) detail
+        $$ language sql immutable;
+    """)
+    op.execute("""
+        create or replace function set_invoice_details_text() returns trigger as $$
+        begin
+            new.details_text = invoice_details_text(new.details);
+            return new;
+        end;
+        $$ language plpgsql;
+    """)
+    op.execute("""
+        create trigger invoices_details_text
+        before insert or update of details on invoices
+        for each row execute procedure set_invoice_details_text();
+    """)
+
+    # Commit per batch and build the indexes concurrently, so the invoices aren't locked for the whole migration.
+    with op.get_context().autocommit_block():
+        min_id, max_id = op.get_bind().execute(sa.text('select min(id), max(id) from invoices')).one()
+        for start_id in range(min_id or 0, (max_id or 0) + 1, BACKFILL_BATCH_SIZE):
+            op.execute(
+                'update invoices set details_text = invoice_details_text(details) '
+                f'where id >= {start_id} and id < {start_id + BACKFILL_BATCH_SIZE} and details is not null'
+            )
+
+        for index_name, table_name, expression in TRIGRAM_INDEXES:
+            op.create_index(
+                index_name,
+                table_name,
+                [sa.text(f'{expression} gin_trgm_ops')],
+                postgresql_using='gin',
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for index_name, table_name, column_name in PREFIX_INDEXES:
+            op.create_index(
+                index_name,
+                table_name,
+                [sa.text(f'upper({column_name}) text_pattern_ops')],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for index_name, table_name, _ in PREFIX_INDEXES + TRIGRAM_INDEXES:
+            op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+    op.execute('drop trigger if exists invoices_details_text on invoices')
+    op.execute('drop function if exists set_invoice_details_text()')
+    op.execute('drop function if exists invoice_details_text(jsonb)')
+    op.drop_column('invoices', 'details_text')
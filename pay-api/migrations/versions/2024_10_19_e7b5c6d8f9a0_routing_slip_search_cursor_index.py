@@ -0,0 +1,30 @@
+"""Index routing slips on (created_on, id) for the routing slip search ordering and cursor.
+
+Revision ID: e7b5c6d8f9a0
+Revises: d6a4f5b7c8e9
+Create Date: 2024-10-19 10:12:44.118305
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+# Note you may see foreign keys with distribution_codes_history
+# For disbursement_distribution_code_id, service_fee_distribution_code_id
+# Please ignore those lines and don't include in migration.
+
+revision = 'e7b5c6d8f9a0'
+down_revision = 'd6a4f5b7c8e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The search orders and seeks on (created_on, id), the index still serves created_on date range filters.
+    op.create_index('ix_routing_slips_created_on_id', 'routing_slips', ['created_on', 'id'], unique=False)
+    op.drop_index('ix_routing_slips_created_on', table_name='routing_slips')
+
+
+def downgrade():
+    op.create_index('ix_routing_slips_created_on', 'routing_slips', ['created_on'], unique=False)
+    op.drop_index('ix_routing_slips_created_on_id', table_name='routing_slips')
@@ -0,0 +1,48 @@
+"""Report jobs, rendered reports for async downloads and the report cache.
+
+Revision ID: f8c6d7e9a0b1
+Revises: e7b5c6d8f9a0
+Create Date: 2024-10-20 09:41:27.502611
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+# Note you may see foreign keys with distribution_codes_history
+# For disbursement_distribution_code_id, service_fee_distribution_code_id
+# Please ignore those lines and don't include in migration.
+
+revision = 'f8c6d7e9a0b1'
+down_revision = 'e7b5c6d8f9a0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'report_jobs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('auth_account_id', sa.String(length=50), nullable=True),
+        sa.Column('cache_key', sa.String(length=64), nullable=True),
+        sa.Column('completed_on', sa.DateTime(), nullable=True),
+        sa.Column('content', sa.LargeBinary(), nullable=True),
+        sa.Column('content_type', sa.String(length=50), nullable=False),
+        sa.Column('created_by', sa.String(length=50), nullable=True),
+        sa.Column('created_on', sa.DateTime(), nullable=False),
+        sa.Column('error_message', sa.String(length=1000), nullable=True),
+        sa.Column('report_name', sa.String(length=200), nullable=True),
+        sa.Column('status_code', sa.String(length=20), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_report_jobs_auth_account_id', 'report_jobs', ['auth_account_id'], unique=False)
+    op.create_index('ix_report_jobs_cache_key', 'report_jobs', ['cache_key'], unique=False)
+    op.create_index('ix_report_jobs_created_on', 'report_jobs', ['created_on'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_report_jobs_created_on', table_name='report_jobs')
+    op.drop_index('ix_report_jobs_cache_key', table_name='report_jobs')
+    op.drop_index('ix_report_jobs_auth_account_id', table_name='report_jobs')
+    op.drop_table('report_jobs')
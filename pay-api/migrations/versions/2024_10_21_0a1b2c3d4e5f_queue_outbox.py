@@ -0,0 +1,37 @@
+"""Queue outbox, queue messages published after the transaction that created them commits.
+
+Revision ID: 0a1b2c3d4e5f
+Revises: f8c6d7e9a0b1
+Create Date: 2024-10-21 10:12:45.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+# Note you may see foreign keys with distribution_codes_history
+# For disbursement_distribution_code_id, service_fee_distribution_code_id
+# Please ignore those lines and don't include in migration.
+
+revision = '0a1b2c3d4e5f'
+down_revision = 'f8c6d7e9a0b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'queue_outbox',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('corp_type', sa.String(length=10), nullable=True),
+        sa.Column('created_on', sa.DateTime(), nullable=False),
+        sa.Column('message', sa.LargeBinary(), nullable=False),
+        sa.Column('ordering_key', sa.String(length=250), nullable=True),
+        sa.Column('topic', sa.String(length=250), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('queue_outbox')
@@ -0,0 +1,29 @@
+"""Index payment line items on (fee_distribution_id, invoice_id) for the revenue account updates.
+
+Revision ID: 1b2c3d4e5f6a
+Revises: 0a1b2c3d4e5f
+Create Date: 2024-10-22 11:03:18.640125
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+# Note you may see foreign keys with distribution_codes_history
+# For disbursement_distribution_code_id, service_fee_distribution_code_id
+# Please ignore those lines and don't include in migration.
+
+revision = '1b2c3d4e5f6a'
+down_revision = '0a1b2c3d4e5f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Changing a distribution code updates its invoices in chunks ordered by invoice id.
+    op.create_index('ix_payment_line_items_fee_distribution_id_invoice_id', 'payment_line_items',
+                    ['fee_distribution_id', 'invoice_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_payment_line_items_fee_distribution_id_invoice_id', table_name='payment_line_items')
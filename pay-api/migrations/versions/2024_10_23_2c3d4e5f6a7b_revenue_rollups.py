@@ -0,0 +1,48 @@
+"""Daily revenue rollups for the partner reconciliation reports.
+
+Revision ID: 2c3d4e5f6a7b
+Revises: 1b2c3d4e5f6a
+Create Date: 2024-10-23 09:41:02.315870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+# Note you may see foreign keys with distribution_codes_history
+# For disbursement_distribution_code_id, service_fee_distribution_code_id
+# Please ignore those lines and don't include in migration.
+
+revision = '2c3d4e5f6a7b'
+down_revision = '1b2c3d4e5f6a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'revenue_rollups',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('corp_type_code', sa.String(length=10), nullable=True),
+        sa.Column('date_type', sa.String(length=20), nullable=False),
+        sa.Column('disbursement_status_code', sa.String(length=20), nullable=True),
+        sa.Column('invoice_status_code', sa.String(length=20), nullable=False),
+        sa.Column('payment_method_code', sa.String(length=15), nullable=False),
+        sa.Column('report_date', sa.Date(), nullable=False),
+        sa.Column('service_fees', sa.Numeric(precision=19, scale=2), nullable=False),
+        sa.Column('total', sa.Numeric(precision=19, scale=2), nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False),
+        sa.Column('updated_on', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_revenue_rollups_corp_type_code_date_type_report_date', 'revenue_rollups',
+                    ['corp_type_code', 'date_type', 'report_date'], unique=False)
+    # The disbursed rollups and reports select invoices by a disbursement_date range.
+    op.create_index(op.f('ix_invoices_disbursement_date'), 'invoices', ['disbursement_date'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_invoices_disbursement_date'), table_name='invoices')
+    op.drop_index('ix_revenue_rollups_corp_type_code_date_type_report_date', table_name='revenue_rollups')
+    op.drop_table('revenue_rollups')
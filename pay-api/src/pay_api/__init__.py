@@ -30,6 +30,7 @@ from pay_api import config
 from pay_api.config import _Config
 from pay_api.models import db, ma
 from pay_api.resources import endpoints
+from pay_api.schemas import utils as schema_utils
 from pay_api.services.flags import flags
 from pay_api.services.gcp_queue import queue
 from pay_api.utils.auth import jwt
@@ -62,6 +63,8 @@ def create_app(run_mode=os.getenv("DEPLOYMENT_ENV", "production")):
             app.logger.info("Migrations were executed on prehook.")
     ma.init_app(app)
     endpoints.init_app(app)
+    # Load and check the request schemas before serving requests.
+    schema_utils.get_default_schema_store()
 
     # Configure Sentry
     if str(app.config.get("SENTRY_ENABLE")).lower() == "true":
@@ -132,7 +135,7 @@ def register_shellcontext(app):
 
 def build_cache(app):
     """Build cache."""
-    cache.init_app(app)
+    cache.init_app(app, config={"CACHE_TYPE": app.config.get("CACHE_TYPE", "simple")})
     with app.app_context():
         cache.clear()
         if not app.config.get("TESTING", False):
@@ -108,6 +108,14 @@ class _Config:  # pylint: disable=too-few-public-methods
     CFS_CLIENT_SECRET = _get_config("CFS_CLIENT_SECRET")
     PAYBC_PORTAL_URL = _get_config("PAYBC_PORTAL_URL")
     CONNECT_TIMEOUT = int(_get_config("CONNECT_TIMEOUT", default=10))
+    HTTP_READ_TIMEOUT = int(_get_config("HTTP_READ_TIMEOUT", default=CONNECT_TIMEOUT))
+    # Outbound HTTP connection pools, one per host.
+    HTTP_POOL_CONNECTIONS = int(_get_config("HTTP_POOL_CONNECTIONS", default=10))
+    HTTP_POOL_MAXSIZE = int(_get_config("HTTP_POOL_MAXSIZE", default=10))
+    HTTP_RETRY_TOTAL = int(_get_config("HTTP_RETRY_TOTAL", default=0))
+    HTTP_RETRY_BACKOFF_FACTOR = float(_get_config("HTTP_RETRY_BACKOFF_FACTOR", default=0.5))
+    # Client credentials tokens are refreshed this many seconds before they expire.
+    OAUTH_TOKEN_REFRESH_MARGIN_SECONDS = int(_get_config("OAUTH_TOKEN_REFRESH_MARGIN_SECONDS", default=60))
     GENERATE_RANDOM_INVOICE_NUMBER = _get_config("CFS_GENERATE_RANDOM_INVOICE_NUMBER", default="False")
     CFS_ACCOUNT_DESCRIPTION = _get_config("CFS_ACCOUNT_DESCRIPTION", default="BCR")
     CFS_INVOICE_PREFIX = os.getenv("CFS_INVOICE_PREFIX", "REG")
@@ -143,7 +151,14 @@ class _Config:  # pylint: disable=too-few-public-methods
     REPORT_API_VERSION = os.getenv("REPORT_API_VERSION", "")
 
     AUTH_API_ENDPOINT = f"{AUTH_API_URL + AUTH_API_VERSION}/"
+    # Authorization lookups against auth-api are cached per token for a short time, 0 disables the cache.
+    AUTH_CACHE_TTL_SECONDS = int(_get_config("AUTH_CACHE_TTL_SECONDS", default=30))
+    AUTH_CACHE_MAX_SIZE = int(_get_config("AUTH_CACHE_MAX_SIZE", default=1000))
     REPORT_API_BASE_URL = f"{REPORT_API_URL + REPORT_API_VERSION}/reports"
+    # Report jobs render in a background thread, so the request returns right away.
+    REPORT_JOBS_ASYNC = _get_config("REPORT_JOBS_ASYNC", default="True").lower() == "true"
+    # Report jobs still pending after this are marked as failed, the process rendering them has gone away.
+    REPORT_JOB_TIMEOUT_MINUTES = int(_get_config("REPORT_JOB_TIMEOUT_MINUTES", default=30))
     BCOL_API_ENDPOINT = f"{BCOL_API_URL + BCOL_API_VERSION}/"
 
     AUTH_WEB_URL = os.getenv("AUTH_WEB_URL", "")
@@ -172,6 +187,8 @@ class _Config:  # pylint: disable=too-few-public-methods
 
     # Default number of routing slips to be returned for routing slip search
     ROUTING_SLIP_DEFAULT_TOTAL = int(_get_config("ROUTING_SLIP_DEFAULT_TOTAL", default=50))
+    # Routing slip search totals are counted exactly up to this many rows, above it the planner estimate is returned.
+    ROUTING_SLIP_SEARCH_EXACT_COUNT_LIMIT = int(_get_config("ROUTING_SLIP_SEARCH_EXACT_COUNT_LIMIT", default=10000))
 
     PAD_CONFIRMATION_PERIOD_IN_DAYS = int(_get_config("PAD_CONFIRMATION_PERIOD_IN_DAYS", default=3))
 
@@ -196,6 +213,15 @@ class _Config:  # pylint: disable=too-few-public-methods
 
     ALLOW_LEGACY_ROUTING_SLIPS = os.getenv("ALLOW_LEGACY_ROUTING_SLIPS", "True").lower() == "true"
 
+    # How often (seconds) the in memory fee schedule index checks the database version stamp for changes
+    FEE_SCHEDULE_INDEX_CHECK_SECONDS = int(_get_config("FEE_SCHEDULE_INDEX_CHECK_SECONDS", default=30))
+    # Same for the code tables, which are also reloaded once the TTL elapses
+    CODE_REGISTRY_CHECK_SECONDS = int(_get_config("CODE_REGISTRY_CHECK_SECONDS", default=30))
+    CODE_REGISTRY_TTL_SECONDS = int(_get_config("CODE_REGISTRY_TTL_SECONDS", default=3600))
+    # Backend for the flask cache, eg. RedisCache with CACHE_REDIS_URL to share loaded code tables between workers
+    CACHE_TYPE = _get_config("CACHE_TYPE", default="simple")
+    CACHE_REDIS_URL = _get_config("CACHE_REDIS_URL", default=None)
+
     TESTING = False
     DEBUG = True
 
@@ -314,6 +340,13 @@ NrQw+2OdQACBJiEHsdZzAkBcsTk7frTH4yGx0VfHxXDPjfTj4wmD6gZIlcIr9lZg
     PAYBC_DIRECT_PAY_CLIENT_SECRET = "TEST"
 
     PAD_CONFIRMATION_PERIOD_IN_DAYS = 3
+    # Always check the fee schedule version stamp, tests change fee schedules within a transaction
+    FEE_SCHEDULE_INDEX_CHECK_SECONDS = 0
+    CODE_REGISTRY_CHECK_SECONDS = 0
+    # Tests mock different authorizations for the same token
+    AUTH_CACHE_TTL_SECONDS = 0
+    # Tests share one database connection, render report jobs in the request.
+    REPORT_JOBS_ASYNC = False
     # Secret key for encrypting bank account
     ACCOUNT_SECRET_KEY = "mysecretkeyforbank"
 
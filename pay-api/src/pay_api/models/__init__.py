@@ -18,6 +18,7 @@ from sqlalchemy import event  # noqa: I001
 from sqlalchemy.engine import Engine  # noqa: I001, I003, I004
 
 from .account_fee import AccountFee, AccountFeeSchema
+from .cache_version import CacheVersion
 from .cas_settlement import CasSettlement
 from .cfs_account import CfsAccount, CfsAccountSchema
 from .cfs_account_status_code import CfsAccountStatusCode, CfsAccountStatusCodeSchema
@@ -58,9 +59,12 @@ from .payment_line_item import PaymentLineItem, PaymentLineItemSchema
 from .payment_method import PaymentMethod, PaymentMethodSchema
 from .payment_status_code import PaymentStatusCode, PaymentStatusCodeSchema
 from .payment_transaction import PaymentTransaction, PaymentTransactionSchema
+from .queue_outbox import QueueOutbox
 from .receipt import Receipt, ReceiptSchema
 from .refund import Refund
 from .refunds_partial import RefundPartialLine, RefundsPartial
+from .report_job import ReportJob, ReportJobSchema
+from .revenue_rollup import RevenueRollup
 from .routing_slip import RoutingSlip, RoutingSlipSchema
 from .routing_slip_status_code import RoutingSlipStatusCode, RoutingSlipStatusCodeSchema
 from .statement import Statement, StatementDTO, StatementSchema
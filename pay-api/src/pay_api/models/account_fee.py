@@ -14,6 +14,8 @@
 """Model to handle all operations related to Fee related to accounts."""
 from __future__ import annotations
 
+from typing import Dict, List
+
 from marshmallow import fields, post_dump
 from sql_versioning import Versioned
 from sqlalchemy import Boolean, ForeignKey
@@ -92,6 +94,24 @@ class AccountFee(Audit, Versioned, BaseModel):
             )
         return account_fee
 
+    @classmethod
+    def find_by_auth_account_id_and_corp_types(
+        cls, account_id: str, corp_type_codes: List[str]
+    ) -> Dict[str, AccountFee]:
+        """Return account fees keyed by corp type code, for all the corp types in one query."""
+        account_fees: Dict[str, AccountFee] = {}
+        if account_id and corp_type_codes:
+            rows = (
+                db.session.query(CorpType.code, AccountFee)
+                .join(CorpType, CorpType.product == AccountFee.product)
+                .outerjoin(PaymentAccount, PaymentAccount.id == AccountFee.account_id)
+                .filter(CorpType.code.in_(set(corp_type_codes)))
+                .filter(PaymentAccount.auth_account_id == account_id)
+                .all()
+            )
+            account_fees = {corp_type_code: account_fee for corp_type_code, account_fee in rows}
+        return account_fees
+
 
 class AccountFeeSchema(BaseSchema):  # pylint: disable=too-many-ancestors
     """Main schema used to serialize the CFS Account."""
@@ -0,0 +1,47 @@
+# Copyright © 2024 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Model to handle the version stamps used to invalidate process local caches."""
+
+from .db import db
+
+
+class CacheVersion(db.Model):  # pylint: disable=too-few-public-methods
+    """This class manages the version stamps of cached master data.
+
+    The version is bumped from a sequence by database triggers whenever the underlying tables change,
+    this includes edits made through pay-admin or directly in the database. Sequences are not transactional,
+    so a rolled back change still results in a new stamp.
+    """
+
+    __tablename__ = "cache_versions"
+    # this mapper is used so that new and old versions of the service can be run simultaneously,
+    # making rolling upgrades easier
+    # This is used by SQLAlchemy to explicitly define which fields we're interested
+    # so it doesn't freak out and say it can't map the structure if other fields are present.
+    # This could occur from a failed deploy or during an upgrade.
+    # The other option is to tell SQLAlchemy to ignore differences, but that is ambiguous
+    # and can interfere with Alembic upgrades.
+    #
+    # NOTE: please keep mapper names in alpha-order, easier to track that way
+    #       Exception, id is always first, _fields first
+    __mapper_args__ = {"include_properties": ["name", "updated_on", "version"]}
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_on = db.Column(db.DateTime, nullable=True)
+
+    @classmethod
+    def find_version(cls, name: str) -> int:
+        """Return the current version stamp for the cache name."""
+        return db.session.query(cls.version).filter(cls.name == name).scalar()
@@ -13,10 +13,17 @@
 # limitations under the License.
 # pylint: disable=W0223
 """Custom Query class to extend BaseQuery class functionality."""
-from datetime import date, datetime
+import re
+from datetime import date, datetime, time, timedelta
 
 from flask_sqlalchemy.query import Query
-from sqlalchemy import and_, func
+from sqlalchemy import Date, and_, func, or_
+from sqlalchemy.exc import CompileError
+
+from pay_api.utils.util import get_utc_range_for_local_dates
+
+# Business identifiers and CFS invoice numbers, eg. CP0001234 or REG01234567.
+IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z]{1,4}\d{6,}$")
 
 
 class CustomQuery(Query):  # pylint: disable=too-many-ancestors
@@ -36,34 +43,75 @@ class CustomQuery(Query):  # pylint: disable=too-many-ancestors
             return self
 
         if isinstance(search_criteria, datetime):
-            return self.filter(func.DATE(model_attribute) == search_criteria.date())
+            return self.filter_conditional_date_range(search_criteria.date(), search_criteria.date(), model_attribute)
         if isinstance(search_criteria, date):
-            return self.filter(func.DATE(model_attribute) == search_criteria)
+            return self.filter_conditional_date_range(search_criteria, search_criteria, model_attribute)
         if is_like:
             # Ensure any updates for this kind of LIKE searches are using SQL Alchemy functions as it uses
             # bind variables to mitigate SQL Injection
-            return self.filter(func.lower(model_attribute).ilike(f"%{search_criteria}%"))
+            return self.filter_contains(search_criteria, model_attribute)
 
         return self.filter(model_attribute == search_criteria)
 
+    def filter_contains(self, search_criteria: str, *model_attributes):
+        """Add a case insensitive substring filter, matching any of the columns.
+
+        The searched columns have pg_trgm GIN indexes, which serve ILIKE '%x%' for criteria of 3 characters or more.
+        """
+        pattern = f"%{search_criteria}%"
+        return self.filter(or_(*(model_attribute.ilike(pattern) for model_attribute in model_attributes)))
+
+    def filter_identifier(self, search_criteria: str, model_attribute):
+        """Add a prefix filter when the criteria looks like a full identifier, a substring filter otherwise.
+
+        Prefix matches on upper(column) are served by a btree text_pattern_ops index.
+        """
+        if IDENTIFIER_PATTERN.match(search_criteria):
+            return self.filter(func.upper(model_attribute).like(f"{search_criteria.upper()}%"))
+        return self.filter_contains(search_criteria, model_attribute)
+
     def filter_conditional_date_range(self, start_date: date, end_date: date, model_attribute):
         """Add query filter for a date range if present."""
         # Dates in DB are stored as UTC, you may need to take into account timezones and adjust the input dates
-        # depending on the needs
+        # depending on the needs. The column is compared as is (not through DATE()), so an index on it can be used.
         query = self
-
-        if start_date and end_date:
-            return query.filter(
-                and_(
-                    func.DATE(model_attribute) >= start_date,
-                    func.DATE(model_attribute) <= end_date,
-                )
-            )
+        if _is_date_column(model_attribute):
+            if start_date:
+                query = query.filter(model_attribute >= start_date)
+            if end_date:
+                query = query.filter(model_attribute <= end_date)
+            return query
 
         if start_date:
-            query = query.filter(func.DATE(model_attribute) >= start_date)
+            query = query.filter(model_attribute >= datetime.combine(start_date, time.min))
 
         if end_date:
-            query = query.filter(func.DATE(model_attribute) <= end_date)
+            query = query.filter(model_attribute < datetime.combine(end_date + timedelta(days=1), time.min))
 
         return query
+
+    def filter_local_date_range(self, start_date: date, end_date: date, model_attribute):
+        """Add query filter for the local (LEGISLATIVE_TIMEZONE) days from start_date through end_date."""
+        if _is_date_column(model_attribute):
+            return self.filter(and_(model_attribute >= start_date, model_attribute <= end_date))
+        utc_start, utc_end = get_utc_range_for_local_dates(start_date, end_date)
+        return self.filter(and_(model_attribute >= utc_start, model_attribute < utc_end))
+
+    def estimated_count(self):
+        """Return the query planner row estimate instead of running count(), None if it can't be estimated.
+
+        Estimates rely on table statistics, use this where an approximate total is acceptable (e.g. large searches).
+        """
+        try:
+            sql = self.statement.compile(
+                dialect=self.session.get_bind().dialect, compile_kwargs={"literal_binds": True}
+            )
+        except CompileError:
+            return None
+        plan = self.session.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _is_date_column(model_attribute) -> bool:
+    """Return True for DATE columns, they are compared against dates instead of UTC timestamps."""
+    return isinstance(model_attribute.type, Date)
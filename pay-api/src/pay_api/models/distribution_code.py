@@ -15,6 +15,7 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from typing import Dict, List
 
 from marshmallow import fields
 from sql_versioning import Versioned
@@ -168,6 +169,18 @@ class DistributionCode(Audit, Versioned, BaseModel):
         distribution_code = query.one_or_none()
         return distribution_code
 
+    @classmethod
+    def find_active_for_accounts(cls, account_ids: List[int]) -> Dict[int, DistributionCode]:
+        """Return the active distribution for each of the accounts, keyed by account id."""
+        valid_date = datetime.now(tz=timezone.utc).date()
+        query = (
+            db.session.query(DistributionCode)
+            .filter(DistributionCode.account_id.in_(account_ids))
+            .filter(DistributionCode.start_date <= valid_date)
+            .filter((DistributionCode.end_date.is_(None)) | (DistributionCode.end_date >= valid_date))
+        )
+        return {distribution_code.account_id: distribution_code for distribution_code in query.all()}
+
     @classmethod
     def find_by_active_for_account(cls, account_id: int):
         """Return active distribution for account."""
@@ -18,7 +18,7 @@ from operator import or_
 
 from sqlalchemy import Boolean, Date, ForeignKey, cast, func
 from sqlalchemy.ext.declarative import declared_attr
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import aliased, relationship
 
 from .corp_type import CorpType, CorpTypeSchema
 from .db import db, ma
@@ -159,6 +159,39 @@ class FeeSchedule(db.Model):
 
         return query.all()
 
+    @classmethod
+    def find_all_with_fee_amounts(cls):
+        """Return every fee schedule (including expired and future dated) with the fee code amounts resolved."""
+        fee = aliased(FeeCode)
+        priority_fee = aliased(FeeCode)
+        future_effective_fee = aliased(FeeCode)
+        service_fee = aliased(FeeCode)
+        return (
+            db.session.query(
+                FeeSchedule.fee_schedule_id,
+                FeeSchedule.corp_type_code,
+                FeeSchedule.filing_type_code,
+                FeeSchedule.fee_code,
+                FeeSchedule.fee_start_date,
+                FeeSchedule.fee_end_date,
+                FeeSchedule.priority_fee_code,
+                FeeSchedule.future_effective_fee_code,
+                FeeSchedule.service_fee_code,
+                FeeSchedule.variable,
+                FilingType.description.label("filing_type_description"),
+                fee.amount.label("fee_amount"),
+                priority_fee.amount.label("priority_fee_amount"),
+                future_effective_fee.amount.label("future_effective_fee_amount"),
+                service_fee.amount.label("service_fee_amount"),
+            )
+            .join(FilingType, FilingType.code == FeeSchedule.filing_type_code)
+            .join(fee, fee.code == FeeSchedule.fee_code)
+            .outerjoin(priority_fee, priority_fee.code == FeeSchedule.priority_fee_code)
+            .outerjoin(future_effective_fee, future_effective_fee.code == FeeSchedule.future_effective_fee_code)
+            .outerjoin(service_fee, service_fee.code == FeeSchedule.service_fee_code)
+            .all()
+        )
+
     def save(self):
         """Save fee schedule."""
         db.session.add(self)
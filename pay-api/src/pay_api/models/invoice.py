@@ -21,8 +21,9 @@ from typing import List, Optional
 import pytz
 from attrs import define
 from dateutil.relativedelta import relativedelta
+from flask import current_app
 from marshmallow import fields, post_dump
-from sqlalchemy import ForeignKey
+from sqlalchemy import FetchedValue, ForeignKey, case, select, update
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 
@@ -75,6 +76,7 @@ class Invoice(Audit):  # pylint: disable=too-many-instance-attributes
             "cfs_account_id",
             "dat_number",
             "details",
+            "details_text",
             "disbursement_reversal_date",
             "disbursement_status_code",
             "disbursement_date",
@@ -110,7 +112,7 @@ class Invoice(Audit):  # pylint: disable=too-many-instance-attributes
     payment_method_code = db.Column(db.String(15), ForeignKey("payment_methods.code"), nullable=False, index=True)
     corp_type_code = db.Column(db.String(10), ForeignKey("corp_types.code"), nullable=True)
     disbursement_status_code = db.Column(db.String(20), ForeignKey("disbursement_status_codes.code"), nullable=True)
-    disbursement_date = db.Column(db.DateTime, nullable=True)
+    disbursement_date = db.Column(db.DateTime, nullable=True, index=True)
     disbursement_reversal_date = db.Column(db.DateTime, nullable=True)
     created_on = db.Column(
         "created_on",
@@ -134,6 +136,8 @@ class Invoice(Audit):  # pylint: disable=too-many-instance-attributes
     bcol_account = db.Column(db.String(50), nullable=True, index=True)
     service_fees = db.Column(db.Numeric(19, 2), nullable=True)
     details = db.Column(JSONB)
+    # Labels and values of details as text for substring search, set by the invoices_details_text trigger.
+    details_text = db.Column(db.Text, nullable=True, server_default=FetchedValue(), server_onupdate=FetchedValue())
 
     payment_line_items = relationship("PaymentLineItem", lazy="joined")
     receipts = relationship("Receipt", lazy="joined")
@@ -147,25 +151,56 @@ class Invoice(Audit):  # pylint: disable=too-many-instance-attributes
             payment_account_id,
             invoice_status_code,
         ),
+        db.Index("ix_invoices_payment_account_id_created_on", payment_account_id, created_on),
     )
 
     @classmethod
-    def update_invoices_for_revenue_updates(cls, fee_distribution_id: int):
-        """Find and update all invoices using the distribution id."""
-        query = (
-            db.session.query(Invoice)
-            .join(PaymentLineItem, PaymentLineItem.invoice_id == Invoice.id)
-            .filter(PaymentLineItem.fee_distribution_id == fee_distribution_id)
-        )
+    def update_invoices_for_revenue_updates(cls, fee_distribution_id: int, chunk_size: int = 5000) -> int:
+        """Flag the paid and refunded invoices using the distribution for a revenue account update.
 
-        invoices: List[Invoice] = query.all()
-        for invoice in invoices:
-            if invoice.invoice_status_code == InvoiceStatus.PAID.value:
-                invoice.invoice_status_code = InvoiceStatus.UPDATE_REVENUE_ACCOUNT.value
-            if invoice.invoice_status_code == InvoiceStatus.REFUNDED.value:
-                invoice.invoice_status_code = InvoiceStatus.UPDATE_REVENUE_ACCOUNT_REFUND.value
-        db.session.bulk_save_objects(invoices)
-        cls.commit()
+        Runs as UPDATE invoices .. FROM payment_line_items over chunks of invoice ids, each chunk is committed so the
+        rows are only locked for the chunk. Returns the number of invoices updated.
+        """
+        updated = 0
+        last_invoice_id = 0
+        while True:
+            # Last invoice id of the chunk, None when the remaining line items fit in this chunk.
+            chunk_end = db.session.scalar(
+                select(PaymentLineItem.invoice_id)
+                .where(PaymentLineItem.fee_distribution_id == fee_distribution_id)
+                .where(PaymentLineItem.invoice_id > last_invoice_id)
+                .order_by(PaymentLineItem.invoice_id)
+                .offset(chunk_size - 1)
+                .limit(1)
+            )
+            query = (
+                update(Invoice)
+                .where(Invoice.id == PaymentLineItem.invoice_id)
+                .where(PaymentLineItem.fee_distribution_id == fee_distribution_id)
+                .where(Invoice.id > last_invoice_id)
+                .where(Invoice.invoice_status_code.in_([InvoiceStatus.PAID.value, InvoiceStatus.REFUNDED.value]))
+                .values(
+                    invoice_status_code=case(
+                        (
+                            Invoice.invoice_status_code == InvoiceStatus.PAID.value,
+                            InvoiceStatus.UPDATE_REVENUE_ACCOUNT.value,
+                        ),
+                        else_=InvoiceStatus.UPDATE_REVENUE_ACCOUNT_REFUND.value,
+                    )
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if chunk_end is not None:
+                query = query.where(Invoice.id <= chunk_end)
+            updated += db.session.execute(query).rowcount
+            cls.commit()
+            if chunk_end is None:
+                return updated
+            current_app.logger.info(
+                f"Revenue update for distribution {fee_distribution_id}: {updated} invoices updated, "
+                f"up to invoice {chunk_end}."
+            )
+            last_invoice_id = chunk_end
 
     @classmethod
     def find_by_business_identifier(cls, business_identifier: str):
@@ -250,7 +285,7 @@ class InvoiceSchema(AuditSchema, BaseSchema):  # pylint: disable=too-many-ancest
         """Returns all the fields from the SQLAlchemy class."""
 
         model = Invoice
-        exclude = ["corp_type"]
+        exclude = ["corp_type", "details_text"]
 
     invoice_status_code = fields.String(data_key="status_code")
     corp_type_code = fields.String(data_key="corp_type_code")
@@ -339,24 +374,12 @@ class InvoiceSearchModel:  # pylint: disable=too-few-public-methods, too-many-in
 
         https://www.attrs.org/en/stable/init.html
         """
-        # Similar to _clean_up in InvoiceSchema.
-        # In the future may need to add a mapping from EFT Status: APPROVED -> COMPLETED
-        status_code = (
-            PaymentStatus.COMPLETED.value
-            if row.invoice_status_code == InvoiceStatus.PAID.value
-            else row.invoice_status_code
-        )
-        business_identifier = (
-            None if row.business_identifier and row.business_identifier.startswith("T") else row.business_identifier
-        )
-
         line_items = [PaymentLineItemSearchModel.from_row(x) for x in row.payment_line_items]
-        invoice_number = row.references[0].invoice_number if len(row.references) > 0 else None
 
         return cls(
             id=row.id,
             bcol_account=row.bcol_account,
-            business_identifier=business_identifier,
+            business_identifier=cls._business_identifier(row),
             corp_type_code=row.corp_type.code,
             created_by=row.created_by,
             created_on=row.created_on,
@@ -364,7 +387,7 @@ class InvoiceSearchModel:  # pylint: disable=too-few-public-methods, too-many-in
             refund=row.refund,
             service_fees=row.service_fees,
             total=row.total,
-            status_code=status_code,
+            status_code=cls._status_code(row),
             filing_id=row.filing_id,
             folio_number=row.folio_number,
             payment_method=row.payment_method_code,
@@ -377,5 +400,65 @@ class InvoiceSearchModel:  # pylint: disable=too-few-public-methods, too-many-in
             refund_date=row.refund_date,
             disbursement_date=row.disbursement_date,
             disbursement_reversal_date=row.disbursement_reversal_date,
-            invoice_number=invoice_number,
+            invoice_number=cls._invoice_number(row),
         )
+
+    @classmethod
+    def dict_from_row(cls, row) -> dict:
+        """Return the same dict as unstructuring from_row(row) and removing the Nones.
+
+        The dict is built directly from the row without creating the models or running the converter, this is the
+        hot path for serializing large purchase history pages.
+        """
+        payment_account = PaymentAccountSearchModel.dict_from_row(row.payment_account)
+        invoice = {
+            "id": row.id,
+            "bcol_account": row.bcol_account,
+            "business_identifier": cls._business_identifier(row),
+            "corp_type_code": row.corp_type.code,
+            "created_by": row.created_by,
+            "created_on": _isoformat(row.created_on),
+            "paid": float(row.paid or 0),
+            "refund": float(row.refund or 0),
+            "service_fees": float(row.service_fees or 0),
+            "total": float(row.total or 0),
+            "status_code": cls._status_code(row),
+            "filing_id": row.filing_id,
+            "folio_number": row.folio_number,
+            "payment_method": row.payment_method_code,
+            "created_name": row.created_name,
+            "details": list(row.details) if row.details is not None else None,
+            "payment_account": {key: value for key, value in payment_account.items() if value is not None},
+            "line_items": [PaymentLineItemSearchModel.dict_from_row(x) for x in row.payment_line_items],
+            "product": row.corp_type.product,
+            "invoice_number": cls._invoice_number(row),
+            "payment_date": _isoformat(row.payment_date),
+            "refund_date": _isoformat(row.refund_date),
+            "disbursement_date": _isoformat(row.disbursement_date),
+            "disbursement_reversal_date": _isoformat(row.disbursement_reversal_date),
+        }
+        return {key: value for key, value in invoice.items() if value is not None}
+
+    @staticmethod
+    def _status_code(row) -> str:
+        # Similar to _clean_up in InvoiceSchema.
+        # In the future may need to add a mapping from EFT Status: APPROVED -> COMPLETED
+        if row.invoice_status_code == InvoiceStatus.PAID.value:
+            return PaymentStatus.COMPLETED.value
+        return row.invoice_status_code
+
+    @staticmethod
+    def _business_identifier(row) -> Optional[str]:
+        # Temporary business identifiers aren't returned.
+        if row.business_identifier and row.business_identifier.startswith("T"):
+            return None
+        return row.business_identifier
+
+    @staticmethod
+    def _invoice_number(row) -> Optional[str]:
+        return row.references[0].invoice_number if len(row.references) > 0 else None
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    """Serialize a datetime the same way the converter does."""
+    return value.isoformat() if value else None
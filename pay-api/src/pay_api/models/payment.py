@@ -12,17 +12,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Model to handle all operations related to Payment data."""
+from __future__ import annotations
 
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List
 
-import pytz
-from flask import current_app
 from marshmallow import fields
-from sqlalchemy import Boolean, ForeignKey, String, and_, cast, func, or_, select, text
+from sqlalchemy import Boolean, ForeignKey, String, and_, cast, func, or_, select
 from sqlalchemy.dialects.postgresql import ARRAY, TEXT
 from sqlalchemy.orm import contains_eager, lazyload, load_only, relationship
-from sqlalchemy.sql.expression import literal
 
 from pay_api.exceptions import BusinessException
 from pay_api.utils.constants import DT_SHORT_FORMAT
@@ -169,6 +167,27 @@ class Payment(BaseModel):  # pylint: disable=too-many-instance-attributes
 
         return query.one_or_none()
 
+    @classmethod
+    def find_payments_for_invoices(cls, invoice_ids: List[int]) -> Dict[int, Payment]:
+        """Find the payment records created for each of the invoices, keyed by invoice id."""
+        query = (
+            db.session.query(InvoiceReference.invoice_id, Payment)
+            .join(
+                InvoiceReference,
+                InvoiceReference.invoice_number == Payment.invoice_number,
+            )
+            .filter(InvoiceReference.invoice_id.in_(invoice_ids))
+            .filter(
+                InvoiceReference.status_code.in_(
+                    [
+                        InvoiceReferenceStatus.ACTIVE.value,
+                        InvoiceReferenceStatus.COMPLETED.value,
+                    ]
+                )
+            )
+        )
+        return dict(query.all())
+
     @classmethod
     def find_payments_for_routing_slip(cls, routing_slip: str):
         """Find payment records created for a routing slip."""
@@ -263,6 +282,72 @@ class Payment(BaseModel):  # pylint: disable=too-many-instance-attributes
         user: UserContext = kwargs["user"]
         search_filter["userProductCode"] = user.product_code
 
+        query = cls._purchase_history_query()
+        query = cls.filter(query, auth_account_id, search_filter)
+        if not return_all:
+            count = cls.get_count(auth_account_id, search_filter)
+            # Add pagination
+            sub_query = cls.generate_subquery(auth_account_id, search_filter, limit, page)
+            result = query.order_by(Invoice.id.desc()).filter(Invoice.id.in_(sub_query.subquery().select())).all()
+            # If maximum number of records is provided, return it as total
+            if max_no_records > 0:
+                count = max_no_records if max_no_records < count else count
+        elif max_no_records > 0:
+            # If maximum number of records is provided, set the page with that number
+            sub_query = cls.generate_subquery(auth_account_id, search_filter, max_no_records, page=None)
+            result, count = (
+                query.filter(Invoice.id.in_(sub_query.subquery().select())).all(),
+                sub_query.count(),
+            )
+        else:
+            count = cls.get_count(auth_account_id, search_filter)
+            if count > 60000:
+                raise BusinessException(Error.PAYMENT_SEARCH_TOO_MANY_RECORDS)
+            result = query.all()
+        return result, count
+
+    @classmethod
+    @user_context
+    def search_purchase_history_by_cursor(  # pylint:disable=too-many-arguments
+        cls,
+        auth_account_id: str,
+        search_filter: Dict,
+        limit: int,
+        after_id: int = None,
+        before_id: int = None,
+        count_mode: str = "none",
+        **kwargs,
+    ):
+        """Search for purchase history using keyset pagination on invoice id.
+
+        Pages seek on invoices.id instead of using OFFSET, so every page costs the same as the first one.
+        after_id returns the invoices older than the cursor, before_id the newer ones.
+        count_mode is one of none (skip the count), estimate (query planner estimate) or exact.
+        Returns the invoices (newest first), whether there are more rows past the page and the count.
+        """
+        user: UserContext = kwargs["user"]
+        search_filter["userProductCode"] = user.product_code
+
+        sub_query = cls.generate_subquery(
+            auth_account_id, search_filter, limit + 1, page=None, after_id=after_id, before_id=before_id
+        )
+        invoice_ids = [invoice_id for (invoice_id,) in sub_query.all()]
+        has_more = len(invoice_ids) > limit
+        invoice_ids = invoice_ids[:limit]
+
+        query = cls.filter(cls._purchase_history_query(), auth_account_id, search_filter)
+        result = query.filter(Invoice.id.in_(invoice_ids)).order_by(Invoice.id.desc()).all() if invoice_ids else []
+
+        count = None
+        if count_mode == "exact":
+            count = cls.get_count(auth_account_id, search_filter)
+        elif count_mode == "estimate":
+            count = cls.get_estimated_count(auth_account_id, search_filter)
+        return result, has_more, count
+
+    @classmethod
+    def _purchase_history_query(cls):
+        """Return the base purchase history query with the eager loads used for serialization."""
         # Exclude 'receipts' they aren't serialized, use specific fields that will be serialized.
         query = (
             db.session.query(Invoice)
@@ -319,28 +404,7 @@ class Payment(BaseModel):  # pylint: disable=too-many-instance-attributes
                 ),
             )
         )
-        query = cls.filter(query, auth_account_id, search_filter)
-        if not return_all:
-            count = cls.get_count(auth_account_id, search_filter)
-            # Add pagination
-            sub_query = cls.generate_subquery(auth_account_id, search_filter, limit, page)
-            result = query.order_by(Invoice.id.desc()).filter(Invoice.id.in_(sub_query.subquery().select())).all()
-            # If maximum number of records is provided, return it as total
-            if max_no_records > 0:
-                count = max_no_records if max_no_records < count else count
-        elif max_no_records > 0:
-            # If maximum number of records is provided, set the page with that number
-            sub_query = cls.generate_subquery(auth_account_id, search_filter, max_no_records, page=None)
-            result, count = (
-                query.filter(Invoice.id.in_(sub_query.subquery().select())).all(),
-                sub_query.count(),
-            )
-        else:
-            count = cls.get_count(auth_account_id, search_filter)
-            if count > 60000:
-                raise BusinessException(Error.PAYMENT_SEARCH_TOO_MANY_RECORDS)
-            result = query.all()
-        return result, count
+        return query
 
     @classmethod
     def get_invoices_and_payment_accounts_for_statements(cls, search_filter: Dict):
@@ -385,13 +449,20 @@ class Payment(BaseModel):  # pylint: disable=too-many-instance-attributes
         count = query.group_by(Invoice.id).with_entities(func.count()).count()  # pylint:disable=not-callable
         return count
 
+    @classmethod
+    def get_estimated_count(cls, auth_account_id: str, search_filter: Dict):
+        """Return the query planner estimate for the count, avoids grouping over the whole filtered set."""
+        query = db.session.query(Invoice.id).outerjoin(PaymentAccount, Invoice.payment_account_id == PaymentAccount.id)
+        query = cls.filter(query, auth_account_id, search_filter, add_outer_joins=True).distinct()
+        return query.estimated_count()
+
     @classmethod
     def filter(cls, query, auth_account_id: str, search_filter: Dict, add_outer_joins=False):
         """For filtering queries."""
         if auth_account_id:
             query = query.filter(PaymentAccount.auth_account_id == auth_account_id)
         if account_name := search_filter.get("accountName", None):
-            query = query.filter(PaymentAccount.name.ilike(f"%{account_name}%"))
+            query = query.filter_contains(account_name, PaymentAccount.name)
         if status_code := search_filter.get("statusCode", None):
             query = query.filter(Invoice.invoice_status_code == status_code)
         if search_filter.get("status", None):
@@ -400,12 +471,12 @@ class Payment(BaseModel):  # pylint: disable=too-many-instance-attributes
         if search_filter.get("folioNumber", None):
             query = query.filter(Invoice.folio_number == search_filter.get("folioNumber"))
         if business_identifier := search_filter.get("businessIdentifier", None):
-            query = query.filter(Invoice.business_identifier.ilike(f"%{business_identifier}%"))
+            query = query.filter_identifier(business_identifier, Invoice.business_identifier)
         if created_by := search_filter.get("createdBy", None):  # pylint: disable=no-member
             # depreciating (replacing with createdName)
-            query = query.filter(Invoice.created_name.ilike(f"%{created_by}%"))  # pylint: disable=no-member
+            query = query.filter_contains(created_by, Invoice.created_name)  # pylint: disable=no-member
         if created_name := search_filter.get("createdName", None):
-            query = query.filter(Invoice.created_name.ilike(f"%{created_name}%"))  # pylint: disable=no-member
+            query = query.filter_contains(created_name, Invoice.created_name)  # pylint: disable=no-member
         if invoice_id := search_filter.get("id", None):
             query = query.filter(cast(Invoice.id, String).like(f"%{invoice_id}%"))
 
@@ -413,7 +484,7 @@ class Payment(BaseModel):  # pylint: disable=too-many-instance-attributes
             # could have multiple invoice reference rows, but is handled in sub_query below (group by)
             if add_outer_joins:
                 query = query.outerjoin(InvoiceReference, InvoiceReference.invoice_id == Invoice.id)
-            query = query.filter(InvoiceReference.invoice_number.ilike(f"%{invoice_number}%"))
+            query = query.filter_identifier(invoice_number, InvoiceReference.invoice_number)
 
         query = cls.filter_corp_type(query, search_filter)
         query = cls.filter_payment(query, search_filter)
@@ -463,15 +534,7 @@ class Payment(BaseModel):  # pylint: disable=too-many-instance-attributes
             created_from, created_to = get_first_and_last_dates_of_month(month=month, year=year)
 
         if created_from and created_to:
-            # Truncate time for from date and add max time for to date
-            tz_name = current_app.config["LEGISLATIVE_TIMEZONE"]
-            tz_local = pytz.timezone(tz_name)
-
-            created_from = created_from.replace(hour=0, minute=0, second=0, microsecond=0).astimezone(tz_local)
-            created_to = created_to.replace(hour=23, minute=59, second=59, microsecond=999999).astimezone(tz_local)
-            query = query.filter(
-                func.timezone(tz_name, func.timezone("UTC", Invoice.created_on)).between(created_from, created_to)
-            )
+            query = query.filter_local_date_range(created_from, created_to, Invoice.created_on)
         return query
 
     @classmethod
@@ -480,41 +543,38 @@ class Payment(BaseModel):  # pylint: disable=too-many-instance-attributes
         if line_item := search_filter.get("lineItems", None):
             if is_count:
                 query = query.outerjoin(PaymentLineItem, PaymentLineItem.invoice_id == Invoice.id)
-            query = query.filter(PaymentLineItem.description.ilike(f"%{line_item}%"))
+            query = query.filter_contains(line_item, PaymentLineItem.description)
         if details := search_filter.get("details", None):
-            if is_count:
-                query = query.outerjoin(PaymentLineItem, PaymentLineItem.invoice_id == Invoice.id)
-            query = query.join(func.jsonb_array_elements(Invoice.details), literal(True))
-            query = query.filter(
-                or_(
-                    text("value ->> 'value' ilike :details"),
-                    text("value ->> 'label' ilike :details"),
-                )
-            ).params(details=f"%{details}%")
+            # details_text holds the labels and values of details, maintained by a trigger.
+            query = query.filter_contains(details, Invoice.details_text)
         if line_item_or_details := search_filter.get("lineItemsAndDetails", None):
             if is_count:
                 query = query.outerjoin(PaymentLineItem, PaymentLineItem.invoice_id == Invoice.id)
-            query = query.join(func.jsonb_array_elements(Invoice.details), literal(True))
-            query = query.filter(
-                or_(
-                    PaymentLineItem.description.ilike(f"%{line_item_or_details}%"),
-                    text("value ->> 'value' ilike :details"),
-                    text("value ->> 'label' ilike :details"),
-                )
-            ).params(details=f"%{line_item_or_details}%")
+            query = query.filter_contains(line_item_or_details, PaymentLineItem.description, Invoice.details_text)
 
         return query
 
     @classmethod
-    def generate_subquery(cls, auth_account_id, search_filter, limit, page):
-        """Generate subquery for invoices, used for pagination."""
+    def generate_subquery(  # pylint:disable=too-many-arguments
+        cls, auth_account_id, search_filter, limit, page, after_id: int = None, before_id: int = None
+    ):
+        """Generate subquery for invoices, used for pagination.
+
+        after_id and before_id seek past the cursor instead of using OFFSET.
+        """
         sub_query = db.session.query(Invoice).outerjoin(PaymentAccount, Invoice.payment_account_id == PaymentAccount.id)
         sub_query = (
             cls.filter(sub_query, auth_account_id, search_filter, add_outer_joins=True)
             .with_entities(Invoice.id)
             .group_by(Invoice.id)
-            .order_by(Invoice.id.desc())
         )
+        if before_id:
+            # Seek towards the newer invoices, the caller re-sorts the page newest first.
+            sub_query = sub_query.filter(Invoice.id > before_id).order_by(Invoice.id.asc())
+        elif after_id:
+            sub_query = sub_query.filter(Invoice.id < after_id).order_by(Invoice.id.desc())
+        else:
+            sub_query = sub_query.order_by(Invoice.id.desc())
         if limit:
             sub_query = sub_query.limit(limit)
         if limit and page:
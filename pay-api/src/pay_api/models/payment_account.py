@@ -136,3 +136,13 @@ class PaymentAccountSearchModel:  # pylint: disable=too-few-public-methods
             account_id=row.auth_account_id,
             branch_name=row.branch_name,
         )
+
+    @staticmethod
+    def dict_from_row(row: PaymentAccount) -> dict:
+        """Return the same dict as unstructuring from_row(row), without creating the model."""
+        return {
+            "account_name": row.name,
+            "billable": row.billable,
+            "account_id": row.auth_account_id,
+            "branch_name": row.branch_name,
+        }
@@ -81,6 +81,10 @@ class PaymentLineItem(BaseModel):  # pylint: disable=too-many-instance-attribute
 
     fee_schedule = relationship(FeeSchedule, foreign_keys=[fee_schedule_id], lazy="joined", innerjoin=True)
 
+    __table_args__ = (
+        db.Index("ix_payment_line_items_fee_distribution_id_invoice_id", fee_distribution_id, invoice_id),
+    )
+
     @classmethod
     def find_by_invoice_ids(cls, invoice_ids: list):
         """Return list of line items by list of invoice ids."""
@@ -139,3 +143,15 @@ class PaymentLineItemSearchModel:  # pylint: disable=too-few-public-methods
             description=row.description,
             filing_type_code=row.fee_schedule.filing_type_code,
         )
+
+    @staticmethod
+    def dict_from_row(row: PaymentLineItem) -> dict:
+        """Return the same dict as unstructuring from_row(row), without creating the model."""
+        return {
+            "total": float(row.total or 0),
+            "gst": float(row.gst or 0),
+            "pst": float(row.pst or 0),
+            "service_fees": float(row.service_fees or 0),
+            "description": row.description,
+            "filing_type_code": row.fee_schedule.filing_type_code,
+        }
@@ -0,0 +1,70 @@
+# Copyright © 2024 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Model to hold queue messages until they are published.
+
+Messages are added in the same transaction as the changes they describe, so a message is only published when the
+transaction commits and isn't lost if the process dies before publishing. The outbox is published and emptied by
+gcp_queue_publisher.publish_outbox.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import List
+
+from .base_model import BaseModel
+from .db import db
+
+
+class QueueOutbox(BaseModel):
+    """This class manages the queue messages waiting to be published."""
+
+    __tablename__ = "queue_outbox"
+    # this mapper is used so that new and old versions of the service can be run simultaneously,
+    # making rolling upgrades easier
+    # This is used by SQLAlchemy to explicitly define which fields we're interested
+    # so it doesn't freak out and say it can't map the structure if other fields are present.
+    # This could occur from a failed deploy or during an upgrade.
+    # The other option is to tell SQLAlchemy to ignore differences, but that is ambiguous
+    # and can interfere with Alembic upgrades.
+    #
+    # NOTE: please keep mapper names in alpha-order, easier to track that way
+    #       Exception, id is always first, _fields first
+    __mapper_args__ = {
+        "include_properties": [
+            "id",
+            "corp_type",
+            "created_on",
+            "message",
+            "ordering_key",
+            "topic",
+        ]
+    }
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    corp_type = db.Column(db.String(10), nullable=True)
+    created_on = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(tz=timezone.utc))
+    # The cloud event, serialized the same way it's sent to the queue.
+    message = db.Column(db.LargeBinary, nullable=False)
+    ordering_key = db.Column(db.String(250), nullable=True)
+    topic = db.Column(db.String(250), nullable=False)
+
+    @classmethod
+    def find_next_batch(cls, batch_size: int) -> List[QueueOutbox]:
+        """Return the oldest messages, skipping the ones another publisher has locked."""
+        return cls.query.order_by(cls.id).with_for_update(skip_locked=True).limit(batch_size).all()
+
+    @classmethod
+    def delete_by_ids(cls, ids: List[int]):
+        """Delete the published messages."""
+        cls.query.filter(cls.id.in_(ids)).delete(synchronize_session=False)
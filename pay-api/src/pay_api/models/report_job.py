@@ -0,0 +1,133 @@
+# Copyright © 2024 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Model to track report jobs, a report rendered by report-api and the status of rendering it.
+
+Used for two things:
+
+1. Async report downloads - a job is submitted, polled for the status and the rendered report is downloaded.
+2. Report cache - reports for immutable inputs (closed statements, paid invoices) are kept by the hash of the
+   report-api request, so they're served without rendering them again.
+
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from marshmallow import fields
+from sqlalchemy.orm import deferred
+
+from pay_api.utils.enums import ReportJobStatus
+
+from .base_model import BaseModel
+from .base_schema import BaseSchema
+from .db import db
+
+
+class ReportJob(BaseModel):  # pylint: disable=too-many-instance-attributes
+    """This class manages the report jobs and the rendered reports."""
+
+    __tablename__ = "report_jobs"
+    # this mapper is used so that new and old versions of the service can be run simultaneously,
+    # making rolling upgrades easier
+    # This is used by SQLAlchemy to explicitly define which fields we're interested
+    # so it doesn't freak out and say it can't map the structure if other fields are present.
+    # This could occur from a failed deploy or during an upgrade.
+    # The other option is to tell SQLAlchemy to ignore differences, but that is ambiguous
+    # and can interfere with Alembic upgrades.
+    #
+    # NOTE: please keep mapper names in alpha-order, easier to track that way
+    #       Exception, id is always first, _fields first
+    __mapper_args__ = {
+        "include_properties": [
+            "id",
+            "auth_account_id",
+            "cache_key",
+            "completed_on",
+            "content",
+            "content_type",
+            "created_by",
+            "created_on",
+            "error_message",
+            "report_name",
+            "status_code",
+        ]
+    }
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    auth_account_id = db.Column(db.String(50), nullable=True, index=True)
+    # SHA-256 of the report-api request, only set for reports which can be served from the cache.
+    cache_key = db.Column(db.String(64), nullable=True, index=True)
+    completed_on = db.Column(db.DateTime, nullable=True)
+    # Loaded only when the report is downloaded.
+    content = deferred(db.Column(db.LargeBinary, nullable=True))
+    content_type = db.Column(db.String(50), nullable=False)
+    created_by = db.Column(db.String(50), nullable=True)
+    created_on = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=lambda: datetime.now(tz=timezone.utc),
+        index=True,
+    )
+    error_message = db.Column(db.String(1000), nullable=True)
+    report_name = db.Column(db.String(200), nullable=True)
+    status_code = db.Column(db.String(20), nullable=False, default=ReportJobStatus.PENDING.value)
+
+    @classmethod
+    def find_by_id_and_account(cls, job_id: int, auth_account_id: str) -> ReportJob:
+        """Return the report job for the account."""
+        return cls.query.filter_by(id=job_id, auth_account_id=auth_account_id).one_or_none()
+
+    @classmethod
+    def find_cached(cls, cache_key: str) -> ReportJob:
+        """Return the latest completed report for the cache key."""
+        return (
+            cls.query.filter_by(cache_key=cache_key, status_code=ReportJobStatus.COMPLETED.value)
+            .order_by(cls.id.desc())
+            .first()
+        )
+
+    @classmethod
+    def fail_pending_created_before(cls, created_before: datetime, job_id: int = None) -> int:
+        """Mark the pending report jobs created before the date as failed, returns the number of jobs.
+
+        Jobs render in the process that submitted them, a job still pending after the timeout lost its worker.
+        """
+        query = cls.query.filter(cls.status_code == ReportJobStatus.PENDING.value, cls.created_on < created_before)
+        if job_id is not None:
+            query = query.filter(cls.id == job_id)
+        return query.update(
+            {
+                cls.completed_on: datetime.now(tz=timezone.utc),
+                cls.error_message: "Report job timed out.",
+                cls.status_code: ReportJobStatus.FAILED.value,
+            },
+            synchronize_session=False,
+        )
+
+    @classmethod
+    def delete_created_before(cls, created_before: datetime) -> int:
+        """Delete the report jobs created before the date, returns the number of deleted jobs."""
+        return cls.query.filter(cls.created_on < created_before).delete(synchronize_session=False)
+
+
+class ReportJobSchema(BaseSchema):  # pylint: disable=too-many-ancestors
+    """Main schema used to serialize the report job."""
+
+    class Meta(BaseSchema.Meta):  # pylint: disable=too-few-public-methods
+        """Returns all the fields from the SQLAlchemy class."""
+
+        model = ReportJob
+        exclude = ["auth_account_id", "cache_key", "content"]
+
+    status_code = fields.String(data_key="status")
@@ -0,0 +1,132 @@
+# Copyright © 2024 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Model to hold the daily revenue totals of the invoices, used by the partner reconciliation reports.
+
+A row sums the invoices of a local (LEGISLATIVE_TIMEZONE) day for a corp type, payment method, invoice status and
+disbursement status. Rows are aggregated by the created date and by the disbursement date (date_type). The rollups
+are rebuilt for the recent days nightly, so reports read a few rows per partner instead of scanning the invoices.
+"""
+from datetime import date, datetime, timezone
+
+from flask import current_app
+from sqlalchemy import Date, cast, func, insert, literal, select
+
+from pay_api.utils.enums import RevenueRollupDateType
+from pay_api.utils.util import get_utc_range_for_local_dates
+
+from .base_model import BaseModel
+from .db import db
+from .invoice import Invoice
+
+
+class RevenueRollup(BaseModel):  # pylint: disable=too-many-instance-attributes
+    """This class manages the daily revenue totals."""
+
+    __tablename__ = "revenue_rollups"
+    # this mapper is used so that new and old versions of the service can be run simultaneously,
+    # making rolling upgrades easier
+    # This is used by SQLAlchemy to explicitly define which fields we're interested
+    # so it doesn't freak out and say it can't map the structure if other fields are present.
+    # This could occur from a failed deploy or during an upgrade.
+    # The other option is to tell SQLAlchemy to ignore differences, but that is ambiguous
+    # and can interfere with Alembic upgrades.
+    #
+    # NOTE: please keep mapper names in alpha-order, easier to track that way
+    #       Exception, id is always first, _fields first
+    __mapper_args__ = {
+        "include_properties": [
+            "id",
+            "corp_type_code",
+            "date_type",
+            "disbursement_status_code",
+            "invoice_status_code",
+            "payment_method_code",
+            "report_date",
+            "service_fees",
+            "total",
+            "transaction_count",
+            "updated_on",
+        ]
+    }
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    corp_type_code = db.Column(db.String(10), nullable=True)
+    date_type = db.Column(db.String(20), nullable=False)
+    disbursement_status_code = db.Column(db.String(20), nullable=True)
+    invoice_status_code = db.Column(db.String(20), nullable=False)
+    payment_method_code = db.Column(db.String(15), nullable=False)
+    report_date = db.Column(db.Date, nullable=False)
+    service_fees = db.Column(db.Numeric(19, 2), nullable=False)
+    total = db.Column(db.Numeric(19, 2), nullable=False)
+    transaction_count = db.Column(db.Integer, nullable=False)
+    updated_on = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_revenue_rollups_corp_type_code_date_type_report_date", corp_type_code, date_type, report_date),
+    )
+
+    @classmethod
+    def refresh(cls, start_date: date, end_date: date) -> int:
+        """Rebuild the rollups for the local days from start_date through end_date, returns the number of rows.
+
+        The invoices are selected by a UTC range on the date column, so its index is used. The caller commits.
+        """
+        cls.query.filter(cls.report_date >= start_date, cls.report_date <= end_date).delete(synchronize_session=False)
+        local_timezone = current_app.config["LEGISLATIVE_TIMEZONE"]
+        utc_start, utc_end = get_utc_range_for_local_dates(start_date, end_date, local_timezone)
+        updated_on = datetime.now(tz=timezone.utc)
+        rows = 0
+        for date_type, date_column in (
+            (RevenueRollupDateType.CREATED, Invoice.created_on),
+            (RevenueRollupDateType.DISBURSED, Invoice.disbursement_date),
+        ):
+            report_date = cast(func.timezone(local_timezone, func.timezone("UTC", date_column)), Date)
+            group_by = (
+                report_date,
+                Invoice.corp_type_code,
+                Invoice.payment_method_code,
+                Invoice.invoice_status_code,
+                Invoice.disbursement_status_code,
+            )
+            totals = (
+                select(
+                    literal(date_type.value),
+                    *group_by,
+                    func.count(),
+                    func.coalesce(func.sum(Invoice.total), 0),
+                    func.coalesce(func.sum(Invoice.service_fees), 0),
+                    literal(updated_on),
+                )
+                .where(date_column >= utc_start, date_column < utc_end)
+                .group_by(*group_by)
+            )
+            result = db.session.execute(
+                insert(cls).from_select(
+                    [
+                        cls.date_type,
+                        cls.report_date,
+                        cls.corp_type_code,
+                        cls.payment_method_code,
+                        cls.invoice_status_code,
+                        cls.disbursement_status_code,
+                        cls.transaction_count,
+                        cls.total,
+                        cls.service_fees,
+                        cls.updated_on,
+                    ],
+                    totals,
+                )
+            )
+            rows += result.rowcount
+        return rows
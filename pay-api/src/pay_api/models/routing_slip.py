@@ -14,15 +14,16 @@
 """Model to handle all operations related to Routing Slip."""
 from __future__ import annotations
 
-from datetime import datetime
+from collections import defaultdict
+from datetime import date, datetime
 from operator import and_
 from typing import Dict, List
 
-import pytz
 from flask import current_app
 from marshmallow import fields
-from sqlalchemy import ForeignKey, Numeric, cast, func
+from sqlalchemy import ForeignKey, Numeric, cast, func, select, tuple_
 from sqlalchemy.orm import contains_eager, lazyload, load_only, relationship
+from sqlalchemy.orm.attributes import set_committed_value
 
 from pay_api.utils.constants import DT_SHORT_FORMAT
 from pay_api.utils.enums import PaymentMethod, RoutingSlipStatus
@@ -84,7 +85,7 @@ class RoutingSlip(Audit):  # pylint: disable=too-many-instance-attributes
     )
     total = db.Column(db.Numeric(), nullable=True, default=0)
     remaining_amount = db.Column(db.Numeric(), nullable=True, default=0)
-    routing_slip_date = db.Column(db.Date, nullable=False)
+    routing_slip_date = db.Column(db.Date, nullable=False, index=True)
     parent_number = db.Column(db.String(), ForeignKey("routing_slips.number"), nullable=True)
     refund_amount = db.Column(db.Numeric(), nullable=True, default=0)
     total_usd = db.Column(db.Numeric(), nullable=True)  # Capture total usd payments if one of payments has USD payment
@@ -132,6 +133,8 @@ class RoutingSlip(Audit):  # pylint: disable=too-many-instance-attributes
 
     parent = relationship("RoutingSlip", remote_side=[number], lazy="select")
 
+    __table_args__ = (db.Index("ix_routing_slips_created_on_id", "created_on", "id"),)
+
     def generate_cas_receipt_number(self) -> str:
         """Return a unique identifier - receipt number for CAS."""
         receipt_number: str = self.number
@@ -162,51 +165,72 @@ class RoutingSlip(Audit):  # pylint: disable=too-many-instance-attributes
         return cls.query.filter_by(payment_account_id=payment_account_id).all()
 
     @classmethod
-    def search(  # pylint: disable=too-many-arguments, too-many-locals
+    def search(
         cls,
         search_filter: Dict,
         page: int,
         limit: int,
         return_all: bool,
     ) -> (List[RoutingSlip], int):
-        """Search for routing slips by the criteria provided."""
-        query = (
-            db.session.query(RoutingSlip)
-            .outerjoin(RoutingSlip.payments)
-            .outerjoin(RoutingSlip.payment_account)
-            .outerjoin(RoutingSlip.invoices)
-            .options(
-                # This lazy loads all the invoice relationships.
-                lazyload("*"),
-                # load_only only loads the desired columns.
-                load_only(
-                    RoutingSlip.created_name,
-                    RoutingSlip.status,
-                    RoutingSlip.number,
-                    RoutingSlip.routing_slip_date,
-                    RoutingSlip.remaining_amount,
-                    RoutingSlip.total,
-                ),
-                contains_eager(RoutingSlip.payments).load_only(
-                    Payment.cheque_receipt_number,
-                    Payment.receipt_number,
-                    Payment.payment_method_code,
-                    Payment.payment_status_code,
-                ),
-                contains_eager(RoutingSlip.payment_account).load_only(
-                    PaymentAccount.name, PaymentAccount.payment_method
-                ),
-                contains_eager(RoutingSlip.invoices).load_only(
-                    Invoice.routing_slip,
-                    Invoice.folio_number,
-                    Invoice.business_identifier,
-                    Invoice.corp_type_code,
-                ),
+        """Search for routing slips by the criteria provided, returns the page of routing slips and the total count."""
+        query = cls._filtered_query(search_filter)
+        if return_all:
+            routing_slips = cls._find_with_details(query.all())
+            return routing_slips, len(routing_slips)
+
+        page_rows = query.limit(limit).offset((page - 1) * limit).all()
+        return cls._find_with_details(page_rows), cls.get_count(search_filter)
+
+    @classmethod
+    def search_by_cursor(cls, search_filter: Dict, limit: int, after_id: int = None):
+        """Search for routing slips using keyset pagination on (created_on, id).
+
+        after_id returns the routing slips older than that routing slip, every page costs the same as the first one.
+        Returns the routing slips (newest first), whether there are more rows past the page and the total count.
+        """
+        query = cls._filtered_query(search_filter)
+        if after_id:
+            cursor = (
+                db.session.query(RoutingSlip.created_on, RoutingSlip.id)
+                .filter(RoutingSlip.id == after_id)
+                .one_or_none()
             )
-        )
+            if cursor is None:
+                return [], False, cls.get_count(search_filter)
+            query = query.filter(tuple_(RoutingSlip.created_on, RoutingSlip.id) < tuple_(cursor.created_on, cursor.id))
+        page_rows = query.limit(limit + 1).all()
+        has_more = len(page_rows) > limit
+        return cls._find_with_details(page_rows[:limit]), has_more, cls.get_count(search_filter)
+
+    @classmethod
+    def get_count(cls, search_filter: Dict) -> int:
+        """Return the total for the search, exact for small results and the planner estimate for large ones."""
+        query = cls._filtered_query(search_filter).order_by(None)
+        estimate = query.estimated_count()
+        if estimate is not None and estimate > current_app.config.get("ROUTING_SLIP_SEARCH_EXACT_COUNT_LIMIT", 10000):
+            return estimate
+        return query.count()
+
+    @classmethod
+    def _filtered_query(cls, search_filter: Dict):
+        """Return the distinct (id, created_on) of the matching routing slips, newest first.
+
+        Payments, payment accounts and invoices are only joined when a filter needs them.
+        """
+        query = db.session.query(RoutingSlip.id, RoutingSlip.created_on).select_from(RoutingSlip)
+        if search_filter.get("receiptNumber", None) or search_filter.get("chequeReceiptNumber", None):
+            query = query.outerjoin(RoutingSlip.payments)
+        if (
+            search_filter.get("receiptNumber", None)
+            or search_filter.get("chequeReceiptNumber", None)
+            or search_filter.get("accountName", None)
+        ):
+            query = query.outerjoin(RoutingSlip.payment_account)
+        if search_filter.get("businessIdentifier", None) or search_filter.get("folioNumber", None):
+            query = query.outerjoin(RoutingSlip.invoices)
 
         if rs_number := search_filter.get("routingSlipNumber", None):
-            query = query.filter(RoutingSlip.number.ilike("%" + rs_number + "%"))
+            query = query.filter_contains(rs_number, RoutingSlip.number)
 
         if status := search_filter.get("status", None):
             query = query.filter(RoutingSlip.status == status)
@@ -223,7 +247,7 @@ class RoutingSlip(Audit):  # pylint: disable=too-many-instance-attributes
         query = cls._add_date_filter(query, search_filter)
 
         if initiator := search_filter.get("initiator", None):
-            query = query.filter(RoutingSlip.created_name.ilike("%" + initiator + "%"))  # pylint: disable=no-member
+            query = query.filter_contains(initiator, RoutingSlip.created_name)  # pylint: disable=no-member
 
         if business_identifier := search_filter.get("businessIdentifier", None):
             query = query.filter(Invoice.business_identifier == business_identifier)
@@ -234,23 +258,103 @@ class RoutingSlip(Audit):  # pylint: disable=too-many-instance-attributes
 
         query = cls._add_entity_filter(query, search_filter)
 
-        # Add ordering
-        query = query.order_by(RoutingSlip.created_on.desc())
+        return query.distinct().order_by(RoutingSlip.created_on.desc(), RoutingSlip.id.desc())
 
-        if not return_all:
-            sub_query = (
-                query.with_entities(RoutingSlip.id)
-                .group_by(RoutingSlip.id)
-                .limit(limit)
-                .offset((page - 1) * limit)
-                .subquery()
+    @classmethod
+    def _find_with_details(cls, rows) -> List[RoutingSlip]:
+        """Load the routing slips for the (id, created_on) rows along with the fields needed for the search results.
+
+        Invoices are fetched in a second query for just these routing slips instead of being joined to the search.
+        """
+        if not rows:
+            return []
+        routing_slip_ids = [row.id for row in rows]
+        routing_slips_by_id = {
+            routing_slip.id: routing_slip
+            for routing_slip in (
+                db.session.query(RoutingSlip)
+                .outerjoin(RoutingSlip.payments)
+                .outerjoin(RoutingSlip.payment_account)
+                .options(
+                    # This lazy loads all the invoice relationships.
+                    lazyload("*"),
+                    # load_only only loads the desired columns.
+                    load_only(
+                        RoutingSlip.created_name,
+                        RoutingSlip.created_on,
+                        RoutingSlip.status,
+                        RoutingSlip.number,
+                        RoutingSlip.routing_slip_date,
+                        RoutingSlip.remaining_amount,
+                        RoutingSlip.total,
+                    ),
+                    contains_eager(RoutingSlip.payments).load_only(
+                        Payment.cheque_receipt_number,
+                        Payment.receipt_number,
+                        Payment.payment_method_code,
+                        Payment.payment_status_code,
+                    ),
+                    contains_eager(RoutingSlip.payment_account).load_only(
+                        PaymentAccount.name, PaymentAccount.payment_method
+                    ),
+                )
+                .filter(RoutingSlip.id.in_(routing_slip_ids))
+                .all()
             )
-            query = query.filter(RoutingSlip.id.in_(sub_query.select()))
+        }
+        routing_slips = [routing_slips_by_id[routing_slip_id] for routing_slip_id in routing_slip_ids]
 
-        result = query.all()
-        count = len(result)
+        invoices_by_number = defaultdict(list)
+        invoices = (
+            db.session.query(Invoice)
+            .options(
+                lazyload("*"),
+                load_only(
+                    Invoice.routing_slip,
+                    Invoice.folio_number,
+                    Invoice.business_identifier,
+                    Invoice.corp_type_code,
+                ),
+            )
+            .filter(Invoice.routing_slip.in_([routing_slip.number for routing_slip in routing_slips]))
+            .filter(Invoice.payment_method_code == PaymentMethod.INTERNAL.value)
+            .all()
+        )
+        for invoice in invoices:
+            invoices_by_number[invoice.routing_slip].append(invoice)
+        for routing_slip in routing_slips:
+            set_committed_value(routing_slip, "invoices", invoices_by_number[routing_slip.number])
+        return routing_slips
 
-        return result, count
+    @classmethod
+    def get_summary_by_payment_method(cls, start_date: date, end_date: date):
+        """Return the non void routing slips created on the local days from start_date through end_date.
+
+        One row per payment method with the number of routing slips, the number of receipts (payments) and the CAD and
+        USD totals, aggregated in the database.
+        """
+        receipt_count = (
+            select(func.count(Payment.id))  # pylint: disable=not-callable
+            .where(Payment.payment_account_id == RoutingSlip.payment_account_id)
+            .correlate(RoutingSlip)
+            .scalar_subquery()
+        )
+        query = (
+            db.session.query(
+                PaymentAccount.payment_method,
+                func.count(RoutingSlip.id).label("routing_slip_count"),  # pylint: disable=not-callable
+                func.coalesce(func.sum(receipt_count), 0).label("receipt_count"),
+                func.coalesce(func.sum(RoutingSlip.total), 0).label("total_cad"),
+                func.coalesce(func.sum(RoutingSlip.total_usd), 0).label("total_usd"),
+            )
+            .select_from(RoutingSlip)
+            .join(PaymentAccount, PaymentAccount.id == RoutingSlip.payment_account_id)
+            .filter(~RoutingSlip.status.in_([RoutingSlipStatus.VOID.value]))
+            .filter_local_date_range(start_date, end_date, RoutingSlip.created_on)
+            .group_by(PaymentAccount.payment_method)
+            .order_by(PaymentAccount.payment_method)
+        )
+        return query.all()
 
     @classmethod
     def _add_date_filter(cls, query, search_filter):
@@ -264,22 +368,12 @@ class RoutingSlip(Audit):  # pylint: disable=too-many-instance-attributes
             created_from = datetime.strptime(start_date, DT_SHORT_FORMAT)
         # if passed in details
         if created_to and created_from:
-            # Truncate time for from date and add max time for to date
-            tz_name = current_app.config["LEGISLATIVE_TIMEZONE"]
-            tz_local = pytz.timezone(tz_name)
-
-            created_from = created_from.replace(hour=0, minute=0, second=0, microsecond=0).astimezone(tz_local)
-            created_to = created_to.replace(hour=23, minute=59, second=59, microsecond=999999).astimezone(tz_local)
-
             # If the dateFilter/target is provided then filter on that column, else filter on routing_slip_date
             target_date = getattr(
                 RoutingSlip,
                 get_str_by_path(search_filter, "dateFilter/target") or "routing_slip_date",
             )
-
-            query = query.filter(
-                func.timezone(tz_name, func.timezone("UTC", target_date)).between(created_from, created_to)
-            )
+            query = query.filter_local_date_range(created_from, created_to, target_date)
         return query
 
     @classmethod
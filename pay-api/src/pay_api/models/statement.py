@@ -23,7 +23,7 @@ from marshmallow import fields
 from sqlalchemy import ForeignKey, Integer, cast
 
 from pay_api.utils.constants import LEGISLATIVE_TIMEZONE
-from pay_api.utils.converter import Converter
+from pay_api.utils.converter import Converter, get_converter
 
 from .base_model import BaseModel
 from .db import db, ma
@@ -147,6 +147,6 @@ class StatementDTO:  # pylint: disable=too-few-public-methods, too-many-instance
     def dao_to_dict(cls, statement_daos: List[Statement]) -> dict[StatementDTO]:
         """Convert from DAO to DTO dict."""
         statements_dto = [StatementDTO.from_row(statement) for statement in statement_daos]
-        statements_dict = Converter().unstructure(statements_dto)
-        statements_dict = [Converter().remove_nones(statement_dict) for statement_dict in statements_dict]
+        statements_dict = get_converter().unstructure(statements_dto)
+        statements_dict = [Converter.remove_nones(statement_dict) for statement_dict in statements_dict]
         return statements_dict
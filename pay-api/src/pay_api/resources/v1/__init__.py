@@ -18,6 +18,7 @@ from flask import Flask
 
 from ..ops import bp as ops_bp
 from .account import bp as account_bp
+from .account_report_jobs import bp as account_report_jobs_bp
 from .account_statements import bp as account_statements_bp
 from .account_statements_notifications import bp as account_notifications_bp
 from .account_statements_settings import bp as account_settings_bp
@@ -53,6 +54,7 @@ class V1Endpoint:  # pylint: disable=too-few-public-methods,
         self.app = app
         self.app.register_blueprint(account_bp)
         self.app.register_blueprint(account_notifications_bp)
+        self.app.register_blueprint(account_report_jobs_bp)
         self.app.register_blueprint(account_settings_bp)
         self.app.register_blueprint(account_statements_bp)
         self.app.register_blueprint(bank_accounts_bp)
@@ -12,10 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Resource for Payment account."""
-from datetime import datetime, timezone
 from http import HTTPStatus
 
-from flask import Blueprint, Response, abort, current_app, jsonify, request
+from flask import Blueprint, Response, abort, current_app, jsonify, request, stream_with_context
 from flask_cors import cross_origin
 
 from pay_api.exceptions import BusinessException, ServiceUnavailableException, error_to_response
@@ -28,6 +27,7 @@ from pay_api.utils.constants import EDIT_ROLE, VIEW_ROLE
 from pay_api.utils.endpoints_enums import EndpointEnum
 from pay_api.utils.enums import CfsAccountStatus, ContentType, Role
 from pay_api.utils.errors import Error
+from pay_api.utils.util import convert_to_bool
 
 bp = Blueprint("ACCOUNTS", __name__, url_prefix=f"{EndpointEnum.API_V1.value}/accounts")
 
@@ -275,10 +275,19 @@ def post_search_purchase_history(account_number: str):
     account_to_search = None if view_all else account_number
     page: int = int(request.args.get("page", "1"))
     limit: int = int(request.args.get("limit", "10"))
-    response, status = (
-        Payment.search_purchase_history(account_to_search, request_json, page, limit),
-        HTTPStatus.OK,
-    )
+    # Cursor pagination is opt in: afterId/beforeId seek from the cursors returned in the previous response.
+    after_id = request.args.get("afterId", None, type=int)
+    before_id = request.args.get("beforeId", None, type=int)
+    if after_id or before_id or convert_to_bool(request.args.get("cursor", "False")):
+        count_mode = request.args.get("count", "none")
+        if count_mode not in ("none", "estimate", "exact"):
+            return error_to_response(Error.INVALID_REQUEST, invalid_params="count")
+        response = Payment.search_purchase_history_by_cursor(
+            account_to_search, request_json, limit, after_id, before_id, count_mode
+        )
+    else:
+        response = Payment.search_purchase_history(account_to_search, request_json, page, limit)
+    status = HTTPStatus.OK
     current_app.logger.debug(">post_search_purchase_history")
     return jsonify(response), status
 
@@ -297,15 +306,22 @@ def post_account_purchase_report(account_number: str):
     if not valid_format:
         return error_to_response(Error.INVALID_REQUEST, invalid_params=schema_utils.serialize(errors))
 
-    report_name = f"bcregistry-transactions-{datetime.now(tz=timezone.utc).strftime('%m-%d-%Y')}"
-
-    if response_content_type == ContentType.PDF.value:
-        report_name = f"{report_name}.pdf"
-    else:
-        report_name = f"{report_name}.csv"
+    report_name = Payment.get_payment_report_name(response_content_type)
 
     # Check if user is authorized to perform this action
     check_auth(business_identifier=None, account_id=account_number, contains_role=EDIT_ROLE)
+
+    if response_content_type == ContentType.CSV.value and convert_to_bool(request.args.get("stream", "False")):
+        # Stream the CSV straight from the database, no record limit and constant memory.
+        response = Response(
+            stream_with_context(Payment.stream_payment_report_csv(account_number, request_json)),
+            200,
+            mimetype=response_content_type,
+        )
+        response.headers.set("Content-Disposition", "attachment", filename=report_name)
+        response.headers.set("Access-Control-Expose-Headers", "Content-Disposition")
+        return response
+
     try:
         report = Payment.create_payment_report(account_number, request_json, response_content_type, report_name)
         response = Response(report, 201)
@@ -0,0 +1,111 @@
+# Copyright © 2024 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Resource for rendering account reports in the background, submit a job, poll it and download the report."""
+
+from http import HTTPStatus
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_cors import cross_origin
+
+from pay_api.exceptions import BusinessException, error_to_response
+from pay_api.schemas import utils as schema_utils
+from pay_api.services import Payment as PaymentService
+from pay_api.services import ReportService
+from pay_api.services import Statement as StatementService
+from pay_api.services.auth import check_auth
+from pay_api.utils.auth import jwt as _jwt
+from pay_api.utils.constants import EDIT_ROLE
+from pay_api.utils.endpoints_enums import EndpointEnum
+from pay_api.utils.enums import ContentType, ReportJobType
+from pay_api.utils.errors import Error
+
+bp = Blueprint(
+    "ACCOUNT_REPORT_JOBS",
+    __name__,
+    url_prefix=f"{EndpointEnum.API_V1.value}/accounts/<string:account_id>/report-jobs",
+)
+
+
+@bp.route("", methods=["POST", "OPTIONS"])
+@cross_origin(origins="*", methods=["POST"])
+@_jwt.requires_auth
+def post_report_job(account_id: str):
+    """Submit a report job, the report is rendered in the background."""
+    current_app.logger.info("<post_report_job")
+    request_json = request.get_json()
+    valid_format, errors = schema_utils.validate(request_json, "report_job_request")
+    if not valid_format:
+        return error_to_response(Error.INVALID_REQUEST, invalid_params=schema_utils.serialize(errors))
+
+    # Check if user is authorized to perform this action
+    auth = check_auth(business_identifier=None, account_id=account_id, contains_role=EDIT_ROLE)
+
+    content_type = request_json.get("contentType", ContentType.PDF.value)
+    if request_json.get("reportType") == ReportJobType.STATEMENT.value:
+        statement_id = request_json.get("statementId")
+        if not statement_id:
+            return error_to_response(Error.INVALID_REQUEST, invalid_params="statementId")
+
+        def render():
+            return StatementService.get_statement_report(
+                statement_id=statement_id, content_type=content_type, auth=auth
+            )
+
+    else:
+        search_filter = request_json.get("searchFilter", {})
+        report_name = PaymentService.get_payment_report_name(content_type)
+
+        def render():
+            return (
+                PaymentService.create_payment_report(account_id, search_filter, content_type, report_name),
+                report_name,
+            )
+
+    response = ReportService.submit_report_job(account_id, content_type, render)
+    current_app.logger.info(">post_report_job")
+    return jsonify(response), HTTPStatus.ACCEPTED
+
+
+@bp.route("/<int:report_job_id>", methods=["GET", "OPTIONS"])
+@cross_origin(origins="*", methods=["GET"])
+@_jwt.requires_auth
+def get_report_job(account_id: str, report_job_id: int):
+    """Return the status of the report job."""
+    current_app.logger.info("<get_report_job")
+    check_auth(business_identifier=None, account_id=account_id, contains_role=EDIT_ROLE)
+    try:
+        response, status = ReportService.find_report_job(account_id, report_job_id), HTTPStatus.OK
+    except BusinessException as exception:
+        return exception.response()
+    current_app.logger.info(">get_report_job")
+    return jsonify(response), status
+
+
+@bp.route("/<int:report_job_id>/content", methods=["GET", "OPTIONS"])
+@cross_origin(origins="*", methods=["GET"])
+@_jwt.requires_auth
+def get_report_job_content(account_id: str, report_job_id: int):
+    """Download the report of a completed report job."""
+    current_app.logger.info("<get_report_job_content")
+    check_auth(business_identifier=None, account_id=account_id, contains_role=EDIT_ROLE)
+    try:
+        report_job = ReportService.get_report_job_content(account_id, report_job_id)
+    except BusinessException as exception:
+        return exception.response()
+    response = Response(report_job.content, 200)
+    response.headers.set("Content-Disposition", "attachment", filename=report_job.report_name)
+    response.headers.set("Content-Type", report_job.content_type)
+    response.headers.set("Access-Control-Expose-Headers", "Content-Disposition")
+    current_app.logger.info(">get_report_job_content")
+    return response
@@ -67,15 +67,19 @@ def post_search_routing_slips():
     if not valid_format:
         return error_to_response(Error.INVALID_REQUEST, invalid_params=schema_utils.serialize(errors))
 
-    # if no page param , return all results
-    return_all = not request_json.get("page", None)
-
-    page: int = int(request_json.get("page", "1"))
     limit: int = int(request_json.get("limit", "10"))
-    response, status = (
-        RoutingSlipService.search(request_json, page, limit, return_all=return_all),
-        HTTPStatus.OK,
-    )
+    # Cursor pagination is opt in: afterId seeks from the cursor returned in the previous response.
+    if (after_id := request_json.get("afterId", None)) or request_json.get("cursor", False):
+        response, status = RoutingSlipService.search_by_cursor(request_json, limit, after_id), HTTPStatus.OK
+    else:
+        # if no page param , return all results
+        return_all = not request_json.get("page", None)
+
+        page: int = int(request_json.get("page", "1"))
+        response, status = (
+            RoutingSlipService.search(request_json, page, limit, return_all=return_all),
+            HTTPStatus.OK,
+        )
     current_app.logger.debug(">post_search_routing_slips")
     return jsonify(response), status
 
@@ -102,6 +106,23 @@ def post_routing_slip_report(date: str):
     return response
 
 
+@bp.route("/reports/summary", methods=["GET", "OPTIONS"])
+@cross_origin(origins="*", methods=["GET"])
+@_jwt.has_one_of_roles([Role.FAS_REPORTS.value])
+def get_routing_slip_summary():
+    """Get the routing slip counts and totals per payment method for a date range."""
+    current_app.logger.info("<get_routing_slip_summary")
+    start_date = request.args.get("startDate", "")
+    end_date = request.args.get("endDate", start_date)
+    # Validate the date parameters to ensure they match the expected format (YYYY-MM-DD)
+    if not re.match(r"^\d{4}-\d{2}-\d{2}$", start_date) or not re.match(r"^\d{4}-\d{2}-\d{2}$", end_date):
+        return error_to_response(Error.INVALID_REQUEST, invalid_params=["startDate", "endDate"])
+
+    response, status = RoutingSlipService.get_summary(start_date, end_date), HTTPStatus.OK
+    current_app.logger.debug(">get_routing_slip_summary")
+    return jsonify(response), status
+
+
 @bp.route("/<string:routing_slip_number>", methods=["GET", "OPTIONS"])
 @cross_origin(origins="*", methods=["GET", "PATCH"])
 @_jwt.has_one_of_roles([Role.FAS_VIEW.value])
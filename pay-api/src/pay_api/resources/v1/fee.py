@@ -18,12 +18,14 @@ from http import HTTPStatus
 from flask import Blueprint, jsonify, request
 from flask_cors import cross_origin
 
-from pay_api.exceptions import BusinessException
+from pay_api.exceptions import BusinessException, error_to_response
+from pay_api.schemas import utils as schema_utils
 from pay_api.services import FeeSchedule
 from pay_api.utils.auth import jwt as _jwt
 from pay_api.utils.constants import DEFAULT_JURISDICTION, DT_SHORT_FORMAT
 from pay_api.utils.endpoints_enums import EndpointEnum
 from pay_api.utils.enums import Role
+from pay_api.utils.errors import Error
 from pay_api.utils.util import convert_to_bool
 
 bp = Blueprint("FEES", __name__, url_prefix=f"{EndpointEnum.API_V1.value}/fees")
@@ -60,3 +62,34 @@ def get_fee_by_corp_and_filing_type(corp_type, filing_type_code):
     except BusinessException as exception:
         return exception.response()
     return jsonify(response), status
+
+
+@bp.route("/quote", methods=["POST", "OPTIONS"])
+@cross_origin(origins="*", methods=["POST"])
+@_jwt.has_one_of_roles([Role.VIEWER.value, Role.EDITOR.value, Role.STAFF.value])
+def post_fee_quote():
+    """Calculate the fees for a cart of filings and return per item and cart totals."""
+    request_json = request.get_json()
+    valid_format, errors = schema_utils.validate(request_json, "fee_quote_request")
+    if not valid_format:
+        return error_to_response(Error.INVALID_REQUEST, invalid_params=schema_utils.serialize(errors))
+
+    is_staff = _jwt.validate_roles([Role.STAFF.value])
+    fee_requests = [
+        {
+            "corp_type": item.get("corpType"),
+            "filing_type_code": item.get("filingTypeCode"),
+            "quantity": item.get("quantity", 1),
+            "is_priority": item.get("priority", False),
+            "is_future_effective": item.get("futureEffective", False),
+            "waive_fees": is_staff and item.get("waiveFees", False),
+        }
+        for item in request_json.get("items")
+    ]
+    valid_date = request_json.get("date") or datetime.now(tz=timezone.utc).strftime(DT_SHORT_FORMAT)
+
+    try:
+        response, status = FeeSchedule.quote(fee_requests, valid_date), HTTPStatus.OK
+    except BusinessException as exception:
+        return exception.response()
+    return jsonify(response), status
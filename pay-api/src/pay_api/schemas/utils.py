@@ -16,6 +16,8 @@
 Test helper functions to load and assert that a JSON payload validates against a defined schema.
 """
 import json
+import threading
+from functools import lru_cache
 from os import listdir, path
 from typing import Tuple
 
@@ -23,6 +25,8 @@ from jsonschema import Draft7Validator, RefResolver, SchemaError
 
 BASE_URI = "https://bcrs.gov.bc.ca/.well_known/schemas"
 
+_validators = threading.local()
+
 
 def get_schema(filename: str) -> dict:
     """Return the given schema file identified by filename."""
@@ -68,6 +72,31 @@ def get_schema_store(validate_schema: bool = False, schema_search_path: str = No
         raise error
 
 
+@lru_cache(maxsize=None)
+def get_default_schema_store() -> dict:
+    """Return the checked schema_store of this package, loaded once per process."""
+    return get_schema_store(validate_schema=True)
+
+
+def get_validator(schema_id: str) -> Draft7Validator:
+    """Return the validator for the schema of this package, compiled once per thread.
+
+    The resolver keeps a stack of the scopes while validating, so the validators aren't shared between threads.
+    """
+    validators = getattr(_validators, "by_schema_id", None)
+    if validators is None:
+        validators = _validators.by_schema_id = {}
+    if (validator := validators.get(schema_id)) is None:
+        schema_store = get_default_schema_store()
+        schema = schema_store.get(f"{BASE_URI}/{schema_id}")
+        schema_file_path = path.join(path.dirname(__file__), "schemas", schema_id)
+        resolver = RefResolver(f"file://{schema_file_path}.json", schema, schema_store)
+        validator = validators[schema_id] = Draft7Validator(
+            schema, format_checker=Draft7Validator.FORMAT_CHECKER, resolver=resolver
+        )
+    return validator
+
+
 def validate(
     json_data: json,
     schema_id: str,
@@ -75,22 +104,31 @@ def validate(
     validate_schema: bool = False,
     schema_search_path: str = None,
 ) -> Tuple[bool, iter]:
-    """Load the json file and validate against loaded schema."""
+    """Load the json file and validate against loaded schema.
+
+    The schemas of this package are validated with the cached validators, a schema_store or schema_search_path
+    loads the schemas for the call.
+    """
     try:
-        if not schema_search_path:
-            schema_search_path = path.join(path.dirname(__file__), "schemas")
+        if not (schema_store or validate_schema or schema_search_path):
+            draft_7_validator = get_validator(schema_id)
+        else:
+            if not schema_search_path:
+                schema_search_path = path.join(path.dirname(__file__), "schemas")
 
-        if not schema_store:
-            schema_store = get_schema_store(validate_schema, schema_search_path)
+            if not schema_store:
+                schema_store = get_schema_store(validate_schema, schema_search_path)
 
-        schema = schema_store.get(f"{BASE_URI}/{schema_id}")
-        if validate_schema:
-            Draft7Validator.check_schema(schema)
+            schema = schema_store.get(f"{BASE_URI}/{schema_id}")
+            if validate_schema:
+                Draft7Validator.check_schema(schema)
 
-        schema_file_path = path.join(schema_search_path, schema_id)
-        resolver = RefResolver(f"file://{schema_file_path}.json", schema, schema_store)
+            schema_file_path = path.join(schema_search_path, schema_id)
+            resolver = RefResolver(f"file://{schema_file_path}.json", schema, schema_store)
 
-        draft_7_validator = Draft7Validator(schema, format_checker=Draft7Validator.FORMAT_CHECKER, resolver=resolver)
+            draft_7_validator = Draft7Validator(
+                schema, format_checker=Draft7Validator.FORMAT_CHECKER, resolver=resolver
+            )
         if draft_7_validator.is_valid(json_data):
             return True, None
 
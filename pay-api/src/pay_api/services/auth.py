@@ -14,13 +14,18 @@
 
 """This manages all of the authorization service."""
 import base64
-from typing import List
+import copy
+import hashlib
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
 
+from cachetools import TTLCache
 from flask import abort, current_app, g
 
 from pay_api.services.code import Code as CodeService
 from pay_api.services.flags import flags
 from pay_api.services.oauth_service import OAuthService as RestService
+from pay_api.services.oauth_token_cache import oauth_token_cache
 from pay_api.utils.enums import AccountType, AuthHeaderType, Code, ContentType, PaymentMethod, Role
 from pay_api.utils.user_context import UserContext, user_context
 
@@ -31,6 +36,61 @@ PREMIUM_ACCOUNT_TYPES = (
 )
 
 
+class AuthorizationCache:
+    """Short lived, size bounded LRU cache of auth-api authorization responses.
+
+    Entries are keyed by a hash of the bearer token along with its subject and roles, so a response is only ever
+    served back to the token it was fetched with.
+    """
+
+    def __init__(self):
+        """Initialize the cache, it is sized from config on first use."""
+        self._lock = Lock()
+        self._cache: Optional[TTLCache] = None
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_fetch(self, resource: Tuple[str, Optional[str]], user: UserContext, fetch: Callable) -> Dict:
+        """Return a copy of the cached authorizations for the resource and product, calling fetch on a miss."""
+        ttl = current_app.config.get("AUTH_CACHE_TTL_SECONDS", 0)
+        if not ttl or not user.bearer_token:
+            return fetch() or {}
+        key = (
+            hashlib.sha256(user.bearer_token.encode("utf-8")).hexdigest(),
+            user.sub,
+            tuple(sorted(user.roles or [])),
+            *resource,
+        )
+        with self._lock:
+            if self._cache is None:
+                self._cache = TTLCache(maxsize=current_app.config.get("AUTH_CACHE_MAX_SIZE", 1000), ttl=ttl)
+            cached = self._cache.get(key)
+            if cached is not None:
+                self.hits += 1
+                return copy.deepcopy(cached)
+            self.misses += 1
+        response = fetch() or {}
+        with self._lock:
+            self._cache[key] = response
+        # check_auth adds stub data to the response, keep the cached copy untouched.
+        return copy.deepcopy(response)
+
+    def stats(self) -> Dict:
+        """Return the hit and miss counts."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._cache) if self._cache else 0}
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._cache = None
+            self.hits = 0
+            self.misses = 0
+
+
+authorization_cache = AuthorizationCache()
+
+
 @user_context
 def check_auth(
     business_identifier: str,
@@ -74,15 +134,16 @@ def check_auth(
             additional_headers = None
             if corp_type_code:
                 additional_headers = {"Product-Code": product_code}
-            auth_response = (
-                RestService.get(
+            auth_response = authorization_cache.get_or_fetch(
+                (f"orgs/{account_id}", product_code if corp_type_code else None),
+                user,
+                lambda: RestService.get(
                     auth_url,
                     bearer_token,
                     AuthHeaderType.BEARER,
                     ContentType.JSON,
                     additional_headers=additional_headers,
-                ).json()
-                or {}
+                ).json(),
             )
             roles: list = auth_response.get("roles", [])
             g.account_id = account_id
@@ -91,8 +152,10 @@ def check_auth(
                 current_app.config.get("AUTH_API_ENDPOINT")
                 + f"entities/{business_identifier}/authorizations?expanded=true"
             )
-            auth_response = (
-                RestService.get(auth_url, bearer_token, AuthHeaderType.BEARER, ContentType.JSON).json() or {}
+            auth_response = authorization_cache.get_or_fetch(
+                (f"entities/{business_identifier}", None),
+                user,
+                lambda: RestService.get(auth_url, bearer_token, AuthHeaderType.BEARER, ContentType.JSON).json(),
             )
 
             roles: list = auth_response.get("roles", [])
@@ -173,12 +236,15 @@ def get_service_account_token():
     auth_str = f"{service_account_id}:{service_account_secret}"
     basic_auth_encoded = base64.b64encode(auth_str.encode("utf-8")).decode("utf-8")
     data = "grant_type=client_credentials"
-    token_response = RestService.post(
-        token_url,
-        basic_auth_encoded,
-        AuthHeaderType.BASIC,
-        ContentType.FORM_URL_ENCODED,
-        data,
+    token_response = oauth_token_cache.get(
+        f"KEYCLOAK:{service_account_id}",
+        lambda: RestService.post(
+            token_url,
+            basic_auth_encoded,
+            AuthHeaderType.BASIC,
+            ContentType.FORM_URL_ENCODED,
+            data,
+        ),
     )
     bearer_token = token_response.json()["access_token"]
     return bearer_token
@@ -26,6 +26,7 @@ from pay_api.models import CfsAccount as CfsAccountModel
 from pay_api.models import DistributionCode as DistributionCodeModel
 from pay_api.models import PaymentLineItem as PaymentLineItemModel
 from pay_api.services.oauth_service import OAuthService
+from pay_api.services.oauth_token_cache import oauth_token_cache
 from pay_api.utils.constants import (
     CFS_ADJ_ACTIVITY_NAME,
     CFS_BATCH_SOURCE,
@@ -393,7 +394,7 @@ class CFSService(OAuthService):
 
     @staticmethod
     def get_token(payment_system=PaymentSystem.PAYBC):
-        """Generate oauth token from PayBC/FAS which will be used for all communication."""
+        """Return the oauth token from PayBC/FAS used for all communication, reused until shortly before it expires."""
         current_app.logger.debug("<Getting token")
         token_url = current_app.config.get("CFS_BASE_URL", None) + "/oauth/token"
         match payment_system:
@@ -407,12 +408,15 @@ class CFSService(OAuthService):
                 raise ValueError("Invalid Payment System")
         basic_auth_encoded = base64.b64encode(bytes(client_id + ":" + secret, "utf-8")).decode("utf-8")
         data = "grant_type=client_credentials"
-        token_response = OAuthService.post(
-            token_url,
-            basic_auth_encoded,
-            AuthHeaderType.BASIC,
-            ContentType.FORM_URL_ENCODED,
-            data,
+        token_response = oauth_token_cache.get(
+            f"{payment_system.value}:{client_id}",
+            lambda: OAuthService.post(
+                token_url,
+                basic_auth_encoded,
+                AuthHeaderType.BASIC,
+                ContentType.FORM_URL_ENCODED,
+                data,
+            ),
         )
         current_app.logger.debug(">Getting token")
         return token_response
@@ -0,0 +1,118 @@
+# Copyright © 2024 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Process local registry of the code tables, indexed by code.
+
+Code lists are read on hot paths (authorization, invoice serialization, reports), so every code type is held in memory
+as the serialized list along with a dict keyed by code. The registry is refreshed when the codes version stamp in
+cache_versions changes, database triggers bump it on any change to the code tables, or when the TTL elapses.
+Serialized lists are also written to the flask cache keyed by version, so with a shared cache backend (CACHE_TYPE)
+only the first worker to see a new version reads the tables.
+"""
+from __future__ import annotations
+
+import time
+from threading import Lock
+from typing import Dict, List, Optional
+
+from flask import current_app
+
+from pay_api.models import CacheVersion as CacheVersionModel
+from pay_api.models.corp_type import CorpType, CorpTypeSchema
+from pay_api.models.error_code import ErrorCode, ErrorCodeSchema
+from pay_api.models.fee_code import FeeCode, FeeCodeSchema
+from pay_api.models.invoice_status_code import InvoiceStatusCode, InvoiceStatusCodeSchema
+from pay_api.models.routing_slip_status_code import RoutingSlipStatusCode, RoutingSlipStatusCodeSchema
+from pay_api.utils.cache import cache
+from pay_api.utils.enums import Code as CodeValue
+
+CODES_CACHE_NAME = "codes"
+
+CODE_TABLES = {
+    CodeValue.ERROR.value: (ErrorCode, ErrorCodeSchema),
+    CodeValue.INVOICE_STATUS.value: (InvoiceStatusCode, InvoiceStatusCodeSchema),
+    CodeValue.CORP_TYPE.value: (CorpType, CorpTypeSchema),
+    CodeValue.FEE_CODE.value: (FeeCode, FeeCodeSchema),
+    CodeValue.ROUTING_SLIP_STATUS.value: (RoutingSlipStatusCode, RoutingSlipStatusCodeSchema),
+}
+
+
+class CodeRegistry:
+    """In memory code lists and code indexes per code type."""
+
+    def __init__(self):
+        """Initialize an empty registry, it is loaded on first use."""
+        self._lock = Lock()
+        self._codes: Dict[str, List[Dict]] = {}
+        self._indexes: Dict[str, Dict[str, Dict]] = {}
+        self._version: Optional[int] = None
+        self._loaded_at: float = 0
+        self._checked_at: float = 0
+
+    def find_all(self, code_type: str) -> Optional[List[Dict]]:
+        """Return the serialized codes for the code type, None for an unknown code type. The list is shared."""
+        self._ensure_current()
+        return self._codes.get(code_type)
+
+    def find(self, code_type: str, code: str) -> Dict:
+        """Return a copy of the serialized code, empty if it doesn't exist."""
+        self._ensure_current()
+        return dict(self._indexes.get(code_type, {}).get(code, {}))
+
+    def invalidate(self):
+        """Force a version check on the next lookup."""
+        self._checked_at = 0
+
+    def clear(self):
+        """Drop the registry, it gets reloaded on the next lookup."""
+        with self._lock:
+            self._version = None
+            self._loaded_at = 0
+            self._checked_at = 0
+            self._codes = {}
+            self._indexes = {}
+
+    def _ensure_current(self):
+        """Reload if the version stamp changed or the TTL elapsed, the stamp is only checked every few seconds."""
+        now = time.monotonic()
+        check_interval = current_app.config.get("CODE_REGISTRY_CHECK_SECONDS", 30)
+        expired = now - self._loaded_at >= current_app.config.get("CODE_REGISTRY_TTL_SECONDS", 3600)
+        if self._version is not None and not expired and now - self._checked_at < check_interval:
+            return
+        version = CacheVersionModel.find_version(CODES_CACHE_NAME)
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if self._version is not None and version == self._version and not expired:
+                return
+            current_app.logger.info(f"Loading code registry, version {self._version} -> {version}")
+            self._load(version, use_shared_cache=not expired)
+            self._version = version
+            self._loaded_at = self._checked_at
+
+    def _load(self, version: Optional[int], use_shared_cache: bool):
+        codes = {}
+        indexes = {}
+        for code_type, (model, schema) in CODE_TABLES.items():
+            cache_key = f"{code_type}:{version}"
+            code_list = cache.get(cache_key) if use_shared_cache and version is not None else None
+            if code_list is None:
+                code_list = schema().dump(model.find_all(), many=True)
+                cache.set(cache_key, code_list)
+            codes[code_type] = code_list
+            # Error codes are serialized with the code as "type".
+            indexes[code_type] = {cd.get("code", cd.get("type")): cd for cd in code_list}
+        self._codes = codes
+        self._indexes = indexes
+
+
+code_registry = CodeRegistry()
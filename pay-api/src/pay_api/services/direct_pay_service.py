@@ -34,7 +34,7 @@ from pay_api.services.hashing import HashingService
 from pay_api.services.invoice import Invoice
 from pay_api.services.invoice_reference import InvoiceReference
 from pay_api.services.payment_account import PaymentAccount
-from pay_api.utils.converter import Converter
+from pay_api.utils.converter import get_converter
 from pay_api.utils.enums import (
     AuthHeaderType,
     ContentType,
@@ -51,6 +51,7 @@ from ..exceptions import BusinessException
 from ..utils.errors import Error
 from ..utils.paybc_transaction_error_message import PAYBC_TRANSACTION_ERROR_MESSAGE_DICT
 from .oauth_service import OAuthService
+from .oauth_token_cache import oauth_token_cache
 from .payment_line_item import PaymentLineItem
 
 PAYBC_DATE_FORMAT = "%Y-%m-%d"
@@ -337,12 +338,15 @@ class DirectPayService(PaymentSystemService, OAuthService):
             )
         ).decode("utf-8")
         data = "grant_type=client_credentials"
-        token_response = self.post(
-            token_url,
-            basic_auth_encoded,
-            AuthHeaderType.BASIC,
-            ContentType.FORM_URL_ENCODED,
-            data,
+        token_response = oauth_token_cache.get(
+            f"DIRECT_PAY:{current_app.config.get('PAYBC_DIRECT_PAY_CLIENT_ID')}",
+            lambda: self.post(
+                token_url,
+                basic_auth_encoded,
+                AuthHeaderType.BASIC,
+                ContentType.FORM_URL_ENCODED,
+                data,
+            ),
         )
         current_app.logger.debug(">Getting token")
         return token_response
@@ -360,12 +364,15 @@ class DirectPayService(PaymentSystemService, OAuthService):
                 "utf-8",
             )
         ).decode("utf-8")
-        token_response = cls.get(
-            token_url,
-            basic_auth_encoded,
-            AuthHeaderType.BASIC,
-            ContentType.FORM_URL_ENCODED,
-            auth_header_name="Basic-Token",
+        token_response = oauth_token_cache.get(
+            f"DIRECT_PAY_REFUND:{current_app.config.get('PAYBC_DIRECT_PAY_CLIENT_ID')}",
+            lambda: cls.get(
+                token_url,
+                basic_auth_encoded,
+                AuthHeaderType.BASIC,
+                ContentType.FORM_URL_ENCODED,
+                auth_header_name="Basic-Token",
+            ),
         )
         current_app.logger.debug(">Getting token")
         return token_response
@@ -455,7 +462,7 @@ class DirectPayService(PaymentSystemService, OAuthService):
         )[0]
         payment_url: str = f"{paybc_svc_base_url}/paybc/payment/{paybc_ref_number}/{inv_reference.invoice_number}"
         payment_response = cls.get(payment_url, access_token, AuthHeaderType.BEARER, ContentType.JSON).json()
-        return Converter().structure(payment_response, OrderStatus)
+        return get_converter().structure(payment_response, OrderStatus)
 
     @classmethod
     def build_automated_refund_payload(cls, invoice: InvoiceModel, refund_partial: List[RefundPartialLine]):
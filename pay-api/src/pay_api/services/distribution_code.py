@@ -387,17 +387,18 @@ class DistributionCode:  # pylint: disable=too-many-instance-attributes, too-man
         )
         dist_code_svc.account_id = distribution_details.get("accountId", None)
 
+        # Reset stop jv for every dave.
+        dist_code_svc.stop_ejv = False
+        dist_code_dao = dist_code_svc.save()
+
         if _has_code_changes and dist_id is not None:
             # Update all invoices which used this distribution for updating revenue account details
             # If this is a service fee distribution, then find all distribution which uses this and update them.
+            # The update commits each chunk and only matches invoices which aren't flagged yet, so a rerun resumes.
             InvoiceModel.update_invoices_for_revenue_updates(dist_id)
             for dist in DistributionCodeModel.find_by_service_fee_distribution_id(dist_id):
                 InvoiceModel.update_invoices_for_revenue_updates(dist.distribution_code_id)
 
-        # Reset stop jv for every dave.
-        dist_code_svc.stop_ejv = False
-        dist_code_dao = dist_code_svc.save()
-
         distribution_code_schema = DistributionCodeSchema()
         current_app.logger.debug(">save_or_update")
         return distribution_code_schema.dump(dist_code_dao, many=False)
@@ -34,7 +34,7 @@ from pay_api.models import PaymentAccount as PaymentAccountModel
 from pay_api.models import Statement as StatementModel
 from pay_api.models import StatementInvoices as StatementInvoicesModel
 from pay_api.models import db
-from pay_api.utils.converter import Converter
+from pay_api.utils.converter import get_converter
 from pay_api.utils.enums import EFTPaymentActions, EFTShortnameStatus, InvoiceStatus, PaymentMethod
 from pay_api.utils.errors import Error
 from pay_api.utils.user_context import user_context
@@ -235,7 +235,7 @@ class EFTShortnames:  # pylint: disable=too-many-instance-attributes
         """Find EFT short name by short name id."""
         current_app.logger.debug("<find_by_short_name_id")
         short_name_model: EFTShortnameModel = cls.get_search_query(EFTShortnamesSearch(id=short_name_id)).first()
-        converter = Converter()
+        converter = get_converter()
         result = converter.unstructure(EFTShortnameSchema.from_row(short_name_model)) if short_name_model else None
 
         current_app.logger.debug(">find_by_short_name_id")
@@ -248,7 +248,7 @@ class EFTShortnames:  # pylint: disable=too-many-instance-attributes
         short_name_model: EFTShortnameModel = cls.get_search_query(
             EFTShortnamesSearch(account_id=auth_account_id)
         ).all()
-        converter = Converter()
+        converter = get_converter()
         result = converter.unstructure(EFTShortnameSchema.from_row(short_name_model))
 
         current_app.logger.debug(">find_by_auth_account_id")
@@ -272,7 +272,7 @@ class EFTShortnames:  # pylint: disable=too-many-instance-attributes
         """Find EFT shortname link by id."""
         current_app.logger.debug("<find_link_by_id")
         link_model: EFTShortnameLinksModel = EFTShortnameLinksModel.find_by_id(link_id)
-        converter = Converter()
+        converter = get_converter()
         result = converter.unstructure(EFTShortnameLinkSchema.from_row(link_model))
 
         current_app.logger.debug(">find_link_by_id")
@@ -183,66 +183,76 @@ class RoutingSlip:  # pylint: disable=too-many-instance-attributes, too-many-pub
             "total": total,
             "page": page,
             "limit": limit,
-            # We need these fields, to populate the UI.
-            "items": RoutingSlipSchema(
-                only=(
-                    "number",
-                    "payments.receipt_number",
-                    "payment_account.name",
-                    "created_name",
-                    "routing_slip_date",
-                    "status",
-                    "invoices.business_identifier",
-                    "payments.cheque_receipt_number",
-                    "remaining_amount",
-                    "total",
-                    "invoices.corp_type_code",
-                    "payments.payment_method_code",
-                    "payments.payment_status_code",
-                    "payment_account.payment_method",
-                )
-            ).dump(routing_slips, many=True),
+            "items": cls._dump_search_results(routing_slips),
         }
 
         return data
 
+    @classmethod
+    def search_by_cursor(cls, search_filter: Dict, limit: int, after_id: int = None):
+        """Search for routing slips using keyset (cursor) pagination.
+
+        The response carries an after_id cursor for the next page instead of a page number.
+        """
+        routing_slips, has_more, total = RoutingSlipModel.search_by_cursor(search_filter, limit, after_id)
+        return {
+            "total": total,
+            "limit": limit,
+            "after_id": routing_slips[-1].id if routing_slips and has_more else None,
+            "items": cls._dump_search_results(routing_slips),
+        }
+
+    @staticmethod
+    def _dump_search_results(routing_slips: List[RoutingSlipModel]) -> List[Dict]:
+        # We need these fields, to populate the UI.
+        return RoutingSlipSchema(
+            only=(
+                "number",
+                "payments.receipt_number",
+                "payment_account.name",
+                "created_name",
+                "routing_slip_date",
+                "status",
+                "invoices.business_identifier",
+                "payments.cheque_receipt_number",
+                "remaining_amount",
+                "total",
+                "invoices.corp_type_code",
+                "payments.payment_method_code",
+                "payments.payment_status_code",
+                "payment_account.payment_method",
+            )
+        ).dump(routing_slips, many=True)
+
+    @classmethod
+    def get_summary(cls, start_date: str, end_date: str) -> Dict[str, any]:
+        """Return the routing slip counts and totals per payment method for the days from start_date to end_date."""
+        rows = RoutingSlipModel.get_summary_by_payment_method(string_to_date(start_date), string_to_date(end_date))
+        payment_methods = [
+            {
+                "paymentMethod": row.payment_method,
+                "routingSlipCount": row.routing_slip_count,
+                "receiptCount": row.receipt_count,
+                "totalCad": float(row.total_cad),
+                "totalUsd": float(row.total_usd),
+            }
+            for row in rows
+        ]
+        return {
+            "startDate": start_date,
+            "endDate": end_date,
+            "total": float(sum(row.total_cad for row in rows)),
+            "paymentMethods": payment_methods,
+        }
+
     @classmethod
     @user_context
     def create_daily_reports(cls, date: str, **kwargs):
         """Create and return daily report for the day provided."""
-        routing_slips: List[RoutingSlipModel] = RoutingSlipModel.search(
-            {
-                "dateFilter": {
-                    "endDate": date,
-                    "startDate": date,
-                    "target": "created_on",
-                },
-                "excludeStatuses": [RoutingSlipStatus.VOID.value],
-            },
-            page=1,
-            limit=0,
-            return_all=True,
-        )[0]
-
-        total: float = 0
-        no_of_cash: int = 0
-        no_of_cheque: int = 0
-        total_cash_usd = 0
-        total_cheque_usd = 0
-        total_cash_cad = 0
-        total_cheque_cad = 0
-        for routing_slip in routing_slips:
-            total += float(routing_slip.total)
-            if routing_slip.payment_account.payment_method == PaymentMethod.CASH.value:
-                no_of_cash += 1
-                total_cash_cad += routing_slip.total
-                if routing_slip.total_usd is not None:
-                    total_cash_usd += routing_slip.total_usd
-            else:
-                no_of_cheque += len(routing_slip.payments)
-                total_cheque_cad += routing_slip.total
-                if routing_slip.total_usd is not None:
-                    total_cheque_usd += routing_slip.total_usd
+        summary = cls.get_summary(date, date)
+        cash = next((row for row in summary["paymentMethods"] if row["paymentMethod"] == PaymentMethod.CASH.value), {})
+        # Anything that isn't cash is reported as cheque, counting each cheque (payment) on the routing slip.
+        cheques = [row for row in summary["paymentMethods"] if row["paymentMethod"] != PaymentMethod.CASH.value]
 
         report_dict = {
             "templateName": "routing_slip_report",
@@ -250,13 +260,13 @@ class RoutingSlip:  # pylint: disable=too-many-instance-attributes, too-many-pub
             "templateVars": {
                 "day": date,
                 "reportDay": str(get_local_time(datetime.now(tz=timezone.utc))),
-                "total": float(total),
-                "numberOfCashReceipts": no_of_cash,
-                "numberOfChequeReceipts": no_of_cheque,
-                "totalCashInUsd": float(total_cash_usd),
-                "totalChequeInUsd": float(total_cheque_usd),
-                "totalCashInCad": float(total_cash_cad),
-                "totalChequeInCad": float(total_cheque_cad),
+                "total": summary["total"],
+                "numberOfCashReceipts": cash.get("routingSlipCount", 0),
+                "numberOfChequeReceipts": sum(row["receiptCount"] for row in cheques),
+                "totalCashInUsd": cash.get("totalUsd", 0.0),
+                "totalChequeInUsd": float(sum(row["totalUsd"] for row in cheques)),
+                "totalCashInCad": cash.get("totalCad", 0.0),
+                "totalChequeInCad": float(sum(row["totalCad"] for row in cheques)),
             },
         }
 
@@ -15,19 +15,21 @@
 
 from datetime import date
 from decimal import Decimal
+from typing import Dict, List
 
 from flask import current_app
 from sbc_common_components.tracing.service_tracing import ServiceTracing
 
 from pay_api.exceptions import BusinessException
 from pay_api.models import AccountFee as AccountFeeModel
-from pay_api.models import FeeCode as FeeCodeModel
 from pay_api.models import FeeSchedule as FeeScheduleModel
 from pay_api.models import FeeScheduleSchema
 from pay_api.utils.enums import Role
 from pay_api.utils.errors import Error
 from pay_api.utils.user_context import UserContext, user_context
 
+from .fee_schedule_index import FeeScheduleEntry, fee_schedule_index
+
 
 @ServiceTracing.trace(ServiceTracing.enable_tracing, ServiceTracing.should_be_tracing)
 class FeeSchedule:  # pylint: disable=too-many-public-methods, too-many-instance-attributes
@@ -72,6 +74,19 @@ class FeeSchedule:  # pylint: disable=too-many-public-methods, too-many-instance
         self._service_fee_code: str = self._dao.service_fee_code
         self._variable: bool = self._dao.variable
 
+    def _load_from_index_entry(self, entry: FeeScheduleEntry):
+        """Populate the fee schedule from the in memory index, without touching the database."""
+        self._fee_schedule_id = entry.fee_schedule_id
+        self._filing_type_code = entry.filing_type_code
+        self._corp_type_code = entry.corp_type_code
+        self._fee_code = entry.fee_code
+        self._fee_start_date = entry.fee_start_date
+        self._fee_end_date = entry.fee_end_date
+        self._fee_amount = entry.fee_amount
+        self._filing_type = entry.filing_type_description
+        self._service_fee_code = entry.service_fee_code
+        self._variable = entry.variable
+
     @property
     def fee_schedule_id(self):
         """Return the fee_schedule_id."""
@@ -286,38 +301,104 @@ class FeeSchedule:  # pylint: disable=too-many-public-methods, too-many-instance
         if not corp_type and not filing_type_code:
             raise BusinessException(Error.INVALID_CORP_OR_FILING_TYPE)
 
-        fee_schedule_dao = FeeScheduleModel.find_by_filing_type_and_corp_type(corp_type, filing_type_code, valid_date)
+        fee_schedule_entry = fee_schedule_index.find(corp_type, filing_type_code, valid_date)
 
-        if not fee_schedule_dao:
+        if not fee_schedule_entry:
             raise BusinessException(Error.INVALID_CORP_OR_FILING_TYPE)
 
-        fee_schedule = FeeSchedule()
-        fee_schedule._dao = fee_schedule_dao  # pylint: disable=protected-access
-        fee_schedule.quantity = kwargs.get("quantity")
-
         # Find fee overrides for account.
         account_fee = AccountFeeModel.find_by_auth_account_id_and_corp_type(user.account_id, corp_type)
 
+        fee_schedule = FeeSchedule._build_from_index_entry(fee_schedule_entry, account_fee, **kwargs)
+
+        current_app.logger.debug(">get_fees_by_corp_type_and_filing_type")
+        return fee_schedule
+
+    @classmethod
+    @user_context
+    def find_by_corp_types_and_filing_types(cls, fee_requests: List[Dict], valid_date: date = None, **kwargs):
+        """Calculate fees for a batch of filings.
+
+        Each fee request is a dict with corp_type and filing_type_code, plus the optional quantity, is_priority,
+        is_future_effective and waive_fees flags accepted by find_by_corp_type_and_filing_type.
+        Schedules and service fees come from the fee schedule index and account fee overrides are fetched in
+        a single query, so the number of queries doesn't grow with the number of filings.
+        """
+        current_app.logger.debug(f"<find_by_corp_types_and_filing_types : {len(fee_requests)} items, {valid_date}")
+        user: UserContext = kwargs["user"]
+
+        entries = []
+        for fee_request in fee_requests:
+            corp_type, filing_type_code = fee_request.get("corp_type"), fee_request.get("filing_type_code")
+            if not corp_type and not filing_type_code:
+                raise BusinessException(Error.INVALID_CORP_OR_FILING_TYPE)
+            fee_schedule_entry = fee_schedule_index.find(corp_type, filing_type_code, valid_date)
+            if not fee_schedule_entry:
+                raise BusinessException(Error.INVALID_CORP_OR_FILING_TYPE)
+            entries.append(fee_schedule_entry)
+
+        account_fees = AccountFeeModel.find_by_auth_account_id_and_corp_types(
+            user.account_id, [fee_request.get("corp_type") for fee_request in fee_requests]
+        )
+
+        fee_schedules = [
+            FeeSchedule._build_from_index_entry(
+                entry,
+                account_fees.get(fee_request.get("corp_type")),
+                quantity=fee_request.get("quantity"),
+                is_priority=fee_request.get("is_priority"),
+                is_future_effective=fee_request.get("is_future_effective"),
+                waive_fees=fee_request.get("waive_fees"),
+            )
+            for fee_request, entry in zip(fee_requests, entries)
+        ]
+        current_app.logger.debug(">find_by_corp_types_and_filing_types")
+        return fee_schedules
+
+    @classmethod
+    def quote(cls, fee_requests: List[Dict], valid_date: date = None) -> Dict:
+        """Return the fees for each filing in the cart along with the cart totals."""
+        fee_schedules = cls.find_by_corp_types_and_filing_types(fee_requests, valid_date)
+        items = []
+        for fee_request, fee_schedule in zip(fee_requests, fee_schedules):
+            item = fee_schedule.asdict()
+            item["corp_type_code"] = fee_request.get("corp_type")
+            item["quantity"] = fee_schedule.quantity or 1
+            items.append(item)
+        return {
+            "items": items,
+            "filing_fees": float(sum(fee.fee_amount for fee in fee_schedules)),
+            "priority_fees": float(sum(fee.priority_fee for fee in fee_schedules)),
+            "future_effective_fees": float(sum(fee.future_effective_fee for fee in fee_schedules)),
+            "service_fees": float(sum(fee.service_fees for fee in fee_schedules)),
+            "total": float(sum(fee.total for fee in fee_schedules)),
+        }
+
+    @staticmethod
+    def _build_from_index_entry(fee_schedule_entry: FeeScheduleEntry, account_fee: AccountFeeModel, **kwargs):
+        """Apply quantity, account fee overrides, service fees and the priority/future effective/waive flags."""
+        fee_schedule = FeeSchedule()
+        fee_schedule._load_from_index_entry(fee_schedule_entry)  # pylint: disable=protected-access
+        fee_schedule.quantity = kwargs.get("quantity")
+
         apply_filing_fees: bool = account_fee.apply_filing_fees if account_fee else True
         if not apply_filing_fees:
             fee_schedule.fee_amount = 0
             fee_schedule.waived_fee_amount = 0
 
         # Set transaction fees
-        fee_schedule.service_fees = FeeSchedule.calculate_service_fees(fee_schedule_dao, account_fee)
+        fee_schedule.service_fees = FeeSchedule.calculate_service_fees(fee_schedule_entry, account_fee)
 
-        if kwargs.get("is_priority") and fee_schedule_dao.priority_fee and apply_filing_fees:
-            fee_schedule.priority_fee = fee_schedule_dao.priority_fee.amount
-        if kwargs.get("is_future_effective") and fee_schedule_dao.future_effective_fee and apply_filing_fees:
-            fee_schedule.future_effective_fee = fee_schedule_dao.future_effective_fee.amount
+        if kwargs.get("is_priority") and fee_schedule_entry.priority_fee_code and apply_filing_fees:
+            fee_schedule.priority_fee = fee_schedule_entry.priority_fee_amount
+        if kwargs.get("is_future_effective") and fee_schedule_entry.future_effective_fee_code and apply_filing_fees:
+            fee_schedule.future_effective_fee = fee_schedule_entry.future_effective_fee_amount
 
         if kwargs.get("waive_fees"):
             fee_schedule.fee_amount = 0
             fee_schedule.priority_fee = 0
             fee_schedule.future_effective_fee = 0
             fee_schedule.service_fees = 0
-
-        current_app.logger.debug(">get_fees_by_corp_type_and_filing_type")
         return fee_schedule
 
     @staticmethod
@@ -337,7 +418,7 @@ class FeeSchedule:  # pylint: disable=too-many-public-methods, too-many-instance
 
     @staticmethod
     @user_context
-    def calculate_service_fees(fee_schedule_model: FeeScheduleModel, account_fee: AccountFeeModel, **kwargs):
+    def calculate_service_fees(fee_schedule_entry: FeeScheduleEntry, account_fee: AccountFeeModel, **kwargs):
         """Calculate service_fees fees."""
         current_app.logger.debug("<calculate_service_fees")
         user: UserContext = kwargs["user"]
@@ -347,11 +428,12 @@ class FeeSchedule:  # pylint: disable=too-many-public-methods, too-many-instance
         if (
             not user.is_staff()
             and not (user.is_system() and Role.EXCLUDE_SERVICE_FEES.value in user.roles)
-            and fee_schedule_model.fee.amount > 0
-            and fee_schedule_model.service_fee
+            and fee_schedule_entry.fee_amount > 0
+            and fee_schedule_entry.service_fee_code
         ):
-            service_fee = (account_fee.service_fee if account_fee else None) or fee_schedule_model.service_fee
-            if service_fee:
-                service_fees = FeeCodeModel.find_by_code(service_fee.code).amount
+            account_service_fee_code = account_fee.service_fee_code if account_fee else None
+            service_fee_code = account_service_fee_code or fee_schedule_entry.service_fee_code
+            if service_fee_code:
+                service_fees = fee_schedule_index.find_fee_code_amount(service_fee_code)
 
         return service_fees
@@ -0,0 +1,159 @@
+# Copyright © 2024 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Process local index of effective dated fee schedules.
+
+Fee schedules and fee codes change rarely but are read on every fee calculation, so the whole table is held in memory
+keyed by (corp_type, filing_type). The index is invalidated through the fee_schedules version stamp in cache_versions,
+which database triggers bump on any change to fee_schedules or fee_codes (including edits made through pay-admin).
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from dateutil import parser
+from flask import current_app
+
+from pay_api.exceptions import BusinessException
+from pay_api.models import CacheVersion as CacheVersionModel
+from pay_api.models import FeeCode as FeeCodeModel
+from pay_api.models import FeeSchedule as FeeScheduleModel
+from pay_api.utils.errors import Error
+
+FEE_SCHEDULES_CACHE_NAME = "fee_schedules"
+
+
+@dataclass(frozen=True)
+class FeeScheduleEntry:  # pylint: disable=too-many-instance-attributes
+    """Fee schedule with the fee code amounts resolved, valid between fee_start_date and fee_end_date."""
+
+    fee_schedule_id: int
+    corp_type_code: str
+    filing_type_code: str
+    filing_type_description: str
+    fee_code: str
+    fee_start_date: date
+    fee_end_date: Optional[date]
+    fee_amount: Decimal
+    priority_fee_code: Optional[str]
+    priority_fee_amount: Optional[Decimal]
+    future_effective_fee_code: Optional[str]
+    future_effective_fee_amount: Optional[Decimal]
+    service_fee_code: Optional[str]
+    service_fee_amount: Optional[Decimal]
+    variable: bool
+
+    def is_valid_on(self, valid_date: date) -> bool:
+        """Return True if the fee schedule is effective on the date."""
+        return self.fee_start_date <= valid_date and (self.fee_end_date is None or self.fee_end_date >= valid_date)
+
+
+class FeeScheduleIndex:
+    """In memory index of fee schedules and fee code amounts."""
+
+    def __init__(self):
+        """Initialize an empty index, it is loaded on first use."""
+        self._lock = Lock()
+        self._schedules: Dict[Tuple[str, str], List[FeeScheduleEntry]] = {}
+        self._fee_codes: Dict[str, Decimal] = {}
+        self._version: Optional[int] = None
+        self._checked_at: float = 0
+
+    def find(self, corp_type_code: str, filing_type_code: str, valid_date=None) -> Optional[FeeScheduleEntry]:
+        """Return the fee schedule effective on the valid_date (defaults to today), None if there isn't one."""
+        self._ensure_current()
+        valid_date = self._to_date(valid_date)
+        for entry in self._schedules.get((corp_type_code, filing_type_code), ()):
+            if entry.is_valid_on(valid_date):
+                return entry
+        return None
+
+    def find_fee_code_amount(self, fee_code: str) -> Optional[Decimal]:
+        """Return the amount for the fee code."""
+        self._ensure_current()
+        return self._fee_codes.get(fee_code)
+
+    def invalidate(self):
+        """Force a version check on the next lookup."""
+        self._checked_at = 0
+
+    def clear(self):
+        """Drop the index, it gets reloaded on the next lookup."""
+        with self._lock:
+            self._version = None
+            self._checked_at = 0
+            self._schedules = {}
+            self._fee_codes = {}
+
+    def _ensure_current(self):
+        """Reload the index if the version stamp changed, the stamp is only checked every few seconds."""
+        check_interval = current_app.config.get("FEE_SCHEDULE_INDEX_CHECK_SECONDS", 30)
+        if self._version is not None and time.monotonic() - self._checked_at < check_interval:
+            return
+        version = CacheVersionModel.find_version(FEE_SCHEDULES_CACHE_NAME)
+        with self._lock:
+            self._checked_at = time.monotonic()
+            if self._version is not None and version == self._version:
+                return
+            current_app.logger.info(f"Loading fee schedule index, version {self._version} -> {version}")
+            self._load()
+            self._version = version
+
+    def _load(self):
+        schedules: Dict[Tuple[str, str], List[FeeScheduleEntry]] = {}
+        for row in FeeScheduleModel.find_all_with_fee_amounts():
+            entry = FeeScheduleEntry(
+                fee_schedule_id=row.fee_schedule_id,
+                corp_type_code=row.corp_type_code,
+                filing_type_code=row.filing_type_code,
+                filing_type_description=row.filing_type_description,
+                fee_code=row.fee_code,
+                fee_start_date=row.fee_start_date,
+                fee_end_date=row.fee_end_date,
+                fee_amount=row.fee_amount,
+                priority_fee_code=row.priority_fee_code,
+                priority_fee_amount=row.priority_fee_amount,
+                future_effective_fee_code=row.future_effective_fee_code,
+                future_effective_fee_amount=row.future_effective_fee_amount,
+                service_fee_code=row.service_fee_code,
+                service_fee_amount=row.service_fee_amount,
+                variable=bool(row.variable),
+            )
+            schedules.setdefault((row.corp_type_code, row.filing_type_code), []).append(entry)
+        for entries in schedules.values():
+            entries.sort(key=lambda e: e.fee_start_date, reverse=True)
+        self._schedules = schedules
+        self._fee_codes = {fee_code.code: fee_code.amount for fee_code in FeeCodeModel.find_all()}
+
+    @staticmethod
+    def _to_date(valid_date) -> date:
+        if not valid_date:
+            return datetime.now(tz=timezone.utc).date()
+        if isinstance(valid_date, str):
+            try:
+                valid_date = parser.parse(valid_date)
+            except (ValueError, OverflowError) as e:
+                raise BusinessException(Error.INVALID_REQUEST) from e
+        if isinstance(valid_date, datetime):
+            if valid_date.tzinfo:
+                valid_date = valid_date.astimezone(timezone.utc)
+            return valid_date.date()
+        return valid_date
+
+
+fee_schedule_index = FeeScheduleIndex()
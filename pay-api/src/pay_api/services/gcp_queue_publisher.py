@@ -1,13 +1,17 @@
 """This module provides Queue type services."""
 
 import uuid
+from concurrent.futures import Future
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional
+from typing import List, Optional, Tuple
 
 from flask import current_app
+from google.cloud import pubsub_v1
 from simple_cloudevent import SimpleCloudEvent
 
+from pay_api.models import QueueOutbox as QueueOutboxModel
+from pay_api.models import db
 from pay_api.services.gcp_queue import GcpQueue, queue
 
 
@@ -23,13 +27,8 @@ class QueueMessage:
     corp_type: Optional[str] = None
 
 
-def publish_to_queue(queue_message: QueueMessage):
-    """Publish to GCP PubSub Queue using queue."""
-    if queue_message.topic is None:
-        current_app.logger.info("Skipping queue message topic not set.")
-        return
-
-    # Create a SimpleCloudEvent from the QueueMessage
+def _to_queue_message(queue_message: QueueMessage) -> bytes:
+    """Create a SimpleCloudEvent from the QueueMessage, serialized for the queue."""
     cloud_event = SimpleCloudEvent(
         id=str(uuid.uuid4()),
         source=f"sbc-pay-{queue_message.source}",
@@ -39,10 +38,137 @@ def publish_to_queue(queue_message: QueueMessage):
         type=queue_message.message_type,
         data=queue_message.payload,
     )
+    return GcpQueue.to_queue_message(cloud_event)
+
+
+def publish_to_queue(queue_message: QueueMessage, use_outbox: bool = False):
+    """Publish to GCP PubSub Queue using queue.
+
+    With use_outbox the message is added to the session instead, it's published by publish_outbox once the caller
+    commits. The message isn't sent for a rolled back transaction or lost if the process dies before publishing.
+    """
+    if queue_message.topic is None:
+        current_app.logger.info("Skipping queue message topic not set.")
+        return
+
+    if use_outbox:
+        db.session.add(
+            QueueOutboxModel(
+                corp_type=queue_message.corp_type,
+                message=_to_queue_message(queue_message),
+                ordering_key=queue_message.ordering_key,
+                topic=queue_message.topic,
+            )
+        )
+        return
 
     kwargs = {}
     if queue_message.ordering_key:
         kwargs.update({"ordering_key": queue_message.ordering_key})
     if queue_message.corp_type:
         kwargs.update({"corp_type": queue_message.corp_type})
-    queue.publish(queue_message.topic, GcpQueue.to_queue_message(cloud_event), **kwargs)
+    queue.publish(queue_message.topic, _to_queue_message(queue_message), **kwargs)
+
+
+class BatchPublisher:
+    """Publish without waiting on each message.
+
+    The pubsub client batches the messages per topic and ordering key, a batch is sent once it has max_messages or
+    has waited max_latency seconds. publish returns the future of the message id, wait blocks until every published
+    message is delivered. close waits and then stops the client, use it as a context manager to close it on exit.
+    """
+
+    def __init__(self, max_messages: int = 100, max_latency: float = 0.05):
+        """Initialize, the client is created on the first publish."""
+        self.max_messages = max_messages
+        self.max_latency = max_latency
+        self._client = None
+        self._pending: List[Tuple[str, Optional[str], Future]] = []
+
+    def __enter__(self):
+        """Return the publisher."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Wait for the published messages and stop the client."""
+        self.close()
+
+    @property
+    def client(self):
+        """Return the batching publisher client, using the same credentials as the queue."""
+        if not self._client:
+            self._client = pubsub_v1.PublisherClient(
+                credentials=queue.credentials_pub,
+                batch_settings=pubsub_v1.types.BatchSettings(
+                    max_messages=self.max_messages, max_latency=self.max_latency
+                ),
+                publisher_options=pubsub_v1.types.PublisherOptions(enable_message_ordering=True),
+            )
+        return self._client
+
+    def publish(self, queue_message: QueueMessage) -> Optional[Future]:
+        """Queue the message for publishing, returns the future of the message id."""
+        if queue_message.topic is None:
+            current_app.logger.info("Skipping queue message topic not set.")
+            return None
+        return self.publish_raw(
+            queue_message.topic, _to_queue_message(queue_message), queue_message.ordering_key, queue_message.corp_type
+        )
+
+    def publish_raw(
+        self, topic: str, message: bytes, ordering_key: Optional[str] = None, corp_type: Optional[str] = None
+    ) -> Future:
+        """Queue an already serialized message for publishing."""
+        future = self.client.publish(topic, message, ordering_key=ordering_key or "", corp_type=corp_type or "")
+        self._pending.append((topic, ordering_key, future))
+        return future
+
+    def wait(self) -> List[Future]:
+        """Wait until the published messages are delivered, returns the futures of the messages that failed."""
+        failed = []
+        for topic, ordering_key, future in self._pending:
+            try:
+                future.result()
+            except Exception as e:  # NOQA pylint: disable=broad-except
+                current_app.logger.error(f"Publishing to {topic} failed: {e}")
+                failed.append(future)
+                if ordering_key:
+                    # Publishing is paused for an ordering key after a failure, so later messages aren't out of order.
+                    self.client.resume_publish(topic, ordering_key)
+        self._pending = []
+        return failed
+
+    def close(self) -> List[Future]:
+        """Wait for the published messages and stop the client, returns the futures of the messages that failed."""
+        failed = self.wait()
+        if self._client:
+            # Stops the client's batching threads, a publish after close creates a new client.
+            self._client.stop()
+            self._client = None
+        return failed
+
+
+def publish_outbox(batch_size: int = 500) -> int:
+    """Publish the messages in the outbox, returns the number published.
+
+    Published messages are deleted. Messages that fail stay in the outbox for the next run.
+    """
+    published = 0
+    with BatchPublisher() as publisher:
+        while messages := QueueOutboxModel.find_next_batch(batch_size):
+            futures = [
+                (
+                    message.id,
+                    publisher.publish_raw(message.topic, message.message, message.ordering_key, message.corp_type),
+                )
+                for message in messages
+            ]
+            failed = set(publisher.wait())
+            published_ids = [message_id for message_id, future in futures if future not in failed]
+            QueueOutboxModel.delete_by_ids(published_ids)
+            db.session.commit()
+            published += len(published_ids)
+            if failed:
+                current_app.logger.error(f"{len(failed)} outbox messages failed to publish, retrying on the next run.")
+                break
+    return published
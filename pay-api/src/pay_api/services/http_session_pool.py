@@ -0,0 +1,123 @@
+# Copyright © 2024 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Keep-alive HTTP sessions shared by the outbound REST calls.
+
+One session is kept per host (and retry policy), so calls to auth-api, CFS, report-api, BCOL and notify reuse pooled
+connections instead of opening a new TCP and TLS connection per request. Latency and error counters are kept per host.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from http.cookiejar import DefaultCookiePolicy
+from threading import Lock
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+@dataclass
+class HostStats:
+    """Request counters for a single host."""
+
+    requests: int = 0
+    errors: int = 0
+    total_seconds: float = 0
+    max_seconds: float = 0
+
+
+class HttpSessionPool:
+    """Pooled requests sessions keyed by host."""
+
+    def __init__(self):
+        """Initialize without sessions, they are created on first use of a host."""
+        self._lock = Lock()
+        self._sessions: Dict[Tuple[str, bool], requests.Session] = {}
+        self._stats: Dict[str, HostStats] = {}
+
+    def session_for(self, endpoint: str, retry_on_failure: bool = False) -> requests.Session:
+        """Return the shared session for the endpoint's host."""
+        key = (self.host(endpoint), retry_on_failure)
+        if (session := self._sessions.get(key)) is not None:
+            return session
+        with self._lock:
+            if key not in self._sessions:
+                self._sessions[key] = self._create_session(retry_on_failure)
+            return self._sessions[key]
+
+    def record(self, endpoint: str, elapsed: float, error: bool = False):
+        """Add a request to the host's counters."""
+        host = self.host(endpoint)
+        with self._lock:
+            stats = self._stats.setdefault(host, HostStats())
+            stats.requests += 1
+            stats.errors += int(error)
+            stats.total_seconds += elapsed
+            stats.max_seconds = max(stats.max_seconds, elapsed)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Return the counters per host."""
+        with self._lock:
+            return {host: asdict(stats) for host, stats in self._stats.items()}
+
+    def close(self):
+        """Close all sessions and reset the counters."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions = {}
+            self._stats = {}
+
+    @staticmethod
+    def host(endpoint: str) -> str:
+        """Return scheme://host[:port] for the endpoint."""
+        parts = urlsplit(endpoint)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    @staticmethod
+    def timeout() -> Tuple[int, int]:
+        """Return the (connect, read) timeout for outbound requests."""
+        connect_timeout = current_app.config.get("CONNECT_TIMEOUT")
+        return connect_timeout, current_app.config.get("HTTP_READ_TIMEOUT", connect_timeout)
+
+    @staticmethod
+    def _create_session(retry_on_failure: bool) -> requests.Session:
+        config = current_app.config
+        if retry_on_failure:
+            retry = Retry(total=5, backoff_factor=1, status_forcelist=[404])
+        else:
+            # Connection failures are safe to retry for any method, read failures only for idempotent ones.
+            retry = Retry(
+                total=config.get("HTTP_RETRY_TOTAL", 0),
+                backoff_factor=config.get("HTTP_RETRY_BACKOFF_FACTOR", 0.5),
+                status=0,
+                raise_on_status=False,
+            )
+        adapter = HTTPAdapter(
+            pool_connections=config.get("HTTP_POOL_CONNECTIONS", 10),
+            pool_maxsize=config.get("HTTP_POOL_MAXSIZE", 10),
+            max_retries=retry,
+        )
+        session = requests.Session()
+        # Sessions are shared between users, never let a server set cookies on them.
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+
+http_session_pool = HttpSessionPool()
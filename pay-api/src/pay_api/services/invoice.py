@@ -34,6 +34,9 @@ from pay_api.utils.util import generate_transaction_number, get_local_formatted_
 
 from .code import Code as CodeService
 from .oauth_service import OAuthService
+from .report_service import ReportRequest, ReportService
+
+INVOICE_SCHEMA = InvoiceSchema()
 
 
 class Invoice:  # pylint: disable=too-many-instance-attributes,too-many-public-methods
@@ -354,8 +357,7 @@ class Invoice:  # pylint: disable=too-many-instance-attributes,too-many-public-m
 
     def asdict(self, include_dynamic_fields: bool = False):
         """Return the invoice as a python dict."""
-        invoice_schema = InvoiceSchema()
-        d = invoice_schema.dump(self._dao)
+        d = INVOICE_SCHEMA.dump(self._dao)
         self._add_dynamic_fields(d, include_dynamic_fields)
         return d
 
@@ -492,23 +494,20 @@ class Invoice:  # pylint: disable=too-many-instance-attributes,too-many-public-m
             },
         }
 
-        invoice_pdf_dict = {
-            "templateName": "invoice",
-            "reportName": invoice_number,
-            "templateVars": template_vars,
-            "populatePageNumber": True,
-        }
-        current_app.logger.info("Invoice PDF Dict %s", invoice_pdf_dict)
-        pdf_response = OAuthService.post(
-            current_app.config.get("REPORT_API_BASE_URL"),
-            kwargs["user"].bearer_token,
-            AuthHeaderType.BEARER,
-            ContentType.JSON,
-            invoice_pdf_dict,
+        invoice_pdf_request = ReportRequest(
+            content_type=ContentType.PDF.value,
+            report_name=invoice_number,
+            template_name="invoice",
+            template_vars=template_vars,
+            populate_page_number=True,
+            # Paid invoices don't change, the PDF is rendered once.
+            cacheable=invoice_dao.invoice_status_code == InvoiceStatus.PAID.value,
         )
-        current_app.logger.debug("<OAuthService responded to receipt.py")
+        current_app.logger.info("Invoice PDF request %s", invoice_pdf_request)
+        pdf_response = ReportService.get_report_response(invoice_pdf_request)
+        current_app.logger.debug("<Report service responded to invoice.py")
 
-        return pdf_response, invoice_pdf_dict.get("reportName")
+        return pdf_response, invoice_pdf_request.report_name
 
     @staticmethod
     def _check_for_auth(dao, one_of_roles=ALL_ALLOWED_ROLES):
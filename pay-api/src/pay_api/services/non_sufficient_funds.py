@@ -29,7 +29,7 @@ from pay_api.models import Statement as StatementModel
 from pay_api.models import StatementDTO
 from pay_api.models import StatementInvoices as StatementInvoicesModel
 from pay_api.models import db
-from pay_api.utils.converter import Converter
+from pay_api.utils.converter import get_converter
 from pay_api.utils.enums import (
     AuthHeaderType,
     ContentType,
@@ -52,7 +52,7 @@ class NonSufficientFundsService:
 
     def asdict(self):
         """Return the EFT Short name as a python dict."""
-        return Converter().unstructure(NonSufficientFundsSchema.from_row(self.dao))
+        return get_converter().unstructure(NonSufficientFundsSchema.from_row(self.dao))
 
     @staticmethod
     def populate(value: NonSufficientFunds):
@@ -170,12 +170,13 @@ class NonSufficientFundsService:
     @staticmethod
     def find_all_non_sufficient_funds_invoices(account_id: str):
         """Return all Non-Sufficient Funds invoices."""
-        results, total, aggregate_totals, statements = (
-            NonSufficientFundsService.query_all_non_sufficient_funds_invoices(account_id=account_id)
-        )
-        invoice_search_model = [InvoiceSearchModel.from_row(invoice_dao) for invoice_dao, _ in results]
-        invoices = Converter().unstructure(invoice_search_model)
-        invoices = [Converter().remove_nones(invoice_dict) for invoice_dict in invoices]
+        (
+            results,
+            total,
+            aggregate_totals,
+            statements,
+        ) = NonSufficientFundsService.query_all_non_sufficient_funds_invoices(account_id=account_id)
+        invoices = [InvoiceSearchModel.dict_from_row(invoice_dao) for invoice_dao, _ in results]
         statements = StatementDTO.dao_to_dict(statements)
         data = {
             "total": total,
@@ -14,22 +14,21 @@
 """Service to invoke Rest services."""
 import json
 import re
+import time
 from collections.abc import Iterable
+from http import HTTPStatus
 from typing import Dict
 
-import requests
 from flask import current_app
-from requests.adapters import HTTPAdapter  # pylint:disable=ungrouped-imports
 from requests.exceptions import ConnectionError as ReqConnectionError  # pylint:disable=ungrouped-imports
 from requests.exceptions import ConnectTimeout, HTTPError
-from urllib3.util.retry import Retry
 
 from pay_api.exceptions import ServiceUnavailableException
+from pay_api.services.http_session_pool import http_session_pool
+from pay_api.services.oauth_token_cache import oauth_token_cache
 from pay_api.utils.enums import AuthHeaderType, ContentType
 from pay_api.utils.json_util import DecimalEncoder
 
-RETRY_ADAPTER = HTTPAdapter(max_retries=Retry(total=5, backoff_factor=1, status_forcelist=[404]))
-
 
 class OAuthService:
     """Service to invoke Rest services which uses OAuth 2.0 implementation."""
@@ -45,8 +44,9 @@ class OAuthService:
         additional_headers: Dict = None,
         is_put: bool = False,
         auth_header_name: str = "Authorization",
+        retry_unauthorized: bool = True,
     ):
-        """POST service."""
+        """POST service, a 401 for a cached client credentials token is retried once with a new token."""
         current_app.logger.debug("<post")
 
         headers = {
@@ -65,22 +65,14 @@ class OAuthService:
         current_app.logger.debug(f"Endpoint : {endpoint}")
         current_app.logger.debug(f"headers : {safe_headers}")
         current_app.logger.debug(f"data : {data}")
+        session = http_session_pool.session_for(endpoint)
         response = None
+        started = time.monotonic()
         try:
             if is_put:
-                response = requests.put(
-                    endpoint,
-                    data=data,
-                    headers=headers,
-                    timeout=current_app.config.get("CONNECT_TIMEOUT"),
-                )
+                response = session.put(endpoint, data=data, headers=headers, timeout=http_session_pool.timeout())
             else:
-                response = requests.post(
-                    endpoint,
-                    data=data,
-                    headers=headers,
-                    timeout=current_app.config.get("CONNECT_TIMEOUT"),
-                )
+                response = session.post(endpoint, data=data, headers=headers, timeout=http_session_pool.timeout())
             if raise_for_error:
                 response.raise_for_status()
         except (ReqConnectionError, ConnectTimeout) as exc:
@@ -93,13 +85,34 @@ class OAuthService:
             )
             if exc.response and exc.response.status_code >= 500:
                 raise ServiceUnavailableException(exc) from exc
+            if retry_unauthorized and (new_token := OAuthService._refresh_unauthorized_token(exc, token)):
+                return OAuthService.post(
+                    endpoint,
+                    new_token,
+                    auth_header_type,
+                    content_type,
+                    data,
+                    raise_for_error=raise_for_error,
+                    additional_headers=additional_headers,
+                    is_put=is_put,
+                    auth_header_name=auth_header_name,
+                    retry_unauthorized=False,
+                )
             raise exc
         finally:
+            http_session_pool.record(endpoint, time.monotonic() - started, error=response is None or not response.ok)
             OAuthService.__log_response(response)
 
         current_app.logger.debug(">post")
         return response
 
+    @staticmethod
+    def _refresh_unauthorized_token(exc: HTTPError, token):
+        """Return a new token if the request was rejected with a 401 and the token came from the token cache."""
+        if exc.response is None or exc.response.status_code != HTTPStatus.UNAUTHORIZED or not token:
+            return None
+        return oauth_token_cache.refresh(token)
+
     @staticmethod
     def __log_response(response):
         if response is not None:
@@ -126,8 +139,9 @@ class OAuthService:
         return_none_if_404: bool = False,
         additional_headers: Dict = None,
         auth_header_name: str = "Authorization",
+        retry_unauthorized: bool = True,
     ):
-        """GET service."""
+        """GET service, a 401 for a cached client credentials token is retried once with a new token."""
         current_app.logger.debug("<GET")
 
         headers = {
@@ -142,16 +156,11 @@ class OAuthService:
         safe_headers.pop("Authorization", None)
         current_app.logger.debug(f"Endpoint : {endpoint}")
         current_app.logger.debug(f"headers : {safe_headers}")
-        session = requests.Session()
-        if retry_on_failure:
-            session.mount(endpoint, RETRY_ADAPTER)
+        session = http_session_pool.session_for(endpoint, retry_on_failure)
         response = None
+        started = time.monotonic()
         try:
-            response = session.get(
-                endpoint,
-                headers=headers,
-                timeout=current_app.config.get("CONNECT_TIMEOUT"),
-            )
+            response = session.get(endpoint, headers=headers, timeout=http_session_pool.timeout())
             response.raise_for_status()
         except (ReqConnectionError, ConnectTimeout) as exc:
             current_app.logger.error("---Error on GET---")
@@ -168,8 +177,21 @@ class OAuthService:
                     raise ServiceUnavailableException(exc) from exc
                 if return_none_if_404 and exc.response.status_code == 404:
                     return None
+            if retry_unauthorized and (new_token := OAuthService._refresh_unauthorized_token(exc, token)):
+                return OAuthService.get(
+                    endpoint,
+                    new_token,
+                    auth_header_type,
+                    content_type,
+                    retry_on_failure=retry_on_failure,
+                    return_none_if_404=return_none_if_404,
+                    additional_headers=additional_headers,
+                    auth_header_name=auth_header_name,
+                    retry_unauthorized=False,
+                )
             raise exc
         finally:
+            http_session_pool.record(endpoint, time.monotonic() - started, error=response is None or not response.ok)
             OAuthService.__log_response(response)
 
         current_app.logger.debug(">GET")
@@ -0,0 +1,114 @@
+# Copyright © 2024 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the 'License');
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an 'AS IS' BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Process wide cache for OAuth client credentials tokens.
+
+CFS, PayBC direct pay and keycloak service account tokens are valid for a while, so the token response is reused until
+shortly before expires_in elapses instead of requesting a new token for every outbound call. Responses without an
+expires_in are not cached.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Dict, Optional
+
+from flask import current_app
+
+
+@dataclass
+class CachedToken:
+    """Token response along with the callable used to fetch it again."""
+
+    response: object
+    access_token: str
+    expires_at: float
+    fetch: Callable
+
+
+class OAuthTokenCache:
+    """Thread safe cache of token responses keyed by the issuing system and client id."""
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._lock = Lock()
+        self._key_locks: Dict[str, Lock] = {}
+        self._tokens: Dict[str, CachedToken] = {}
+
+    def get(self, key: str, fetch: Callable):
+        """Return the cached token response for the key, calling fetch when it is missing or about to expire."""
+        if (cached := self._valid_token(key)) is not None:
+            return cached.response
+        with self._key_lock(key):
+            # Another thread may have refreshed the token while this one was waiting on the lock.
+            if (cached := self._valid_token(key)) is not None:
+                return cached.response
+            response = fetch()
+            self._store(key, response, fetch)
+            return response
+
+    def refresh(self, access_token: str) -> Optional[str]:
+        """Replace a rejected access token with a new one, None if the token was not issued through the cache."""
+        with self._lock:
+            key = next((k for k, v in self._tokens.items() if v.access_token == access_token), None)
+        if key is None:
+            return None
+        with self._key_lock(key):
+            cached = self._tokens.get(key)
+            if cached is None:
+                return None
+            if cached.access_token == access_token:
+                current_app.logger.info(f"Access token for {key} was rejected, requesting a new one.")
+                self._tokens.pop(key, None)
+                self._store(key, cached.fetch(), cached.fetch)
+            refreshed = self._tokens.get(key)
+            return refreshed.access_token if refreshed else None
+
+    def invalidate(self, key: str = None):
+        """Drop the token for the key, or all tokens when no key is passed."""
+        with self._lock:
+            if key is None:
+                self._tokens.clear()
+            else:
+                self._tokens.pop(key, None)
+
+    def _valid_token(self, key: str) -> Optional[CachedToken]:
+        cached = self._tokens.get(key)
+        if cached is not None and time.monotonic() < cached.expires_at:
+            return cached
+        return None
+
+    def _key_lock(self, key: str) -> Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, Lock())
+
+    def _store(self, key: str, response, fetch: Callable):
+        token_json = response.json() or {}
+        access_token = token_json.get("access_token")
+        expires_in = token_json.get("expires_in")
+        if not access_token or not expires_in:
+            return
+        expires_in = int(expires_in)
+        # Refresh early so a token doesn't expire in flight, but never spend more than half its lifetime doing so.
+        margin = min(current_app.config.get("OAUTH_TOKEN_REFRESH_MARGIN_SECONDS", 60), expires_in // 2)
+        with self._lock:
+            self._tokens[key] = CachedToken(
+                response=response,
+                access_token=access_token,
+                expires_at=time.monotonic() + expires_in - margin,
+                fetch=fetch,
+            )
+
+
+oauth_token_cache = OAuthTokenCache()
@@ -14,6 +14,8 @@
 """Service to manage Payment model related operations."""
 from __future__ import annotations
 
+import csv
+import io
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from decimal import Decimal
@@ -28,12 +30,12 @@ from pay_api.models import EFTTransaction as EFTTransactionModel
 from pay_api.models import Invoice as InvoiceModel
 from pay_api.models import Payment as PaymentModel
 from pay_api.models import PaymentAccount as PaymentAccountModel
+from pay_api.models import db
 from pay_api.models.base_model import BaseModel
 from pay_api.models.invoice import InvoiceSchema, InvoiceSearchModel
 from pay_api.models.invoice_reference import InvoiceReference as InvoiceReferenceModel
 from pay_api.models.payment import PaymentSchema
 from pay_api.services.cfs_service import CFSService
-from pay_api.utils.converter import Converter
 from pay_api.utils.enums import (
     AuthHeaderType,
     Code,
@@ -58,6 +60,10 @@ from .code import Code as CodeService
 from .oauth_service import OAuthService
 from .report_service import ReportRequest, ReportService
 
+# Schemas are created once, building them (and their nested schemas) for every record is expensive on large results.
+PAYMENT_SCHEMA = PaymentSchema()
+PAYMENT_INVOICE_SCHEMA = InvoiceSchema(exclude=("receipts", "references", "_links"))
+
 
 @dataclass
 class PaymentReportInput:
@@ -69,6 +75,24 @@ class PaymentReportInput:
     results: dict
     statement_summary: Optional[dict] = None
     eft_transactions: Optional[List[EFTTransactionModel]] = None
+    cacheable: bool = False
+
+
+PAYMENT_REPORT_LABELS = [
+    "Transaction",
+    "Transaction Details",
+    "Folio Number",
+    "Initiated By",
+    "Date",
+    "Purchase Amount",
+    "GST",
+    "Statutory Fee",
+    "BCOL Fee",
+    "Status",
+    "Corp Number",
+    "Transaction ID",
+    "Invoice Reference Number",
+]
 
 
 class Payment:  # pylint: disable=too-many-instance-attributes, too-many-public-methods
@@ -275,8 +299,7 @@ class Payment:  # pylint: disable=too-many-instance-attributes, too-many-public-
 
     def asdict(self):
         """Return the payment as a python dict."""
-        payment_schema = PaymentSchema()
-        d = payment_schema.dump(self._dao)
+        d = PAYMENT_SCHEMA.dump(self._dao)
         return d
 
     @staticmethod
@@ -333,15 +356,11 @@ class Payment:  # pylint: disable=too-many-instance-attributes, too-many-public-
             payment = result[0]
             invoice = result[1]
             if last_payment_iter is None or payment.id != last_payment_iter.id:  # Payment doesn't exist in array yet
-                payment_schema = PaymentSchema()
-                payment_dict = payment_schema.dump(payment)
-                payment_dict["invoices"] = []
-                inv_schema = InvoiceSchema(exclude=("receipts", "references", "_links"))
-                payment_dict["invoices"] = [inv_schema.dump(invoice)]
+                payment_dict = PAYMENT_SCHEMA.dump(payment)
+                payment_dict["invoices"] = [PAYMENT_INVOICE_SCHEMA.dump(invoice)]
                 data["items"].append(payment_dict)
             else:
-                inv_schema = InvoiceSchema(exclude=("receipts", "references", "_links"))
-                payment_dict["invoices"].append(inv_schema.dump(invoice))
+                payment_dict["invoices"].append(PAYMENT_INVOICE_SCHEMA.dump(invoice))
 
             last_payment_iter = payment
 
@@ -380,6 +399,39 @@ class Payment:  # pylint: disable=too-many-instance-attributes, too-many-public-
         current_app.logger.debug(">search_purchase_history")
         return data
 
+    @classmethod
+    def search_purchase_history_by_cursor(  # pylint: disable=too-many-arguments
+        cls,
+        auth_account_id: str,
+        search_filter: Dict,
+        limit: int,
+        after_id: int = None,
+        before_id: int = None,
+        count_mode: str = "none",
+    ):
+        """Search purchase history for the account using keyset (cursor) pagination.
+
+        The response carries after_id/before_id cursors for the next and previous pages instead of a page number.
+        """
+        current_app.logger.debug(f"<search_purchase_history_by_cursor {auth_account_id}")
+        purchases, has_more, total = PaymentModel.search_purchase_history_by_cursor(
+            auth_account_id, search_filter, limit, after_id, before_id, count_mode
+        )
+        # Seeking backwards always has a next page (where we came from), forwards always has a previous one.
+        has_next = has_more if not before_id else True
+        has_previous = has_more if before_id else bool(after_id)
+        data = {
+            "total": total,
+            "limit": limit,
+            "after_id": purchases[-1].id if purchases and has_next else None,
+            "before_id": purchases[0].id if purchases and has_previous else None,
+            "items": [],
+        }
+        data = cls.create_payment_report_details(purchases, data)
+
+        current_app.logger.debug(">search_purchase_history_by_cursor")
+        return data
+
     @classmethod
     def create_payment_report_details(cls, purchases: Tuple, data: Dict):  # pylint:disable=too-many-locals
         """Return payment report details by fetching the line items.
@@ -389,12 +441,15 @@ class Payment:  # pylint: disable=too-many-instance-attributes, too-many-public-
         if data is None or "items" not in data:
             data = {"items": []}
 
-        invoice_search_list = [InvoiceSearchModel.from_row(invoice_dao) for invoice_dao in purchases]
-        converter = Converter()
-        invoice_list = converter.unstructure(invoice_search_list)
-        data["items"] = [converter.remove_nones(invoice_dict) for invoice_dict in invoice_list]
+        data["items"] = [InvoiceSearchModel.dict_from_row(invoice_dao) for invoice_dao in purchases]
         return data
 
+    @staticmethod
+    def get_payment_report_name(content_type: str) -> str:
+        """Return the file name of the payment report."""
+        extension = "pdf" if content_type == ContentType.PDF.value else "csv"
+        return f"bcregistry-transactions-{datetime.now(tz=timezone.utc).strftime('%m-%d-%Y')}.{extension}"
+
     @staticmethod
     def create_payment_report(auth_account_id: str, search_filter: Dict, content_type: str, report_name: str):
         """Create payment report."""
@@ -443,38 +498,27 @@ class Payment:  # pylint: disable=too-many-instance-attributes, too-many-public-
     @staticmethod
     @user_context
     def generate_payment_report(report_inputs: PaymentReportInput, **kwargs):  # pylint: disable=too-many-locals
-        """Prepare data and generate payment report by calling report api."""
-        labels = [
-            "Transaction",
-            "Transaction Details",
-            "Folio Number",
-            "Initiated By",
-            "Date",
-            "Purchase Amount",
-            "GST",
-            "Statutory Fee",
-            "BCOL Fee",
-            "Status",
-            "Corp Number",
-            "Transaction ID",
-            "Invoice Reference Number",
-        ]
+        """Prepare data and generate payment report by calling report api.
 
+        The token defaults to the one of the request, jobs pass it in explicitly.
+        """
+        token = kwargs.get("token", None) or kwargs["user"].bearer_token
         content_type = report_inputs.content_type
         results = report_inputs.results
         report_name = report_inputs.report_name
         template_name = report_inputs.template_name
 
         # Use the status_code_description instead of status_code.
-        invoice_status_codes = CodeService.find_code_values_by_type(Code.INVOICE_STATUS.value)
         for invoice in results.get("items", None):
-            filtered_codes = [cd for cd in invoice_status_codes["codes"] if cd["code"] == invoice["status_code"]]
-            if filtered_codes:
-                invoice["status_code"] = filtered_codes[0]["description"]
+            status_code = CodeService.find_code_value_by_type_and_code(
+                Code.INVOICE_STATUS.value, invoice["status_code"]
+            )
+            if status_code:
+                invoice["status_code"] = status_code["description"]
 
         if content_type == ContentType.CSV.value:
             template_vars = {
-                "columns": labels,
+                "columns": PAYMENT_REPORT_LABELS,
                 "values": Payment._prepare_csv_data(results),
             }
         else:
@@ -487,7 +531,7 @@ class Payment:  # pylint: disable=too-many-instance-attributes, too-many-public-
                 contact_url = current_app.config.get("AUTH_API_ENDPOINT") + f"orgs/{account_id}/contacts"
                 contact = OAuthService.get(
                     endpoint=contact_url,
-                    token=kwargs["user"].bearer_token,
+                    token=token,
                     auth_header_type=AuthHeaderType.BEARER,
                     content_type=ContentType.JSON,
                 ).json()
@@ -510,7 +554,9 @@ class Payment:  # pylint: disable=too-many-instance-attributes, too-many-public-
                 template_vars=template_vars,
                 populate_page_number=True,
                 content_type=content_type,
-            )
+                cacheable=report_inputs.cacheable,
+            ),
+            token=token,
         )
 
         return report_response
@@ -518,41 +564,72 @@ class Payment:  # pylint: disable=too-many-instance-attributes, too-many-public-
     @staticmethod
     def _prepare_csv_data(results):
         """Prepare data for creating a CSV report."""
-        cells = []
-        for invoice in results.get("items"):
-            txn_description = ""
-            total_gst = 0
-            total_pst = 0
-            for line_item in invoice.get("line_items"):
-                txn_description += "," + line_item.get("description")
-                total_gst += line_item.get("gst")
-                total_pst += line_item.get("pst")
-            service_fee = float(invoice.get("service_fees", 0))
-            total_fees = float(invoice.get("total", 0))
-            row_value = [
-                ",".join([line_item.get("description") for line_item in invoice.get("line_items")]),
-                (
-                    ",".join([f"{detail.get('label')} {detail.get('value')}" for detail in invoice.get("details")])
-                    if invoice.get("details")
-                    else None
-                ),
-                invoice.get("folio_number"),
-                invoice.get("created_name"),
-                get_local_formatted_date_time(
-                    parser.parse(invoice.get("created_on")),
-                    "%Y-%m-%d %I:%M:%S %p Pacific Time",
-                ),
-                total_fees,
-                total_gst + total_pst,
-                total_fees - service_fee,
-                service_fee,
-                invoice.get("status_code"),
-                invoice.get("business_identifier"),
-                invoice.get("id"),
-                invoice.get("invoice_number"),
-            ]
-            cells.append(row_value)
-        return cells
+        return [Payment._prepare_csv_row(invoice) for invoice in results.get("items")]
+
+    @staticmethod
+    def _prepare_csv_row(invoice: Dict) -> List:
+        """Prepare a single invoice row for a CSV report."""
+        total_gst = 0
+        total_pst = 0
+        for line_item in invoice.get("line_items"):
+            total_gst += line_item.get("gst")
+            total_pst += line_item.get("pst")
+        service_fee = float(invoice.get("service_fees", 0))
+        total_fees = float(invoice.get("total", 0))
+        return [
+            ",".join([line_item.get("description") for line_item in invoice.get("line_items")]),
+            (
+                ",".join([f"{detail.get('label')} {detail.get('value')}" for detail in invoice.get("details")])
+                if invoice.get("details")
+                else None
+            ),
+            invoice.get("folio_number"),
+            invoice.get("created_name"),
+            get_local_formatted_date_time(
+                parser.parse(invoice.get("created_on")),
+                "%Y-%m-%d %I:%M:%S %p Pacific Time",
+            ),
+            total_fees,
+            total_gst + total_pst,
+            total_fees - service_fee,
+            service_fee,
+            invoice.get("status_code"),
+            invoice.get("business_identifier"),
+            invoice.get("id"),
+            invoice.get("invoice_number"),
+        ]
+
+    @classmethod
+    def stream_payment_report_csv(cls, auth_account_id: str, search_filter: Dict, chunk_size: int = 1000):
+        """Yield the purchase history CSV report in chunks, without the record limit of the report API path.
+
+        Invoices are read a chunk at a time with keyset pagination, so memory stays constant regardless of the size
+        of the export. Columns are the same as the CSV generated through the report API.
+        """
+        current_app.logger.debug(f"<stream_payment_report_csv {auth_account_id}")
+        invoice_status_codes = CodeService.find_code_values_by_type(Code.INVOICE_STATUS.value)
+        status_descriptions = {code["code"]: code["description"] for code in invoice_status_codes["codes"] or []}
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(PAYMENT_REPORT_LABELS)
+        after_id = None
+        while True:
+            purchases, has_more, _ = PaymentModel.search_purchase_history_by_cursor(
+                auth_account_id, search_filter, chunk_size, after_id=after_id
+            )
+            for invoice in cls.create_payment_report_details(purchases, None)["items"]:
+                invoice["status_code"] = status_descriptions.get(invoice["status_code"], invoice["status_code"])
+                writer.writerow(cls._prepare_csv_row(invoice))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            if not has_more:
+                break
+            after_id = purchases[-1].id
+            # Release the chunk, the session would otherwise keep every invoice of the export.
+            db.session.expunge_all()
+        current_app.logger.debug(">stream_payment_report_csv")
 
     @staticmethod
     def find_payment_for_invoice(invoice_id: int) -> Payment:
@@ -320,20 +320,24 @@ class PaymentService:  # pylint: disable=too-few-public-methods
 
 def _calculate_fees(corp_type, filing_info):
     """Calculate and return the fees based on the filing type codes."""
-    fees = []
+    filing_types = filing_info.get("filingTypes")
+    current_app.logger.debug(f"Getting fees for {[info.get('filingTypeCode') for info in filing_types]} ")
+    fees = FeeSchedule.find_by_corp_types_and_filing_types(
+        [
+            {
+                "corp_type": corp_type,
+                "filing_type_code": filing_type_info.get("filingTypeCode", None),
+                "is_priority": filing_type_info.get("priority"),
+                "is_future_effective": filing_type_info.get("futureEffective"),
+                "waive_fees": filing_type_info.get("waiveFees"),
+                "quantity": filing_type_info.get("quantity"),
+            }
+            for filing_type_info in filing_types
+        ],
+        valid_date=filing_info.get("date", None),
+    )
     service_fee_applied: bool = False
-    for filing_type_info in filing_info.get("filingTypes"):
-        current_app.logger.debug(f"Getting fees for {filing_type_info.get('filingTypeCode')} ")
-        fee: FeeSchedule = FeeSchedule.find_by_corp_type_and_filing_type(
-            corp_type=corp_type,
-            filing_type_code=filing_type_info.get("filingTypeCode", None),
-            valid_date=filing_info.get("date", None),
-            jurisdiction=None,
-            is_priority=filing_type_info.get("priority"),
-            is_future_effective=filing_type_info.get("futureEffective"),
-            waive_fees=filing_type_info.get("waiveFees"),
-            quantity=filing_type_info.get("quantity"),
-        )
+    for filing_type_info, fee in zip(filing_types, fees):
         # If service fee is already applied, do not charge again.
         if service_fee_applied:
             fee.service_fees = 0
@@ -346,7 +350,6 @@ def _calculate_fees(corp_type, filing_info):
         if filing_type_info.get("filingDescription"):
             fee.description = filing_type_info.get("filingDescription")
 
-        fees.append(fee)
     return fees
 
 
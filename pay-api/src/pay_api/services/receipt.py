@@ -24,7 +24,6 @@ from pay_api.models import Payment as PaymentModel
 from pay_api.models import PaymentMethod as PaymentMethodModel
 from pay_api.models import Receipt as ReceiptModel
 from pay_api.utils.enums import (
-    AuthHeaderType,
     ContentType,
     InvoiceReferenceStatus,
     InvoiceStatus,
@@ -37,7 +36,7 @@ from pay_api.utils.util import get_local_formatted_date
 
 from .invoice import Invoice
 from .invoice_reference import InvoiceReference
-from .oauth_service import OAuthService
+from .report_service import ReportRequest, ReportService
 
 
 class Receipt:  # pylint: disable=too-many-instance-attributes
@@ -162,28 +161,27 @@ class Receipt:  # pylint: disable=too-many-instance-attributes
     ):
         """Create receipt."""
         current_app.logger.debug("<create receipt initiated")
-        receipt_dict = {
-            "templateName": "payment_receipt",
-            "reportName": filing_data.pop("fileName", "payment_receipt"),
-        }
+        report_name = filing_data.pop("fileName", "payment_receipt")
 
         template_vars = Receipt.get_receipt_details(filing_data, invoice_identifier, skip_auth_check)
         template_vars.update(filing_data)
 
-        receipt_dict["templateVars"] = template_vars
-
         current_app.logger.debug(
-            f"<OAuthService invoked from receipt.py {current_app.config.get('REPORT_API_BASE_URL')}"
+            f"<ReportService invoked from receipt.py {current_app.config.get('REPORT_API_BASE_URL')}"
         )
 
-        pdf_response = OAuthService.post(
-            current_app.config.get("REPORT_API_BASE_URL"),
-            kwargs["user"].bearer_token,
-            AuthHeaderType.BEARER,
-            ContentType.JSON,
-            receipt_dict,
+        # Receipts are only created for completed payments, the same receipt request renders the same PDF.
+        pdf_response = ReportService.get_report_response(
+            ReportRequest(
+                content_type=ContentType.PDF.value,
+                report_name=report_name,
+                template_name="payment_receipt",
+                template_vars=template_vars,
+                populate_page_number=False,
+                cacheable=True,
+            )
         )
-        current_app.logger.debug("<OAuthService responded to receipt.py")
+        current_app.logger.debug("<ReportService responded to receipt.py")
 
         return pdf_response
 
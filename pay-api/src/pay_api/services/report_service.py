@@ -11,14 +11,28 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-"""Service to manage report generation."""
+"""Service to manage report generation.
+
+Reports for immutable inputs (closed statements, paid invoices) are cached by the hash of the report-api request, and
+reports can be rendered as jobs in the background, which are polled and downloaded when completed.
+"""
+import hashlib
+import json
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from threading import Thread
+from typing import Callable, Dict, Tuple
 
-from flask import current_app
+from flask import copy_current_request_context, current_app, has_request_context
 
+from pay_api.exceptions import BusinessException
+from pay_api.models import ReportJob as ReportJobModel
+from pay_api.models import ReportJobSchema
+from pay_api.models import db
+from pay_api.utils.errors import Error
 from pay_api.utils.user_context import user_context
 
-from ..utils.enums import AuthHeaderType, ContentType
+from ..utils.enums import AuthHeaderType, ContentType, ReportJobStatus
 from .oauth_service import OAuthService
 
 
@@ -31,6 +45,8 @@ class ReportRequest:
     template_name: str
     template_vars: dict
     populate_page_number: bool
+    # Only set for reports of immutable inputs, the rendered report is kept and reused for the same request.
+    cacheable: bool = False
 
 
 class ReportService:
@@ -46,17 +62,109 @@ class ReportService:
             "populatePageNumber": request.populate_page_number,
         }
 
+    @staticmethod
+    def get_cache_key(content_type: str, report_payload: dict) -> str:
+        """Return the content hash of the report-api request, identical requests render identical reports."""
+        request_json = json.dumps({"contentType": content_type, **report_payload}, sort_keys=True, default=str)
+        return hashlib.sha256(request_json.encode("utf-8")).hexdigest()
+
     @classmethod
     @user_context
     def get_report_response(cls, request: ReportRequest, **kwargs):
-        """Return report response from report-api."""
+        """Return the rendered report from report-api, or from the cache for cacheable reports.
+
+        The token defaults to the one of the request, jobs pass it in explicitly.
+        """
         report_payload = cls.get_request_payload(request)
+        cache_key = cls.get_cache_key(request.content_type, report_payload) if request.cacheable else None
+        if cache_key and (cached_report := ReportJobModel.find_cached(cache_key)):
+            current_app.logger.info(f"Serving report {request.report_name} from the cache, job {cached_report.id}")
+            return cached_report.content
 
-        return OAuthService.post(
+        report_response = OAuthService.post(
             endpoint=current_app.config.get("REPORT_API_BASE_URL"),
-            token=kwargs["user"].bearer_token,
+            token=kwargs.get("token", None) or kwargs["user"].bearer_token,
             auth_header_type=AuthHeaderType.BEARER,
             content_type=ContentType.JSON,
             additional_headers={"Accept": request.content_type},
             data=report_payload,
         )
+        if report_response is None:
+            return None
+        if cache_key:
+            ReportJobModel(
+                cache_key=cache_key,
+                completed_on=datetime.now(tz=timezone.utc),
+                content=report_response.content,
+                content_type=request.content_type,
+                created_by=kwargs["user"].user_name,
+                report_name=request.report_name,
+                status_code=ReportJobStatus.COMPLETED.value,
+            ).save()
+        return report_response.content
+
+    @classmethod
+    @user_context
+    def submit_report_job(
+        cls, auth_account_id: str, content_type: str, render: Callable[[], Tuple[bytes, str]], **kwargs
+    ) -> Dict:
+        """Create a report job and render the report in the background, render returns the report and its name.
+
+        The job is polled with find_report_job and the report downloaded with get_report_job_content once completed.
+        """
+        report_job = ReportJobModel(
+            auth_account_id=auth_account_id,
+            content_type=content_type,
+            created_by=kwargs["user"].user_name,
+            status_code=ReportJobStatus.PENDING.value,
+        ).save()
+        report_job_id = report_job.id
+
+        def run_report_job():
+            cls._run_report_job(report_job_id, render)
+
+        if current_app.config.get("REPORT_JOBS_ASYNC") and has_request_context():
+            current_app.logger.debug(f"Starting thread to render report job {report_job_id}.")
+            Thread(target=copy_current_request_context(run_report_job)).start()
+        else:
+            run_report_job()
+        return ReportJobSchema().dump(ReportJobModel.find_by_id(report_job_id))
+
+    @staticmethod
+    def _run_report_job(report_job_id: int, render: Callable[[], Tuple[bytes, str]]):
+        """Render the report for the job and store it, failures are recorded on the job."""
+        try:
+            content, report_name = render()
+            report_job = ReportJobModel.find_by_id(report_job_id)
+            report_job.content = content
+            report_job.report_name = report_name
+            report_job.status_code = ReportJobStatus.COMPLETED.value
+        except Exception as e:  # NOQA # pylint: disable=broad-except
+            current_app.logger.error(f"Report job {report_job_id} failed: {e}", exc_info=True)
+            db.session.rollback()
+            report_job = ReportJobModel.find_by_id(report_job_id)
+            report_job.error_message = str(e)[:1000]
+            report_job.status_code = ReportJobStatus.FAILED.value
+        report_job.completed_on = datetime.now(tz=timezone.utc)
+        report_job.save()
+
+    @staticmethod
+    def find_report_job(auth_account_id: str, report_job_id: int) -> Dict:
+        """Return the report job status, a job pending for longer than the timeout is marked as failed."""
+        timeout = timedelta(minutes=current_app.config.get("REPORT_JOB_TIMEOUT_MINUTES"))
+        if ReportJobModel.fail_pending_created_before(datetime.now(tz=timezone.utc) - timeout, report_job_id):
+            db.session.commit()
+        report_job = ReportJobModel.find_by_id_and_account(report_job_id, auth_account_id)
+        if not report_job:
+            raise BusinessException(Error.REPORT_JOB_NOT_FOUND)
+        return ReportJobSchema().dump(report_job)
+
+    @staticmethod
+    def get_report_job_content(auth_account_id: str, report_job_id: int) -> ReportJobModel:
+        """Return the completed report job, the content is loaded when accessed."""
+        report_job = ReportJobModel.find_by_id_and_account(report_job_id, auth_account_id)
+        if not report_job:
+            raise BusinessException(Error.REPORT_JOB_NOT_FOUND)
+        if report_job.status_code != ReportJobStatus.COMPLETED.value:
+            raise BusinessException(Error.REPORT_JOB_NOT_COMPLETED)
+        return report_job
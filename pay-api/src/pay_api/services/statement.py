@@ -369,6 +369,12 @@ class Statement:  # pylint:disable=too-many-public-methods
             "dueDate": cls.calculate_due_date(statement.to_date) if statement else None,
         }
 
+    @staticmethod
+    def is_closed(statement: StatementModel) -> bool:
+        """Return True if the statement period has ended, the statement report is then cached."""
+        today = get_local_time(datetime.now(tz=timezone.utc)).date()
+        return bool(statement.to_date) and statement.to_date < today
+
     @staticmethod
     def get_statement_report(statement_id: str, content_type: str, **kwargs):
         """Generate statement report."""
@@ -403,13 +409,14 @@ class Statement:  # pylint:disable=too-many-public-methods
             report_name=report_name,
             template_name=StatementTemplate.STATEMENT_REPORT.value,
             results=result_items,
+            cacheable=Statement.is_closed(statement_dao),
         )
 
         if Statement.is_eft_statement(statement_dao, statement_purchases):
             report_inputs.statement_summary = Statement._populate_statement_summary(statement_dao, statement_purchases)
 
         report_response = PaymentService.generate_payment_report(
-            report_inputs, auth=kwargs.get("auth", None), statement=statement
+            report_inputs, auth=kwargs.get("auth", None), statement=statement, token=kwargs.get("token", None)
         )
         current_app.logger.debug(">get_statement_report")
 
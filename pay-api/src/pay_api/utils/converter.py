@@ -4,6 +4,7 @@ import re
 from datetime import datetime
 from decimal import Decimal
 from enum import Enum
+from functools import lru_cache
 from typing import Any, Dict, Type
 
 import cattrs
@@ -97,3 +98,20 @@ class Converter(cattrs.Converter):
             elif val is not None:
                 new_data[key] = val
         return new_data
+
+
+@lru_cache(maxsize=None)
+def get_converter(
+    camel_to_snake_case: bool = False, snake_case_to_camel: bool = False, enum_to_value: bool = False
+) -> Converter:
+    """Return a shared converter for the options.
+
+    cattrs generates the structure / unstructure function for a class the first time it's used and keeps it on the
+    converter, sharing the converter means this is done once per process instead of on every call.
+    Hooks must not be registered on the shared converters, create a Converter for that.
+    """
+    return Converter(
+        camel_to_snake_case=camel_to_snake_case,
+        snake_case_to_camel=snake_case_to_camel,
+        enum_to_value=enum_to_value,
+    )
@@ -429,6 +429,28 @@ class EJVLinkType(Enum):
     PARTIAL_REFUND = "partial_refund"
 
 
+class ReportJobStatus(Enum):
+    """Report job statuses."""
+
+    PENDING = "PENDING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+class ReportJobType(Enum):
+    """Reports which can be rendered as a report job."""
+
+    PAYMENT_TRANSACTIONS = "PAYMENT_TRANSACTIONS"
+    STATEMENT = "STATEMENT"
+
+
+class RevenueRollupDateType(Enum):
+    """Invoice date the revenue rollups are aggregated by."""
+
+    CREATED = "CREATED"
+    DISBURSED = "DISBURSED"
+
+
 class StatementTemplate(Enum):
     """Statement report templates."""
 
@@ -72,6 +72,9 @@ class Error(Enum):
         HTTPStatus.BAD_REQUEST,
     )
 
+    REPORT_JOB_NOT_FOUND = "REPORT_JOB_NOT_FOUND", HTTPStatus.NOT_FOUND
+    REPORT_JOB_NOT_COMPLETED = "REPORT_JOB_NOT_COMPLETED", HTTPStatus.CONFLICT
+
     DIRECT_PAY_INVALID_RESPONSE = "DIRECT_PAY_INVALID_RESPONSE", HTTPStatus.BAD_REQUEST
 
     ACCOUNT_EXISTS = "ACCOUNT_EXISTS", HTTPStatus.BAD_REQUEST
@@ -1,6 +1,6 @@
 """Serializable class for cattr structure and unstructure."""
 
-from pay_api.utils.converter import Converter
+from pay_api.utils.converter import get_converter
 
 
 class Serializable:
@@ -9,8 +9,8 @@ class Serializable:
     @classmethod
     def from_dict(cls, data: dict):
         """Convert from dictionary to object."""
-        return Converter(camel_to_snake_case=True).structure(data, cls)
+        return get_converter(camel_to_snake_case=True).structure(data, cls)
 
     def to_dict(self):
         """Convert from object to dictionary."""
-        return Converter(snake_case_to_camel=True).unstructure(self)
+        return get_converter(snake_case_to_camel=True).unstructure(self)
@@ -18,9 +18,9 @@ A simple decorator to add the options method to a Request Class.
 """
 import ast
 import calendar
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, time, timedelta, timezone
 from decimal import Decimal
-from typing import Dict
+from typing import Dict, Tuple
 from urllib.parse import parse_qsl
 
 import pytz
@@ -30,7 +30,7 @@ from holidays.constants import GOVERNMENT, OPTIONAL, PUBLIC
 from holidays.countries import Canada
 
 from .constants import DT_SHORT_FORMAT
-from .converter import Converter
+from .converter import get_converter
 from .enums import Code, CorpType, Product, StatementFrequency
 
 
@@ -151,6 +151,22 @@ def get_local_time(date_val: datetime, timezone_override=None):
     return date_val
 
 
+def get_utc_range_for_local_dates(start_date, end_date, timezone_override=None) -> Tuple[datetime, datetime]:
+    """Return the naive UTC [start, end) range covering the local days from start_date through end_date (dates).
+
+    Timestamps are stored as naive UTC, comparing the column against these bounds (instead of converting the column
+    to local time in SQL) lets postgres use an index on the column.
+    """
+    tz_local = pytz.timezone(timezone_override or current_app.config["LEGISLATIVE_TIMEZONE"])
+    if isinstance(start_date, datetime):
+        start_date = start_date.date()
+    if isinstance(end_date, datetime):
+        end_date = end_date.date()
+    utc_start = tz_local.localize(datetime.combine(start_date, time.min)).astimezone(pytz.utc)
+    utc_end = tz_local.localize(datetime.combine(end_date + timedelta(days=1), time.min)).astimezone(pytz.utc)
+    return utc_start.replace(tzinfo=None), utc_end.replace(tzinfo=None)
+
+
 def get_local_formatted_date_time(date_val: datetime, dt_format: str = "%Y-%m-%d %H:%M:%S"):
     """Return formatted local time."""
     return get_local_time(date_val).strftime(dt_format)
@@ -311,6 +327,6 @@ def get_topic_for_corp_type(corp_type: str):
 def unstructure_schema_items(schema, items):
     """Return unstructured results by schema."""
     results = [schema.from_row(item) for item in items]
-    converter = Converter()
+    converter = get_converter()
 
     return converter.unstructure(results)
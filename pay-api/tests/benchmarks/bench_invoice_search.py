@@ -0,0 +1,54 @@
+# Copyright © 2024 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark the query plans of the invoice date filters."""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, text
+
+from pay_api.models import Invoice, Payment, db
+from pay_api.utils.enums import InvoiceStatus, PaymentMethod
+from tests.utilities.base_test import factory_payment_account
+
+ROWS = 10000
+
+
+def test_filter_date_plan_uses_created_on_index(session):
+    """Assert postgres can answer the date filter from an index on created_on instead of a sequential scan."""
+    payment_account = factory_payment_account()
+    payment_account.save()
+    db.session.execute(
+        insert(Invoice),
+        [
+            {
+                "invoice_status_code": InvoiceStatus.CREATED.value,
+                "payment_account_id": payment_account.id,
+                "total": 0,
+                "corp_type_code": "CP",
+                "created_by": "test",
+                "payment_method_code": PaymentMethod.DIRECT_PAY.value,
+                "created_on": datetime(2023, 1, 1) + timedelta(minutes=10 * i),
+            }
+            for i in range(ROWS)
+        ],
+    )
+    db.session.execute(text("analyze invoices"))
+    query = db.session.query(Invoice.id).filter(Invoice.payment_account_id == payment_account.id)
+    query = Payment.filter_date(query, {"dateFilter": {"startDate": "2023-02-01", "endDate": "2023-02-02"}})
+    sql = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+    plan = "\n".join(db.session.execute(text(f"EXPLAIN ANALYZE {sql}")).scalars().all())
+    print(f"\n{plan}")
+    assert "Seq Scan on invoices" not in plan
+    assert "created_on" in plan
@@ -0,0 +1,78 @@
+# Copyright © 2024 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Benchmark the purchase history serialization against the generic converter."""
+
+import time
+
+from pay_api.models import Invoice as InvoiceModel
+from pay_api.models.invoice import InvoiceSearchModel
+from pay_api.services.payment import Payment as Payment_service
+from pay_api.utils.converter import Converter
+from pay_api.utils.enums import InvoiceStatus
+from tests.utilities.base_test import (
+    factory_invoice,
+    factory_invoice_reference,
+    factory_payment_account,
+    factory_payment_line_item,
+)
+
+ROWS = 2000
+ROUNDS = 5
+
+
+def _best_of(func) -> float:
+    """Return the fastest of a few rounds, in seconds."""
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def test_purchase_history_serialization(session):
+    """Time the purchase history fast path against the converter it replaced."""
+    payment_account = factory_payment_account()
+    payment_account.save()
+    for i in range(ROWS):
+        invoice = factory_invoice(
+            payment_account,
+            business_identifier="T1234567" if i % 2 else "CP0001234",
+            status_code=InvoiceStatus.PAID.value if i % 3 else InvoiceStatus.CREATED.value,
+            total=10 + i,
+            details=[{"label": "label1", "value": f"value{i}"}] if i % 2 else None,
+        )
+        invoice.save()
+        if i % 2:
+            factory_invoice_reference(invoice.id, invoice_number=f"REG{i:08}").save()
+        factory_payment_line_item(invoice_id=invoice.id, fee_schedule_id=1, description=f"test{i}").save()
+    purchases = InvoiceModel.query.filter(InvoiceModel.payment_account_id == payment_account.id).all()
+
+    def converter():
+        return [
+            Converter.remove_nones(invoice_dict)
+            for invoice_dict in Converter().unstructure([InvoiceSearchModel.from_row(row) for row in purchases])
+        ]
+
+    def fast_path():
+        return Payment_service.create_payment_report_details(purchases, {"items": []})["items"]
+
+    assert fast_path() == converter()
+    converter_time = _best_of(converter)
+    fast_path_time = _best_of(fast_path)
+    print(
+        f"\n{ROWS} purchases: converter {converter_time * 1000:.1f} ms, "
+        f"fast path {fast_path_time * 1000:.1f} ms, {converter_time / fast_path_time:.1f}x"
+    )
@@ -30,6 +30,7 @@ from pay_api.schemas import utils as schema_utils
 from pay_api.services.fas.routing_slip_status_transition_service import RoutingSlipStatusTransitionService
 from pay_api.utils.constants import DT_SHORT_FORMAT
 from pay_api.utils.enums import PatchActions, PaymentMethod, Role, RoutingSlipCustomStatus, RoutingSlipStatus
+from pay_api.utils.util import get_local_time
 from tests.utilities.base_test import factory_invoice, get_claims, get_routing_slip_request, token_header
 
 fake = Faker()
@@ -603,6 +604,42 @@ def test_create_routing_slips_search_with_receipt(session, client, jwt, app):
     assert items[0].get("payments")[0].get("chequeReceiptNumber") == receipt_number
 
 
+def test_routing_slips_search_total_and_cursor(session, client, jwt, app):
+    """Assert that the search returns the total count and pages with the cursor."""
+    token = jwt.create_jwt(get_claims(roles=[Role.FAS_CREATE.value, Role.FAS_SEARCH.value]), token_header)
+    headers = {"Authorization": f"Bearer {token}", "content-type": "application/json"}
+    numbers = ["206380792", "206380867", "206380909"]
+    for number in numbers:
+        rv = client.post(
+            "/api/v1/fas/routing-slips", data=json.dumps(get_routing_slip_request(number=number)), headers=headers
+        )
+        assert rv.status_code == 201
+
+    rv = client.post("/api/v1/fas/routing-slips/queries", data=json.dumps({"page": 1, "limit": 2}), headers=headers)
+    assert rv.json.get("total") == 3
+    assert len(rv.json.get("items")) == 2
+
+    rv = client.post(
+        "/api/v1/fas/routing-slips/queries", data=json.dumps({"cursor": True, "limit": 2}), headers=headers
+    )
+    assert rv.json.get("total") == 3
+    first_page = [item.get("number") for item in rv.json.get("items")]
+    assert first_page == list(reversed(numbers))[:2]
+    # Response keys are camel cased.
+    after_id = rv.json.get("afterId")
+    assert after_id == RoutingSlip.find_by_number(first_page[-1]).id
+
+    rv = client.post(
+        "/api/v1/fas/routing-slips/queries", data=json.dumps({"afterId": after_id, "limit": 2}), headers=headers
+    )
+    assert rv.json.get("total") == 3
+    second_page = [item.get("number") for item in rv.json.get("items")]
+    assert second_page == [numbers[0]]
+    assert RoutingSlip.find_by_number(second_page[0]).id < after_id
+    # The last page has no cursor.
+    assert rv.json.get("afterId") is None
+
+
 @pytest.mark.parametrize(
     "payload",
     [
@@ -746,6 +783,39 @@ def test_routing_slip_report(session, client, jwt, app):
     assert rv.status_code == 201
 
 
+def test_routing_slip_summary(session, client, jwt, app):
+    """Assert that the summary returns the counts and totals per payment method."""
+    token = jwt.create_jwt(get_claims(roles=[Role.FAS_CREATE.value, Role.FAS_REPORTS.value]), token_header)
+    headers = {"Authorization": f"Bearer {token}", "content-type": "application/json"}
+    payloads = [
+        get_routing_slip_request(
+            number="206380792",
+            cheque_receipt_numbers=[
+                ("0001", PaymentMethod.CHEQUE.value, 100),
+                ("0002", PaymentMethod.CHEQUE.value, 50),
+            ],
+        ),
+        get_routing_slip_request(number="206380867", cheque_receipt_numbers=[("0003", PaymentMethod.CASH.value, 20)]),
+    ]
+    for payload in payloads:
+        rv = client.post("/api/v1/fas/routing-slips", data=json.dumps(payload), headers=headers)
+        assert rv.status_code == 201
+
+    today = get_local_time(datetime.now(tz=timezone.utc)).strftime(DT_SHORT_FORMAT)
+    rv = client.get(f"/api/v1/fas/routing-slips/reports/summary?startDate={today}&endDate={today}", headers=headers)
+    assert rv.status_code == 200
+    assert rv.json.get("total") == 170
+    summary = {row.get("paymentMethod"): row for row in rv.json.get("paymentMethods")}
+    assert summary[PaymentMethod.CHEQUE.value].get("routingSlipCount") == 1
+    assert summary[PaymentMethod.CHEQUE.value].get("receiptCount") == 2
+    assert summary[PaymentMethod.CHEQUE.value].get("totalCad") == 150
+    assert summary[PaymentMethod.CASH.value].get("receiptCount") == 1
+    assert summary[PaymentMethod.CASH.value].get("totalCad") == 20
+
+    rv = client.get("/api/v1/fas/routing-slips/reports/summary?startDate=2020-01", headers=headers)
+    assert rv.status_code == 400
+
+
 def test_create_comment_with_valid_routing_slips(session, client, jwt):
     """Assert that the endpoint returns 201."""
     token = jwt.create_jwt(get_claims(roles=[Role.FAS_CREATE.value, Role.FAS_VIEW.value]), token_header)
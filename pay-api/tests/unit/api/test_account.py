@@ -17,6 +17,8 @@
 Test-Suite to ensure that the /accounts endpoint is working as expected.
 """
 
+import csv
+import io
 import json
 from datetime import datetime, timezone
 from unittest.mock import patch
@@ -299,6 +301,42 @@ def test_account_purchase_history_export_as_csv(session, client, jwt, app):
     assert rv.status_code == 201
 
 
+def test_account_purchase_history_export_as_streamed_csv(session, client, jwt, app):
+    """Assert that the streamed CSV export returns a header and a row per invoice."""
+    token = jwt.create_jwt(get_claims(), token_header)
+    headers = {"Authorization": f"Bearer {token}", "content-type": "application/json"}
+
+    invoice_ids = []
+    for _ in range(3):
+        rv = client.post(
+            "/api/v1/payment-requests",
+            data=json.dumps(get_payment_request()),
+            headers=headers,
+        )
+        invoice_ids.append(rv.json.get("id"))
+
+    invoice: Invoice = Invoice.find_by_id(invoice_ids[0])
+    pay_account: PaymentAccount = PaymentAccount.find_by_id(invoice.payment_account_id)
+
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "content-type": "application/json",
+        "Accept": "text/csv",
+    }
+
+    rv = client.post(
+        f"/api/v1/accounts/{pay_account.auth_account_id}/payments/reports?stream=true",
+        data=json.dumps({}),
+        headers=headers,
+    )
+
+    assert rv.status_code == 200
+    rows = list(csv.reader(io.StringIO(rv.get_data(as_text=True))))
+    assert rows[0][0] == "Transaction"
+    assert len(rows) == len(invoice_ids) + 1
+    assert sorted(int(row[11]) for row in rows[1:]) == sorted(invoice_ids)
+
+
 def test_account_purchase_history_export_as_pdf(session, client, jwt, app):
     """Assert that the endpoint returns 200."""
     token = jwt.create_jwt(get_claims(), token_header)
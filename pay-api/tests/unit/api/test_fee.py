@@ -308,6 +308,56 @@ def test_fee_for_account_fee_settings(session, client, jwt, app):
     assert rv.json.get("serviceFees") == 1.5
 
 
+def test_fee_quote_for_cart(session, client, jwt, app):
+    """Assert that the quote endpoint returns per item fees and the cart totals."""
+    token = jwt.create_jwt(get_claims(), token_header)
+    headers = {"Authorization": f"Bearer {token}", "content-type": "application/json"}
+    corp_type = factory_corp_type_model("XX", "TEST")
+    service_fee = factory_fee_model("SF01", 1.5)
+    factory_fee_schedule_model(
+        factory_filing_type_model("XOTANN", "TEST"), corp_type, factory_fee_model("XXX", 100), service_fee=service_fee
+    )
+    factory_fee_schedule_model(factory_filing_type_model("XOTADD", "TEST"), corp_type, factory_fee_model("XXY", 20))
+
+    rv = client.post(
+        "/api/v1/fees/quote",
+        data=json.dumps(
+            {
+                "items": [
+                    {"corpType": "XX", "filingTypeCode": "XOTANN"},
+                    {"corpType": "XX", "filingTypeCode": "XOTADD", "quantity": 3},
+                ]
+            }
+        ),
+        headers=headers,
+    )
+    assert rv.status_code == 200
+    items = rv.json.get("items")
+    assert len(items) == 2
+    assert items[0].get("filingFees") == 100
+    assert items[0].get("serviceFees") == 1.5
+    assert items[1].get("filingFees") == 60
+    assert items[1].get("quantity") == 3
+    assert rv.json.get("filingFees") == 160
+    assert rv.json.get("total") == 161.5
+
+
+def test_fee_quote_with_invalid_filing_type(session, client, jwt, app):
+    """Assert that the quote endpoint rejects unknown filing types and invalid payloads."""
+    token = jwt.create_jwt(get_claims(), token_header)
+    headers = {"Authorization": f"Bearer {token}", "content-type": "application/json"}
+
+    rv = client.post(
+        "/api/v1/fees/quote",
+        data=json.dumps({"items": [{"corpType": "XX", "filingTypeCode": "NOTEXIST"}]}),
+        headers=headers,
+    )
+    assert rv.status_code == 400
+
+    rv = client.post("/api/v1/fees/quote", data=json.dumps({"items": []}), headers=headers)
+    assert rv.status_code == 400
+
+
 def factory_filing_type_model(filing_type_code: str, filing_description: str = "TEST"):
     """Return the filing type model."""
     filing_type = FilingType(code=filing_type_code, description=filing_description)
@@ -361,7 +361,7 @@ def test_payment_delete_when_paybc_is_down(session, client, jwt, app):
     pay_id = rv.json.get("id")
 
     with patch(
-        "pay_api.services.oauth_service.requests.post",
+        "pay_api.services.http_session_pool.requests.Session.post",
         side_effect=ConnectionError("mocked error"),
     ):
         rv = client.delete(f"/api/v1/payment-requests/{pay_id}", headers=headers)
@@ -406,7 +406,7 @@ def test_transaction_patch_when_paybc_down(session, client, jwt, app):
     )
     txn_id = rv.json.get("id")
     with patch(
-        "pay_api.services.oauth_service.requests.post",
+        "pay_api.services.http_session_pool.requests.Session.post",
         side_effect=ConnectionError("mocked error"),
     ):
         rv = client.patch(
@@ -23,7 +23,13 @@ from dateutil.relativedelta import relativedelta
 
 from pay_api.models import Invoice, InvoiceSchema
 from pay_api.utils.enums import CorpType, InvoiceStatus, PaymentMethod
-from tests.utilities.base_test import factory_invoice, factory_payment, factory_payment_account
+from tests.utilities.base_test import (
+    factory_distribution_code,
+    factory_invoice,
+    factory_payment,
+    factory_payment_account,
+    factory_payment_line_item,
+)
 
 
 def test_invoice(session):
@@ -137,3 +143,53 @@ def test_invoice_created_on(session):
         invoice.save()
         dates.append(invoice.created_on)
     assert dates[0] != dates[1]
+
+
+def test_invoice_details_text(session):
+    """Assert the details labels and values are copied to details_text for searching."""
+    payment_account = factory_payment_account()
+    payment_account.save()
+    invoice = factory_invoice(
+        payment_account=payment_account, details=[{"label": "Registration:", "value": "BC1234567"}]
+    ).save()
+    assert invoice.details_text == "Registration:\nBC1234567"
+
+    invoice.details = [{"label": "Name:", "value": "Test Ltd."}]
+    invoice.save()
+    assert invoice.details_text == "Name:\nTest Ltd."
+
+
+def test_update_invoices_for_revenue_updates(session):
+    """Assert the paid and refunded invoices of the distribution are flagged, over several chunks."""
+    payment_account = factory_payment_account()
+    payment_account.save()
+    distribution_code = factory_distribution_code("Revenue update").save()
+    statuses = [
+        InvoiceStatus.PAID.value,
+        InvoiceStatus.REFUNDED.value,
+        InvoiceStatus.CREATED.value,
+        InvoiceStatus.PAID.value,
+        InvoiceStatus.PAID.value,
+    ]
+    invoices = []
+    for status in statuses:
+        invoice = factory_invoice(payment_account=payment_account, status_code=status).save()
+        # Two line items for an invoice, the invoice is still updated once.
+        for _ in range(2):
+            line_item = factory_payment_line_item(invoice.id, fee_schedule_id=1)
+            line_item.fee_distribution_id = distribution_code.distribution_code_id
+            line_item.save()
+        invoices.append(invoice)
+    other_invoice = factory_invoice(payment_account=payment_account, status_code=InvoiceStatus.PAID.value).save()
+    factory_payment_line_item(other_invoice.id, fee_schedule_id=1).save()
+
+    assert Invoice.update_invoices_for_revenue_updates(distribution_code.distribution_code_id, chunk_size=3) == 4
+
+    assert [Invoice.find_by_id(invoice.id).invoice_status_code for invoice in invoices] == [
+        InvoiceStatus.UPDATE_REVENUE_ACCOUNT.value,
+        InvoiceStatus.UPDATE_REVENUE_ACCOUNT_REFUND.value,
+        InvoiceStatus.CREATED.value,
+        InvoiceStatus.UPDATE_REVENUE_ACCOUNT.value,
+        InvoiceStatus.UPDATE_REVENUE_ACCOUNT.value,
+    ]
+    assert Invoice.find_by_id(other_invoice.id).invoice_status_code == InvoiceStatus.PAID.value
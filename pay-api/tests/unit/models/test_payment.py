@@ -17,7 +17,13 @@
 Test-Suite to ensure that the CorpType Class is working as expected.
 """
 
-from pay_api.models import Payment
+from datetime import datetime
+
+from sqlalchemy.dialects import postgresql
+
+from pay_api.models import Invoice, Payment, db
+from pay_api.utils.util import get_utc_range_for_local_dates
+from tests.utilities.base_test import factory_invoice, factory_payment_account
 
 
 def factory_payment(
@@ -57,3 +63,51 @@ def test_payment_usd_payment(session):
     payment.save()
     assert payment.id is not None
     assert payment.paid_usd_amount == 100
+
+
+def test_filter_date_uses_local_days(session):
+    """Assert the date filter matches invoices by their local (Pacific) day and compares the raw created_on."""
+    payment_account = factory_payment_account()
+    payment_account.save()
+    # 2024-01-02 07:30 UTC is 2024-01-01 23:30 in Vancouver.
+    late_invoice = factory_invoice(payment_account, created_on=datetime(2024, 1, 2, 7, 30)).save()
+    next_day_invoice = factory_invoice(payment_account, created_on=datetime(2024, 1, 2, 8, 30)).save()
+
+    query = db.session.query(Invoice).filter(Invoice.payment_account_id == payment_account.id)
+    search_filter = {"dateFilter": {"startDate": "2024-01-01", "endDate": "2024-01-01"}}
+    invoice_ids = [invoice.id for invoice in Payment.filter_date(query, search_filter).all()]
+    assert invoice_ids == [late_invoice.id]
+
+    search_filter = {"dateFilter": {"startDate": "2024-01-02", "endDate": "2024-01-02"}}
+    invoice_ids = [invoice.id for invoice in Payment.filter_date(query, search_filter).all()]
+    assert invoice_ids == [next_day_invoice.id]
+
+    sql = str(Payment.filter_date(query, search_filter).statement.compile(dialect=db.engine.dialect))
+    assert "timezone" not in sql
+
+
+def test_filter_date_compares_raw_created_on(session):
+    """Assert the date filter compares created_on to UTC bounds, so an index on created_on can be used."""
+    query = db.session.query(Invoice.id)
+    query = Payment.filter_date(query, {"dateFilter": {"startDate": "2023-02-01", "endDate": "2023-02-02"}})
+    compiled = query.statement.compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert "timezone(" not in sql.lower()
+    assert "invoices.created_on >= %(created_on_1)s" in sql
+    assert "invoices.created_on < %(created_on_2)s" in sql
+    utc_start, utc_end = get_utc_range_for_local_dates(datetime(2023, 2, 1), datetime(2023, 2, 2))
+    assert compiled.params["created_on_1"] == utc_start
+    assert compiled.params["created_on_2"] == utc_end
+
+
+def test_filter_identifier_prefix(session):
+    """Assert identifier like criteria use a prefix match and other criteria a substring match."""
+    payment_account = factory_payment_account()
+    payment_account.save()
+    invoice = factory_invoice(payment_account, business_identifier="BC1234567").save()
+    factory_invoice(payment_account, business_identifier="C1234567").save()
+
+    query = db.session.query(Invoice).filter(Invoice.payment_account_id == payment_account.id)
+    invoice_ids = [i.id for i in query.filter_identifier("bc1234567", Invoice.business_identifier).all()]
+    assert invoice_ids == [invoice.id]
+    assert len(query.filter_identifier("1234567", Invoice.business_identifier).all()) == 2
@@ -0,0 +1,69 @@
+# Copyright © 2024 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests to assure the schema utilities.
+
+Test-Suite to ensure that the request schemas are validated as expected.
+"""
+import threading
+from os import path
+
+from pay_api.schemas import utils as schema_utils
+from tests.utilities.base_test import get_payment_request
+
+SCHEMA_SEARCH_PATH = path.join(path.dirname(schema_utils.__file__), "schemas")
+
+
+def test_all_schemas_are_valid():
+    """Assert every schema is loaded and passes the schema check."""
+    schema_store = schema_utils.get_default_schema_store()
+    assert f"{schema_utils.BASE_URI}/payment_request" in schema_store
+    assert schema_utils.get_default_schema_store() is schema_store
+
+
+def test_validator_is_reused():
+    """Assert the validator is compiled once and gives the same result as loading the schemas."""
+    assert schema_utils.get_validator("payment_request") is schema_utils.get_validator("payment_request")
+
+    valid, _ = schema_utils.validate(get_payment_request(), "payment_request")
+    assert valid
+    invalid_request = {"businessInfo": {"corpType": "CP"}}
+    valid, errors = schema_utils.validate(invalid_request, "payment_request")
+    _, loaded_errors = schema_utils.validate(invalid_request, "payment_request", schema_search_path=SCHEMA_SEARCH_PATH)
+    assert not valid
+    assert schema_utils.serialize(errors) == schema_utils.serialize(loaded_errors)
+
+
+def test_validator_is_cached_per_thread():
+    """Assert each thread compiles its own validator once and keeps reusing it."""
+    schema_store = schema_utils.get_default_schema_store()
+    validator = schema_utils.get_validator("payment_request")
+    thread_validators = []
+
+    def validate_in_thread():
+        for _ in range(3):
+            schema_utils.validate(get_payment_request(), "payment_request")
+            thread_validators.append(schema_utils.get_validator("payment_request"))
+
+    thread = threading.Thread(target=validate_in_thread)
+    thread.start()
+    thread.join()
+
+    assert len(thread_validators) == 3
+    assert thread_validators[0] is not validator
+    assert all(thread_validator is thread_validators[0] for thread_validator in thread_validators)
+    assert schema_utils.get_validator("payment_request") is validator
+    # The schema store is shared between the threads.
+    assert schema_utils.get_default_schema_store() is schema_store
+    assert schema_utils.get_default_schema_store.cache_info().currsize == 1
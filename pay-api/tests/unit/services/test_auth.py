@@ -16,11 +16,12 @@
 
 Test-Suite to ensure that the auth Service is working as expected.
 """
+from unittest.mock import Mock, patch
 
 import pytest
 from werkzeug.exceptions import HTTPException
 
-from pay_api.services.auth import check_auth
+from pay_api.services.auth import authorization_cache, check_auth
 from pay_api.utils.constants import EDIT_ROLE, VIEW_ROLE
 
 
@@ -77,3 +78,29 @@ def test_auth_for_client_user_roles_for_error(session, public_user_mock, roles,
     with pytest.raises(HTTPException) as excinfo:
         check_auth("CP0000000", param_name=roles)
         assert excinfo.exception.code == 403
+
+
+def test_auth_authorizations_are_cached_per_token(session, app, monkeypatch):
+    """Assert authorization lookups are cached for the same token and never shared with another token."""
+    tokens = {"current": "token-a"}
+    monkeypatch.setattr("pay_api.utils.user_context._get_token", lambda: tokens["current"])
+    monkeypatch.setattr(
+        "pay_api.utils.user_context._get_token_info",
+        lambda: {"username": "user", "sub": "sub", "realm_access": {"roles": ["public_user", "edit"]}},
+    )
+    monkeypatch.setitem(app.config, "AUTH_CACHE_TTL_SECONDS", 60)
+    authorization_cache.clear()
+    auth_response = Mock()
+    auth_response.json.return_value = {"roles": [EDIT_ROLE], "account": {"id": "1234"}}
+    with patch("pay_api.services.auth.RestService.get", return_value=auth_response) as mock_get:
+        check_auth(None, account_id="1234", one_of_roles=[EDIT_ROLE])
+        check_auth(None, account_id="1234", one_of_roles=[EDIT_ROLE])
+        assert mock_get.call_count == 1
+
+        tokens["current"] = "token-b"
+        check_auth(None, account_id="1234", one_of_roles=[EDIT_ROLE])
+        assert mock_get.call_count == 2
+
+    assert authorization_cache.stats()["hits"] == 1
+    assert authorization_cache.stats()["misses"] == 2
+    authorization_cache.clear()
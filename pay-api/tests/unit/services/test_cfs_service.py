@@ -35,7 +35,7 @@ def test_validate_bank_account_valid(session):
         "bankTransitNumber": "00720",
         "bankAccountNumber": "1234567",
     }
-    with patch("pay_api.services.oauth_service.requests.post") as mock_post:
+    with patch("pay_api.services.http_session_pool.requests.Session.post") as mock_post:
         # Configure the mock to return a response with an OK status code.
         mock_post.return_value.ok = True
         mock_post.return_value.status_code = 200
@@ -63,7 +63,7 @@ def test_validate_bank_account_invalid(session):
         "bankTransitNumber": "00720",
         "bankAccountNumber": "1234567",
     }
-    with patch("pay_api.services.oauth_service.requests.post") as mock_post:
+    with patch("pay_api.services.http_session_pool.requests.Session.post") as mock_post:
         # Configure the mock to return a response with an OK status code.
         mock_post.return_value.ok = True
         mock_post.return_value.status_code = 400
@@ -96,7 +96,7 @@ def test_validate_bank_account_exception(session):
         "bankAccountNumber": 33333333,
     }
     with patch(
-        "pay_api.services.oauth_service.requests.post",
+        "pay_api.services.http_session_pool.requests.Session.post",
         side_effect=ConnectTimeout("mocked error"),
     ):
         # Configure the mock to return a response with an OK status code.
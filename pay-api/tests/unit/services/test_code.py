@@ -17,7 +17,9 @@
 Test-Suite to ensure that the Code Service is working as expected.
 """
 
+from pay_api.models import CorpType, db
 from pay_api.services.code import Code as CodeService
+from pay_api.services.code_registry import code_registry
 from pay_api.utils.cache import cache
 from pay_api.utils.enums import Code
 
@@ -25,8 +27,8 @@ from pay_api.utils.enums import Code
 def test_build_cache(session):
     """Assert that code cache is built."""
     CodeService.build_all_codes_cache()
-    assert cache is not None
-    assert cache.get(Code.ERROR.value) is not None
+    assert code_registry.find_all(Code.ERROR.value) is not None
+    assert code_registry.find_all(Code.CORP_TYPE.value) is not None
 
 
 def test_find_code_values_by_type(session):
@@ -58,3 +60,15 @@ def test_find_payment_types_code_values(session):
     codes = CodeService.find_code_values_by_type(Code.INVOICE_STATUS.value)
     assert codes is not None
     assert len(codes) > 0
+
+
+def test_code_registry_refreshes_on_code_change(session):
+    """Assert that code lookups are served from the registry and reloaded when a code table changes."""
+    corp_type = CorpType.find_by_code("CP")
+    assert CodeService.find_code_value_by_type_and_code(Code.CORP_TYPE.value, "CP").get("code") == "CP"
+
+    corp_type.description = "Registry Test Cooperative"
+    db.session.flush()
+    code = CodeService.find_code_value_by_type_and_code(Code.CORP_TYPE.value, "CP")
+    assert code.get("description") == "Registry Test Cooperative"
+    assert CodeService.find_code_value_by_type_and_code(Code.CORP_TYPE.value, "NOT_A_CODE") == {}
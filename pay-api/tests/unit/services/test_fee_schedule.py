@@ -253,6 +253,50 @@ def test_fee_schedule_with_service_fees_for_basic_user(session):
     assert fee_schedule.service_fees == 10
 
 
+def test_fee_schedule_index_refreshes_on_fee_code_change(session):
+    """Assert that the in memory fee schedule index picks up fee code changes."""
+    create_linked_data(FILING_TYPE_CODE, CORP_TYPE_CODE, FEE_CODE)
+    FeesScheduleModel(filing_type_code=FILING_TYPE_CODE, corp_type_code=CORP_TYPE_CODE, fee_code=FEE_CODE).save()
+
+    fee_schedule = services.FeeSchedule.find_by_corp_type_and_filing_type(CORP_TYPE_CODE, FILING_TYPE_CODE, None)
+    assert fee_schedule.fee_amount == 100
+
+    fee_code = FeeCode.find_by_code(FEE_CODE)
+    fee_code.amount = 150
+    fee_code.save()
+
+    fee_schedule = services.FeeSchedule.find_by_corp_type_and_filing_type(CORP_TYPE_CODE, FILING_TYPE_CODE, None)
+    assert fee_schedule.fee_amount == 150
+
+
+def test_fee_schedule_index_effective_dates(session):
+    """Assert that the in memory fee schedule index resolves the schedule effective on the valid date."""
+    create_linked_data(FILING_TYPE_CODE, CORP_TYPE_CODE, FEE_CODE)
+    FeeCode(code="EN102X", amount=200).save()
+    today = datetime.now(tz=timezone.utc).date()
+    FeesScheduleModel(
+        filing_type_code=FILING_TYPE_CODE,
+        corp_type_code=CORP_TYPE_CODE,
+        fee_code=FEE_CODE,
+        fee_start_date=today - timedelta(days=30),
+        fee_end_date=today - timedelta(days=1),
+    ).save()
+    FeesScheduleModel(
+        filing_type_code=FILING_TYPE_CODE,
+        corp_type_code=CORP_TYPE_CODE,
+        fee_code="EN102X",
+        fee_start_date=today,
+    ).save()
+
+    old_fee = services.FeeSchedule.find_by_corp_type_and_filing_type(
+        CORP_TYPE_CODE, FILING_TYPE_CODE, (today - timedelta(days=10)).strftime("%Y-%m-%d")
+    )
+    new_fee = services.FeeSchedule.find_by_corp_type_and_filing_type(CORP_TYPE_CODE, FILING_TYPE_CODE, today)
+
+    assert old_fee.fee_amount == 100
+    assert new_fee.fee_amount == 200
+
+
 def create_linked_data(
     filing_type_code: str,
     corp_type_code: str,
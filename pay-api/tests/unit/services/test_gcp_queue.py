@@ -16,6 +16,7 @@
 
 Test-Suite to ensure that the GCP Queue Service layer is working as expected.
 """
+from concurrent.futures import Future
 from dataclasses import asdict
 from unittest.mock import ANY, MagicMock, patch
 
@@ -25,8 +26,9 @@ from dotenv import load_dotenv
 from gcp_queue.gcp_queue import GcpQueue
 
 from pay_api import create_app
+from pay_api.models import QueueOutbox as QueueOutboxModel
 from pay_api.services import gcp_queue_publisher
-from pay_api.services.gcp_queue_publisher import QueueMessage, publish_to_queue
+from pay_api.services.gcp_queue_publisher import BatchPublisher, QueueMessage, publish_outbox, publish_to_queue
 from pay_api.services.payment_transaction import PaymentToken
 from pay_api.utils.enums import TransactionStatus
 
@@ -75,6 +77,59 @@ def test_publish_to_queue_no_topic(app, mock_credentials, mock_publisher_client)
             mock_publisher.publish.assert_not_called()
 
 
+def _future(exception: Exception = None) -> Future:
+    future = Future()
+    if exception:
+        future.set_exception(exception)
+    else:
+        future.set_result("message-id")
+    return future
+
+
+def _queue_message(ordering_key=None) -> QueueMessage:
+    return QueueMessage(
+        source="test-source",
+        message_type="test-message-type",
+        payload={"key": "value"},
+        topic="projects/project-id/topics/topic",
+        ordering_key=ordering_key,
+    )
+
+
+def test_batch_publisher(app, mock_credentials, mock_publisher_client):
+    """Test the batch publisher returns the futures and reports the failed messages."""
+    failed_future = _future(Exception("publish failed"))
+    mock_publisher_client.publish.side_effect = [_future(), failed_future]
+    with app.app_context():
+        publisher = BatchPublisher()
+        assert publisher.publish(_queue_message()).result() == "message-id"
+        publisher.publish(_queue_message(ordering_key="1"))
+
+        assert publisher.wait() == [failed_future]
+        mock_publisher_client.resume_publish.assert_called_once_with("projects/project-id/topics/topic", "1")
+        assert publisher.wait() == []
+        mock_publisher_client.stop.assert_not_called()
+
+        assert publisher.close() == []
+        mock_publisher_client.stop.assert_called_once()
+
+
+def test_publish_to_outbox(session, mock_credentials, mock_publisher_client):
+    """Test messages in the outbox are only published by publish_outbox."""
+    mock_publisher_client.publish.side_effect = [_future(), _future(Exception("publish failed"))]
+    with patch.object(GcpQueue, "publish") as mock_publisher:
+        publish_to_queue(_queue_message(), use_outbox=True)
+        publish_to_queue(_queue_message(ordering_key="1"), use_outbox=True)
+        mock_publisher.assert_not_called()
+    assert QueueOutboxModel.query.count() == 2
+
+    assert publish_outbox() == 1
+    assert mock_publisher_client.publish.call_count == 2
+    mock_publisher_client.stop.assert_called_once()
+    remaining = QueueOutboxModel.query.one()
+    assert remaining.ordering_key == "1"
+
+
 @pytest.mark.skip(reason="ADHOC only test.")
 def test_gcp_pubsub_connectivity(monkeypatch):
     """Test that a queue can publish to gcp pubsub."""
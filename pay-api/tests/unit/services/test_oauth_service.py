@@ -22,14 +22,17 @@ import pytest
 from requests.exceptions import ConnectionError, ConnectTimeout, HTTPError
 
 from pay_api.exceptions import ServiceUnavailableException
+from pay_api.services.cfs_service import CFSService
+from pay_api.services.http_session_pool import http_session_pool
 from pay_api.services.oauth_service import OAuthService
+from pay_api.services.oauth_token_cache import oauth_token_cache
 from pay_api.utils.enums import AuthHeaderType, ContentType
 
 
 def test_get(app):
     """Test Get."""
     with app.app_context():
-        mock_get_token = patch("pay_api.services.oauth_service.requests.Session.get")
+        mock_get_token = patch("pay_api.services.http_session_pool.requests.Session.get")
         mock_get = mock_get_token.start()
         mock_get.return_value = Mock(status_code=201)
         mock_get.return_value.json.return_value = {}
@@ -44,7 +47,7 @@ def test_get(app):
 def test_post(app):
     """Test Post."""
     with app.app_context():
-        mock_get_token = patch("pay_api.services.oauth_service.requests.post")
+        mock_get_token = patch("pay_api.services.http_session_pool.requests.Session.post")
         mock_get = mock_get_token.start()
         mock_get.return_value = Mock(status_code=201)
         mock_get.return_value.json.return_value = {}
@@ -59,7 +62,7 @@ def test_post(app):
 def test_get_with_connection_errors(app):
     """Test Get with errors."""
     with app.app_context():
-        mock_get_token = patch("pay_api.services.oauth_service.requests.Session.get")
+        mock_get_token = patch("pay_api.services.http_session_pool.requests.Session.get")
         mock_get = mock_get_token.start()
         mock_get.side_effect = HTTPError()
         mock_get.return_value.json.return_value = {}
@@ -69,14 +72,14 @@ def test_get_with_connection_errors(app):
         mock_get_token.stop()
 
         with patch(
-            "pay_api.services.oauth_service.requests.Session.get",
+            "pay_api.services.http_session_pool.requests.Session.get",
             side_effect=ConnectionError("mocked error"),
         ):
             with pytest.raises(ServiceUnavailableException) as excinfo:
                 OAuthService.get("http://google.com/", "", AuthHeaderType.BEARER, ContentType.JSON)
             assert excinfo.type == ServiceUnavailableException
         with patch(
-            "pay_api.services.oauth_service.requests.Session.get",
+            "pay_api.services.http_session_pool.requests.Session.get",
             side_effect=ConnectTimeout("mocked error"),
         ):
             with pytest.raises(ServiceUnavailableException) as excinfo:
@@ -87,7 +90,7 @@ def test_get_with_connection_errors(app):
 def test_post_with_connection_errors(app):
     """Test Get with errors."""
     with app.app_context():
-        mock_get_token = patch("pay_api.services.oauth_service.requests.post")
+        mock_get_token = patch("pay_api.services.http_session_pool.requests.Session.post")
         mock_get = mock_get_token.start()
         mock_get.side_effect = HTTPError()
         mock_get.return_value.json.return_value = {}
@@ -97,7 +100,7 @@ def test_post_with_connection_errors(app):
         mock_get_token.stop()
 
         with patch(
-            "pay_api.services.oauth_service.requests.post",
+            "pay_api.services.http_session_pool.requests.Session.post",
             side_effect=ConnectionError("mocked error"),
         ):
             with pytest.raises(ServiceUnavailableException) as excinfo:
@@ -110,7 +113,7 @@ def test_post_with_connection_errors(app):
                 )
             assert excinfo.type == ServiceUnavailableException
         with patch(
-            "pay_api.services.oauth_service.requests.post",
+            "pay_api.services.http_session_pool.requests.Session.post",
             side_effect=ConnectTimeout("mocked error"),
         ):
             with pytest.raises(ServiceUnavailableException) as excinfo:
@@ -122,3 +125,55 @@ def test_post_with_connection_errors(app):
                     {},
                 )
             assert excinfo.type == ServiceUnavailableException
+
+
+def test_client_credentials_token_is_cached(app):
+    """Assert the CFS token is reused until it expires and refreshed once when rejected."""
+    with app.app_context():
+        oauth_token_cache.invalidate()
+        token_responses = [
+            Mock(status_code=200, json=Mock(return_value={"access_token": "first", "expires_in": 3600})),
+            Mock(status_code=200, json=Mock(return_value={"access_token": "second", "expires_in": 3600})),
+        ]
+        with patch(
+            "pay_api.services.http_session_pool.requests.Session.post", side_effect=token_responses
+        ) as mock_post:
+            assert CFSService.get_token().json().get("access_token") == "first"
+            assert CFSService.get_token().json().get("access_token") == "first"
+            assert mock_post.call_count == 1
+
+        unauthorized = Mock(status_code=401)
+        unauthorized.raise_for_status.side_effect = HTTPError(response=unauthorized)
+        success = Mock(status_code=200)
+        success.json.return_value = {}
+        with patch("pay_api.services.http_session_pool.requests.Session.post", side_effect=token_responses[1:]):
+            with patch("pay_api.services.http_session_pool.requests.Session.get", side_effect=[unauthorized, success]):
+                response = OAuthService.get("http://google.com/", "first", AuthHeaderType.BEARER, ContentType.JSON)
+        assert response is success
+        assert CFSService.get_token().json().get("access_token") == "second"
+        oauth_token_cache.invalidate()
+
+
+def test_sessions_are_pooled_per_host(app):
+    """Assert calls to the same host share a session and are counted."""
+    with app.app_context():
+        http_session_pool.close()
+        assert http_session_pool.session_for("https://host-a/api/v1/one") is http_session_pool.session_for(
+            "https://host-a/api/v1/two"
+        )
+        assert http_session_pool.session_for("https://host-a/") is not http_session_pool.session_for("https://host-b/")
+        assert http_session_pool.session_for("https://host-a/") is not http_session_pool.session_for(
+            "https://host-a/", retry_on_failure=True
+        )
+
+        with patch("pay_api.services.http_session_pool.requests.Session.get") as mock_get:
+            mock_get.return_value = Mock(status_code=200, ok=True)
+            OAuthService.get("https://host-a/api/v1/one", "", AuthHeaderType.BEARER, ContentType.JSON)
+            mock_get.side_effect = ConnectionError("mocked error")
+            with pytest.raises(ServiceUnavailableException):
+                OAuthService.get("https://host-a/api/v1/two", "", AuthHeaderType.BEARER, ContentType.JSON)
+
+        stats = http_session_pool.stats()["https://host-a"]
+        assert stats["requests"] == 2
+        assert stats["errors"] == 1
+        http_session_pool.close()
@@ -21,8 +21,11 @@ from datetime import datetime, timezone
 import pytest
 import pytz
 
+from pay_api.models import Invoice as InvoiceModel
+from pay_api.models.invoice import InvoiceSearchModel
 from pay_api.models.payment_account import PaymentAccount
 from pay_api.services.payment import Payment as Payment_service
+from pay_api.utils.converter import Converter
 from pay_api.utils.enums import InvoiceReferenceStatus, InvoiceStatus, PaymentMethod
 from pay_api.utils.util import current_local_time
 from tests.utilities.base_test import (
@@ -310,6 +313,45 @@ def test_search_payment_history_for_all(session):
     assert results.get("total") == 10
 
 
+def test_search_payment_history_by_cursor(session):
+    """Assert that the cursor (keyset) pagination walks the purchase history without gaps or duplicates."""
+    payment_account = factory_payment_account()
+    payment_account.save()
+    auth_account_id = PaymentAccount.find_by_id(payment_account.id).auth_account_id
+
+    invoice_ids = []
+    for _ in range(7):
+        invoice = factory_invoice(payment_account)
+        invoice.save()
+        factory_invoice_reference(invoice.id).save()
+        invoice_ids.append(invoice.id)
+    invoice_ids.sort(reverse=True)
+
+    first_page = Payment_service.search_purchase_history_by_cursor(
+        auth_account_id=auth_account_id, search_filter={}, limit=3, count_mode="exact"
+    )
+    assert [item["id"] for item in first_page["items"]] == invoice_ids[:3]
+    assert first_page["total"] == 7
+    assert first_page["before_id"] is None
+
+    second_page = Payment_service.search_purchase_history_by_cursor(
+        auth_account_id=auth_account_id, search_filter={}, limit=3, after_id=first_page["after_id"]
+    )
+    assert [item["id"] for item in second_page["items"]] == invoice_ids[3:6]
+    assert second_page["total"] is None
+
+    last_page = Payment_service.search_purchase_history_by_cursor(
+        auth_account_id=auth_account_id, search_filter={}, limit=3, after_id=second_page["after_id"]
+    )
+    assert [item["id"] for item in last_page["items"]] == invoice_ids[6:]
+    assert last_page["after_id"] is None
+
+    previous_page = Payment_service.search_purchase_history_by_cursor(
+        auth_account_id=auth_account_id, search_filter={}, limit=3, before_id=last_page["before_id"]
+    )
+    assert [item["id"] for item in previous_page["items"]] == invoice_ids[3:6]
+
+
 def test_create_payment_report_csv(session, rest_call_mock):
     """Assert that the create payment report is working."""
     payment_account = factory_payment_account()
@@ -681,3 +723,29 @@ def test_payment_usd(session):
     assert p.payment_method_code is not None
     assert p.payment_status_code is not None
     assert p.paid_usd_amount == 100
+
+
+def test_purchase_history_serialization(session):
+    """Assert the purchase history fast path matches the converter output."""
+    payment_account = factory_payment_account()
+    payment_account.save()
+    for i in range(50):
+        invoice = factory_invoice(
+            payment_account,
+            business_identifier="T1234567" if i % 2 else "CP0001234",
+            status_code=InvoiceStatus.PAID.value if i % 3 else InvoiceStatus.CREATED.value,
+            total=10 + i,
+            details=[{"label": "label1", "value": f"value{i}"}] if i % 2 else None,
+        )
+        invoice.save()
+        if i % 2:
+            factory_invoice_reference(invoice.id, invoice_number=f"REG{i:08}").save()
+        factory_payment_line_item(invoice_id=invoice.id, fee_schedule_id=1, description=f"test{i}").save()
+    purchases = InvoiceModel.query.filter(InvoiceModel.payment_account_id == payment_account.id).all()
+
+    expected = [
+        Converter.remove_nones(invoice_dict)
+        for invoice_dict in Converter().unstructure([InvoiceSearchModel.from_row(row) for row in purchases])
+    ]
+    results = Payment_service.create_payment_report_details(purchases, {"items": []})
+    assert results["items"] == expected
@@ -141,7 +141,7 @@ def test_create_payment_record_rollback_on_paybc_connection_error(session, publi
 
     # Mock here that the invoice update fails here to test the rollback scenario
     with patch(
-        "pay_api.services.oauth_service.requests.post",
+        "pay_api.services.http_session_pool.requests.Session.post",
         side_effect=ConnectionError("mocked error"),
     ):
         with pytest.raises(ServiceUnavailableException) as excinfo:
@@ -149,7 +149,7 @@ def test_create_payment_record_rollback_on_paybc_connection_error(session, publi
         assert excinfo.type == ServiceUnavailableException
 
     with patch(
-        "pay_api.services.oauth_service.requests.post",
+        "pay_api.services.http_session_pool.requests.Session.post",
         side_effect=ConnectTimeout("mocked error"),
     ):
         with pytest.raises(ServiceUnavailableException) as excinfo:
@@ -157,7 +157,7 @@ def test_create_payment_record_rollback_on_paybc_connection_error(session, publi
         assert excinfo.type == ServiceUnavailableException
 
     with patch(
-        "pay_api.services.oauth_service.requests.post",
+        "pay_api.services.http_session_pool.requests.Session.post",
         side_effect=HTTPError("mocked error"),
     ) as post_mock:
         post_mock.status_Code = 503
@@ -408,13 +408,13 @@ def test_transaction_update_on_paybc_connection_error(session):
 
     # Mock here that the invoice update fails here to test the rollback scenario
     with patch(
-        "pay_api.services.oauth_service.requests.post",
+        "pay_api.services.http_session_pool.requests.Session.post",
         side_effect=ConnectionError("mocked error"),
     ):
         transaction = PaymentTransactionService.update_transaction(transaction.id, pay_response_url=None)
         assert transaction.pay_system_reason_code == "SERVICE_UNAVAILABLE"
     with patch(
-        "pay_api.services.oauth_service.requests.post",
+        "pay_api.services.http_session_pool.requests.Session.post",
         side_effect=ConnectTimeout("mocked error"),
     ):
         transaction = PaymentTransactionService.update_transaction(transaction.id, pay_response_url=None)
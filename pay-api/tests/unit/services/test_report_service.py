@@ -0,0 +1,106 @@
+# Copyright © 2024 Province of British Columbia
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests to assure the Report Service.
+
+Test-Suite to ensure that the Report Service is working as expected.
+"""
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+import pytest
+
+from pay_api.exceptions import BusinessException
+from pay_api.models import ReportJob as ReportJobModel
+from pay_api.services.oauth_service import OAuthService
+from pay_api.services.report_service import ReportRequest, ReportService
+from pay_api.utils.enums import ContentType, ReportJobStatus
+from pay_api.utils.errors import Error
+
+
+def _report_request(cacheable: bool) -> ReportRequest:
+    return ReportRequest(
+        report_name="test-report",
+        template_name="invoice",
+        template_vars={"invoiceNumber": "REG00001"},
+        populate_page_number=True,
+        content_type=ContentType.PDF.value,
+        cacheable=cacheable,
+    )
+
+
+def test_cacheable_report_is_rendered_once(session):
+    """Assert a cacheable report is only sent to report-api the first time."""
+    with patch.object(OAuthService, "post", return_value=Mock(content=b"report")) as mock_post:
+        assert ReportService.get_report_response(_report_request(cacheable=True)) == b"report"
+        assert ReportService.get_report_response(_report_request(cacheable=True)) == b"report"
+        assert mock_post.call_count == 1
+
+
+def test_report_is_not_cached(session):
+    """Assert a report that isn't cacheable is always sent to report-api."""
+    with patch.object(OAuthService, "post", return_value=Mock(content=b"report")) as mock_post:
+        ReportService.get_report_response(_report_request(cacheable=False))
+        ReportService.get_report_response(_report_request(cacheable=False))
+        assert mock_post.call_count == 2
+    assert ReportJobModel.query.count() == 0
+
+
+def test_report_job(session):
+    """Assert a report job stores the rendered report."""
+    report_job = ReportService.submit_report_job(
+        auth_account_id="1234", content_type=ContentType.CSV.value, render=lambda: (b"a,b", "test.csv")
+    )
+    assert report_job["status"] == ReportJobStatus.COMPLETED.value
+    assert ReportService.find_report_job("1234", report_job["id"])["report_name"] == "test.csv"
+    assert ReportService.get_report_job_content("1234", report_job["id"]).content == b"a,b"
+
+    with pytest.raises(BusinessException) as excinfo:
+        ReportService.find_report_job("5678", report_job["id"])
+    assert excinfo.value.code == Error.REPORT_JOB_NOT_FOUND.name
+
+
+def test_failed_report_job(session):
+    """Assert a failed report job records the error and has no content to download."""
+
+    def render():
+        raise ValueError("report-api unavailable")
+
+    report_job = ReportService.submit_report_job(
+        auth_account_id="1234", content_type=ContentType.PDF.value, render=render
+    )
+    assert report_job["status"] == ReportJobStatus.FAILED.value
+    assert report_job["error_message"] == "report-api unavailable"
+
+    with pytest.raises(BusinessException) as excinfo:
+        ReportService.get_report_job_content("1234", report_job["id"])
+    assert excinfo.value.code == Error.REPORT_JOB_NOT_COMPLETED.name
+
+
+def test_stale_report_job_is_failed(session):
+    """Assert a report job pending past the timeout is reported as failed."""
+    stale_job = ReportJobModel(
+        auth_account_id="1234",
+        content_type=ContentType.PDF.value,
+        created_on=datetime.now(tz=timezone.utc) - timedelta(hours=2),
+        status_code=ReportJobStatus.PENDING.value,
+    ).save()
+    pending_job = ReportJobModel(
+        auth_account_id="1234", content_type=ContentType.PDF.value, status_code=ReportJobStatus.PENDING.value
+    ).save()
+
+    report_job = ReportService.find_report_job("1234", stale_job.id)
+    assert report_job["status"] == ReportJobStatus.FAILED.value
+    assert report_job["error_message"] == "Report job timed out."
+    assert ReportService.find_report_job("1234", pending_job.id)["status"] == ReportJobStatus.PENDING.value
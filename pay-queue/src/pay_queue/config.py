@@ -106,11 +106,15 @@ class _Config:  # pylint: disable=too-few-public-methods,protected-access
 
     DISABLE_EJV_ERROR_EMAIL = os.getenv("DISABLE_EJV_ERROR_EMAIL", "true").lower() == "true"
     DISABLE_CSV_ERROR_EMAIL = os.getenv("DISABLE_CSV_ERROR_EMAIL", "true").lower() == "true"
+    # Settlement file rows prefetched and committed together.
+    CAS_SETTLEMENT_BATCH_SIZE = int(os.getenv("CAS_SETTLEMENT_BATCH_SIZE", "500"))
 
     # PUB/SUB - PUB: account-mailer-dev, auth-event-dev, SUB to ftp-poller-payment-reconciliation-dev, business-events
     ACCOUNT_MAILER_TOPIC = os.getenv("ACCOUNT_MAILER_TOPIC", "account-mailer-dev")
     AUTH_EVENT_TOPIC = os.getenv("AUTH_EVENT_TOPIC", "auth-event-dev")
     GCP_AUTH_KEY = os.getenv("AUTHPAY_GCP_AUTH_KEY", None)
+    # Payment events are written to the queue outbox with the reconciliation and published by the QUEUE_OUTBOX job.
+    PAYMENT_EVENTS_USE_OUTBOX = os.getenv("PAYMENT_EVENTS_USE_OUTBOX", "false").lower() == "true"
     # If blank in PUBSUB, this should match the https endpoint the subscription is pushing to.
     PAY_AUDIENCE_SUB = os.getenv("PAY_AUDIENCE_SUB", None)
     VERIFY_PUBSUB_EMAILS = f'{os.getenv("AUTHPAY_SERVICE_ACCOUNT")},{os.getenv("BUSINESS_SERVICE_ACCOUNT")}'.split(",")
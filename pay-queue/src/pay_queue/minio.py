@@ -12,24 +12,49 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Minio util functions."""
+import io
+from functools import lru_cache
+from typing import Iterator
 
 from flask import current_app
 from minio import Minio
 from urllib3 import HTTPResponse
 
 
+@lru_cache(maxsize=4)
+def _get_client(endpoint: str, access_key: str, secret_key: str, secure: bool) -> Minio:
+    """Return a Minio client, clients are thread safe and reused across files."""
+    return Minio(endpoint, access_key=access_key, secret_key=secret_key, secure=secure)
+
+
 def get_object(bucket_name: str, file_name: str) -> HTTPResponse:
-    """Return a pre-signed URL for new doc upload."""
-    current_app.logger.debug(f"Creating pre-signed URL for {file_name}")
-    minio_endpoint = current_app.config["MINIO_ENDPOINT"]
-    minio_key = current_app.config["MINIO_ACCESS_KEY"]
-    minio_secret = current_app.config["MINIO_ACCESS_SECRET"]
-
-    minio_client: Minio = Minio(
-        minio_endpoint,
-        access_key=minio_key,
-        secret_key=minio_secret,
-        secure=current_app.config["MINIO_SECURE"],
+    """Return the object, the caller is responsible for closing the response and releasing the connection."""
+    current_app.logger.debug(f"Getting object {file_name} from {bucket_name}")
+    minio_client: Minio = _get_client(
+        current_app.config["MINIO_ENDPOINT"],
+        current_app.config["MINIO_ACCESS_KEY"],
+        current_app.config["MINIO_ACCESS_SECRET"],
+        current_app.config["MINIO_SECURE"],
     )
-
     return minio_client.get_object(bucket_name, file_name)
+
+
+def iter_object_lines(bucket_name: str, file_name: str) -> Iterator[str]:
+    """Return an iterator over the lines of a text object, read as they are downloaded.
+
+    The whole file is never held in memory, the response is released once iteration ends.
+    """
+    response = get_object(bucket_name, file_name)
+    return _iter_response_lines(response)
+
+
+def _iter_response_lines(response: HTTPResponse) -> Iterator[str]:
+    # Let the text wrapper control closing, otherwise the response closes itself once the body is read.
+    response.auto_close = False
+    try:
+        with io.TextIOWrapper(response, encoding="utf-8-sig", newline=None) as reader:
+            for line in reader:
+                yield line.rstrip("\n")
+    finally:
+        response.close()
+        response.release_conn()
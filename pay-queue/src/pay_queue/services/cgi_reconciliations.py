@@ -15,7 +15,7 @@
 import os
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from flask import current_app
 from pay_api.models import DistributionCode as DistributionCodeModel
@@ -51,7 +51,7 @@ from sbc_common_components.utils.enums import QueueMessageTypes
 from sentry_sdk import capture_message
 
 from pay_queue import config
-from pay_queue.minio import get_object
+from pay_queue.minio import iter_object_lines
 
 APP_CONFIG = config.get_named_config(os.getenv("DEPLOYMENT_ENV", "production"))
 
@@ -78,26 +78,29 @@ def _update_feedback(msg: Dict[str, any]):  # pylint:disable=too-many-locals, to
 
     file_name: str = msg.get("fileName")
     minio_location: str = msg.get("location")
-    file = get_object(minio_location, file_name)
-    content = file.data.decode("utf-8-sig")
-    group_batches: List[str] = _group_batches(content)
-
-    if _is_processed_or_processing(group_batches["EJV"], file_name):
+    # The file is streamed twice rather than held in memory, only one batch is kept at a time.
+    if _is_processed_or_processing(_iter_batches(iter_object_lines(minio_location, file_name)), file_name):
         return
 
-    has_errors = _process_ejv_feedback(group_batches["EJV"])
-    has_errors = _process_ap_feedback(group_batches["AP"]) or has_errors
+    has_errors = False
+    for is_ejv, batch_lines in _iter_batches(iter_object_lines(minio_location, file_name)):
+        if is_ejv:
+            has_errors = _process_ejv_feedback([batch_lines]) or has_errors
+        else:
+            has_errors = _process_ap_feedback([batch_lines]) or has_errors
 
     if has_errors and not APP_CONFIG.DISABLE_EJV_ERROR_EMAIL:
         _publish_mailer_events(file_name, minio_location)
     current_app.logger.info("Feedback file processing completed.")
 
 
-def _is_processed_or_processing(group_batches, file_name) -> bool:
+def _is_processed_or_processing(batches: Iterable[Tuple[bool, List[str]]], file_name) -> bool:
     """Check to see if file has already been processed. Mark them as processing."""
-    for group_batch in group_batches:
+    for is_ejv, group_batch in batches:
+        if not is_ejv:
+            continue
         ejv_file: Optional[EjvFileModel] = None
-        for line in group_batch.splitlines():
+        for line in group_batch:
             is_batch_group: bool = line[2:4] == "BG"
             if is_batch_group:
                 batch_number = int(line[15:24])
@@ -120,7 +123,7 @@ def _process_ejv_feedback(group_batches) -> bool:  # pylint:disable=too-many-loc
     for group_batch in group_batches:
         ejv_file: Optional[EjvFileModel] = None
         receipt_number: Optional[str] = None
-        for line in group_batch.splitlines():
+        for line in group_batch:
             # For all these indexes refer the sharepoint docs refer : https://github.com/bcgov/entity/issues/6226
             is_batch_group = line[2:4] == "BG"
             is_batch_header = line[2:4] == "BH"
@@ -358,29 +361,23 @@ def _create_payment_record(amount, ejv_header, receipt_number):
     ).flush()
 
 
-def _group_batches(content: str) -> Dict[str, List]:
-    """Group batches based on the group and trailer."""
-    # A batch starts from BG to BT.
-    group_batches: Dict[str, List] = {"EJV": [], "AP": []}
-    batch_content: str = ""
+def _iter_batches(lines: Iterable[str]) -> Iterator[Tuple[bool, List[str]]]:
+    """Yield (is_ejv, lines) for each batch as it is read, a batch starts from BG and ends with BT."""
+    batch_lines: List[str] = []
 
     is_ejv = True
-    for line in content.splitlines():
+    for line in lines:
         if line[:4] in (
             "GABG",
             "GIBG",
             "APBG",
         ):  # batch starts from GIBG or GABG for JV
             is_ejv = line[:4] in ("GABG", "GIBG")
-            batch_content = line
+            batch_lines = [line]
         else:
-            batch_content = batch_content + os.linesep + line
+            batch_lines.append(line)
             if line[2:4] == "BT":  # batch ends with BT
-                if is_ejv:
-                    group_batches["EJV"].append(batch_content)
-                else:
-                    group_batches["AP"].append(batch_content)
-    return group_batches
+                yield is_ejv, batch_lines
 
 
 def _get_disbursement_status(return_code: str) -> str:
@@ -412,7 +409,7 @@ def _process_ap_feedback(group_batches) -> bool:  # pylint:disable=too-many-loca
     has_errors = False
     for group_batch in group_batches:
         ejv_file: Optional[EjvFileModel] = None
-        for line in group_batch.splitlines():
+        for line in group_batch:
             # For all these indexes refer the sharepoint docs refer : https://github.com/bcgov/entity/issues/6226
             is_batch_group: bool = line[2:4] == "BG"
             is_batch_header: bool = line[2:4] == "BH"
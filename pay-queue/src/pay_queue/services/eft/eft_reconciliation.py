@@ -13,7 +13,7 @@
 # limitations under the License.
 """EFT reconciliation file."""
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from flask import current_app
 from pay_api import db
@@ -27,7 +27,7 @@ from pay_api.services.eft_short_names import EFTShortnames as EFTShortnamesServi
 from pay_api.utils.enums import EFTFileLineType, EFTPaymentActions, EFTProcessStatus, EFTShortnameType
 from sentry_sdk import capture_message
 
-from pay_queue.minio import get_object
+from pay_queue.minio import iter_object_lines
 from pay_queue.services.eft import EFTHeader, EFTRecord, EFTTrailer
 from pay_queue.services.email_service import EmailParams, send_error_email
 
@@ -83,13 +83,6 @@ def reconcile_eft_payments(ce):  # pylint: disable=too-many-locals
         context.eft_error_handling("N/A", "Missing EFT_TDI17_LOCATION_ID configuration")
         return
 
-    # Fetch EFT File
-    file = get_object(context.minio_location, context.file_name)
-    file_content = file.data.decode("utf-8-sig")
-
-    # Split into lines
-    lines = file_content.splitlines()
-
     # Check if there is an existing EFT File record
     eft_file_model: EFTFileModel = (
         db.session.query(EFTFileModel).filter(EFTFileModel.file_ref == context.file_name).one_or_none()
@@ -102,6 +95,9 @@ def reconcile_eft_payments(ce):  # pylint: disable=too-many-locals
         current_app.logger.info("File: %s already %s.", context.file_name, str(eft_file_model.status_code))
         return
 
+    # Fetch EFT File, the lines are streamed as they are parsed.
+    lines = iter_object_lines(context.minio_location, context.file_name)
+
     # There is no existing EFT File record - instantiate one
     if eft_file_model is None:
         eft_file_model = EFTFileModel()
@@ -175,18 +171,21 @@ def reconcile_eft_payments(ce):  # pylint: disable=too-many-locals
     _apply_eft_pending_payments(context, shortname_balance)
 
 
-def _parse_tdi17_lines(eft_lines: List[str]):
-    """Parse EFT file header, trailer, transactions."""
+def _parse_tdi17_lines(eft_lines: Iterable[str]):
+    """Parse EFT file header, trailer, transactions in a single pass, the last line is the trailer."""
     eft_header: EFTHeader = None
     eft_trailer: EFTTrailer = None
     eft_transactions: List[EFTRecord] = []
+    previous: Optional[Tuple[str, int]] = None
     for index, line in enumerate(eft_lines):
         if index == 0:
             eft_header = EFTHeader(line, index)
-        elif index == len(eft_lines) - 1:
-            eft_trailer = EFTTrailer(line, index)
-        else:
-            eft_transactions.append(EFTRecord(line, index))
+            continue
+        if previous:
+            eft_transactions.append(EFTRecord(*previous))
+        previous = (line, index)
+    if previous:
+        eft_trailer = EFTTrailer(*previous)
     return eft_header, eft_trailer, eft_transactions
 
 
@@ -17,9 +17,11 @@
 import csv
 import os
 import traceback
+from collections import defaultdict
 from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Dict, List, Tuple
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from flask import current_app
 from pay_api.models import CasSettlement as CasSettlementModel
@@ -53,80 +55,173 @@ from pay_api.utils.enums import (
 from pay_api.utils.util import get_topic_for_corp_type
 from sbc_common_components.utils.enums import QueueMessageTypes
 from sentry_sdk import capture_message
+from sqlalchemy.orm.exc import MultipleResultsFound
 
 from pay_queue import config
-from pay_queue.minio import get_object
+from pay_queue.minio import iter_object_lines
 from pay_queue.services.email_service import EmailParams, send_error_email
 
 from ..enums import Column, RecordType, SourceTransaction, Status, TargetTransaction
 
 APP_CONFIG = config.get_named_config(os.getenv("DEPLOYMENT_ENV", "production"))
 
+PAYMENT_ACCOUNT_CFS_STATUSES = (
+    CfsAccountStatus.ACTIVE.value,
+    CfsAccountStatus.FREEZE.value,
+    CfsAccountStatus.INACTIVE.value,
+)
 
-def _build_source_txns(csv_content: str):
-    """Iterate the rows and create a dict with key as the source transaction number."""
-    source_txns: Dict[str, List[Dict[str, str]]] = {}
-    for row in csv.DictReader(csv_content.splitlines()):
-        # Convert lower case keys to avoid any key mismatch
-        row = dict((k.lower(), v) for k, v in row.items())
-        source_txn_number = _get_row_value(row, Column.SOURCE_TXN_NO)
-        if not source_txns.get(source_txn_number):
-            source_txns[source_txn_number] = [row]
-        else:
-            source_txns[source_txn_number].append(row)
-    return source_txns
 
+class _SettlementLookups:
+    """Records referenced by a batch of settlement rows, loaded up front with IN queries.
+
+    Lookups filter in memory, so changes made while processing earlier rows of the batch are seen by later rows the
+    same way the per row queries saw them through autoflush.
+    """
+
+    def __init__(self, rows: List[Dict[str, str]]):
+        """Load the invoice references, invoices, CFS accounts, payment accounts, payments and credits for the rows."""
+        inv_numbers = {value for row in rows if (value := _get_row_value(row, Column.TARGET_TXN_NO))}
+        source_txn_numbers = {value for row in rows if (value := _get_row_value(row, Column.SOURCE_TXN_NO))}
+        account_numbers = {value for row in rows if (value := _get_row_value(row, Column.CUSTOMER_ACC))}
+
+        self._invoice_references: Dict[str, List[InvoiceReferenceModel]] = defaultdict(list)
+        for inv_ref in (
+            db.session.query(InvoiceReferenceModel).filter(InvoiceReferenceModel.invoice_number.in_(inv_numbers)).all()
+        ):
+            self._invoice_references[inv_ref.invoice_number].append(inv_ref)
+
+        # Invoices and their CFS accounts are only loaded into the session, so find_by_id is served from the identity
+        # map. The session holds weak references, keep them alive for the batch.
+        invoice_ids = {inv_ref.invoice_id for refs in self._invoice_references.values() for inv_ref in refs}
+        self._invoices: List[InvoiceModel] = (
+            db.session.query(InvoiceModel).filter(InvoiceModel.id.in_(invoice_ids)).all() if invoice_ids else []
+        )
+        cfs_account_ids = {invoice.cfs_account_id for invoice in self._invoices if invoice.cfs_account_id}
+        self._cfs_accounts: List[CfsAccountModel] = (
+            db.session.query(CfsAccountModel).filter(CfsAccountModel.id.in_(cfs_account_ids)).all()
+            if cfs_account_ids
+            else []
+        )
+
+        self._payment_accounts: Dict[str, List[PaymentAccountModel]] = defaultdict(list)
+        for account_number, payment_account in (
+            db.session.query(CfsAccountModel.cfs_account, PaymentAccountModel)
+            .select_from(PaymentAccountModel)
+            .join(CfsAccountModel, CfsAccountModel.account_id == PaymentAccountModel.id)
+            .filter(CfsAccountModel.cfs_account.in_(account_numbers))
+            .filter(CfsAccountModel.status.in_(PAYMENT_ACCOUNT_CFS_STATUSES))
+            .all()
+        ):
+            self._payment_accounts[account_number].append(payment_account)
+
+        self._payments: List[PaymentModel] = (
+            db.session.query(PaymentModel)
+            .filter(PaymentModel.invoice_number.in_(inv_numbers) | PaymentModel.receipt_number.in_(source_txn_numbers))
+            .all()
+        )
+
+        self._credits: Dict[Tuple[str, bool], CreditModel] = {
+            (credit.cfs_identifier, credit.is_credit_memo): credit
+            for credit in db.session.query(CreditModel).filter(CreditModel.cfs_identifier.in_(source_txn_numbers))
+        }
+
+    def invoice_references(self, inv_number: str, status: str) -> List[InvoiceReferenceModel]:
+        """Return the invoice references for the invoice number in the status."""
+        return [inv_ref for inv_ref in self._invoice_references.get(inv_number, []) if inv_ref.status_code == status]
+
+    def add_invoice_reference(self, inv_ref: InvoiceReferenceModel):
+        """Make an invoice reference created during the batch visible to later rows."""
+        self._invoice_references[inv_ref.invoice_number].append(inv_ref)
+
+    def payment_accounts(self, account_number: str) -> List[PaymentAccountModel]:
+        """Return the payment accounts linked to the CFS account number."""
+        return self._payment_accounts.get(account_number, [])
+
+    def payments(self, inv_number: str, status: str) -> List[PaymentModel]:
+        """Return the payments for the invoice number in the status."""
+        return [p for p in self._payments if p.invoice_number == inv_number and p.payment_status_code == status]
+
+    def payment_by_receipt_number(self, receipt_number: str) -> Optional[PaymentModel]:
+        """Return the payment for the receipt number."""
+        payments = [payment for payment in self._payments if payment.receipt_number == receipt_number]
+        if len(payments) > 1:
+            raise MultipleResultsFound(f"Multiple payments found for receipt number {receipt_number}.")
+        return payments[0] if payments else None
 
-def _create_payment_records(csv_content: str):
+    def add_payment(self, payment: PaymentModel):
+        """Make a payment created during the batch visible to later rows."""
+        self._payments.append(payment)
+
+    def credit(self, cfs_identifier: str, credit_memo: bool = False) -> Optional[CreditModel]:
+        """Return the credit for the cfs identifier."""
+        return self._credits.get((cfs_identifier, credit_memo))
+
+    def add_credit(self, credit: CreditModel):
+        """Make a credit created during the batch visible to later rows."""
+        self._credits[(credit.cfs_identifier, credit.is_credit_memo)] = credit
+
+
+def _iter_rows(lines: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """Parse the rows as they are read, converting the keys to lower case to avoid any key mismatch."""
+    for row in csv.DictReader(lines):
+        yield dict((k.lower(), v) for k, v in row.items())
+
+
+def _batches(items: Iterable, batch_size: int) -> Iterator[List]:
+    """Split the items into batches which are prefetched and committed together."""
+    batch_size = max(int(batch_size), 1)
+    iterator = iter(items)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def _collect_rows(
+    rows: List[Dict[str, str]], source_txns: Dict[str, List[Dict[str, str]]], credit_rows: List[Dict[str, str]]
+):
+    """Keep the rows the payment and credit records need, grouped by the source transaction number."""
+    for row in rows:
+        source_txns.setdefault(_get_row_value(row, Column.SOURCE_TXN_NO), []).append(row)
+        if _get_row_value(row, Column.TARGET_TXN) == TargetTransaction.RECEIPT.value or (
+            _get_row_value(row, Column.RECORD_TYPE) == RecordType.CMAP.value
+            and _get_row_value(row, Column.TARGET_TXN) == TargetTransaction.INV.value
+        ):
+            credit_rows.append(row)
+
+
+def _create_payment_records(source_txns: Dict[str, List[Dict[str, str]]]):
     """Create payment records by grouping the lines with target transaction number."""
-    source_txns: Dict[str, List[Dict[str, str]]] = _build_source_txns(csv_content)
-    # Iterate the grouped source transactions and create payment record.
+    # Iterate the grouped source transactions and create payment record, committing a batch at a time.
+    batch_size = current_app.config.get("CAS_SETTLEMENT_BATCH_SIZE", 500)
+    for batch in _batches(source_txns.items(), batch_size):
+        lookups = _SettlementLookups([row for _, payment_lines in batch for row in payment_lines])
+        for source_txn_number, payment_lines in batch:
+            _create_payment_record(source_txn_number, payment_lines, lookups)
+        db.session.commit()
+
+
+def _create_payment_record(source_txn_number: str, payment_lines: List[Dict[str, str]], lookups: _SettlementLookups):
+    """Create the payment record for the lines of a source transaction."""
     # For PAD payments, create one payment record per row
     # For Online Banking payments, add up the ONAC receipts and payments against invoices.
     # For EFT, WIRE, Drawdown balance transfer mark the payment as COMPLETED
     # For Credit Memos, populate the cfs_credit_invoices table.
-    for source_txn_number, payment_lines in source_txns.items():
-        match _get_settlement_type(payment_lines):
-            case RecordType.PAD.value | RecordType.PADR.value | RecordType.PAYR.value:
-                for row in payment_lines:
-                    inv_number = _get_row_value(row, Column.TARGET_TXN_NO)
-                    invoice_amount = float(_get_row_value(row, Column.TARGET_TXN_ORIGINAL))
-                    payment_date = datetime.strptime(_get_row_value(row, Column.APP_DATE), "%d-%b-%y")
-                    status = (
-                        PaymentStatus.COMPLETED.value
-                        if _get_row_value(row, Column.TARGET_TXN_STATUS).lower() == Status.PAID.value.lower()
-                        else PaymentStatus.FAILED.value
-                    )
-                    paid_amount = 0
-                    if status == PaymentStatus.COMPLETED.value:
-                        paid_amount = float(_get_row_value(row, Column.APP_AMOUNT))
-                    elif _get_row_value(row, Column.TARGET_TXN_STATUS).lower() == Status.PARTIAL.value.lower():
-                        paid_amount = invoice_amount - float(_get_row_value(row, Column.TARGET_TXN_OUTSTANDING))
-
-                    _save_payment(
-                        payment_date,
-                        inv_number,
-                        invoice_amount,
-                        paid_amount,
-                        row,
-                        status,
-                        PaymentMethod.PAD.value,
-                        source_txn_number,
-                    )
-            case RecordType.BOLP.value:
-                # Add up the amount together for Online Banking
+    match _get_settlement_type(payment_lines):
+        case RecordType.PAD.value | RecordType.PADR.value | RecordType.PAYR.value:
+            for row in payment_lines:
+                inv_number = _get_row_value(row, Column.TARGET_TXN_NO)
+                invoice_amount = float(_get_row_value(row, Column.TARGET_TXN_ORIGINAL))
+                payment_date = datetime.strptime(_get_row_value(row, Column.APP_DATE), "%d-%b-%y")
+                status = (
+                    PaymentStatus.COMPLETED.value
+                    if _get_row_value(row, Column.TARGET_TXN_STATUS).lower() == Status.PAID.value.lower()
+                    else PaymentStatus.FAILED.value
+                )
                 paid_amount = 0
-                inv_number = None
-                invoice_amount = 0
-                payment_date = datetime.strptime(_get_row_value(payment_lines[0], Column.APP_DATE), "%d-%b-%y")
-                for row in payment_lines:
-                    paid_amount += float(_get_row_value(row, Column.APP_AMOUNT))
-
-                # If the payment exactly covers the amount for invoice, then populate invoice amount and number
-                if len(payment_lines) == 1:
-                    row = payment_lines[0]
-                    invoice_amount = float(_get_row_value(row, Column.TARGET_TXN_ORIGINAL))
-                    inv_number = _get_row_value(row, Column.TARGET_TXN_NO)
+                if status == PaymentStatus.COMPLETED.value:
+                    paid_amount = float(_get_row_value(row, Column.APP_AMOUNT))
+                elif _get_row_value(row, Column.TARGET_TXN_STATUS).lower() == Status.PARTIAL.value.lower():
+                    paid_amount = invoice_amount - float(_get_row_value(row, Column.TARGET_TXN_OUTSTANDING))
 
                 _save_payment(
                     payment_date,
@@ -134,23 +229,45 @@ def _create_payment_records(csv_content: str):
                     invoice_amount,
                     paid_amount,
                     row,
-                    PaymentStatus.COMPLETED.value,
-                    PaymentMethod.ONLINE_BANKING.value,
+                    status,
+                    PaymentMethod.PAD.value,
                     source_txn_number,
+                    lookups,
                 )
-                _publish_online_banking_mailer_events(payment_lines, paid_amount)
-
-            case RecordType.EFTP.value:
-                # Find the payment using receipt_number and mark it as COMPLETED
-                payment = (
-                    db.session.query(PaymentModel)
-                    .filter(PaymentModel.receipt_number == source_txn_number)
-                    .one_or_none()
-                )
-                payment.payment_status_code = PaymentStatus.COMPLETED.value
-            case _:
-                pass
-        db.session.commit()
+        case RecordType.BOLP.value:
+            # Add up the amount together for Online Banking
+            paid_amount = 0
+            inv_number = None
+            invoice_amount = 0
+            payment_date = datetime.strptime(_get_row_value(payment_lines[0], Column.APP_DATE), "%d-%b-%y")
+            for row in payment_lines:
+                paid_amount += float(_get_row_value(row, Column.APP_AMOUNT))
+
+            # If the payment exactly covers the amount for invoice, then populate invoice amount and number
+            if len(payment_lines) == 1:
+                row = payment_lines[0]
+                invoice_amount = float(_get_row_value(row, Column.TARGET_TXN_ORIGINAL))
+                inv_number = _get_row_value(row, Column.TARGET_TXN_NO)
+
+            _save_payment(
+                payment_date,
+                inv_number,
+                invoice_amount,
+                paid_amount,
+                row,
+                PaymentStatus.COMPLETED.value,
+                PaymentMethod.ONLINE_BANKING.value,
+                source_txn_number,
+                lookups,
+            )
+            _publish_online_banking_mailer_events(payment_lines, paid_amount, lookups)
+
+        case RecordType.EFTP.value:
+            # Find the payment using receipt_number and mark it as COMPLETED
+            payment = lookups.payment_by_receipt_number(source_txn_number)
+            payment.payment_status_code = PaymentStatus.COMPLETED.value
+        case _:
+            pass
 
 
 def _save_payment(  # pylint: disable=too-many-arguments
@@ -162,30 +279,32 @@ def _save_payment(  # pylint: disable=too-many-arguments
     status,
     payment_method,
     receipt_number,
+    lookups: _SettlementLookups,
 ):
     # pylint: disable=import-outside-toplevel
     from pay_api.factory.payment_system_factory import PaymentSystemFactory
 
-    payment_account = _get_payment_account(row)
+    payment_account = _get_payment_account(row, lookups)
     pay_service = PaymentSystemFactory.create_from_payment_method(payment_method)
     # If status is failed, which means NSF. We already have a COMPLETED payment record, find and update iit.
     payment: PaymentModel = None
     if status == PaymentStatus.FAILED.value:
-        payment = _get_payment_by_inv_number_and_status(inv_number, PaymentStatus.COMPLETED.value)
+        payment = _get_payment_by_inv_number_and_status(inv_number, PaymentStatus.COMPLETED.value, lookups)
         # Just to handle duplicate rows in settlement file,
         # pull out failed payment record if it exists and no COMPLETED payments are present.
         if not payment:
             # Select the latest failure.
-            payment = _get_failed_payment_by_inv_number(inv_number)
+            payment = _get_failed_payment_by_inv_number(inv_number, lookups)
     elif status == PaymentStatus.COMPLETED.value:
         # if the payment status is COMPLETED, then make sure there are
         # no other COMPLETED payment for same invoice_number.If found, return. This is to avoid duplicate entries.
-        payment = _get_payment_by_inv_number_and_status(inv_number, PaymentStatus.COMPLETED.value)
+        payment = _get_payment_by_inv_number_and_status(inv_number, PaymentStatus.COMPLETED.value, lookups)
         if payment:
             return
 
     if not payment:
         payment = PaymentModel()
+        lookups.add_payment(payment)
     payment.payment_method_code = pay_service.get_payment_method_code()
     payment.payment_status_code = status
     payment.payment_system_code = pay_service.get_payment_system_code()
@@ -198,34 +317,22 @@ def _save_payment(  # pylint: disable=too-many-arguments
     db.session.add(payment)
 
 
-def _get_failed_payment_by_inv_number(inv_number: str) -> PaymentModel:
-    """Get the failed payment record for the invoice number."""
-    payment: PaymentModel = (
-        db.session.query(PaymentModel)
-        .filter(
-            PaymentModel.invoice_number == inv_number,
-            PaymentModel.payment_status_code == PaymentStatus.FAILED.value,
-        )
-        .order_by(PaymentModel.payment_date.desc())
-        .first()
-    )
-    return payment
+def _get_failed_payment_by_inv_number(inv_number: str, lookups: _SettlementLookups) -> PaymentModel:
+    """Get the latest failed payment record for the invoice number."""
+    payments = lookups.payments(inv_number, PaymentStatus.FAILED.value)
+    # Same as ordering by payment_date desc in postgres, where nulls sort first.
+    return max(payments, key=lambda p: p.payment_date or datetime.max, default=None)
 
 
-def _get_payment_by_inv_number_and_status(inv_number: str, status: str) -> PaymentModel:
+def _get_payment_by_inv_number_and_status(inv_number: str, status: str, lookups: _SettlementLookups) -> PaymentModel:
     """Get payment by invoice number and status."""
     # It's possible to look up null inv_number and return more than one.
     if inv_number is None:
         return None
-    payment: PaymentModel = (
-        db.session.query(PaymentModel)
-        .filter(
-            PaymentModel.invoice_number == inv_number,
-            PaymentModel.payment_status_code == status,
-        )
-        .one_or_none()
-    )
-    return payment
+    payments = lookups.payments(inv_number, status)
+    if len(payments) > 1:
+        raise MultipleResultsFound(f"Multiple {status} payments found for invoice number {inv_number}.")
+    return payments[0] if payments else None
 
 
 def reconcile_payments(ce):
@@ -257,11 +364,10 @@ def reconcile_payments(ce):
     current_app.logger.info("Creating cas_settlement record for file: %s", file_name)
     cas_settlement = _create_cas_settlement(file_name)
 
-    file = get_object(minio_location, file_name)
-    content = file.data.decode("utf-8-sig")
+    lines = iter_object_lines(minio_location, file_name)
 
     error_messages = []
-    has_errors, error_messages = _process_file_content(content, cas_settlement, msg, error_messages)
+    has_errors, error_messages = _process_file_content(lines, cas_settlement, msg, error_messages)
 
     if has_errors and not current_app.config.get("DISABLE_CSV_ERROR_EMAIL"):
         email_service_params = EmailParams(
@@ -276,62 +382,46 @@ def reconcile_payments(ce):
 
 
 def _process_file_content(
-    content: str,
+    lines: Iterable[str],
     cas_settlement: CasSettlementModel,
     msg: Dict[str, any],
     error_messages: List[Dict[str, any]],
 ):
     """Process the content of the feedback file."""
     has_errors = False
-    # Iterate the rows and create key value pair for each row
-    for row in csv.DictReader(content.splitlines()):
-        # Convert lower case keys to avoid any key mismatch
-        row = dict((k.lower(), v) for k, v in row.items())
-        current_app.logger.debug("Processing %s", row)
-
-        # IF not PAD and application amount is zero, continue
-        record_type = _get_row_value(row, Column.RECORD_TYPE)
-        pad_record_types: Tuple[str] = (
-            RecordType.PAD.value,
-            RecordType.PADR.value,
-            RecordType.PAYR.value,
-        )
-        if float(_get_row_value(row, Column.APP_AMOUNT)) == 0 and record_type not in pad_record_types:
-            continue
-
-        # If PAD, lookup the payment table and mark status based on the payment status
-        # If BCOL, lookup the invoices and set the status:
-        # Create payment record by looking the receipt_number
-        # If EFT/WIRE, lookup the invoices and set the status:
-        # Create payment record by looking the receipt_number
-        # PS : Duplicating some code to make the code more readable.
-        if record_type in pad_record_types:
-            # Handle invoices
-            has_errors = _process_consolidated_invoices(row, error_messages) or has_errors
-        elif record_type in (RecordType.BOLP.value, RecordType.EFTP.value):
-            # EFT, WIRE and Online Banking are one-to-one invoice. So handle them in same way.
-            has_errors = _process_unconsolidated_invoices(row, error_messages) or has_errors
-        elif record_type in (
-            RecordType.ONAC.value,
-            RecordType.CMAP.value,
-            RecordType.DRWP.value,
-        ):
-            has_errors = _process_credit_on_invoices(row, error_messages) or has_errors
-        elif record_type == RecordType.ADJS.value:
-            current_app.logger.info("Adjustment received for %s.", msg)
-        else:
-            # For any other transactions like DM log error and continue.
-            error_msg = f"Record Type is received as {record_type}, and cannot process {msg}."
-            has_errors = True
-            _csv_error_handling(row, error_msg, error_messages)
-            # Continue processing
+    # Only the rows needed to group the payments and credits are kept once they have been processed.
+    source_txns: Dict[str, List[Dict[str, str]]] = {}
+    credit_rows: List[Dict[str, str]] = []
+    # Rows are processed in batches as they are read, everything a batch refers to is fetched up front and
+    # committed together.
+    for batch in _batches(_iter_rows(lines), current_app.config.get("CAS_SETTLEMENT_BATCH_SIZE", 500)):
+        _collect_rows(batch, source_txns, credit_rows)
+        lookups = _SettlementLookups(batch)
+        for row in batch:
+            current_app.logger.debug("Processing %s", row)
+            # Each row runs in a savepoint, a failing row is reported without discarding the rest of the batch.
+            # The NSF path commits while creating the invoice, which also releases the savepoint.
+            savepoint = db.session.begin_nested()
+            try:
+                has_errors = _process_settlement_row(row, msg, error_messages, lookups) or has_errors
+                if savepoint.is_active:
+                    savepoint.commit()
+            except Exception as e:  # NOQA # pylint: disable=broad-except
+                if savepoint.is_active:
+                    savepoint.rollback()
+                else:
+                    db.session.rollback()
+                has_errors = True
+                _csv_error_handling(row, f"Error processing row: {str(e)}", error_messages, e)
+                # Records the row created or changed were rolled back, reload them for the rest of the batch.
+                lookups = _SettlementLookups(batch)
 
-        # Commit the transaction and process next row.
+        # Commit the batch and process the next one.
         db.session.commit()
 
     # Create payment records for lines other than PAD
     try:
-        _create_payment_records(content)
+        _create_payment_records(source_txns)
     except Exception as e:  # NOQA # pylint: disable=broad-except
         error_msg = f"Error creating payment records: {str(e)}"
         has_errors = True
@@ -339,7 +429,7 @@ def _process_file_content(
         return has_errors, error_messages
 
     try:
-        _create_credit_records(content)
+        _create_credit_records(credit_rows)
     except Exception as e:  # NOQA # pylint: disable=broad-except
         error_msg = f"Error creating credit records: {str(e)}"
         has_errors = True
@@ -359,7 +449,49 @@ def _process_file_content(
     return has_errors, error_messages
 
 
-def _process_consolidated_invoices(row, error_messages: List[Dict[str, any]]) -> bool:
+def _process_settlement_row(
+    row: Dict[str, str], msg: Dict[str, any], error_messages: List[Dict[str, any]], lookups: _SettlementLookups
+) -> bool:
+    """Process a row of the settlement file, returns True if an error was reported for it."""
+    # IF not PAD and application amount is zero, continue
+    record_type = _get_row_value(row, Column.RECORD_TYPE)
+    pad_record_types: Tuple[str] = (
+        RecordType.PAD.value,
+        RecordType.PADR.value,
+        RecordType.PAYR.value,
+    )
+    if float(_get_row_value(row, Column.APP_AMOUNT)) == 0 and record_type not in pad_record_types:
+        return False
+
+    # If PAD, lookup the payment table and mark status based on the payment status
+    # If BCOL, lookup the invoices and set the status:
+    # Create payment record by looking the receipt_number
+    # If EFT/WIRE, lookup the invoices and set the status:
+    # Create payment record by looking the receipt_number
+    # PS : Duplicating some code to make the code more readable.
+    if record_type in pad_record_types:
+        # Handle invoices
+        return _process_consolidated_invoices(row, error_messages, lookups)
+    if record_type in (RecordType.BOLP.value, RecordType.EFTP.value):
+        # EFT, WIRE and Online Banking are one-to-one invoice. So handle them in same way.
+        return _process_unconsolidated_invoices(row, error_messages, lookups)
+    if record_type in (
+        RecordType.ONAC.value,
+        RecordType.CMAP.value,
+        RecordType.DRWP.value,
+    ):
+        return _process_credit_on_invoices(row, error_messages, lookups)
+    if record_type == RecordType.ADJS.value:
+        current_app.logger.info("Adjustment received for %s.", msg)
+        return False
+    # For any other transactions like DM log error and continue.
+    error_msg = f"Record Type is received as {record_type}, and cannot process {msg}."
+    _csv_error_handling(row, error_msg, error_messages)
+    # Continue processing
+    return True
+
+
+def _process_consolidated_invoices(row, error_messages: List[Dict[str, any]], lookups: _SettlementLookups) -> bool:
     has_errors = False
     target_txn_status = _get_row_value(row, Column.TARGET_TXN_STATUS)
     if (target_txn := _get_row_value(row, Column.TARGET_TXN)) == TargetTransaction.INV.value:
@@ -367,16 +499,14 @@ def _process_consolidated_invoices(row, error_messages: List[Dict[str, any]]) ->
         record_type = _get_row_value(row, Column.RECORD_TYPE)
         current_app.logger.debug("Processing invoice :  %s", inv_number)
 
-        inv_references = _find_invoice_reference_by_number_and_status(inv_number, InvoiceReferenceStatus.ACTIVE.value)
+        inv_references = lookups.invoice_references(inv_number, InvoiceReferenceStatus.ACTIVE.value)
 
-        payment_account: PaymentAccountModel = _get_payment_account(row)
+        payment_account: PaymentAccountModel = _get_payment_account(row, lookups)
 
         if target_txn_status.lower() == Status.PAID.value.lower():
             current_app.logger.debug("Fully PAID payment.")
             # if no inv reference is found, and if there are no COMPLETED inv ref, raise alert
-            completed_inv_references = _find_invoice_reference_by_number_and_status(
-                inv_number, InvoiceReferenceStatus.COMPLETED.value
-            )
+            completed_inv_references = lookups.invoice_references(inv_number, InvoiceReferenceStatus.COMPLETED.value)
 
             if not inv_references and not completed_inv_references:
                 error_msg = f"No invoice found for {inv_number} in the system, and cannot process {row}."
@@ -390,7 +520,7 @@ def _process_consolidated_invoices(row, error_messages: List[Dict[str, any]]) ->
         ):
             current_app.logger.info("NOT PAID. NSF identified.")
             # NSF Condition. Publish to account events for NSF.
-            if _process_failed_payments(row):
+            if _process_failed_payments(row, lookups):
                 # Send mailer and account events to update status and send email notification
                 _publish_account_events(QueueMessageTypes.NSF_LOCK_ACCOUNT.value, payment_account, row)
         else:
@@ -400,39 +530,19 @@ def _process_consolidated_invoices(row, error_messages: List[Dict[str, any]]) ->
     return has_errors
 
 
-def _find_invoice_reference_by_number_and_status(inv_number: str, status: str):
-    inv_references: List[InvoiceReferenceModel] = (
-        db.session.query(InvoiceReferenceModel)
-        .filter(InvoiceReferenceModel.status_code == status)
-        .filter(InvoiceReferenceModel.invoice_number == inv_number)
-        .all()
-    )
-    return inv_references
-
-
-def _process_unconsolidated_invoices(row, error_messages: List[Dict[str, any]]) -> bool:
+def _process_unconsolidated_invoices(row, error_messages: List[Dict[str, any]], lookups: _SettlementLookups) -> bool:
     has_errors = False
     target_txn_status = _get_row_value(row, Column.TARGET_TXN_STATUS)
     record_type = _get_row_value(row, Column.RECORD_TYPE)
     if (target_txn := _get_row_value(row, Column.TARGET_TXN)) == TargetTransaction.INV.value:
         inv_number = _get_row_value(row, Column.TARGET_TXN_NO)
 
-        inv_references: List[InvoiceReferenceModel] = (
-            db.session.query(InvoiceReferenceModel)
-            .filter(InvoiceReferenceModel.status_code == InvoiceReferenceStatus.ACTIVE.value)
-            .filter(InvoiceReferenceModel.invoice_number == inv_number)
-            .all()
-        )
+        inv_references = lookups.invoice_references(inv_number, InvoiceReferenceStatus.ACTIVE.value)
 
         if len(inv_references) != 1:
             # There could be case where same invoice can appear as PAID in 2 lines, especially when there are credits.
             # Make sure there is one invoice_reference with completed status, else raise error.
-            completed_inv_references: List[InvoiceReferenceModel] = (
-                db.session.query(InvoiceReferenceModel)
-                .filter(InvoiceReferenceModel.status_code == InvoiceReferenceStatus.COMPLETED.value)
-                .filter(InvoiceReferenceModel.invoice_number == inv_number)
-                .all()
-            )
+            completed_inv_references = lookups.invoice_references(inv_number, InvoiceReferenceStatus.COMPLETED.value)
             current_app.logger.info(
                 "Found %s completed invoice references for invoice number %s",
                 len(completed_inv_references),
@@ -519,7 +629,7 @@ def _handle_credit_invoices_and_adjust_invoice_paid(row):
         current_app.logger.warning(f"Amount {amount} remaining after applying to invoices {invoice_number}.")
 
 
-def _process_credit_on_invoices(row, error_messages: List[Dict[str, any]]) -> bool:
+def _process_credit_on_invoices(row, error_messages: List[Dict[str, any]], lookups: _SettlementLookups) -> bool:
     has_errors = False
     # Credit memo can happen for any type of accounts.
     target_txn_status = _get_row_value(row, Column.TARGET_TXN_STATUS)
@@ -527,12 +637,7 @@ def _process_credit_on_invoices(row, error_messages: List[Dict[str, any]]) -> bo
         inv_number = _get_row_value(row, Column.TARGET_TXN_NO)
         current_app.logger.debug("Processing invoice :  %s", inv_number)
 
-        inv_references: List[InvoiceReferenceModel] = (
-            db.session.query(InvoiceReferenceModel)
-            .filter(InvoiceReferenceModel.status_code == InvoiceReferenceStatus.ACTIVE.value)
-            .filter(InvoiceReferenceModel.invoice_number == inv_number)
-            .all()
-        )
+        inv_references = lookups.invoice_references(inv_number, InvoiceReferenceStatus.ACTIVE.value)
 
         if target_txn_status.lower() == Status.PAID.value.lower():
             current_app.logger.debug("Fully PAID payment.")
@@ -619,7 +724,7 @@ def _process_partial_paid_invoices(inv_ref: InvoiceReferenceModel, row):
     db.session.add(receipt)
 
 
-def _process_failed_payments(row):
+def _process_failed_payments(row, lookups: _SettlementLookups):
     """Handle failed payments."""
     # 1. Check if there is an NSF record for this account, if there isn't, proceed.
     # 2. SET cfs_account status to FREEZE.
@@ -629,11 +734,10 @@ def _process_failed_payments(row):
     # 6. Create invoice reference for the newly created NSF invoice.
     # 7. Adjust invoice in CFS to include NSF fees.
     inv_number = _get_row_value(row, Column.TARGET_TXN_NO)
-    payment_account: PaymentAccountModel = _get_payment_account(row)
+    payment_account: PaymentAccountModel = _get_payment_account(row, lookups)
 
     # If there is a FAILED payment record for this; it means it's a duplicate event. Ignore it.
-    payment = PaymentModel.find_payment_by_invoice_number_and_status(inv_number, PaymentStatus.FAILED.value)
-    if payment:
+    if lookups.payments(inv_number, PaymentStatus.FAILED.value):
         current_app.logger.info("Ignoring duplicate NSF message for invoice : %s ", inv_number)
         return False
     # If there is an NSF row, it means it's a duplicate NSF event. Ignore it.
@@ -659,12 +763,7 @@ def _process_failed_payments(row):
         )
         return False
     # Find the invoice_reference for this invoice and mark it as ACTIVE.
-    inv_references: List[InvoiceReferenceModel] = (
-        db.session.query(InvoiceReferenceModel)
-        .filter(InvoiceReferenceModel.status_code == InvoiceReferenceStatus.COMPLETED.value)
-        .filter(InvoiceReferenceModel.invoice_number == inv_number)
-        .all()
-    )
+    inv_references = lookups.invoice_references(inv_number, InvoiceReferenceStatus.COMPLETED.value)
 
     # Update status to ACTIVE, if it was marked COMPLETED
     for inv_reference in inv_references:
@@ -680,33 +779,35 @@ def _process_failed_payments(row):
 
     # Create an invoice for NSF for this account
     reason_description = _get_row_value(row, Column.REVERSAL_REASON_DESC)
-    invoice = _create_nsf_invoice(cfs_account, inv_number, payment_account, reason_description)
+    invoice = _create_nsf_invoice(cfs_account, inv_number, payment_account, reason_description, lookups)
     # Adjust CFS invoice
     CFSService.add_nsf_adjustment(cfs_account=cfs_account, inv_number=inv_number, amount=invoice.total)
     return True
 
 
-def _create_credit_records(csv_content: str):
+def _create_credit_records(rows: List[Dict[str, str]]):
     """Create credit records and sync them up with CFS."""
     # Iterate the rows and store any ONAC RECEIPTs to credit table .
-    for row in csv.DictReader(csv_content.splitlines()):
-        # Convert lower case keys to avoid any key mismatch
-        row = dict((k.lower(), v) for k, v in row.items())
-        if _get_row_value(row, Column.TARGET_TXN) == TargetTransaction.RECEIPT.value:
+    receipt_rows = [row for row in rows if _get_row_value(row, Column.TARGET_TXN) == TargetTransaction.RECEIPT.value]
+    for batch in _batches(receipt_rows, current_app.config.get("CAS_SETTLEMENT_BATCH_SIZE", 500)):
+        lookups = _SettlementLookups(batch)
+        for row in batch:
             receipt_number = _get_row_value(row, Column.SOURCE_TXN_NO)
-            pay_account = _get_payment_account(row)
+            pay_account = _get_payment_account(row, lookups)
             # Create credit if a record doesn't exists for this receipt number.
-            if not CreditModel.find_by_cfs_identifier(cfs_identifier=receipt_number):
-                CreditModel(
+            if not lookups.credit(receipt_number):
+                credit = CreditModel(
                     cfs_identifier=receipt_number,
                     is_credit_memo=False,
                     amount=float(_get_row_value(row, Column.TARGET_TXN_ORIGINAL)),
                     remaining_amount=float(_get_row_value(row, Column.TARGET_TXN_ORIGINAL)),
                     account_id=pay_account.id,
-                ).save()
+                )
+                db.session.add(credit)
+                lookups.add_credit(credit)
+        db.session.commit()
 
-    for row in csv.DictReader(csv_content.splitlines()):
-        row = dict((k.lower(), v) for k, v in row.items())
+    for row in rows:
         record_type = _get_row_value(row, Column.RECORD_TYPE)
         target_txn = _get_row_value(row, Column.TARGET_TXN)
         if record_type == RecordType.CMAP.value and target_txn == TargetTransaction.INV.value:
@@ -774,23 +875,18 @@ def _sync_credit_records_with_cfs():
         pay_account.save()
 
 
-def _get_payment_account(row) -> PaymentAccountModel:
+def _get_payment_account(row, lookups: _SettlementLookups = None) -> PaymentAccountModel:
     account_number: str = _get_row_value(row, Column.CUSTOMER_ACC)
-    payment_accounts: PaymentAccountModel = (
-        db.session.query(PaymentAccountModel)
-        .join(CfsAccountModel, CfsAccountModel.account_id == PaymentAccountModel.id)
-        .filter(CfsAccountModel.cfs_account == account_number)
-        .filter(
-            CfsAccountModel.status.in_(
-                [
-                    CfsAccountStatus.ACTIVE.value,
-                    CfsAccountStatus.FREEZE.value,
-                    CfsAccountStatus.INACTIVE.value,
-                ]
-            )
+    if lookups:
+        payment_accounts = lookups.payment_accounts(account_number)
+    else:
+        payment_accounts: List[PaymentAccountModel] = (
+            db.session.query(PaymentAccountModel)
+            .join(CfsAccountModel, CfsAccountModel.account_id == PaymentAccountModel.id)
+            .filter(CfsAccountModel.cfs_account == account_number)
+            .filter(CfsAccountModel.status.in_(PAYMENT_ACCOUNT_CFS_STATUSES))
+            .all()
         )
-        .all()
-    )
     if not all(payment_account.id == payment_accounts[0].id for payment_account in payment_accounts):
         raise Exception("Multiple unique payment accounts for cfs_account.")  # pylint: disable=broad-exception-raised
     return payment_accounts[0] if payment_accounts else None
@@ -824,7 +920,8 @@ def _publish_payment_event(inv: InvoiceModel):
                 message_type=QueueMessageTypes.PAYMENT.value,
                 payload=payload,
                 topic=get_topic_for_corp_type(inv.corp_type_code),
-            )
+            ),
+            use_outbox=current_app.config.get("PAYMENT_EVENTS_USE_OUTBOX"),
         )
     except Exception as e:  # NOQA pylint: disable=broad-except
         current_app.logger.error(e)
@@ -863,10 +960,10 @@ def _publish_mailer_events(message_type: str, pay_account: PaymentAccountModel,
         )
 
 
-def _publish_online_banking_mailer_events(rows: List[Dict[str, str]], paid_amount: float):
+def _publish_online_banking_mailer_events(rows: List[Dict[str, str]], paid_amount: float, lookups: _SettlementLookups):
     """Publish payment message to the mailer queue."""
     # Publish message to the Queue, saying account has been created. Using the event spec.
-    pay_account = _get_payment_account(rows[0])  # All rows are for same account.
+    pay_account = _get_payment_account(rows[0], lookups)  # All rows are for same account.
     # Check for credit, or fully paid or under paid payment
     credit_rows = list(
         filter(
@@ -981,6 +1078,7 @@ def _create_nsf_invoice(
     inv_number: str,
     payment_account: PaymentAccountModel,
     reason_description: str,
+    lookups: _SettlementLookups,
 ) -> InvoiceModel:
     """Create Invoice, line item and invoice referwnce records."""
     fee_schedule: FeeScheduleModel = FeeScheduleModel.find_by_filing_type_and_corp_type(
@@ -1037,6 +1135,7 @@ def _create_nsf_invoice(
         status_code=InvoiceReferenceStatus.ACTIVE.value,
     )
     inv_ref.save()
+    lookups.add_invoice_reference(inv_ref)
 
     return invoice
 
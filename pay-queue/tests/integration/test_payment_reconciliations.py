@@ -30,7 +30,8 @@ from pay_api.models import Receipt as ReceiptModel
 from pay_api.utils.enums import CfsAccountStatus, InvoiceReferenceStatus, InvoiceStatus, PaymentMethod, PaymentStatus
 from sbc_common_components.utils.enums import QueueMessageTypes
 
-from pay_queue.enums import RecordType, SourceTransaction, Status, TargetTransaction
+from pay_queue.enums import Column, RecordType, SourceTransaction, Status, TargetTransaction
+from pay_queue.services import payment_reconciliations
 
 from .factory import (
     factory_create_online_banking_account,
@@ -106,6 +107,125 @@ def test_online_banking_reconciliations(session, app, client):
     assert payment.invoice_number == invoice_number
 
 
+def test_online_banking_reconciliations_in_batches(session, app, client, monkeypatch):
+    """Test a settlement file spanning several prefetch and commit batches."""
+    monkeypatch.setitem(app.config, "CAS_SETTLEMENT_BATCH_SIZE", 2)
+    cfs_account_number = "1234"
+    pay_account = factory_create_online_banking_account(
+        status=CfsAccountStatus.ACTIVE.value, cfs_account=cfs_account_number
+    )
+    date = datetime.now().strftime("%d-%b-%y")
+    rows = []
+    invoice_ids = []
+    for index in range(5):
+        invoice = factory_invoice(
+            payment_account=pay_account,
+            total=100,
+            service_fees=10.0,
+            payment_method_code=PaymentMethod.ONLINE_BANKING.value,
+        )
+        factory_payment_line_item(invoice_id=invoice.id, filing_fees=90.0, service_fees=10.0, total=90.0)
+        invoice_number = f"100000000{index}"
+        factory_invoice_reference(invoice_id=invoice.id, invoice_number=invoice_number)
+        invoice.invoice_status_code = InvoiceStatus.SETTLEMENT_SCHEDULED.value
+        invoice.save()
+        invoice_ids.append(invoice.id)
+        rows.append(
+            [
+                RecordType.BOLP.value,
+                SourceTransaction.ONLINE_BANKING.value,
+                f"200000000{index}",
+                100001 + index,
+                date,
+                invoice.total,
+                cfs_account_number,
+                TargetTransaction.INV.value,
+                invoice_number,
+                invoice.total,
+                0,
+                Status.PAID.value,
+            ]
+        )
+
+    file_name: str = "cas_settlement_file.csv"
+    create_and_upload_settlement_file(file_name, rows)
+    add_file_event_to_queue_and_process(
+        client,
+        file_name=file_name,
+        message_type=QueueMessageTypes.CAS_MESSAGE_TYPE.value,
+    )
+
+    for index, invoice_id in enumerate(invoice_ids):
+        assert InvoiceModel.find_by_id(invoice_id).invoice_status_code == InvoiceStatus.PAID.value
+        payment: PaymentModel = PaymentModel.find_payment_by_receipt_number(f"200000000{index}")
+        assert payment.payment_status_code == PaymentStatus.COMPLETED.value
+        assert payment.invoice_number == f"100000000{index}"
+
+
+def test_reconciliations_row_error_keeps_batch(session, app, client, monkeypatch):
+    """Assert a failing row is rolled back on its own, the other rows of its batch are still processed."""
+    monkeypatch.setitem(app.config, "CAS_SETTLEMENT_BATCH_SIZE", 3)
+    cfs_account_number = "1234"
+    pay_account = factory_create_online_banking_account(
+        status=CfsAccountStatus.ACTIVE.value, cfs_account=cfs_account_number
+    )
+    date = datetime.now().strftime("%d-%b-%y")
+    rows = []
+    invoice_ids = []
+    for index in range(3):
+        invoice = factory_invoice(
+            payment_account=pay_account,
+            total=100,
+            service_fees=10.0,
+            payment_method_code=PaymentMethod.ONLINE_BANKING.value,
+        )
+        factory_payment_line_item(invoice_id=invoice.id, filing_fees=90.0, service_fees=10.0, total=90.0)
+        invoice_number = f"300000000{index}"
+        factory_invoice_reference(invoice_id=invoice.id, invoice_number=invoice_number)
+        invoice.invoice_status_code = InvoiceStatus.SETTLEMENT_SCHEDULED.value
+        invoice.save()
+        invoice_ids.append(invoice.id)
+        rows.append(
+            [
+                RecordType.BOLP.value,
+                SourceTransaction.ONLINE_BANKING.value,
+                f"400000000{index}",
+                100001 + index,
+                date,
+                invoice.total,
+                cfs_account_number,
+                TargetTransaction.INV.value,
+                invoice_number,
+                invoice.total,
+                0,
+                Status.PAID.value,
+            ]
+        )
+
+    process_unconsolidated_invoices = payment_reconciliations._process_unconsolidated_invoices
+
+    def fail_second_row(row, error_messages, lookups):
+        has_errors = process_unconsolidated_invoices(row, error_messages, lookups)
+        if payment_reconciliations._get_row_value(row, Column.TARGET_TXN_NO) == "3000000001":
+            raise ValueError("Row failed after updating the invoice.")
+        return has_errors
+
+    monkeypatch.setattr(payment_reconciliations, "_process_unconsolidated_invoices", fail_second_row)
+    monkeypatch.setattr(payment_reconciliations, "send_error_email", lambda *args, **kwargs: None)
+
+    file_name: str = "cas_settlement_file_row_error.csv"
+    create_and_upload_settlement_file(file_name, rows)
+    add_file_event_to_queue_and_process(
+        client,
+        file_name=file_name,
+        message_type=QueueMessageTypes.CAS_MESSAGE_TYPE.value,
+    )
+
+    assert InvoiceModel.find_by_id(invoice_ids[0]).invoice_status_code == InvoiceStatus.PAID.value
+    assert InvoiceModel.find_by_id(invoice_ids[1]).invoice_status_code == InvoiceStatus.SETTLEMENT_SCHEDULED.value
+    assert InvoiceModel.find_by_id(invoice_ids[2]).invoice_status_code == InvoiceStatus.PAID.value
+
+
 def test_online_banking_reconciliations_over_payment(session, app, client):
     """Test Reconciliations worker."""
     # 1. Create payment account
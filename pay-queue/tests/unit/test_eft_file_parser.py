@@ -16,13 +16,17 @@
 
 Test-Suite to ensure that the EFT File parser is working as intended.
 """
+import io
 from datetime import datetime
 
 from pay_api.utils.enums import EFTShortnameType
+from urllib3 import HTTPResponse
 
+from pay_queue.minio import _iter_response_lines
 from pay_queue.services.eft import EFTHeader, EFTRecord, EFTTrailer
 from pay_queue.services.eft.eft_enums import EFTConstants
 from pay_queue.services.eft.eft_errors import EFTError
+from pay_queue.services.eft.eft_reconciliation import _parse_tdi17_lines
 from tests.utilities.factory_utils import factory_eft_header, factory_eft_record, factory_eft_trailer
 
 
@@ -655,3 +659,20 @@ def test_eft_parse_file():
         assert eft_records[4].jv_number == "002425836"
         assert eft_records[4].transaction_date is None
         assert eft_records[4].short_name_type is None
+
+
+def test_eft_parse_streamed_file():
+    """Test EFT parsing a file streamed line by line from object storage."""
+    with open("tests/unit/test_data/tdi17_sample.txt", "rb") as f:
+        response = HTTPResponse(body=io.BytesIO(f.read()), preload_content=False)
+
+    eft_header, eft_trailer, eft_records = _parse_tdi17_lines(_iter_response_lines(response))
+
+    assert eft_header.index == 0
+    assert eft_header.record_type == "1"
+    assert eft_trailer.index == 6
+    assert eft_trailer.number_of_details == 5
+    assert len(eft_records) == 5
+    assert [record.index for record in eft_records] == [1, 2, 3, 4, 5]
+    assert eft_records[1].transaction_description == "HSIMPSON"
+    assert response.closed